@@ -0,0 +1,268 @@
+"""
+Rolling-origin backtest of the forecasting models.
+
+Builds the monthly series the analysis forecasts (per tenant: the expense total,
+every category and every project), cuts each one at several forecast origins,
+fits every model on the history before the origin and scores the next `horizon`
+months against what actually happened. Reports MAPE, sMAPE, 95% interval coverage
+and fit time per model.
+
+All folds of all series are fitted as one batch per model, so the engine's
+vectorized grid search and process pool (`--workers`) do the parallel work.
+
+Series come from the synthetic generator (one seeded ledger per tenant) or from an
+exported dataset: .csv or .xlsx transactions with Date and Amount columns and
+optionally Category, Project and a tenant column (tenant_id / tenant).
+
+Usage:
+    python -m benchmarks.backtest --tenants 20 --rows 5000
+    python -m benchmarks.backtest --dataset export.csv --horizon 3 --folds 6
+    python -m benchmarks.backtest --models holt holt_winters --workers 4 --output backtest.json
+"""
+import argparse
+import json
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic_ledger import LedgerSpec, generate_ledger
+from src.application.analysis_services import NON_EXPENSE_CATEGORIES, ForecastService
+from src.application.forecast_engine import FIT_CHUNK_SIZE, FIT_WORKERS, Z_95, ForecastEngine, bootstrap_bounds
+
+# Holt-Winters only kicks in above one season; a season longer than any history
+# pins the engine to Holt's linear model
+_NO_SEASON = 10**9
+
+# (point, lower, upper), each (series x horizon)
+Forecasts = Tuple[np.ndarray, np.ndarray, np.ndarray]
+Model = Callable[[Sequence[Sequence[float]], int, int], Forecasts]
+
+
+def _engine_model(factory: Callable[[int], ForecastEngine]) -> Model:
+    def run(series: Sequence[Sequence[float]], horizon: int, workers: int) -> Forecasts:
+        fits = ForecastService.fit_series(series, horizon, engine=factory(workers))
+        point = np.zeros((len(series), horizon))
+        for i, fit in enumerate(fits):
+            if fit is not None:
+                point[i] = fit.forecast(horizon)
+        return (point, *bootstrap_bounds(fits, horizon))
+    return run
+
+
+def _naive(series: Sequence[Sequence[float]], horizon: int, workers: int) -> Forecasts:
+    """Last value carried forward; interval from the spread of month-to-month changes."""
+    last = np.array([s[-1] for s in series], dtype=np.float64)
+    sigma = np.array([np.std(np.diff(s)) if len(s) > 1 else 0.0 for s in series])
+    margin = Z_95 * sigma[:, None] * np.sqrt(np.arange(1, horizon + 1))
+    point = np.repeat(last[:, None], horizon, axis=1)
+    return point, np.maximum(0, point - margin), point + margin
+
+
+MODELS: Dict[str, Model] = {
+    "naive": _naive,
+    "holt_fixed": _engine_model(lambda w: ForecastEngine((0.6,), (0.3,), (0.3,), workers=w)),
+    "holt": _engine_model(lambda w: ForecastEngine(season_length=_NO_SEASON, workers=w)),
+    "holt_winters": _engine_model(lambda w: ForecastEngine(workers=w)),
+}
+
+
+@dataclass
+class Folds:
+    """
+    Training windows and the actuals that follow them.
+
+    Attributes:
+        train (List[np.ndarray]): History up to each forecast origin.
+        actual (np.ndarray): (folds x horizon) realised values after each origin.
+        kind (List[str]): Series kind per fold (total, category, project).
+    """
+    train: List[np.ndarray]
+    actual: np.ndarray
+    kind: List[str]
+
+
+def ledger_series(frame: pd.DataFrame) -> Dict[str, List[np.ndarray]]:
+    """
+    Monthly expense series of one tenant, built like the analysis builds them.
+
+    Args:
+        frame (pd.DataFrame): Transactions with date, amount and optionally
+            category and project columns (lower-case names).
+
+    Returns:
+        Dict[str, List[np.ndarray]]: 'total', 'category' and 'project' series
+            (absolute amounts summed per month, months without spend omitted).
+    """
+    if "category" in frame:
+        frame = frame[~frame["category"].isin(NON_EXPENSE_CATEGORIES)]
+    month = pd.to_datetime(frame["date"]).dt.to_period("M")
+    amount = frame["amount"].astype(float).abs()
+
+    series: Dict[str, List[np.ndarray]] = {
+        "total": [amount.groupby(month).sum().sort_index().to_numpy()], "category": [], "project": [],
+    }
+    for kind in ("category", "project"):
+        if kind in frame:
+            grouped = amount.groupby([frame[kind].fillna("Unassigned"), month]).sum().sort_index()
+            series[kind] = [values.to_numpy() for _, values in grouped.groupby(level=0)]
+    return series
+
+
+def make_folds(series: Dict[str, List[np.ndarray]], horizon: int, folds: int, step: int, min_train: int) -> Folds:
+    """
+    Cuts every series at up to `folds` origins, `step` months apart, ending `horizon`
+    months before its last value. Origins with fewer than `min_train` months of
+    history are skipped.
+    """
+    train, actual, kinds = [], [], []
+    for kind, values in series.items():
+        for s in values:
+            for k in range(folds):
+                origin = len(s) - horizon - k * step
+                if origin < max(min_train, 2):
+                    break
+                train.append(s[:origin])
+                actual.append(s[origin:origin + horizon])
+                kinds.append(kind)
+    return Folds(train, np.array(actual).reshape(len(actual), horizon), kinds)
+
+
+def score(actual: np.ndarray, point: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> Dict[str, float]:
+    """
+    Accuracy of a batch of forecasts.
+
+    MAPE skips zero actuals; sMAPE counts months where both values are zero as
+    exact; coverage is the share of actuals inside the interval.
+
+    Returns:
+        Dict[str, float]: mape and smape (percent), coverage (0-1).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        nonzero = actual != 0
+        ape = np.abs(point - actual)[nonzero] / np.abs(actual[nonzero])
+        denominator = np.abs(point) + np.abs(actual)
+        sape = np.where(denominator > 0, 2 * np.abs(point - actual) / denominator, 0.0)
+    covered = (actual >= lower) & (actual <= upper)
+    return {
+        "mape": round(float(100 * ape.mean()), 2) if ape.size else 0.0,
+        "smape": round(float(100 * sape.mean()), 2) if sape.size else 0.0,
+        "coverage": round(float(covered.mean()), 4) if covered.size else 0.0,
+    }
+
+
+def backtest(folds: Folds, models: Sequence[str], horizon: int, workers: int) -> Dict[str, Dict]:
+    """
+    Fits and scores every model on the same folds.
+
+    Returns:
+        Dict[str, Dict]: Per model: fit seconds, overall scores, scores per series
+            kind and MAPE per forecast step.
+    """
+    kinds = np.array(folds.kind)
+    if workers > 1:
+        # Start the fit processes up front so their startup is not billed to the first model
+        ForecastEngine(workers=workers).fit(folds.train[:FIT_CHUNK_SIZE * workers], horizon)
+    report = {}
+    for name in models:
+        started = time.perf_counter()
+        point, lower, upper = MODELS[name](folds.train, horizon, workers)
+        elapsed = time.perf_counter() - started
+
+        report[name] = {
+            "fit_seconds": round(elapsed, 4),
+            **score(folds.actual, point, lower, upper),
+            "by_kind": {
+                kind: score(folds.actual[kinds == kind], point[kinds == kind], lower[kinds == kind], upper[kinds == kind])
+                for kind in sorted(set(folds.kind))
+            },
+            "mape_by_step": [
+                score(folds.actual[:, k], point[:, k], lower[:, k], upper[:, k])["mape"] for k in range(horizon)
+            ],
+        }
+    return report
+
+
+def synthetic_tenants(tenants: int, rows: int, months: int, seed: int) -> List[pd.DataFrame]:
+    """One seeded synthetic ledger per tenant, with lower-case column names."""
+    frames = []
+    for t in range(tenants):
+        sheets = generate_ledger(LedgerSpec(rows=rows, seed=seed + t, months=months))
+        frames.append(pd.concat(sheets.values(), ignore_index=True).rename(columns=str.lower))
+    return frames
+
+
+def load_dataset(path: Path) -> List[pd.DataFrame]:
+    """
+    Reads exported transactions (.csv, or every sheet of an .xlsx) and splits them by tenant.
+
+    Raises:
+        ValueError: On an unsupported format or missing Date/Amount columns.
+    """
+    if path.suffix == ".csv":
+        frame = pd.read_csv(path)
+    elif path.suffix == ".xlsx":
+        frame = pd.concat(pd.read_excel(path, sheet_name=None).values(), ignore_index=True)
+    else:
+        raise ValueError(f"Unsupported dataset format: {path.suffix}")
+
+    frame = frame.rename(columns=lambda c: str(c).strip().lower())
+    missing = {"date", "amount"} - set(frame.columns)
+    if missing:
+        raise ValueError(f"Dataset is missing columns: {', '.join(sorted(missing))}")
+    tenant = next((c for c in ("tenant_id", "tenant") if c in frame), None)
+    if tenant is None:
+        return [frame]
+    return [group for _, group in frame.groupby(tenant, sort=False)]
+
+
+def print_report(report: Dict[str, Dict], folds: Folds) -> None:
+    print(f"\n== {len(folds.train):,} folds, horizon {folds.actual.shape[1]}")
+    print(f"  {'model':<14} {'MAPE':>8} {'sMAPE':>8} {'coverage':>9} {'fit':>9}")
+    for name, r in report.items():
+        print(f"  {name:<14} {r['mape']:7.2f}% {r['smape']:7.2f}% {r['coverage']:9.1%} {r['fit_seconds']:8.3f}s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of the forecasting models.")
+    parser.add_argument("--dataset", type=Path, help="Exported transactions (.csv/.xlsx); synthetic tenants if omitted")
+    parser.add_argument("--tenants", type=int, default=10)
+    parser.add_argument("--rows", type=int, default=5_000, help="Rows per synthetic tenant")
+    parser.add_argument("--months", type=int, default=36, help="History length of synthetic tenants")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--models", nargs="+", choices=sorted(MODELS), default=list(MODELS))
+    parser.add_argument("--horizon", type=int, default=6)
+    parser.add_argument("--folds", type=int, default=4, help="Forecast origins per series")
+    parser.add_argument("--step", type=int, default=1, help="Months between origins")
+    parser.add_argument("--min-train", type=int, default=6, help="Shortest history a fold may train on")
+    parser.add_argument("--workers", type=int, default=FIT_WORKERS, help="Fit processes per model (1 = in-process)")
+    parser.add_argument("--output", type=Path, help="Write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.dataset:
+        frames = load_dataset(args.dataset)
+    else:
+        frames = synthetic_tenants(args.tenants, args.rows, args.months, args.seed)
+
+    series: Dict[str, List[np.ndarray]] = {"total": [], "category": [], "project": []}
+    for frame in frames:
+        for kind, values in ledger_series(frame).items():
+            series[kind].extend(values)
+    folds = make_folds(series, args.horizon, args.folds, args.step, args.min_train)
+    if not folds.train:
+        print("No series long enough to backtest")
+        return 1
+
+    report = backtest(folds, args.models, args.horizon, args.workers)
+    print_report(report, folds)
+    if args.output:
+        args.output.write_text(json.dumps({"folds": len(folds.train), "horizon": args.horizon, "models": report}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+"""
+Seeded synthetic ledger generator for benchmarks.
+
+Produces realistic-looking transaction histories at arbitrary scale: a catalogue of
+known merchants, fixed-price subscriptions, a long tail of free-text card
+descriptions, monthly seasonality with a Q4 spike, and a few payments/transfers.
+Generation is vectorized with NumPy so a 1M-row ledger takes seconds.
+
+Usage:
+    python -m benchmarks.synthetic_ledger --rows 100000 --sheets 3 --out ledger.xlsx
+"""
+import argparse
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Tuple
+import numpy as np
+import pandas as pd
+
+# Excel's hard row limit per sheet (minus the header row)
+XLSX_MAX_ROWS = 1_048_575
+
+# (description, category, typical amount, relative spread)
+MERCHANTS: List[Tuple[str, str, float, float]] = [
+    ("AWS", "Hosting/Cloud", 4200.0, 0.35),
+    ("Google Cloud Platform", "Hosting/Cloud", 1800.0, 0.30),
+    ("Azure Consumption", "Hosting/Cloud", 2500.0, 0.30),
+    ("Datadog", "Observability", 950.0, 0.20),
+    ("PagerDuty", "Observability", 310.0, 0.10),
+    ("Snowflake Credits", "Data", 1400.0, 0.40),
+    ("Upwork Contractor", "Contractors", 3200.0, 0.50),
+    ("Toptal Consulting", "Contractors", 8500.0, 0.25),
+    ("Dell Laptop", "Hardware", 1650.0, 0.15),
+    ("Apple MacBook Pro", "Hardware", 2900.0, 0.10),
+    ("CDW Monitor", "Hardware", 420.0, 0.20),
+    ("Office Rent", "Facilities", 12000.0, 0.02),
+    ("Electricity Utility", "Facilities", 800.0, 0.25),
+    ("Cleaning Services", "Facilities", 600.0, 0.10),
+    ("HubSpot", "Marketing", 1100.0, 0.05),
+    ("Google Ads", "Marketing", 2600.0, 0.60),
+    ("LinkedIn Ads", "Marketing", 1500.0, 0.50),
+    ("Salesforce", "Sales", 3000.0, 0.05),
+    ("Delta Airlines", "Travel", 650.0, 0.45),
+    ("Uber", "Travel", 38.0, 0.60),
+    ("Marriott Hotel", "Travel", 240.0, 0.35),
+    ("Lunch Meeting", "Meals", 85.0, 0.50),
+]
+
+# (description, category, amount, cadence in days)
+SUBSCRIPTIONS: List[Tuple[str, str, float, int]] = [
+    ("GitHub Enterprise", "Software", 2100.0, 30),
+    ("Slack Business+", "Software", 1250.0, 30),
+    ("Atlassian Jira Cloud", "Software", 780.0, 30),
+    ("Zoom Pro", "Software", 149.9, 30),
+    ("Figma Organization", "Software", 450.0, 30),
+    ("Notion Team", "Software", 96.0, 30),
+    ("1Password Business", "Security", 320.0, 30),
+    ("Okta Workforce", "Security", 1900.0, 30),
+    ("JetBrains All Products Annual", "Software", 7800.0, 365),
+    ("Adobe Creative Cloud Annual", "Software", 4300.0, 365),
+    ("Sentry Team", "Observability", 260.0, 30),
+    ("Vercel Pro", "Hosting/Cloud", 40.0, 7),
+]
+
+PROJECTS = ["General", "Platform", "Mobile App", "Data Lake", "Website Redesign", "Security Uplift", "Migration", "R&D"]
+
+TAIL_PREFIXES = ["POS PURCHASE", "CARD", "ONLINE", "DEBIT", "SQ *", "PAYPAL *"]
+TAIL_WORDS = ["Cafe", "Store", "Supplies", "Market", "Books", "Print", "Parking", "Fuel", "Hardware", "Deli", "Courier", "Catering"]
+
+NON_EXPENSE: List[Tuple[str, str]] = [
+    ("Credit Card Payment - Thank You", "Credit Card Payment"),
+    ("Transfer to Savings", "Transfer"),
+    ("Customer Refund", "Income"),
+]
+
+
+@dataclass
+class LedgerSpec:
+    """
+    Shape of a synthetic ledger.
+
+    Attributes:
+        rows (int): Total number of transactions.
+        seed (int): RNG seed; identical specs produce identical ledgers.
+        start (date): First possible transaction date.
+        months (int): Length of the history in months.
+        sheets (int): Number of sheets the rows are split across.
+        subscription_share (float): Approximate share of subscription rows.
+        tail_share (float): Share of long-tail free-text merchants.
+        tail_merchants (int): Distinct long-tail merchant strings.
+        non_expense_share (float): Share of payments/transfers/income.
+        uncategorized_share (float): Share of catalogue rows left uncategorized.
+    """
+    rows: int
+    seed: int = 42
+    start: date = date(2022, 1, 1)
+    months: int = 36
+    sheets: int = 1
+    subscription_share: float = 0.10
+    tail_share: float = 0.30
+    tail_merchants: int = 20_000
+    non_expense_share: float = 0.03
+    uncategorized_share: float = 0.10
+
+
+def _month_weights(months: int, start_month: int) -> np.ndarray:
+    calendar_month = (np.arange(months) + start_month - 1) % 12
+    growth = np.linspace(1.0, 1.4, months)
+    seasonal = 1.0 + 0.15 * np.sin(2 * np.pi * calendar_month / 12)
+    q4 = np.where(calendar_month >= 9, 1.35, 1.0)
+    weights = growth * seasonal * q4
+    return weights / weights.sum()
+
+
+def _random_dates(rng: np.random.Generator, spec: LedgerSpec, n: int) -> np.ndarray:
+    start = np.datetime64(spec.start, "M")
+    months = rng.choice(spec.months, size=n, p=_month_weights(spec.months, spec.start.month))
+    month_start = (start + months).astype("datetime64[D]")
+    days_in_month = ((start + months + 1).astype("datetime64[D]") - month_start).astype(np.int64)
+    return month_start + (rng.random(n) * days_in_month).astype(np.int64)
+
+
+def _subscription_rows(spec: LedgerSpec, n: int) -> pd.DataFrame:
+    start = np.datetime64(spec.start, "D")
+    end = (np.datetime64(spec.start, "M") + spec.months).astype("datetime64[D]")
+    frames = []
+    for i, (desc, cat, amount, cadence) in enumerate(SUBSCRIPTIONS):
+        offset = np.timedelta64(i * 3 % cadence, "D")
+        dates = np.arange(start + offset, end, np.timedelta64(cadence, "D"))
+        # Price rise one third of the way through
+        amounts = np.where(np.arange(len(dates)) > len(dates) // 3, round(amount * 1.08, 2), amount)
+        frames.append(pd.DataFrame({
+            "Date": dates, "Category": cat, "Amount": amounts, "Description": desc, "Project": "General",
+        }))
+    subs = pd.concat(frames, ignore_index=True).sort_values("Date", kind="stable")
+    if n <= 0:
+        return subs.iloc[:0]
+    # Repeat the subscription book (as per-entity cards) until the quota is filled
+    reps = int(np.ceil(n / len(subs)))
+    out = pd.concat([subs] * reps, ignore_index=True).iloc[:n].copy()
+    copy_no = np.repeat(np.arange(reps), len(subs))[:n]
+    out.loc[copy_no > 0, "Description"] = out.loc[copy_no > 0, "Description"] + " - Team " + copy_no[copy_no > 0].astype(str)
+    return out
+
+
+def generate_ledger(spec: LedgerSpec) -> Dict[str, pd.DataFrame]:
+    """
+    Generates a synthetic ledger.
+
+    Args:
+        spec (LedgerSpec): Size and shape of the ledger.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Sheet name -> frame with Date, Category, Amount,
+        Description and Project columns, each sheet sorted by date.
+    """
+    rng = np.random.default_rng(spec.seed)
+    n = spec.rows
+    n_subs = int(n * spec.subscription_share)
+    n_tail = int(n * spec.tail_share)
+    n_other = int(n * spec.non_expense_share)
+    n_catalogue = n - n_subs - n_tail - n_other
+
+    # Catalogue merchants (log-normal amounts around a typical price)
+    idx = rng.integers(0, len(MERCHANTS), n_catalogue)
+    base = np.array([m[2] for m in MERCHANTS])[idx]
+    spread = np.array([m[3] for m in MERCHANTS])[idx]
+    catalogue = pd.DataFrame({
+        "Date": _random_dates(rng, spec, n_catalogue),
+        "Category": np.array([m[1] for m in MERCHANTS], dtype=object)[idx],
+        "Amount": np.round(base * rng.lognormal(0.0, spread), 2),
+        "Description": np.array([m[0] for m in MERCHANTS], dtype=object)[idx],
+        "Project": np.array(PROJECTS, dtype=object)[rng.integers(0, len(PROJECTS), n_catalogue)],
+    })
+    uncategorized = rng.random(n_catalogue) < spec.uncategorized_share
+    catalogue.loc[uncategorized, "Category"] = "Uncategorized"
+
+    # Long tail of free-text descriptions
+    tail_ids = rng.zipf(1.3, n_tail) % spec.tail_merchants
+    prefixes = np.array(TAIL_PREFIXES, dtype=object)[tail_ids % len(TAIL_PREFIXES)]
+    words = np.array(TAIL_WORDS, dtype=object)[(tail_ids // len(TAIL_PREFIXES)) % len(TAIL_WORDS)]
+    tail = pd.DataFrame({
+        "Date": _random_dates(rng, spec, n_tail),
+        "Category": "General",
+        "Amount": np.round(rng.lognormal(3.5, 0.9, n_tail), 2),
+        "Description": prefixes + " " + words + " #" + tail_ids.astype(str),
+        "Project": np.array(PROJECTS, dtype=object)[rng.integers(0, len(PROJECTS), n_tail)],
+    })
+
+    other_idx = rng.integers(0, len(NON_EXPENSE), n_other)
+    other = pd.DataFrame({
+        "Date": _random_dates(rng, spec, n_other),
+        "Category": np.array([c for _, c in NON_EXPENSE], dtype=object)[other_idx],
+        "Amount": -np.round(rng.lognormal(7.5, 0.8, n_other), 2),
+        "Description": np.array([d for d, _ in NON_EXPENSE], dtype=object)[other_idx],
+        "Project": "General",
+    })
+
+    ledger = pd.concat([catalogue, tail, other, _subscription_rows(spec, n_subs)], ignore_index=True)
+    ledger = ledger.iloc[rng.permutation(len(ledger))].reset_index(drop=True)
+    ledger["Date"] = pd.to_datetime(ledger["Date"]).dt.date
+
+    sheets = max(1, spec.sheets)
+    if -(-len(ledger) // sheets) > XLSX_MAX_ROWS:
+        sheets = -(-len(ledger) // XLSX_MAX_ROWS)
+    chunks = np.array_split(np.arange(len(ledger)), sheets)
+    return {
+        f"Sheet{i + 1}": ledger.iloc[chunk].sort_values("Date", kind="stable").reset_index(drop=True)
+        for i, chunk in enumerate(chunks)
+    }
+
+
+def to_xlsx_bytes(sheets: Dict[str, pd.DataFrame]) -> bytes:
+    """Serializes the sheets into a single .xlsx workbook."""
+    import io
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        for name, frame in sheets.items():
+            frame.to_excel(writer, sheet_name=name, index=False)
+    return buffer.getvalue()
+
+
+def write_ledger(sheets: Dict[str, pd.DataFrame], out: Path) -> List[Path]:
+    """
+    Writes the ledger as .xlsx (one workbook) or .csv (one file per sheet).
+
+    Args:
+        sheets (Dict[str, pd.DataFrame]): Output of `generate_ledger`.
+        out (Path): Target path; the suffix selects the format.
+
+    Returns:
+        List[Path]: Files written.
+    """
+    if out.suffix == ".xlsx":
+        out.write_bytes(to_xlsx_bytes(sheets))
+        return [out]
+    if out.suffix == ".csv":
+        if len(sheets) == 1:
+            next(iter(sheets.values())).to_csv(out, index=False)
+            return [out]
+        paths = []
+        for name, frame in sheets.items():
+            path = out.with_name(f"{out.stem}_{name}{out.suffix}")
+            frame.to_csv(path, index=False)
+            paths.append(path)
+        return paths
+    raise ValueError(f"Unsupported ledger format: {out.suffix}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic ledger.")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--months", type=int, default=36)
+    parser.add_argument("--sheets", type=int, default=1)
+    parser.add_argument("--out", type=Path, default=Path("synthetic_ledger.xlsx"))
+    args = parser.parse_args()
+
+    spec = LedgerSpec(rows=args.rows, seed=args.seed, months=args.months, sheets=args.sheets)
+    for path in write_ledger(generate_ledger(spec), args.out):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""Add source_file and (tenant_id, date) index to budget_entries
+
+Revision ID: 8c1d2e3f4a5b
+Revises: 425527d25b72
+Create Date: 2026-01-12 10:04:12.418203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1d2e3f4a5b'
+down_revision: Union[str, None] = '425527d25b72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('budget_entries', sa.Column('source_file', sa.String(), nullable=True))
+    op.create_index('ix_budget_entries_tenant_date', 'budget_entries', ['tenant_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_budget_entries_tenant_date', table_name='budget_entries')
+    op.drop_column('budget_entries', 'source_file')
@@ -0,0 +1,39 @@
+"""Persist the rule re-categorization queue
+
+Revision ID: a7d9f1b3c5e7
+Revises: f6c8e0a2b4d5
+Create Date: 2026-10-19 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d9f1b3c5e7'
+down_revision: Union[str, None] = 'f6c8e0a2b4d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('recategorization_jobs',
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('generation', sa.Integer(), nullable=False),
+    sa.Column('last_id', sa.Integer(), nullable=False),
+    sa.Column('scanned', sa.Integer(), nullable=False),
+    sa.Column('updated', sa.Integer(), nullable=False),
+    sa.Column('done', sa.Boolean(), nullable=False),
+    sa.Column('requested_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('tenant_id')
+    )
+    op.create_index(op.f('ix_recategorization_jobs_done'), 'recategorization_jobs', ['done'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_recategorization_jobs_done'), table_name='recategorization_jobs')
+    op.drop_table('recategorization_jobs')
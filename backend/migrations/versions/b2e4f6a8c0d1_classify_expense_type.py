@@ -0,0 +1,31 @@
+"""Reset expense_type for classification and index it per tenant
+
+Rows were only ever stored with the column default ('opex'), so they are reset to
+NULL and classified by the expense_type_backfill job.
+
+Revision ID: b2e4f6a8c0d1
+Revises: 8c1d2e3f4a5b
+Create Date: 2026-01-19 09:31:45.102944
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b2e4f6a8c0d1'
+down_revision: Union[str, None] = '8c1d2e3f4a5b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("UPDATE budget_entries SET expense_type = NULL")
+    op.create_index('ix_budget_entries_tenant_expense_type', 'budget_entries', ['tenant_id', 'expense_type'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_budget_entries_tenant_expense_type', table_name='budget_entries')
+    op.execute("UPDATE budget_entries SET expense_type = 'opex' WHERE expense_type IS NULL")
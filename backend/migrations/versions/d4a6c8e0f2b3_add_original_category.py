@@ -0,0 +1,29 @@
+"""Keep the imported category so rule changes can be re-applied
+
+Existing rows take their current category as the imported one.
+
+Revision ID: d4a6c8e0f2b3
+Revises: b2e4f6a8c0d1
+Create Date: 2026-01-26 14:12:08.530417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4a6c8e0f2b3'
+down_revision: Union[str, None] = 'b2e4f6a8c0d1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('budget_entries', sa.Column('original_category', sa.String(), nullable=True))
+    op.execute("UPDATE budget_entries SET original_category = category")
+
+
+def downgrade() -> None:
+    op.drop_column('budget_entries', 'original_category')
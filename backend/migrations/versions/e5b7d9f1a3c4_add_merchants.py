@@ -0,0 +1,47 @@
+"""Add per-tenant merchants and link budget entries to them
+
+Existing rows keep merchant_id NULL and are linked by the merchant_backfill job.
+
+Revision ID: e5b7d9f1a3c4
+Revises: d4a6c8e0f2b3
+Create Date: 2026-02-02 10:47:21.604183
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5b7d9f1a3c4'
+down_revision: Union[str, None] = 'd4a6c8e0f2b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('merchants',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('aliases', sa.JSON(), nullable=True),
+    sa.Column('default_category', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('tenant_id', 'name', name='uq_merchants_tenant_name')
+    )
+    # Batch mode so the foreign key can be added on SQLite as well
+    with op.batch_alter_table('budget_entries') as batch_op:
+        batch_op.add_column(sa.Column('merchant_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_budget_entries_merchant_id', 'merchants', ['merchant_id'], ['id'])
+        batch_op.create_index('ix_budget_entries_tenant_merchant', ['tenant_id', 'merchant_id'], unique=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('budget_entries') as batch_op:
+        batch_op.drop_index('ix_budget_entries_tenant_merchant')
+        batch_op.drop_constraint('fk_budget_entries_merchant_id', type_='foreignkey')
+        batch_op.drop_column('merchant_id')
+    op.drop_table('merchants')
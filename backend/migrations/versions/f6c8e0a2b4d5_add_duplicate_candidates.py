@@ -0,0 +1,40 @@
+"""Add the near-duplicate review queue
+
+Revision ID: f6c8e0a2b4d5
+Revises: e5b7d9f1a3c4
+Create Date: 2026-02-09 16:05:33.218790
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6c8e0a2b4d5'
+down_revision: Union[str, None] = 'e5b7d9f1a3c4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('duplicate_candidates',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('duplicate_of_id', sa.Integer(), nullable=False),
+    sa.Column('similarity', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ),
+    sa.ForeignKeyConstraint(['entry_id'], ['budget_entries.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['duplicate_of_id'], ['budget_entries.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_duplicate_candidates_tenant_status', 'duplicate_candidates', ['tenant_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_duplicate_candidates_tenant_status', table_name='duplicate_candidates')
+    op.drop_table('duplicate_candidates')
@@ -1,7 +1,8 @@
 from typing import List, Dict, Optional, AsyncIterator
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from src.infrastructure.models import BudgetModel
+from src.infrastructure.models import BudgetModel, MerchantModel
+from src.application.merchant_normalizer import merchant_display_name
 from src.domain.user import User
 from src.application.dtos import BudgetContextDTO, DateRangeDTO, TransactionDTO
 from src.application.ports import LLMProvider
@@ -23,6 +24,7 @@ class AIChatService:
         """
         Extract merchant name from transaction description.
         Simple heuristic: take first meaningful words (skip common prefixes).
+        Only used for rows not yet linked to a stored merchant.
         """
         # Remove common prefixes
         desc = description.strip()
@@ -67,6 +69,10 @@ class AIChatService:
         categories = {}
         projects = {}
         merchants = {}
+        merchant_names = dict((await self.session.execute(
+            select(MerchantModel.id, MerchantModel.aliases[0].as_string())
+            .where(MerchantModel.tenant_id == self.user.tenant_id)
+        )).all())
         dates = []
         large_transactions_list = []
         
@@ -79,8 +85,11 @@ class AIChatService:
             proj = entry.project or "No Project"
             projects[proj] = projects.get(proj, 0) + float(entry.amount)
             
-            # Merchant extraction (from description)
-            merchant = self._extract_merchant(entry.description)
+            # Merchant: the stored merchant when linked, else extracted from the description
+            if merchant_names.get(entry.merchant_id):
+                merchant = merchant_display_name(merchant_names[entry.merchant_id])
+            else:
+                merchant = self._extract_merchant(entry.description)
             merchants[merchant] = merchants.get(merchant, 0) + float(entry.amount)
             
             # Large transactions (> $500)
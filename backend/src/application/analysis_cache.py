@@ -0,0 +1,167 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from uuid import UUID
+import hashlib
+import json
+import threading
+
+from src.domain.analysis_models import BudgetAnalysisResult
+
+
+def settings_fingerprint(settings: Optional[Dict[str, Any]]) -> str:
+    """
+    Stable hash of tenant settings, so a settings change is a cache miss.
+
+    Args:
+        settings (Optional[Dict[str, Any]]): Tenant settings.
+
+    Returns:
+        str: Hex digest of the canonical JSON form.
+    """
+    canonical = json.dumps(settings or {}, sort_keys=True, default=str)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+@dataclass
+class _CacheEntry:
+    data_version: int
+    settings_key: str
+    result: BudgetAnalysisResult
+    computed_at: datetime
+
+
+class AnalysisCache:
+    """
+    Process-local LRU cache of analysis results, one entry per tenant.
+
+    Each tenant has a data version that is bumped whenever its transactions or rules
+    change. Entries are only served for the current version and the same settings,
+    and a result computed against an older version is refused on `put`, so a warm-up
+    that races with an upload can never publish stale data.
+    """
+
+    def __init__(self, max_entries: int = 512, max_age: timedelta = timedelta(hours=24)):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: "OrderedDict[UUID, _CacheEntry]" = OrderedDict()
+        self._versions: Dict[UUID, int] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, tenant_id: UUID) -> int:
+        """Returns the tenant's current data version."""
+        with self._lock:
+            return self._versions.get(tenant_id, 0)
+
+    def invalidate(self, tenant_id: UUID) -> int:
+        """
+        Bumps the tenant's data version and drops its cached result.
+
+        Args:
+            tenant_id (UUID): The tenant whose data changed.
+
+        Returns:
+            int: The new data version.
+        """
+        with self._lock:
+            version = self._versions.get(tenant_id, 0) + 1
+            self._versions[tenant_id] = version
+            self._entries.pop(tenant_id, None)
+            return version
+
+    def get(self, tenant_id: UUID, settings: Optional[Dict[str, Any]]) -> Optional[BudgetAnalysisResult]:
+        """
+        Returns a copy of the cached result if it is fresh, else None.
+
+        Args:
+            tenant_id (UUID): The tenant.
+            settings (Optional[Dict[str, Any]]): The settings the result must have used.
+
+        Returns:
+            Optional[BudgetAnalysisResult]: The cached analysis, or None on a miss.
+        """
+        key = settings_fingerprint(settings)
+        with self._lock:
+            entry = self._entries.get(tenant_id)
+            if not self._is_fresh(tenant_id, entry, key):
+                self.misses += 1
+                return None
+            self._entries.move_to_end(tenant_id)
+            self.hits += 1
+            # Callers decorate results (e.g. upload warnings); never hand out the cached object
+            return entry.result.model_copy()
+
+    def contains(self, tenant_id: UUID, settings: Optional[Dict[str, Any]]) -> bool:
+        """
+        Whether `get` would hit, without counting a hit or miss or touching the LRU
+        order (for background probes such as the precompute job).
+
+        Args:
+            tenant_id (UUID): The tenant.
+            settings (Optional[Dict[str, Any]]): The settings the result must have used.
+
+        Returns:
+            bool: True if a fresh result is cached.
+        """
+        key = settings_fingerprint(settings)
+        with self._lock:
+            return self._is_fresh(tenant_id, self._entries.get(tenant_id), key)
+
+    def _is_fresh(self, tenant_id: UUID, entry: Optional[_CacheEntry], settings_key: str) -> bool:
+        return (
+            entry is not None
+            and entry.settings_key == settings_key
+            and entry.data_version == self._versions.get(tenant_id, 0)
+            and datetime.utcnow() - entry.computed_at <= self.max_age
+        )
+
+    def put(
+        self,
+        tenant_id: UUID,
+        settings: Optional[Dict[str, Any]],
+        result: BudgetAnalysisResult,
+        data_version: int,
+    ) -> bool:
+        """
+        Stores a result computed against `data_version`.
+
+        Args:
+            tenant_id (UUID): The tenant.
+            settings (Optional[Dict[str, Any]]): Settings used for the computation.
+            result (BudgetAnalysisResult): The analysis result.
+            data_version (int): The tenant's data version read before computing.
+
+        Returns:
+            bool: False if the data changed in the meantime and the result was discarded.
+        """
+        with self._lock:
+            if data_version != self._versions.get(tenant_id, 0):
+                return False
+            self._entries[tenant_id] = _CacheEntry(
+                data_version=data_version,
+                settings_key=settings_fingerprint(settings),
+                result=result.model_copy(),
+                computed_at=datetime.utcnow(),
+            )
+            self._entries.move_to_end(tenant_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss counters and the current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# Shared instance used by the API and the precompute job
+analysis_cache = AnalysisCache()
@@ -1,4 +1,5 @@
-from typing import List, Dict, Any, Literal
+from typing import List, Dict, Any, Literal, Optional, Sequence, Tuple
+from functools import lru_cache
 from decimal import Decimal
 import math
 from datetime import date, timedelta, datetime
@@ -6,10 +7,17 @@ import numpy as np
 import structlog
 from dataclasses import dataclass
 from enum import Enum
-import random
 
 from src.infrastructure.models import BudgetModel
 from src.domain.analysis_models import FlashFillSuggestion, SubscriptionEntry, AnomalyEntry
+from src.application.gap_engine import GapEngine
+from src.application.ledger_columns import LedgerColumns
+from src.application.keyword_classifier import KeywordClassifier
+from src.application.forecast_engine import DEFAULT_SEASON_LENGTH, FittedForecast, ForecastEngine, bootstrap_bounds
+from src.application.time_buckets import MONTH_NAMES
+from src.application.forecast_cache import (
+    ForecastCache, MAX_FORECAST_HORIZON, MAX_INCREMENTAL_MONTHS, series_fingerprint
+)
 
 logger = structlog.get_logger()
 
@@ -27,6 +35,22 @@ OPEX_KEYWORDS = [
     'utility', 'rent', 'service'
 ]
 
+CAPEX_CATEGORIES = frozenset({'Hardware', 'Equipment', 'Infrastructure', 'Licenses'})
+OPEX_CATEGORIES = frozenset({'Software', 'Hosting/Cloud', 'Contractors', 'Subscriptions'})
+CAPEX_AMOUNT_THRESHOLD = 10000  # Large one-time purchases are likely capitalized
+
+# Monte Carlo settings for CapEx timing (seeded so forecasts are reproducible)
+CAPEX_SIMULATIONS = 1000
+CAPEX_SEED = 0
+
+# Timeline markers: implicit yearly contracts and hardware with a multi-year lifecycle
+CONTRACT_KEYWORDS = ["annual", "renewal", "yearly", "lease", "contract", "license"]
+HARDWARE_KEYWORDS = ["macbook", "laptop", "server", "dell", "lenovo", "hp ", "apple"]
+
+# Categories that move money around rather than spend it. Excluded from totals
+# and trends so payments (positive) don't cancel out expenses (negative).
+NON_EXPENSE_CATEGORIES = frozenset({"Payment", "Transfer", "Income", "Credit Card Payment", "Opening Balance"})
+
 # --- Enums & Dataclasses for V2 ---
 
 class ProjectPhase(Enum):
@@ -50,20 +74,20 @@ def classify_expense(
     description: str,
     amount: float,
     category: str = None,
-    is_recurring: bool = None
+    is_recurring: bool = None,
+    classifier: Optional[KeywordClassifier] = None
 ) -> Literal['capex', 'opex']:
     """
     Classify expense as CapEx or OpEx based on heuristics.
     """
-    desc_lower = description.lower()
-
     # 1. Check explicit flag
     if is_recurring is not None:
         return 'opex' if is_recurring else 'capex'
 
     # 2. Keyword matching
-    capex_score = sum(1 for kw in CAPEX_KEYWORDS if kw in desc_lower)
-    opex_score = sum(1 for kw in OPEX_KEYWORDS if kw in desc_lower)
+    clf = classifier or default_keyword_classifier()
+    capex_score = clf.tag_count(description, "capex")
+    opex_score = clf.tag_count(description, "opex")
 
     if capex_score > opex_score:
         return 'capex'
@@ -71,20 +95,54 @@ def classify_expense(
         return 'opex'
 
     # 3. Category-based rules (if provided)
-    capex_categories = {'Hardware', 'Equipment', 'Infrastructure', 'Licenses'}
-    opex_categories = {'Software', 'Hosting/Cloud', 'Contractors', 'Subscriptions'}
-
-    if category in capex_categories:
+    if category in CAPEX_CATEGORIES:
         return 'capex'
-    if category in opex_categories:
+    if category in OPEX_CATEGORIES:
         return 'opex'
 
     # 4. Amount heuristic (large one-time = likely CapEx)
-    if abs(amount) > 10000: 
+    if abs(amount) > CAPEX_AMOUNT_THRESHOLD: 
         return 'capex'
 
     return 'opex'
 
+def classify_expense_batch(
+    descriptions: Sequence[str],
+    amounts: Sequence[float],
+    categories: Sequence[str],
+    classifier: Optional[KeywordClassifier] = None
+) -> List[str]:
+    """
+    Vectorized classify_expense for whole columns (same rules, same precedence).
+
+    Descriptions are scanned once per distinct value; the keyword, category and
+    amount rules are then applied as array masks.
+
+    Returns:
+        List[str]: 'capex' or 'opex' per row.
+    """
+    if not len(descriptions):
+        return []
+    clf = classifier or default_keyword_classifier()
+    _, tags = clf.scan_column(descriptions)
+    capex_score = tags[:, clf.tags.index("capex")]
+    opex_score = tags[:, clf.tags.index("opex")]
+    category_arr = np.asarray(categories, dtype=object)
+    amount_arr = np.abs(np.asarray(amounts, dtype=np.float64))
+
+    result = np.select(
+        [
+            capex_score > opex_score,
+            opex_score > capex_score,
+            np.isin(category_arr, list(CAPEX_CATEGORIES)),
+            np.isin(category_arr, list(OPEX_CATEGORIES)),
+            amount_arr > CAPEX_AMOUNT_THRESHOLD,
+        ],
+        ["capex", "opex", "capex", "opex", "capex"],
+        default="opex",
+    )
+    return result.tolist()
+
 def s_curve_spend(t: float, total_budget: float, midpoint: float, steepness: float = 1.0) -> float:
     """
     Logistic S-curve for cumulative project spending.
@@ -109,25 +167,58 @@ def determine_phase(current_month: int, total_months: int) -> ProjectPhase:
     else:
         return ProjectPhase.COMPLETE
 
+def s_curve_monthly(
+    total_budget: np.ndarray,
+    duration_months: np.ndarray,
+    current_month: np.ndarray,
+    periods: int,
+    steepness: float = 1.0,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Monthly spend from the logistic S-curve for many projects at once.
+
+    Each project's cumulative curve (midpoint at half its duration) is evaluated once
+    per month for t = current_month .. current_month + periods; monthly spend is the
+    difference of consecutive points. Months before the project starts (t < 1) or
+    after it ends (t > duration) spend nothing.
+
+    Args:
+        total_budget (np.ndarray): Budget per project.
+        duration_months (np.ndarray): Project length in months.
+        current_month (np.ndarray): Months of the project already elapsed.
+        periods (int): Months to forecast.
+        steepness (float): How sharp the ramp is.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Monthly spend and cumulative spend, both
+            shaped (projects, periods).
+    """
+    t = np.asarray(current_month, dtype=np.float64)[:, None] + np.arange(periods + 1)
+    midpoint = np.asarray(duration_months, dtype=np.float64)[:, None] / 2
+    cumulative = np.asarray(total_budget, dtype=np.float64)[:, None] / (1 + np.exp(-steepness * (t - midpoint)))
+    spend = np.diff(cumulative, axis=1)
+    month = t[:, 1:]
+    spend[(month < 1) | (month > np.asarray(duration_months)[:, None])] = 0
+    return spend, cumulative[:, 1:]
+
 def project_monthly_spend(project: ProjectForecast) -> List[Dict]:
     """
     Generate monthly spend forecast for a project.
     """
-    forecasts = []
-    midpoint = project.duration_months / 2
-
     # Forecast for remaining months
-    start_forecast_month = project.current_month + 1
-    
-    for month in range(start_forecast_month, project.duration_months + 1):
-        cumulative_current = s_curve_spend(month, project.total_budget, midpoint)
-        cumulative_prev = s_curve_spend(month - 1, project.total_budget, midpoint) if month > 0 else 0
-
-        monthly_spend = cumulative_current - cumulative_prev
+    periods = project.duration_months - project.current_month
+    if periods < 1:
+        return []
+    spend, cumulative = s_curve_monthly(
+        np.array([project.total_budget]), np.array([project.duration_months]), np.array([project.current_month]), periods
+    )
 
+    forecasts = []
+    for k, (monthly_spend, cumulative_current) in enumerate(zip(spend[0].tolist(), cumulative[0].tolist()), start=1):
+        month = project.current_month + k
         forecasts.append({
             'project_id': project.project_id,
-            'month': month - project.current_month,  # Months from now (1, 2, 3...)
+            'month': k,  # Months from now (1, 2, 3...)
             'forecast': monthly_spend,
             'cumulative': cumulative_current,
             'percent_complete': (cumulative_current / project.total_budget) * 100,
@@ -140,29 +231,15 @@ def project_monthly_spend(project: ProjectForecast) -> List[Dict]:
 
 class GapDetector:
     @staticmethod
-    def detect_gaps(entries: List[BudgetModel]) -> List[Dict]:
+    def detect_gaps(entries: List[BudgetModel], threshold_days: int = 7) -> List[Dict]:
         """
-        Detects gaps of more than 7 days between transactions.
+        Detects tenant-level gaps of more than `threshold_days` between transactions.
+        See GapEngine for per-project / category / source gaps.
         """
         if not entries:
             return []
-            
-        sorted_entries = sorted(entries, key=lambda x: x.date)
-        gaps = []
-        
-        if len(sorted_entries) > 1:
-            for i in range(len(sorted_entries) - 1):
-                current_date = sorted_entries[i].date
-                next_date = sorted_entries[i+1].date
-                delta = (next_date - current_date).days
-                
-                if delta > 7:
-                    gaps.append({
-                        "start_date": current_date,
-                        "end_date": next_date,
-                        "days": delta
-                    })
-        return gaps
+        tenant_gaps, _ = GapEngine.detect(LedgerColumns(entries), {"tenant": threshold_days})
+        return tenant_gaps
 
 class CategoryClassifier:
     """
@@ -183,40 +260,63 @@ class CategoryClassifier:
     }
 
     @staticmethod
-    def infer(description: str, current_category: str = None) -> str:
+    def infer(description: str, current_category: str = None, classifier: Optional[KeywordClassifier] = None) -> str:
         """
         Infers category based on keywords in description.
         Prioritizes existing valid category if present.
         """
         if current_category and current_category not in ["Uncategorized", "General", "Expense", "Misc"]:
             return current_category
-            
-        desc_lower = description.lower()
-        
-        for category, keywords in CategoryClassifier.KNOWLEDGE_BASE.items():
-            for keyword in keywords:
-                if keyword in desc_lower:
-                    return category
-                    
-        return "Uncategorized"
+
+        return (classifier or default_keyword_classifier()).category(description) or "Uncategorized"
+
+
+@lru_cache(maxsize=128)
+def _build_keyword_classifier(extensions: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> KeywordClassifier:
+    categories: Dict[str, List[str]] = {}
+    # Tenant-defined categories take priority over the built-in ones
+    for name, keywords in extensions:
+        if name not in CategoryClassifier.KNOWLEDGE_BASE:
+            categories[name] = list(keywords)
+    for name, keywords in CategoryClassifier.KNOWLEDGE_BASE.items():
+        categories[name] = keywords + [kw for ext_name, ext in extensions if ext_name == name for kw in ext]
+    return KeywordClassifier(categories, tags={
+        "capex": CAPEX_KEYWORDS,
+        "opex": OPEX_KEYWORDS,
+        "contract": CONTRACT_KEYWORDS,
+        "hardware": HARDWARE_KEYWORDS,
+    })
+
+
+def default_keyword_classifier() -> KeywordClassifier:
+    """Returns the shared classifier built from KNOWLEDGE_BASE and the CapEx/OpEx/timeline keywords."""
+    return _build_keyword_classifier(())
+
+
+def keyword_classifier_for(settings: Optional[Dict[str, Any]]) -> KeywordClassifier:
+    """
+    Returns the classifier for a tenant, including its `settings['category_keywords']`
+    extensions ({category: [keywords]}). Classifiers are cached per distinct extension set.
+    """
+    extensions = (settings or {}).get("category_keywords") or {}
+    key = tuple(sorted((name, tuple(kws)) for name, kws in extensions.items()))
+    return _build_keyword_classifier(key)
 
 class InsightGenerator:
     @staticmethod
-    def generate_flash_fill(entries: List[BudgetModel]) -> List[FlashFillSuggestion]:
+    def generate_flash_fill(entries: List[BudgetModel], classifier: Optional[KeywordClassifier] = None) -> List[FlashFillSuggestion]:
         suggestions = []
-        uncategorized_counts = {}
+        uncategorized_counts: Dict[str, int] = {}
         
         for e in entries:
             if e.category in ["Uncategorized", "General", "Misc", "Expense", "Unknown"]:
-                desc = e.description
-                if desc not in uncategorized_counts:
-                    uncategorized_counts[desc] = 0
-                uncategorized_counts[desc] += 1
+                uncategorized_counts[e.description] = uncategorized_counts.get(e.description, 0) + 1
                 
+        classifier = classifier or default_keyword_classifier()
         for desc, count in uncategorized_counts.items():
             if count >= 2: 
-                inferred = CategoryClassifier.infer(desc)
-                if inferred != "Uncategorized":
+                inferred = classifier.category(desc)
+                if inferred:
                     suggestions.append(FlashFillSuggestion(
                         description=desc,
                         suggested_category=inferred,
@@ -228,223 +328,378 @@ class InsightGenerator:
 
     @staticmethod
     def detect_subscriptions(entries: List[BudgetModel]) -> List[SubscriptionEntry]:
-        subscriptions = []
-        desc_to_entries: Dict[str, List[BudgetModel]] = {}
-        for e in entries:
-            if e.description not in desc_to_entries:
-                desc_to_entries[e.description] = []
-            desc_to_entries[e.description].append(e)
-            
-        for desc, entry_list in desc_to_entries.items():
-            if len(entry_list) >= 2:
-                entry_list.sort(key=lambda x: x.date)
-                amounts = {e.amount for e in entry_list}
-                
-                if len(amounts) == 1: 
-                    first_date = entry_list[0].date
-                    last_date = entry_list[-1].date
-                    
-                    days_diff = (entry_list[1].date - entry_list[0].date).days
-                    freq = "Monthly"
-                    next_date = last_date + timedelta(days=30)
-                    
-                    if 25 <= days_diff <= 35:
-                        freq = "Monthly"
-                        next_date = last_date + timedelta(days=30)
-                    elif 360 <= days_diff <= 370:
-                        freq = "Annual"
-                        next_date = last_date + timedelta(days=365)
-                    elif days_diff < 10:
-                        freq = "Weekly"
-                        next_date = last_date + timedelta(days=7)
-                        
-                    raw_cat = entry_list[0].category
-                    final_cat = CategoryClassifier.infer(desc, raw_cat)
-                    
-                    subscriptions.append(SubscriptionEntry(
-                        description=desc,
-                        amount=float(list(amounts)[0]),
-                        frequency=freq,
-                        category=final_cat,
-                        start_date=first_date,
-                        next_payment_date=next_date,
-                        status="Active"
-                    ))
-        return subscriptions
+        """
+        Detects recurring charges. See SubscriptionDetector.
+        """
+        from src.application.subscription_detector import SubscriptionDetector
+        return SubscriptionDetector().detect(LedgerColumns(entries))
 
     @staticmethod
     def detect_anomalies(entries: List[BudgetModel]) -> List[AnomalyEntry]:
-        anomalies = []
-        desc_to_entries: Dict[str, List[BudgetModel]] = {}
-        for e in entries:
-            if e.description not in desc_to_entries:
-                desc_to_entries[e.description] = []
-            desc_to_entries[e.description].append(e)
-            
-        for desc, entry_list in desc_to_entries.items():
-            if len(entry_list) >= 3:
-                amounts = [float(e.amount) for e in entry_list]
-                avg_amount = sum(amounts) / len(amounts)
-                for e in entry_list:
-                    if float(e.amount) > avg_amount * 2:
-                        anomalies.append(AnomalyEntry(
-                            description=desc,
-                            date=e.date,
-                            amount=float(e.amount),
-                            average=avg_amount
-                        ))
-        return anomalies
+        """
+        Detects unusually large charges. See AnomalyEngine.
+        """
+        from src.application.anomaly_engine import AnomalyEngine
+        return AnomalyEngine().detect(LedgerColumns(entries))
+
+
+def _empty_forecast_summary() -> Dict[str, Any]:
+    return {
+        "trend_direction": "Insufficient Data",
+        "forecasted_total": Decimal("0.00"),
+        "growth_rate": Decimal("0.00"),
+        "confidence_interval_width": Decimal("0.00"),
+        "seasonality_index": Decimal("0.00"),
+        "trend_component": Decimal("0.00"),
+        "level_component": Decimal("0.00"),
+        "outlier_detected": False,
+        "model_accuracy": Decimal("0.00")
+    }
+
+
+@lru_cache(maxsize=1024)
+def _future_months(last_sort_key: str, periods: int) -> Optional[Tuple[Tuple[str, str], ...]]:
+    """(display month, sort key) for the `periods` months after a 'YYYY-MM' key; None if unparsable."""
+    try:
+        year, month = map(int, last_sort_key.split("-"))
+    except ValueError:
+        return None
+    months = []
+    for _ in range(periods):
+        month += 1
+        if month > 12:
+            month = 1
+            year += 1
+        months.append((f"{MONTH_NAMES[month - 1]} {year}", f"{year}-{month:02d}"))
+    return tuple(months)
+
+
+def _future_points(last: Dict[str, Any], periods: int) -> Optional[List[Dict[str, Any]]]:
+    """
+    Keys of the `periods` points after `last`: integer period codes when the
+    history carries them (see time_buckets), else month labels after its
+    'YYYY-MM' sort key. None if neither is usable.
+    """
+    if "period" in last:
+        return [{"period": last["period"] + k} for k in range(1, periods + 1)]
+    months = _future_months(last.get("sort_key", ""), periods)
+    return None if months is None else [{"month": month, "sort_key": key} for month, key in months]
+
+
+def _decimals(values: np.ndarray) -> List[Decimal]:
+    return [Decimal(f"{v:.2f}") for v in values.tolist()]
+
+
+def _trend_direction(level: float, trend: float) -> str:
+    # Same thresholds as the dashboard's client-side summary
+    if trend > 0.05 * abs(level):
+        return "Increasing ↗"
+    if trend < -0.05 * abs(level):
+        return "Decreasing ↘"
+    if trend > 0:
+        return "Slight Increase ↗"
+    if trend < 0:
+        return "Slight Decrease ↘"
+    return "Stable ➡"
+
+
+def _forecast_summary(
+    fit: FittedForecast, last_actual: float, points: np.ndarray, lower: np.ndarray, upper: np.ndarray
+) -> Dict[str, Any]:
+    growth = (points[-1] - last_actual) / last_actual * 100 if last_actual else 0.0
+    positive = points > 0
+    # Mean interval width relative to the forecast, in percent
+    width = float(np.mean((upper[positive] - lower[positive]) / points[positive]) * 100) if positive.any() else 0.0
+    seasonality = float(np.mean(fit.factors[:points.size])) if fit.model == "holt_winters" else 0.0
+    return {
+        "trend_direction": _trend_direction(fit.level, fit.trend),
+        "forecasted_total": Decimal(f"{np.cumsum(points)[-1]:.2f}"),
+        "growth_rate": Decimal(f"{growth:.2f}"),
+        "model_accuracy": Decimal(f"{max(0.0, 100 - fit.mape):.2f}"),
+        "confidence_interval_width": Decimal(f"{width:.2f}"),
+        "seasonality_index": Decimal(f"{seasonality:.2f}"),
+        "trend_component": Decimal(f"{fit.trend:.2f}"),
+        "level_component": Decimal(f"{fit.level:.2f}"),
+        "outlier_detected": fit.outlier
+    }
+
+
+# Variance given to bottom series without a model, relative to the largest modeled one
+_UNMODELED_VARIANCE = 1e8
+
+
+def reconcile_forecasts(parents: np.ndarray, base: np.ndarray, sigma: np.ndarray) -> np.ndarray:
+    """
+    Weighted least-squares reconciliation of forecasts across a hierarchy.
+
+    Finds the bottom-level forecasts whose sums best match every node's base
+    forecast, weighting each node by the inverse of its one-step error variance
+    (one solve for all periods), and sums them back up, so every aggregate equals
+    the sum of its parts. Plain OLS weights the many noisy bottom series as much
+    as the aggregates and pulls dashboard-level nodes negative; weighting by error
+    variance keeps them close to their own, more reliable, forecasts.
+
+    Solved in its equivalent constrained form: one (aggregates x aggregates)
+    system says how far each aggregate's base forecast is from the sum of its
+    parts, and each bottom series moves by its variance times the multipliers of
+    its parents. A category x project hierarchy has far fewer aggregates than
+    bottom series, so this never builds the (nodes x bottom series) problem.
+
+    Args:
+        parents (np.ndarray): (bottom series x levels) index of the aggregate node
+            each bottom series adds up to on each level, -1 where it has none.
+        base (np.ndarray): (nodes x periods) independent base forecasts, the
+            aggregates first and then the bottom series.
+        sigma (np.ndarray): One-step error standard deviation per node (np.inf
+            for nodes without a model, which then carry no weight).
+
+    Returns:
+        np.ndarray: (nodes x periods) coherent forecasts (bottom series may be
+            negative where their base forecasts overshoot the aggregates).
+    """
+    if parents.size == 0:
+        return np.zeros_like(base)
+    aggregates = base.shape[0] - parents.shape[0]
+    # Floor at one cent so perfectly fitted series get a small, non-zero variance
+    variance = np.maximum(sigma, 0.01) ** 2
+    modeled = np.isfinite(variance)
+    # Unmodeled bottom series take up whatever the others leave, split as least-squares
+    # would (its minimum-norm solution is the limit as their variance grows)
+    bottom_variance = np.where(
+        modeled[aggregates:], variance[aggregates:], _UNMODELED_VARIANCE * np.max(variance[modeled], initial=1.0)
+    )
+    bottom = base[aggregates:]
+
+    # Unmodeled aggregates carry no weight: they leave the system and are just summed
+    active = np.flatnonzero(modeled[:aggregates])
+    slot = np.full(aggregates + 1, -1)
+    slot[active] = np.arange(active.size)
+    links = slot[parents]  # No parent (-1) maps to the trailing -1
+
+    system = np.diag(variance[active])
+    for level in links.T:
+        for other in links.T:
+            both = (level >= 0) & (other >= 0)
+            np.add.at(system, (level[both], other[both]), bottom_variance[both])
+    gaps = base[active] - _sum_to_parents(links, bottom, active.size)
+    multipliers = np.linalg.solve(system, gaps) if active.size else gaps
+
+    adjustment = np.zeros_like(bottom)
+    for level in links.T:
+        has_parent = level >= 0
+        adjustment[has_parent] += multipliers[level[has_parent]]
+    reconciled = bottom + bottom_variance[:, None] * adjustment
+    return np.vstack([_sum_to_parents(parents, reconciled, aggregates), reconciled])
+
+
+def _sum_to_parents(parents: np.ndarray, values: np.ndarray, count: int) -> np.ndarray:
+    totals = np.zeros((count, values.shape[1]))
+    for level in parents.T:
+        has_parent = level >= 0
+        np.add.at(totals, level[has_parent], values[has_parent])
+    return totals
+
 
 class ForecastService:
     @staticmethod
-    def append_forecast(history: List[Dict], periods=6, alpha=0.6, beta=0.3) -> Dict[str, Any]:
+    def append_forecast(
+        history: List[Dict], periods=6, alpha: Optional[float] = None, beta: Optional[float] = None
+    ) -> Dict[str, Any]:
         """
-        Applies Forecasting. Tries Holt-Winters first, falls back to Holt Linear.
+        Applies Forecasting to one series. See `append_forecasts`.
         Modifies list in-place.
         Returns a summary dictionary of the forecast model.
         """
+        return ForecastService.append_forecasts([history], periods, alpha, beta)[0]
+
+    @staticmethod
+    def append_forecasts(
+        histories: Sequence[List[Dict]],
+        periods=6,
+        alpha: Optional[float] = None,
+        beta: Optional[float] = None,
+        cache: Optional[ForecastCache] = None,
+        season_length: int = DEFAULT_SEASON_LENGTH,
+    ) -> List[Dict[str, Any]]:
+        """
+        Forecasts many series in one batch and appends the forecast points (with 95%
+        bounds) to each history in-place.
+
+        Each series gets Holt-Winters (more than one season of history) or Holt's
+        linear trend, with smoothing parameters fitted per series unless given.
+        Bounds come from a residual bootstrap over all series at once
+        (`bootstrap_bounds`).
+
+        Args:
+            histories (Sequence[List[Dict]]): Series of {"period", "amount"} dicts
+                (integer period codes, see time_buckets) or monthly
+                {"month", "amount", "sort_key"} dicts, sorted by period.
+            periods (int): Forecast horizon in periods (clamped to 1..60).
+            alpha (Optional[float]): Fixed level smoothing factor (fitted if None).
+            beta (Optional[float]): Fixed trend smoothing factor (fitted if None).
+            cache (Optional[ForecastCache]): Per-series fit cache; only series whose
+                values changed are refitted.
+            season_length (int): Periods per seasonal cycle.
+
+        Returns:
+            List[Dict[str, Any]]: One forecast summary per history.
+        """
         # Clamp forecast horizon to reasonable limit (60 months)
-        periods = min(max(periods, 1), 60)
-
-        empty_summary = {
-            "trend_direction": "Insufficient Data",
-            "forecasted_total": Decimal("0.00"),
-            "growth_rate": Decimal("0.00"),
-            "confidence_interval_width": Decimal("0.00"),
-            "seasonality_index": Decimal("0.00"),
-            "trend_component": Decimal("0.00"),
-            "level_component": Decimal("0.00"),
-            "outlier_detected": False,
-            "model_accuracy": Decimal("0.00")
-        }
-
-        if not history or len(history) < 2:
-            return empty_summary
-
-        # Try Holt-Winters First
-        hw_forecasts = ForecastService.holt_winters_forecast(history, periods=periods)
-        
-        if hw_forecasts:
-            # Integrate HW Results
-            last_date_str = history[-1].get("sort_key", "")
-            try:
-                year, month = map(int, last_date_str.split("-"))
-            except ValueError:
-                return empty_summary
-
-            months_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-            forecast_sum = 0
-            
-            for item in hw_forecasts:
-                forecast_val = item['forecast']
-                forecast_sum += forecast_val
-                
-                month += 1
-                if month > 12:
-                    month = 1
-                    year += 1
-                
-                month_fmt = f"{month:02d}"
-                sort_key = f"{year}-{month_fmt}"
-                display_month = f"{months_names[month-1]} {year}"
-                
-                history.append({
-                    "month": display_month,
-                    "amount": Decimal(f"{forecast_val:.2f}"),
-                    "lower_bound": Decimal(f"{forecast_val * 0.9:.2f}"), # Simplified CI for HW
-                    "upper_bound": Decimal(f"{forecast_val * 1.1:.2f}"),
-                    "is_forecast": True,
-                    "sort_key": sort_key
-                })
-            
-            # Simple Summary for HW
-            return {
-                "trend_direction": "Seasonal/Complex",
-                "forecasted_total": Decimal(f"{forecast_sum:.2f}"),
-                "growth_rate": Decimal("0.00"), # Todo: calc
-                "model_accuracy": Decimal("85.00"), # Placeholder/Estimated
-                "confidence_interval_width": Decimal("10.00"), # Estimated 10%
-                "seasonality_index": Decimal("1.00"), # Avg seasonality
-                "trend_component": Decimal("0.00"),
-                "level_component": Decimal("0.00"),
-                "outlier_detected": False
-            }
+        periods = min(max(periods, 1), MAX_FORECAST_HORIZON)
+
+        if alpha is None and beta is None:
+            engine = ForecastEngine(season_length=season_length)
+        else:
+            engine = ForecastEngine.fixed(
+                0.6 if alpha is None else alpha, 0.3 if beta is None else beta, season_length=season_length
+            )
+
+        series = [[float(x.get("amount", 0)) for x in history] for history in histories]
+        fits = ForecastService.fit_series(series, periods, engine, cache)
+        lower_bounds, upper_bounds = bootstrap_bounds(fits, periods)
+
+        summaries = []
+        for history, values, fit, lower, upper in zip(histories, series, fits, lower_bounds, upper_bounds):
+            future = _future_points(history[-1], periods) if fit is not None else None
+            if future is None:
+                summaries.append(_empty_forecast_summary())
+                continue
+
+            points = fit.forecast(periods)
+            history.extend(
+                {**keys, "amount": amount, "lower_bound": low, "upper_bound": high, "is_forecast": True}
+                for keys, amount, low, high in zip(future, _decimals(points), _decimals(lower), _decimals(upper))
+            )
+            summaries.append(_forecast_summary(fit, values[-1], points, lower, upper))
+        return summaries
 
-        # Fallback to Holt Linear (Legacy)
-        amounts = [float(x["amount"]) for x in history]
-        
-        # Initialization
-        level = amounts[0]
-        trend = amounts[1] - amounts[0]
-        
-        fitted_values = [level]
-        
-        # Smoothing Loop
-        for i in range(1, len(amounts)):
-            val = amounts[i]
-            last_level = level
-            last_trend = trend
-            
-            fitted_values.append(last_level + last_trend)
-            
-            level = alpha * val + (1 - alpha) * (last_level + last_trend)
-            trend = beta * (level - last_level) + (1 - beta) * last_trend
-            
-        residuals = [amounts[i] - fitted_values[i] for i in range(len(amounts))]
-        sum_sq_error = sum(r**2 for r in residuals)
-        sigma = math.sqrt(sum_sq_error / len(amounts)) if len(amounts) > 0 else 0
-        
-        last_date_str = history[-1].get("sort_key", "")
-        try:
-            year, month = map(int, last_date_str.split("-"))
-        except ValueError:
-            return empty_summary
-            
-        last_level = level
-        last_trend = trend
-        
-        months_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
-        forecast_sum = 0
-        
-        for p in range(1, periods + 1):
-            forecast_val = last_level + p * last_trend
-            margin = 1.96 * sigma * math.sqrt(p)
-            
-            upper = forecast_val + margin
-            lower = max(0, forecast_val - margin)
-            forecast_val = max(0, forecast_val)
-            
-            forecast_sum += forecast_val
-            
-            month += 1
-            if month > 12:
-                month = 1
-                year += 1
-                
-            month_fmt = f"{month:02d}"
-            sort_key = f"{year}-{month_fmt}"
-            display_month = f"{months_names[month-1]} {year}"
-            
-            history.append({
-                "month": display_month,
-                "amount": Decimal(f"{forecast_val:.2f}"),
-                "lower_bound": Decimal(f"{lower:.2f}"),
-                "upper_bound": Decimal(f"{upper:.2f}"),
-                "is_forecast": True,
-                "sort_key": sort_key
-            })
-
-        return {
-            "trend_direction": "Stable",
-            "forecasted_total": Decimal(f"{forecast_sum:.2f}"),
-            "growth_rate": Decimal("0.00"),
-            "model_accuracy": Decimal("0.00"),
-            "confidence_interval_width": Decimal("0.00"),
-            "seasonality_index": Decimal("0.00"),
-            "trend_component": Decimal(f"{last_trend:.2f}"),
-            "level_component": Decimal(f"{last_level:.2f}"),
-            "outlier_detected": False
-        }
+    @staticmethod
+    def append_reconciled_forecasts(
+        histories: Sequence[List[Dict]],
+        series: Sequence[Sequence[float]],
+        parents: np.ndarray,
+        periods=6,
+        cache: Optional[ForecastCache] = None,
+        season_length: int = DEFAULT_SEASON_LENGTH,
+    ) -> List[Dict[str, Any]]:
+        """
+        Hierarchical variant of `append_forecasts`: every node of the hierarchy is
+        fitted in one batch, the forecasts are reconciled with `reconcile_forecasts`
+        and appended to the histories, all starting after the latest history period.
+
+        Bounds are the bootstrap bounds of each node's own model, shifted by its
+        reconciliation adjustment. Reconciled values are floored at 0 for display.
+
+        Args:
+            histories (Sequence[List[Dict]]): Monthly series of the first
+                `len(histories)` nodes (modified in-place).
+            series (Sequence[Sequence[float]]): Values of every node on the shared
+                period grid (see `ForecastHierarchy`).
+            parents (np.ndarray): Aggregate node of each bottom series per level
+                (see `reconcile_forecasts`).
+            periods (int): Forecast horizon in periods (clamped to 1..60).
+            cache (Optional[ForecastCache]): Per-series fit cache.
+            season_length (int): Periods per seasonal cycle.
+
+        Returns:
+            List[Dict[str, Any]]: One forecast summary per history.
+        """
+        periods = min(max(periods, 1), MAX_FORECAST_HORIZON)
+        fits = ForecastService.fit_series(series, periods, ForecastEngine(season_length=season_length), cache)
+        base = np.stack([fit.forecast(periods) if fit is not None else np.zeros(periods) for fit in fits])
+        lower, upper = bootstrap_bounds(fits, periods)
+
+        sigma = np.array([fit.sigma if fit is not None else np.inf for fit in fits])
+        reconciled = np.maximum(reconcile_forecasts(parents, base, sigma), 0.0)
+        lower = np.minimum(np.maximum(lower + reconciled - base, 0.0), reconciled)
+        upper = np.maximum(upper + reconciled - base, reconciled)
+
+        lasts = [history[-1] for history in histories if history]
+        last = max(lasts, key=lambda point: point.get("period", point.get("sort_key", ""))) if lasts else None
+        future = _future_points(last, periods) if last is not None else None
+
+        summaries = []
+        for i, history in enumerate(histories):
+            if not history or future is None:
+                summaries.append(_empty_forecast_summary())
+                continue
+            history.extend(
+                {**keys, "amount": amount, "lower_bound": low, "upper_bound": high, "is_forecast": True}
+                for keys, amount, low, high
+                in zip(future, _decimals(reconciled[i]), _decimals(lower[i]), _decimals(upper[i]))
+            )
+            if fits[i] is None:
+                summaries.append(_empty_forecast_summary())
+            else:
+                summaries.append(_forecast_summary(fits[i], series[i][-1], reconciled[i], lower[i], upper[i]))
+        return summaries
+
+    @staticmethod
+    def fit_series(
+        series: Sequence[Sequence[float]],
+        periods: int,
+        engine: Optional[ForecastEngine] = None,
+        cache: Optional[ForecastCache] = None,
+    ) -> List[Optional[FittedForecast]]:
+        """
+        Fits smoothing models to raw series, reusing cached fits when given a cache.
+
+        With a cache, a series that extends a cached one by a month (or revises its
+        latest month and adds one) is advanced from the cached state in O(1);
+        only series whose earlier months changed are refitted.
+
+        Args:
+            series (Sequence[Sequence[float]]): Values per series, oldest first.
+            periods (int): Horizon needed (cached fits always cover the maximum).
+            engine (Optional[ForecastEngine]): Engine to fit with (grid search by default).
+            cache (Optional[ForecastCache]): Per-series fit cache.
+
+        Returns:
+            List[Optional[FittedForecast]]: One fit per series (None below 2 points).
+        """
+        engine = engine or ForecastEngine()
+        if cache is None:
+            return engine.fit(series, periods)
+
+        fits: List[Optional[FittedForecast]] = [None] * len(series)
+        misses: List[Tuple[int, str]] = []
+        for i, values in enumerate(series):
+            if len(values) < 2:
+                continue
+            key = series_fingerprint(values, engine.params)
+            fits[i] = cache.get(key) or ForecastService._advance_cached(values, engine, cache)
+            if fits[i] is None:
+                misses.append((i, key))
+
+        if misses:
+            # Misses are fitted together, at the full horizon so any later horizon is a slice
+            fitted = engine.fit([series[i] for i, _ in misses], MAX_FORECAST_HORIZON)
+            for (i, key), fit in zip(misses, fitted):
+                fits[i] = fit
+                cache.put(key, fit)
+                if fit.previous is not None:
+                    # Starting point for when the latest (usually partial) month is revised
+                    cache.put(series_fingerprint(series[i][:-1], engine.params), fit.previous)
+        return fits
+
+    @staticmethod
+    def _advance_cached(
+        values: Sequence[float], engine: ForecastEngine, cache: ForecastCache
+    ) -> Optional[FittedForecast]:
+        # A revised latest month means the state one month back is cached; a new
+        # month on top of a revised one means two months back
+        for known in (len(values) - 1, len(values) - 2):
+            if known < 2:
+                break
+            fit = cache.get(series_fingerprint(values[:known], engine.params), record=False)
+            if (fit is None or not engine.can_advance(fit, len(values))
+                    or len(values) - fit.refit_length > MAX_INCREMENTAL_MONTHS):
+                continue
+            for length in range(known + 1, len(values) + 1):
+                fit = engine.advance(fit, values[length - 1], MAX_FORECAST_HORIZON)
+                cache.put(series_fingerprint(values[:length], engine.params), fit, advanced=True)
+            return fit
+        return None
 
     @staticmethod
     def holt_winters_forecast(
@@ -456,97 +711,76 @@ class ForecastService:
         season_length=12
     ) -> List[Dict]:
         """
-        Triple exponential smoothing with multiplicative seasonality.
+        Triple exponential smoothing with multiplicative seasonality and fixed
+        parameters (Holt's linear trend below `season_length + 1` points).
         Returns ONLY the forecast points (doesn't modify history in-place).
         """
-        if not history:
+        if len(history) < 2:
             return []
-            
-        values = [float(x.get("amount", 0)) for x in history]
-        n = len(values)
-        
-        # Fallback if insufficient data
-        if n < season_length + 1:
-            # Use basic Holt logic from append_forecast, or just simple projection
-            # For this simplified implementation, we'll return an empty list or call legacy?
-            # Let's return a simple linear forecast
-            if n < 2: return []
-            level = values[-1]
-            trend = (values[-1] - values[0]) / n
-            forecasts = []
-            for k in range(1, periods + 1):
-                 val = max(0, level + k * trend)
-                 forecasts.append({'period': k, 'forecast': val, 'seasonal_factor': 1.0})
-            return forecasts
-
-        # Initialize seasonal indices
-        first_season_avg = np.mean(values[:season_length])
-        season = [values[i] / first_season_avg if first_season_avg > 0 else 1.0 for i in range(season_length)]
-
-        # Initialize level and trend
-        level = first_season_avg
-        trend = (np.mean(values[season_length:2*season_length]) - 
-                 np.mean(values[:season_length])) / season_length
-
-        # Smoothing
-        for t in range(season_length, n):
-            val = values[t]
-            last_level, last_trend = level, trend
-            
-            season_idx = t % season_length
-            s_factor = season[season_idx] if season[season_idx] > 0 else 1.0
-            
-            level = alpha * (val / s_factor) + (1 - alpha) * (last_level + last_trend)
-            trend = beta * (level - last_level) + (1 - beta) * last_trend
-            season[season_idx] = gamma * (val / level) + (1 - gamma) * season[season_idx]
-
-        forecasts = []
-        for k in range(1, periods + 1):
-            season_idx = (n + k - 1) % season_length
-            point_forecast = (level + k * trend) * season[season_idx]
-            forecasts.append({
-                'period': k,
-                'forecast': max(0, point_forecast),
-                'seasonal_factor': season[season_idx]
-            })
-            
-        return forecasts
+        engine = ForecastEngine.fixed(alpha, beta, gamma, season_length)
+        fit = engine.fit([[float(x.get("amount", 0)) for x in history]], periods)[0]
+        return [
+            {'period': k, 'forecast': value, 'seasonal_factor': factor}
+            for k, (value, factor) in enumerate(zip(fit.forecast(periods).tolist(), fit.factors.tolist()), start=1)
+        ]
 
     @staticmethod
-    def capex_forecast(planned_purchases: List[Dict], timing_uncertainty: float = 0.2) -> List[Dict]:
+    def capex_forecast(
+        planned_purchases: List[Dict],
+        timing_uncertainty: float = 0.2,
+        simulations: int = CAPEX_SIMULATIONS,
+        seed: Optional[int] = CAPEX_SEED,
+    ) -> List[Dict]:
         """
-        Monte Carlo simulation for CapEx.
+        Monte Carlo simulation of CapEx timing.
+
+        Each purchase slips by a normal draw (mean half a month, at most one month
+        early) in every simulation. All draws come from one (simulations x
+        purchases) matrix; amounts are then summed per (simulation, month) with a
+        single bincount, so the percentiles describe the month's total spend across
+        simulations.
+
+        Args:
+            planned_purchases (List[Dict]): {"amount", "expected_month"} dicts, where
+                expected_month is relative (1 = next month).
+            timing_uncertainty (float): Scales the slip standard deviation.
+            simulations (int): Number of simulated futures.
+            seed (Optional[int]): RNG seed; the same inputs give the same result.
+
+        Returns:
+            List[Dict]: Per month that receives spend in any simulation: the
+                expected total and its p10/p50/p90.
         """
-        simulations = 1000
-        monthly_forecasts = {}
-
-        for _ in range(simulations):
-            for purchase in planned_purchases:
-                # expected_month is relative (1 = next month)
-                expected_month = purchase.get('expected_month', 1)
-                amount = float(purchase.get('amount', 0))
-                
-                # Simulate timing slip
-                slip_months = max(-1, random.gauss(0.5, timing_uncertainty * 3))
-                actual_month = int(expected_month + slip_months)
-                
-                if actual_month < 1: actual_month = 1 # Can't happen in past relative to now
-
-                if actual_month not in monthly_forecasts:
-                    monthly_forecasts[actual_month] = []
-                monthly_forecasts[actual_month].append(amount)
-
-        results = []
-        for month, amounts in sorted(monthly_forecasts.items()):
-            amounts_np = np.array(amounts)
-            results.append({
-                'month': month,
-                'expected': float(np.mean(amounts_np)),
-                'p10': float(np.percentile(amounts_np, 10)),
-                'p50': float(np.percentile(amounts_np, 50)),
-                'p90': float(np.percentile(amounts_np, 90)),
+        if not planned_purchases or simulations < 1:
+            return []
+        rng = np.random.default_rng(seed)
+        expected_month = np.array([p.get('expected_month', 1) for p in planned_purchases], dtype=np.float64)
+        amount = np.array([float(p.get('amount', 0)) for p in planned_purchases])
+
+        # Simulate timing slip
+        slip = np.maximum(-1, rng.normal(0.5, timing_uncertainty * 3, (simulations, amount.size)))
+        # Can't happen in past relative to now
+        month = np.maximum(1, (expected_month + slip).astype(np.int64))
+
+        width = int(month.max()) + 1
+        cells = (np.arange(simulations) * width)[:, None] + month
+        totals = np.bincount(
+            cells.ravel(), weights=np.broadcast_to(amount, month.shape).ravel(), minlength=simulations * width
+        ).reshape(simulations, width)
+
+        months = np.flatnonzero(np.bincount(month.ravel(), minlength=width))
+        spend = totals[:, months]
+        p10, p50, p90 = np.quantile(spend, [0.1, 0.5, 0.9], axis=0)
+        expected = spend.mean(axis=0)
+        return [
+            {
+                'month': int(m),
+                'expected': float(expected[k]),
+                'p10': float(p10[k]),
+                'p50': float(p50[k]),
+                'p90': float(p90[k]),
                 'type': 'capex',
                 'confidence': 0.7
-            })
-
-        return results
\ No newline at end of file
+            }
+            for k, m in enumerate(months)
+        ]
@@ -1,6 +1,7 @@
 from typing import Dict, List, Optional, Any
 from decimal import Decimal
 from datetime import date, timedelta
+import numpy as np
 import pandas as pd
 from src.domain.repository import BudgetRepository
 from src.domain.budget import BudgetEntry
@@ -15,21 +16,49 @@ from src.domain.analysis_models import (
     TimelineItem
 )
 import structlog
-from src.application.analysis_services import GapDetector, InsightGenerator, ForecastService
-from datetime import timedelta
-import uuid
+from src.application.analysis_services import (
+    InsightGenerator, ForecastService, NON_EXPENSE_CATEGORIES, keyword_classifier_for
+)
+from src.application.timeline_engine import TimelineEngine
+from src.application.gap_engine import GapEngine, resolve_gap_thresholds
+from src.application.ledger_columns import LedgerColumns
+from src.application.anomaly_engine import AnomalyEngine, resolve_anomaly_sensitivity
+from src.application.subscription_detector import SubscriptionDetector
+from src.application.analysis_cache import AnalysisCache
+from src.application.forecast_cache import ForecastCache, MAX_FORECAST_HORIZON
+from src.application.forecast_hierarchy import ForecastHierarchy
+from src.application.hybrid_forecast import HybridForecaster
+from src.application.time_buckets import period_histories, resolve_time_buckets
+from src.application.context import get_tenant_id
+from src.application.instrumentation import profile
+from src.application.sketches import TopKAccumulator, GroupedTopK, use_exact_mode, DEFAULT_SKETCH_EPSILON
 
 logger = structlog.get_logger()
 
 class AnalyzeBudgetUseCase:
     """
     Use case for analyzing budget data to generate insights, trends, and statistics.
-    Orchestrates various specialized services (GapDetector, InsightGenerator, ForecastService)
+    Orchestrates various specialized services (GapEngine, InsightGenerator, ForecastService)
     to produce a comprehensive `BudgetAnalysisResult`.
     """
     
-    def __init__(self, repo: BudgetRepository):
+    def __init__(
+        self,
+        repo: BudgetRepository,
+        cache: Optional[AnalysisCache] = None,
+        forecast_cache: Optional[ForecastCache] = None,
+    ):
         self.repo = repo
+        self.cache = cache
+        self.forecast_cache = forecast_cache
+
+    def invalidate(self) -> None:
+        """
+        Marks the current tenant's data as changed so cached analysis is not served.
+        """
+        tenant_id = get_tenant_id()
+        if self.cache is not None and tenant_id:
+            self.cache.invalidate(tenant_id)
         
     def _compute_analysis(self, entries: list, settings: Dict[str, Any] = None) -> BudgetAnalysisResult:
         """
@@ -45,225 +74,148 @@ class AnalyzeBudgetUseCase:
         """
         settings = settings or {}
         forecast_horizon = settings.get("forecast_horizon", 6)
+        prof = profile("analysis")
 
         # 0. Pre-processing: Filter for Expenses vs Income
         # We assume the user wants to track "Spending".
         # We exclude typically non-expense categories from the "Total" and "Trend" to avoid 
         # payments (positive) cancelling out expenses (negative).
-        exclude_categories = {"Payment", "Transfer", "Income", "Credit Card Payment", "Opening Balance"}
-        
-        expense_entries = [e for e in entries if e.category not in exclude_categories]
+        with prof.stage("filter", items=len(entries)):
+            expense_entries = [e for e in entries if e.category not in NON_EXPENSE_CATEGORIES]
 
         # 1. Basic Stats (Total Expenses is magnitude of spending)
-        total_expenses = sum((abs(e.amount) for e in expense_entries), Decimal("0"))
+        with prof.stage("breakdowns", items=len(expense_entries)):
+            total_expenses = sum((abs(e.amount) for e in expense_entries), Decimal("0"))
         
-        category_breakdown: Dict[str, Decimal] = {}
-        project_breakdown: Dict[str, Decimal] = {}
-        merchant_breakdown: Dict[str, Decimal] = {}
+            category_breakdown: Dict[str, Decimal] = {}
+            project_breakdown: Dict[str, Decimal] = {}
+
+            # Merchant totals: exact maps for small tenants, bounded-memory heavy-hitter
+            # sketches for large ones (free-text descriptions can have huge cardinality)
+            exact_merchants = use_exact_mode(len(expense_entries), settings)
+            sketch_epsilon = float(settings.get("merchant_sketch_epsilon", DEFAULT_SKETCH_EPSILON))
+            merchant_totals = TopKAccumulator(exact_merchants, sketch_epsilon)
+            category_merchants_acc = GroupedTopK(exact_merchants, sketch_epsilon)
+            project_merchants_acc = GroupedTopK(exact_merchants, sketch_epsilon)
         
-        # For breakdowns, we use ALL entries but take absolute value to show magnitude of activity
-        # (Or should we filter? Usually filtering is safer for "Budget" view)
-        for e in expense_entries:
-            amt = abs(e.amount)
-            category_breakdown[e.category] = category_breakdown.get(e.category, Decimal("0")) + amt
-            project_breakdown[e.project] = project_breakdown.get(e.project, Decimal("0")) + amt
-            merchant_breakdown[e.description] = merchant_breakdown.get(e.description, Decimal("0")) + amt
+            # For breakdowns, we use ALL entries but take absolute value to show magnitude of activity
+            # (Or should we filter? Usually filtering is safer for "Budget" view)
+            for e in expense_entries:
+                amt = abs(e.amount)
+                # Linked rows are grouped by merchant; rows not yet resolved by raw description
+                merchant = e.merchant_name or e.merchant or e.description
+                category_breakdown[e.category] = category_breakdown.get(e.category, Decimal("0")) + amt
+                project_breakdown[e.project] = project_breakdown.get(e.project, Decimal("0")) + amt
+                merchant_totals.add(merchant, amt)
+                category_merchants_acc.add(e.category, merchant, amt)
+                project_merchants_acc.add(e.project, merchant, amt)
             
-        top_merchants = dict(sorted(merchant_breakdown.items(), key=lambda item: item[1], reverse=True)[:5])
+            top_merchants = merchant_totals.top(5)
 
         # 2. Insights using Services (Use full list for context, or filtered? Full is better for gaps/subscriptions)
-        gaps = GapDetector.detect_gaps(entries)
-        flash_fill_suggestions = InsightGenerator.generate_flash_fill(entries)
-        subscriptions = InsightGenerator.detect_subscriptions(entries)
-        anomalies = InsightGenerator.detect_anomalies(entries)
+        with prof.stage("gaps", items=len(entries)):
+            columns = LedgerColumns(entries)
+            gaps, dimension_gaps = GapEngine.detect(columns, resolve_gap_thresholds(settings))
+        classifier = keyword_classifier_for(settings)
+        with prof.stage("flash_fill", items=len(entries)):
+            flash_fill_suggestions = InsightGenerator.generate_flash_fill(entries, classifier)
+        with prof.stage("subscriptions", items=len(entries)):
+            subscriptions = SubscriptionDetector(classifier=classifier).detect(columns)
+        with prof.stage("anomalies", items=len(entries)):
+            anomalies = AnomalyEngine(resolve_anomaly_sensitivity(settings)).detect(columns)
 
         # 3. Trend Analysis & Forecasting (Use Expense Entries only)
-        monthly_trend_map: Dict[str, Dict] = {}
-        category_history_map: Dict[str, Dict[str, Dict]] = {}
-        project_history_map: Dict[str, Dict[str, Dict]] = {}
-
-        for e in expense_entries:
-            month_key = e.date.strftime("%Y-%m")
-            month_display = e.date.strftime("%b %Y")
-            amt = abs(e.amount)
-            
-            # Overall Trend
-            if month_key not in monthly_trend_map:
-                monthly_trend_map[month_key] = {"month": month_display, "amount": Decimal("0"), "sort_key": month_key}
-            monthly_trend_map[month_key]["amount"] += amt
-            
-            # Category History
-            if e.category not in category_history_map:
-                category_history_map[e.category] = {}
-            if month_key not in category_history_map[e.category]:
-                category_history_map[e.category][month_key] = {"month": month_display, "amount": Decimal("0"), "sort_key": month_key}
-            category_history_map[e.category][month_key]["amount"] += amt
-
-            # Project History
-            if e.project not in project_history_map:
-                project_history_map[e.project] = {}
-            if month_key not in project_history_map[e.project]:
-                project_history_map[e.project][month_key] = {"month": month_display, "amount": Decimal("0"), "sort_key": month_key}
-            project_history_map[e.project][month_key]["amount"] += amt
+        with prof.stage("trends", items=len(expense_entries)):
+            # Rows are bucketed by integer period codes; labels are only formatted for the response
+            buckets = resolve_time_buckets(settings)
+            category_codes, category_labels = columns.codes("category")
+            excluded = np.flatnonzero(np.isin(category_labels, list(NON_EXPENSE_CATEGORIES)))
+            expense = ~np.isin(category_codes, excluded)
+            monthly_trend_raw, breakdowns = period_histories(columns, expense, buckets, ("category", "project"))
+            category_history_raw: Dict[str, List[Dict]] = breakdowns["category"]
+            project_history_raw: Dict[str, List[Dict]] = breakdowns["project"]
 
-        # Convert to lists and sort
-        monthly_trend_raw = sorted(monthly_trend_map.values(), key=lambda x: x["sort_key"])
-        
-        logger.debug("forecast_input_data_debug", 
-                     count=len(monthly_trend_raw), 
-                     sample_amounts=[float(x["amount"]) for x in monthly_trend_raw[:5]],
-                     all_amounts=[float(x["amount"]) for x in monthly_trend_raw])
-        
-        category_history_raw: Dict[str, List[Dict]] = {}
-        for cat, month_map in category_history_map.items():
-            category_history_raw[cat] = sorted(month_map.values(), key=lambda x: x["sort_key"])
-
-        project_history_raw: Dict[str, List[Dict]] = {}
-        for proj, month_map in project_history_map.items():
-            project_history_raw[proj] = sorted(month_map.values(), key=lambda x: x["sort_key"])
-
-        # 4. Filter Granular Merchants (Use Expense Entries)
-        category_merchants_map: Dict[str, Dict[str, Decimal]] = {}
-        project_merchants_map: Dict[str, Dict[str, Decimal]] = {}
-
-        for e in expense_entries:
-            amt = abs(e.amount)
-            if e.category not in category_merchants_map:
-                category_merchants_map[e.category] = {}
-            category_merchants_map[e.category][e.description] = category_merchants_map[e.category].get(e.description, Decimal("0")) + amt
-
-            if e.project not in project_merchants_map:
-                project_merchants_map[e.project] = {}
-            project_merchants_map[e.project][e.description] = project_merchants_map[e.project].get(e.description, Decimal("0")) + amt
-
-        category_merchants = {
-            cat: dict(sorted(merch_map.items(), key=lambda item: item[1], reverse=True)[:10])
-            for cat, merch_map in category_merchants_map.items()
-        }
-        
-        project_merchants = {
-            proj: dict(sorted(merch_map.items(), key=lambda item: item[1], reverse=True)[:10])
-            for proj, merch_map in project_merchants_map.items()
-        }
+        # 4. Filter Granular Merchants (Heap-based top-K per category / project)
+        with prof.stage("merchant_top_k"):
+            category_merchants = category_merchants_acc.top(10)
+            project_merchants = project_merchants_acc.top(10)
 
         # 5. Apply Forecast
-        forecast_metrics_dict = ForecastService.append_forecast(monthly_trend_raw, periods=forecast_horizon)
-        forecast_summary = ForecastSummary(**forecast_metrics_dict)
-        
-        for history in category_history_raw.values():
-            ForecastService.append_forecast(history, periods=forecast_horizon)
-            
-        for history in project_history_raw.values():
-            ForecastService.append_forecast(history, periods=forecast_horizon)
+        with prof.stage("forecast", items=1 + len(category_history_raw) + len(project_history_raw)):
+            # Total, category and project series are forecast in one batch
+            histories = [monthly_trend_raw, *category_history_raw.values(), *project_history_raw.values()]
+            if settings.get("forecast_mode") == "hierarchical":
+                # Category x project series join the batch and every level is reconciled to add up
+                hierarchy = ForecastHierarchy.from_columns(
+                    columns, list(category_history_raw), list(project_history_raw), buckets
+                )
+                forecast_summaries = ForecastService.append_reconciled_forecasts(
+                    histories, hierarchy.series, hierarchy.parents, periods=forecast_horizon,
+                    cache=self.forecast_cache, season_length=buckets.season_length
+                )
+            else:
+                forecast_summaries = ForecastService.append_forecasts(
+                    histories, periods=forecast_horizon, cache=self.forecast_cache,
+                    season_length=buckets.season_length
+                )
+            forecast_summary = ForecastSummary(**forecast_summaries[0])
 
-        # 6. Convert to Pydantic Models for Response
-        monthly_trend_models = [
-            TrendEntry(
-                month=x["month"],
-                amount=x["amount"],
-                is_forecast=x.get("is_forecast", False),
-                sort_key=x["sort_key"],
-                lower_bound=x.get("lower_bound"),
-                upper_bound=x.get("upper_bound")
-            ) for x in monthly_trend_raw
-        ]
+        # 5b. Hybrid forecast: OpEx smoothing + CapEx Monte Carlo + project S-curves
+        with prof.stage("hybrid_forecast", items=len(entries)):
+            hybrid_forecast = HybridForecaster(settings, self.forecast_cache, classifier).forecast(
+                columns, min(max(forecast_horizon, 1), MAX_FORECAST_HORIZON)
+            )
 
-        category_history_models: Dict[str, List[TrendEntry]] = {}
-        for cat, raw_list in category_history_raw.items():
-            category_history_models[cat] = [
-                TrendEntry(
-                    month=x["month"],
-                    amount=x["amount"],
-                    is_forecast=x.get("is_forecast", False),
-                    sort_key=x["sort_key"],
-                    lower_bound=x.get("lower_bound"),
-                    upper_bound=x.get("upper_bound")
-                ) for x in raw_list
-            ]
-            
-        project_history_models: Dict[str, List[TrendEntry]] = {}
-        for proj, raw_list in project_history_raw.items():
-            project_history_models[proj] = [
+        # 6. Convert to Pydantic Models for Response
+        with prof.stage("response_models"):
+            labels = buckets.labels(x["period"] for raw_list in histories for x in raw_list)
+            monthly_trend_models = [
                 TrendEntry(
-                    month=x["month"],
+                    month=labels[x["period"]][0],
                     amount=x["amount"],
                     is_forecast=x.get("is_forecast", False),
-                    sort_key=x["sort_key"],
+                    sort_key=labels[x["period"]][1],
                     lower_bound=x.get("lower_bound"),
                     upper_bound=x.get("upper_bound")
-                ) for x in raw_list
+                ) for x in monthly_trend_raw
             ]
 
-        # 7. Generate Timeline Items
-        timeline_items: List[TimelineItem] = []
-        
-        # A. Map Subscriptions to Timeline
-        for sub in subscriptions:
-            # Estimate end date based on frequency (default to 1 year for visualization if ongoing)
-            start = sub.start_date
-            # Visual duration: if monthly, show 1 month block repeating? 
-            # For Gantt, usually we want "Contract Duration". 
-            # If it's a subscription, let's show a 12-month projected block from start or current date.
-            
-            # Use next_payment_date as a "renewal" marker
+            category_history_models: Dict[str, List[TrendEntry]] = {}
+            for cat, raw_list in category_history_raw.items():
+                category_history_models[cat] = [
+                    TrendEntry(
+                        month=labels[x["period"]][0],
+                        amount=x["amount"],
+                        is_forecast=x.get("is_forecast", False),
+                        sort_key=labels[x["period"]][1],
+                        lower_bound=x.get("lower_bound"),
+                        upper_bound=x.get("upper_bound")
+                    ) for x in raw_list
+                ]
             
-            item = TimelineItem(
-                id=str(uuid.uuid4()),
-                label=f"{sub.description} ({sub.frequency})",
-                start_date=sub.start_date,
-                end_date=sub.next_payment_date if sub.next_payment_date > sub.start_date else sub.start_date + timedelta(days=30),
-                type="subscription",
-                amount=sub.amount,
-                color="#3b82f6" # Blue
-            )
-            timeline_items.append(item)
-
-        # B. Detect Implicit Contracts (e.g. "Annual", "Renewal")
-        for e in expense_entries:
-            desc_lower = e.description.lower()
-            if any(k in desc_lower for k in ["annual", "renewal", "yearly", "lease", "contract", "license"]):
-                # Assume 1 year duration
-                start = e.date
-                end = start + timedelta(days=365)
-                
-                # Check duplication with subscriptions (simple check)
-                if not any(t.label.startswith(e.description) for t in timeline_items):
-                    item = TimelineItem(
-                        id=str(uuid.uuid4()),
-                        label=e.description,
-                        start_date=start,
-                        end_date=end,
-                        type="contract",
-                        amount=float(e.amount),
-                        color="#10b981" # Green
-                    )
-                    timeline_items.append(item)
-            
-            # C. Detect Hardware EOL (Mock logic for demo: "MacBook", "Laptop", "Server")
-            if any(k in desc_lower for k in ["macbook", "laptop", "server", "dell", "lenovo", "hp ", "apple"]):
-                 # Assume 3 year lifecycle
-                start = e.date
-                end = start + timedelta(days=365 * 3)
-                
-                # Avoid duplicates if we already caught it as a contract (e.g. "Dell Lease")
-                if not any(t.label == f"{e.description} (Lifecycle)" for t in timeline_items):
-                     item = TimelineItem(
-                        id=str(uuid.uuid4()),
-                        label=f"{e.description} (Lifecycle)",
-                        start_date=start,
-                        end_date=end,
-                        type="hardware",
-                        amount=float(e.amount),
-                        color="#f59e0b" # Amber
-                    )
-                     timeline_items.append(item)
+            project_history_models: Dict[str, List[TrendEntry]] = {}
+            for proj, raw_list in project_history_raw.items():
+                project_history_models[proj] = [
+                    TrendEntry(
+                        month=labels[x["period"]][0],
+                        amount=x["amount"],
+                        is_forecast=x.get("is_forecast", False),
+                        sort_key=labels[x["period"]][1],
+                        lower_bound=x.get("lower_bound"),
+                        upper_bound=x.get("upper_bound")
+                    ) for x in raw_list
+                ]
 
+        # 7. Generate Timeline Items
+        with prof.stage("timeline", items=len(expense_entries)) as stage:
+            timeline_items = TimelineEngine.build(expense_entries, subscriptions)
+            stage.items = len(timeline_items)
 
         # Legacy redundant fields
         category_vendors = {k: list(v.keys()) for k, v in category_merchants.items()}
         project_vendors = {k: list(v.keys()) for k, v in project_merchants.items()}
 
-        return BudgetAnalysisResult(
+        result = BudgetAnalysisResult(
             total_expenses=total_expenses,
             category_breakdown=category_breakdown,
             project_breakdown=project_breakdown,
@@ -274,21 +226,26 @@ class AnalyzeBudgetUseCase:
             category_merchants=category_merchants,
             project_merchants=project_merchants,
             gaps=gaps, # Validated as compatible by Pydantic
+            dimension_gaps=dimension_gaps,
             flash_fill=flash_fill_suggestions,
             subscriptions=subscriptions,
             anomalies=anomalies,
             timeline=timeline_items,
             category_vendors=category_vendors,
             project_vendors=project_vendors,
-            forecast_summary=forecast_summary
+            forecast_summary=forecast_summary,
+            hybrid_forecast=hybrid_forecast
         )
+        prof.finish(entries=len(entries), expense_entries=len(expense_entries))
+        return result
 
     async def execute(self, entries: list = None, settings: Dict[str, Any] = None) -> BudgetAnalysisResult:
         """
         Executes the analysis workflow.
         
         Fetches data from the repository (if not provided) and runs the computation
-        in a thread pool to ensure non-blocking execution.
+        in a thread pool to ensure non-blocking execution. When a cache is configured,
+        repository-backed calls are served from (and stored in) the analysis cache.
 
         Args:
             entries (list, optional): Pre-fetched entries to analyze. Defaults to None (fetches all).
@@ -297,6 +254,14 @@ class AnalyzeBudgetUseCase:
         Returns:
             BudgetAnalysisResult: The complete analysis result.
         """
+        # Serve warm results for repository-backed calls (explicit entries bypass the cache)
+        tenant_id = get_tenant_id() if self.cache is not None and entries is None else None
+        if tenant_id:
+            cached = self.cache.get(tenant_id, settings)
+            if cached is not None:
+                return cached
+            data_version = self.cache.version(tenant_id)
+
         if entries is None:
             entries = await self.repo.get_all() # type: ignore
         
@@ -304,4 +269,8 @@ class AnalyzeBudgetUseCase:
         loop = asyncio.get_running_loop()
         
         # Run synchronous analysis in executor
-        return await loop.run_in_executor(None, self._compute_analysis, entries, settings)
+        result = await loop.run_in_executor(None, self._compute_analysis, entries, settings)
+
+        if tenant_id:
+            self.cache.put(tenant_id, settings, result, data_version)
+        return result
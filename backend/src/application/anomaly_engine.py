@@ -0,0 +1,119 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from src.application.analysis_services import NON_EXPENSE_CATEGORIES
+from src.application.ledger_columns import LedgerColumns, group_median
+from src.domain.analysis_models import AnomalyEntry
+
+DEFAULT_ANOMALY_SENSITIVITY = 3.5  # Robust z-score threshold; lower flags more
+MIN_GROUP_SIZE = 3
+MIN_RATIO = 1.5  # Flagged amounts must also be this multiple of the baseline
+MAX_RESULTS = 100
+
+
+def resolve_anomaly_sensitivity(settings: Optional[Dict[str, Any]]) -> float:
+    """Returns the tenant's anomaly threshold (`settings['anomaly_sensitivity']`) or the default."""
+    return float((settings or {}).get("anomaly_sensitivity") or DEFAULT_ANOMALY_SENSITIVITY)
+
+
+class AnomalyEngine:
+    """
+    Flags unusually large charges against robust per-group baselines.
+
+    Each charge is compared with the median of its merchant and of its category,
+    scaled by the median absolute deviation (MAD): score = (x - median) / (1.4826 * MAD),
+    where x is the log of the amount (spend varies multiplicatively, so heavy-tailed
+    merchants are not flagged wholesale). Median and MAD ignore the outliers they are
+    meant to find, unlike a mean. When MAD is zero (identical recurring charges) the
+    mean absolute deviation is used. All groups are scored at once with sorted-group
+    reductions over the columnar arrays. A charge flagged in both dimensions is
+    reported once, with its higher score, and only the `max_results` highest are returned.
+    """
+
+    DIMENSIONS = ("merchant", "category")
+
+    def __init__(
+        self,
+        sensitivity: float = DEFAULT_ANOMALY_SENSITIVITY,
+        min_group_size: int = MIN_GROUP_SIZE,
+        max_results: int = MAX_RESULTS,
+    ):
+        self.sensitivity = sensitivity
+        self.min_group_size = min_group_size
+        self.max_results = max_results
+
+    def _codes(self, columns: LedgerColumns, dimension: str) -> np.ndarray:
+        if dimension == "merchant":
+            return columns.merchant_codes()[0]
+        codes, labels = columns.codes("category")
+        # Transfers and payments are not spending; leave them out of category baselines
+        excluded = np.array([label in NON_EXPENSE_CATEGORIES for label in labels], dtype=bool)
+        if excluded.any():
+            codes = np.where((codes >= 0) & excluded[np.maximum(codes, 0)], -1, codes)
+        return codes
+
+    def _score(self, log_magnitude: np.ndarray, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (score, baseline amount) per row; rows in small or unknown groups score -inf."""
+        valid = codes >= 0
+        n_groups = int(codes.max()) + 1 if valid.any() else 0
+        score = np.full(log_magnitude.size, -np.inf)
+        baseline = np.zeros(log_magnitude.size)
+        if not n_groups:
+            return score, baseline
+
+        rows = np.flatnonzero(valid)
+        g, x = codes[rows], log_magnitude[rows]
+        counts = np.bincount(g, minlength=n_groups)
+        median = group_median(x, g, n_groups)
+        deviation = np.abs(x - median[g])
+        mad = group_median(deviation, g, n_groups)
+        mean_ad = np.bincount(g, weights=deviation, minlength=n_groups) / np.maximum(counts, 1)
+        scale = np.where(mad > 0, 1.4826 * mad, 1.2533 * mean_ad)
+
+        group_scale = scale[g]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z = np.where(group_scale > 0, (x - median[g]) / group_scale, -np.inf)
+        z[counts[g] < self.min_group_size] = -np.inf
+        score[rows] = z
+        baseline[rows] = np.expm1(median[g])
+        return score, baseline
+
+    def detect(self, columns: LedgerColumns) -> List[AnomalyEntry]:
+        """
+        Finds anomalous charges.
+
+        Args:
+            columns (LedgerColumns): Columnar view of the entries.
+
+        Returns:
+            List[AnomalyEntry]: Up to `max_results` anomalies, highest score first.
+        """
+        if columns.size < self.min_group_size:
+            return []
+        magnitude = np.abs(columns.amounts)
+        log_magnitude = np.log1p(magnitude)
+
+        best_score = np.full(columns.size, -np.inf)
+        best_baseline = np.zeros(columns.size)
+        best_dim = np.zeros(columns.size, dtype=np.int64)
+        for i, dimension in enumerate(self.DIMENSIONS):
+            score, baseline = self._score(log_magnitude, self._codes(columns, dimension))
+            flagged = (score >= self.sensitivity) & (magnitude >= MIN_RATIO * baseline) & (score > best_score)
+            best_score = np.where(flagged, score, best_score)
+            best_baseline = np.where(flagged, baseline, best_baseline)
+            best_dim = np.where(flagged, i, best_dim)
+
+        rows = np.flatnonzero(np.isfinite(best_score))
+        rows = rows[np.argsort(-best_score[rows], kind="stable")][:self.max_results]
+        anomalies = []
+        for r in rows.tolist():
+            entry = columns.entries[r]
+            anomalies.append(AnomalyEntry(
+                description=entry.description,
+                date=entry.date,
+                amount=float(entry.amount),
+                average=round(float(best_baseline[r]), 2),
+                score=round(float(best_score[r]), 2),
+                dimension=self.DIMENSIONS[best_dim[r]],
+            ))
+        return anomalies
@@ -4,7 +4,7 @@ from sqlalchemy import select, delete, func
 from src.infrastructure.models import (
     TenantModel, UserModel, SessionModel, 
     BudgetModel, AuditLogModel, GuestUsageStats,
-    RuleModel
+    RuleModel, RecategorizationJobModel, MerchantModel, DuplicateCandidateModel
 )
 import structlog
 import uuid
@@ -78,11 +78,22 @@ class CleanupService:
             # Delete Sessions
             await self.session.execute(delete(SessionModel).where(SessionModel.tenant_id == tenant.id))
             
+            # Delete Duplicate Review Queue
+            await self.session.execute(
+                delete(DuplicateCandidateModel).where(DuplicateCandidateModel.tenant_id == tenant.id)
+            )
+            
             # Delete Transactions
             await self.session.execute(delete(BudgetModel).where(BudgetModel.tenant_id == tenant.id))
             
-            # Delete Rules
+            # Delete Merchants (after the transactions that reference them)
+            await self.session.execute(delete(MerchantModel).where(MerchantModel.tenant_id == tenant.id))
+            
+            # Delete Rules (and any pending re-categorization of them)
             await self.session.execute(delete(RuleModel).where(RuleModel.tenant_id == tenant.id))
+            await self.session.execute(
+                delete(RecategorizationJobModel).where(RecategorizationJobModel.tenant_id == tenant.id)
+            )
             
             # Delete Audit Logs
             await self.session.execute(delete(AuditLogModel).where(AuditLogModel.tenant_id == tenant.id))
@@ -0,0 +1,107 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
+
+from src.application.analysis_cache import AnalysisCache, analysis_cache
+from src.application.analysis_services import classify_expense_batch, keyword_classifier_for
+from src.infrastructure.models import BudgetModel, TenantModel
+
+logger = structlog.get_logger()
+
+
+class ExpenseTypeBackfillService:
+    """
+    Classifies stored rows whose `expense_type` is still NULL (rows from before
+    ingest-time classification).
+
+    Walks the table in keyset batches by primary key, each in its own short
+    transaction, so the job can be interrupted at any point and simply resumes with
+    the rows that are still NULL on the next run. Rows are classified with their
+    tenant's keyword extensions. Cached analysis of every tenant in a batch is
+    invalidated once the batch commits.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        cache: AnalysisCache = analysis_cache,
+        batch_size: int = 5000,
+        max_batches_per_run: int = 50,
+    ):
+        self.session_factory = session_factory
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_batches_per_run = max_batches_per_run
+
+    async def run_batch(self, after_id: int = 0) -> Tuple[int, Optional[int]]:
+        """
+        Classifies the next batch of unclassified rows with id > after_id.
+
+        Args:
+            after_id (int): Keyset cursor (last id of the previous batch).
+
+        Returns:
+            Tuple[int, Optional[int]]: Rows classified and the new cursor (None when done).
+        """
+        async with self.session_factory() as session:
+            stmt = (
+                select(BudgetModel.id, BudgetModel.tenant_id, BudgetModel.description,
+                       BudgetModel.amount, BudgetModel.category)
+                .where(BudgetModel.expense_type.is_(None), BudgetModel.id > after_id)
+                .order_by(BudgetModel.id)
+                .limit(self.batch_size)
+            )
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                return 0, None
+
+            by_tenant: Dict[UUID, List[Any]] = defaultdict(list)
+            for row in rows:
+                by_tenant[row.tenant_id].append(row)
+            tenant_settings = dict((await session.execute(
+                select(TenantModel.id, TenantModel.settings).where(TenantModel.id.in_(list(by_tenant)))
+            )).all())
+
+            ids_by_type: Dict[str, List[int]] = defaultdict(list)
+            for tenant_id, tenant_rows in by_tenant.items():
+                expense_types = classify_expense_batch(
+                    [r.description for r in tenant_rows],
+                    [float(r.amount) for r in tenant_rows],
+                    [r.category for r in tenant_rows],
+                    keyword_classifier_for(tenant_settings.get(tenant_id)),
+                )
+                for r, expense_type in zip(tenant_rows, expense_types):
+                    ids_by_type[expense_type].append(r.id)
+
+            for expense_type, ids in ids_by_type.items():
+                await session.execute(
+                    update(BudgetModel).where(BudgetModel.id.in_(ids)).values(expense_type=expense_type)
+                )
+            await session.commit()
+            for tenant_id in by_tenant:
+                self.cache.invalidate(tenant_id)
+            return len(rows), rows[-1].id
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Runs up to `max_batches_per_run` batches.
+
+        Returns:
+            Dict[str, Any]: Rows classified, batches run and whether the backlog is empty.
+        """
+        cursor: Optional[int] = 0
+        summary = {"classified": 0, "batches": 0, "complete": False}
+        while summary["batches"] < self.max_batches_per_run:
+            count, cursor = await self.run_batch(cursor)
+            if cursor is None:
+                summary["complete"] = True
+                break
+            summary["classified"] += count
+            summary["batches"] += 1
+
+        if summary["classified"]:
+            logger.info("expense_type_backfill_progress", **summary)
+        return summary
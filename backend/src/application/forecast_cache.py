@@ -0,0 +1,111 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+import hashlib
+import threading
+import numpy as np
+
+from src.application.forecast_engine import FittedForecast
+
+# Fits are forecast to the longest horizon a tenant can request and sliced down,
+# so changing `forecast_horizon` does not refit anything
+MAX_FORECAST_HORIZON = 60
+
+# A fit is advanced month by month for at most this many months past the history
+# length its parameters were searched at; after that the series is refitted
+MAX_INCREMENTAL_MONTHS = 12
+
+
+def series_fingerprint(values: Sequence[float], params: Tuple[Hashable, ...]) -> str:
+    """
+    Stable hash of a series and the model parameters it is forecast with.
+
+    Args:
+        values (Sequence[float]): The series, oldest value first.
+        params (Tuple[Hashable, ...]): Model identity and parameters.
+
+    Returns:
+        str: Hex digest; equal only for identical values (bit for bit) and params.
+    """
+    digest = hashlib.blake2b(np.asarray(values, dtype=np.float64).tobytes(), digest_size=16)
+    digest.update(repr(params).encode())
+    return digest.hexdigest()
+
+
+class ForecastCache:
+    """
+    Process-local LRU cache of per-series model fits.
+
+    Keys are series fingerprints, so an entry (fitted parameters, final state and
+    forecast path) stays valid for as long as the series it was computed from; any
+    new or corrected month produces a different key and the old entry simply ages
+    out. Entries are fitted at `MAX_FORECAST_HORIZON` and are immutable; callers
+    slice them to the requested horizon.
+
+    Entries double as the persisted model state per series: a series whose history
+    is a cached series plus one or two new months is advanced from that entry's
+    level/trend/season instead of being refitted (counted as `updates`).
+    """
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, FittedForecast]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.updates = 0
+
+    def get(self, key: str, record: bool = True) -> Optional[FittedForecast]:
+        """
+        Returns the cached fit for a fingerprint, or None on a miss.
+
+        Args:
+            key (str): Fingerprint from `series_fingerprint`.
+            record (bool): Count the lookup in the hit/miss statistics (off for
+                probes of a series' earlier states).
+
+        Returns:
+            Optional[FittedForecast]: The fit, forecast to `MAX_FORECAST_HORIZON`.
+        """
+        with self._lock:
+            fit = self._entries.get(key)
+            if fit is None:
+                if record:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if record:
+                self.hits += 1
+            return fit
+
+    def put(self, key: str, fit: FittedForecast, advanced: bool = False) -> None:
+        """
+        Stores a fit forecast to `MAX_FORECAST_HORIZON`.
+
+        Args:
+            key (str): Fingerprint from `series_fingerprint`.
+            fit (FittedForecast): The fitted model.
+            advanced (bool): The fit was advanced from a cached state, not refitted.
+        """
+        with self._lock:
+            if advanced:
+                self.updates += 1
+            self._entries[key] = fit
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns hit/miss/update counters and the current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "updates": self.updates,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+# Shared instance used by the API and the precompute job
+forecast_cache = ForecastCache()
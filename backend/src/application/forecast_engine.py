@@ -0,0 +1,543 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, replace
+from itertools import repeat
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import multiprocessing
+import os
+import threading
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+DEFAULT_SEASON_LENGTH = 12
+
+# Smoothing parameters tried per series; the combination with the lowest
+# one-step-ahead squared error wins (ties go to the smoother, earlier values)
+ALPHA_GRID = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9)
+BETA_GRID = (0.05, 0.1, 0.2, 0.3, 0.5)
+GAMMA_GRID = (0.05, 0.1, 0.2, 0.3, 0.5)
+
+# Batches larger than one chunk are split across a process pool (1 = always in-process)
+FIT_WORKERS = int(os.getenv("FORECAST_FIT_WORKERS", str(min(4, os.cpu_count() or 1))))
+FIT_CHUNK_SIZE = int(os.getenv("FORECAST_FIT_CHUNK_SIZE", "64"))
+
+Z_95 = 1.96
+
+# Residual bootstrap for prediction intervals: simulated future paths per series,
+# seeded per series so a series' bounds do not depend on what it is batched with
+BOOTSTRAP_PATHS = int(os.getenv("FORECAST_BOOTSTRAP_PATHS", "500"))
+BOOTSTRAP_SEED = int(os.getenv("FORECAST_BOOTSTRAP_SEED", "0"))
+# Below this many residuals, shocks are drawn from N(0, sigma) instead of resampled
+MIN_BOOTSTRAP_RESIDUALS = 6
+# Upper bound on simulated values held at once (series x paths x horizon)
+_BOOTSTRAP_BATCH_VALUES = 2_000_000
+
+# One pool per worker count, so an engine never runs on a pool sized by another caller
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pool_lock = threading.Lock()
+
+
+def _fit_pool(workers: int) -> ProcessPoolExecutor:
+    with _pool_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            # spawn: the API process runs threads (event loop, executors), which fork does not copy safely
+            pool = _pools[workers] = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+        return pool
+
+
+def _reset_fit_pool(workers: int) -> None:
+    with _pool_lock:
+        pool = _pools.pop(workers, None)
+    if pool is not None:
+        # A broken pool still holds worker processes and its management thread
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_fit_pool() -> None:
+    """Shuts down the fit worker processes (on application shutdown); the next parallel fit starts new ones."""
+    with _pool_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+@dataclass(frozen=True)
+class FittedForecast:
+    """
+    Smoothing model fitted to one series, with its final state and forecast path.
+
+    `season` holds the final seasonal factors by slot (`t % season_length`) and is
+    empty for Holt's linear model. `path` and `factors` are the point forecasts
+    (before flooring at 0) and the seasonal factor applied to each step.
+    `residuals` are the one-step-ahead errors (resampled by `bootstrap_bounds`); the
+    error sums over them let `ForecastEngine.advance` extend the statistics without
+    the history. `refit_length` is the history length the parameters
+    were searched at; `previous` is the same model's state one month earlier (the
+    starting point when the latest month is revised), if that state is valid.
+    """
+    model: str
+    alpha: float
+    beta: float
+    gamma: float
+    length: int
+    level: float
+    trend: float
+    season: np.ndarray
+    path: np.ndarray
+    factors: np.ndarray
+    residuals: np.ndarray
+    sse: float
+    error_count: int
+    ape_sum: float
+    ape_count: int
+    outlier: bool
+    refit_length: int
+    previous: Optional["FittedForecast"] = None
+
+    @property
+    def sigma(self) -> float:
+        """Standard deviation of the one-step-ahead errors."""
+        return float(np.nan_to_num(np.sqrt(self.sse / max(self.error_count, 1))))
+
+    @property
+    def mape(self) -> float:
+        """Mean absolute percentage one-step-ahead error (months with a zero actual skipped)."""
+        return float(np.nan_to_num(100 * self.ape_sum / max(self.ape_count, 1)))
+
+    def forecast(self, periods: int) -> np.ndarray:
+        """Point forecasts for the next `periods` steps, floored at 0."""
+        return _floor(self.path[:periods])
+
+
+class ForecastEngine:
+    """
+    Fits exponential smoothing models to many series at once.
+
+    Series with more than one season of history get multiplicative Holt-Winters
+    (seeded from the first and second season); shorter ones get Holt's linear trend
+    (seeded from the first two points). For every series the smoothing parameters
+    are chosen from the grid by one-step-ahead SSE.
+
+    The grid search is vectorized: series are stacked into one matrix, left-aligned
+    so that each series' own month index drives its seasonal slot, and every
+    recurrence step updates a (series x parameter combination) state array. Rows are
+    ordered by length, longest first, so the series that still have history form a
+    prefix and each step updates a slice instead of masking. Batches larger than
+    `chunk_size` are split across a process pool.
+
+    A single-value grid gives fixed parameters; forecasts then match the scalar
+    recurrences bit for bit. `advance` moves a fitted state forward by one month
+    with the same arithmetic, so an advanced fit equals a fixed-parameter refit of
+    the longer series.
+    """
+
+    def __init__(
+        self,
+        alpha_grid: Sequence[float] = ALPHA_GRID,
+        beta_grid: Sequence[float] = BETA_GRID,
+        gamma_grid: Sequence[float] = GAMMA_GRID,
+        season_length: int = DEFAULT_SEASON_LENGTH,
+        workers: int = FIT_WORKERS,
+        chunk_size: int = FIT_CHUNK_SIZE,
+    ):
+        self.alpha_grid = tuple(alpha_grid)
+        self.beta_grid = tuple(beta_grid)
+        self.gamma_grid = tuple(gamma_grid)
+        self.season_length = season_length
+        self.workers = workers
+        self.chunk_size = chunk_size
+
+    @classmethod
+    def fixed(cls, alpha: float, beta: float, gamma: float = 0.3, season_length: int = DEFAULT_SEASON_LENGTH):
+        """Engine that uses the given parameters instead of searching the grid."""
+        return cls((alpha,), (beta,), (gamma,), season_length)
+
+    @property
+    def params(self) -> Tuple[Any, ...]:
+        """Model identity and parameter grid (part of forecast cache keys)."""
+        return ("smoothing", self.alpha_grid, self.beta_grid, self.gamma_grid, self.season_length)
+
+    def can_advance(self, fit: FittedForecast, length: int) -> bool:
+        """
+        Whether `advance` can extend a fit to a series of `length` months.
+
+        Holt's model can be extended until the series outgrows one season (it then
+        switches to Holt-Winters). Holt-Winters seeds its trend from the second
+        season, so its state only stops depending on later months after two seasons.
+        """
+        if fit.model == "holt":
+            return fit.length >= 2 and length <= self.season_length
+        return fit.length >= 2 * self.season_length and fit.season.size == self.season_length
+
+    def advance(self, fit: FittedForecast, value: float, horizon: int) -> FittedForecast:
+        """
+        Feeds the next month through a fitted model's final state.
+
+        Costs one recurrence step plus the forecast path, whatever the history
+        length. Parameters are kept; the error statistics and outlier flag are
+        extended with the new one-step-ahead error.
+
+        Args:
+            fit (FittedForecast): Fit of the series so far (see `can_advance`).
+            value (float): The new month's value.
+            horizon (int): Forecast horizon of the returned fit.
+
+        Returns:
+            FittedForecast: Fit of the series extended by `value`.
+        """
+        m = self.season_length
+        seasonal = fit.model == "holt_winters"
+        cell = lambda x: np.full((1, 1), x, dtype=np.float64)  # noqa: E731
+        idx = fit.length % m
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            error, level, trend, factor = _step(
+                cell(fit.level), cell(fit.trend), cell(fit.season[idx]) if seasonal else None,
+                cell(value), cell(fit.alpha), cell(fit.beta), cell(fit.gamma),
+            )
+        error, level, trend = float(error[0, 0]), float(level[0, 0]), float(trend[0, 0])
+
+        length = fit.length + 1
+        steps = np.arange(1, horizon + 1)
+        if seasonal:
+            season = np.array(fit.season)
+            season[idx] = factor[0, 0]
+            factors = season[(length + steps - 1) % m]
+        else:
+            season, factors = fit.season, np.ones(horizon)
+
+        sse = fit.sse + error * error
+        sigma = np.sqrt(sse / (fit.error_count + 1))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            relative = value != 0
+            return replace(
+                fit,
+                length=length,
+                level=level,
+                trend=trend,
+                season=_readonly(season),
+                path=_readonly((level + steps * trend) * factors),
+                factors=_readonly(factors),
+                residuals=_readonly(np.append(fit.residuals, error)),
+                sse=sse,
+                error_count=fit.error_count + 1,
+                ape_sum=fit.ape_sum + (abs(error / value) if relative else 0.0),
+                ape_count=fit.ape_count + int(relative),
+                outlier=fit.outlier or bool(abs(error) > 3 * sigma and sigma > 0),
+                previous=replace(fit, previous=None),
+            )
+
+    def fit(self, series: Sequence[Sequence[float]], horizon: int) -> List[Optional[FittedForecast]]:
+        """
+        Fits every series and forecasts it `horizon` steps ahead.
+
+        Args:
+            series (Sequence[Sequence[float]]): Histories, oldest value first.
+            horizon (int): Forecast horizon.
+
+        Returns:
+            List[Optional[FittedForecast]]: One fit per series; None for series with
+                fewer than 2 values.
+        """
+        if self.workers > 1 and len(series) > self.chunk_size:
+            chunks = [series[i:i + self.chunk_size] for i in range(0, len(series), self.chunk_size)]
+            try:
+                results = _fit_pool(self.workers).map(self._fit_batch, chunks, repeat(horizon))
+                return [fit for chunk in results for fit in chunk]
+            except (BrokenProcessPool, OSError) as e:
+                logger.warn("forecast_fit_pool_failed", error=str(e), series=len(series))
+                _reset_fit_pool(self.workers)
+        return self._fit_batch(series, horizon)
+
+    def _fit_batch(self, series: Sequence[Sequence[float]], horizon: int) -> List[Optional[FittedForecast]]:
+        lengths = np.fromiter((len(s) for s in series), dtype=np.int64, count=len(series))
+        fits: List[Optional[FittedForecast]] = [None] * len(series)
+        steps = np.arange(1, horizon + 1)
+
+        for seasonal in (False, True):
+            if seasonal:
+                selected = np.flatnonzero(lengths > self.season_length)
+            else:
+                selected = np.flatnonzero((lengths >= 2) & (lengths <= self.season_length))
+            if not selected.size:
+                continue
+            order = selected[np.argsort(-lengths[selected], kind="stable")]
+            n = lengths[order]
+            values = np.zeros((order.size, int(n[0])))
+            for row, i in enumerate(order):
+                values[row, :n[row]] = series[i]
+            for i, fit in zip(order, self._fit_group(values, n, steps, seasonal)):
+                fits[i] = fit
+        return fits
+
+    def _fit_group(self, values: np.ndarray, n: np.ndarray, steps: np.ndarray, seasonal: bool) -> List[FittedForecast]:
+        grid = np.array(np.meshgrid(self.alpha_grid, self.beta_grid, self.gamma_grid if seasonal else (0.0,),
+                                    indexing="ij")).reshape(3, -1)
+        rows = values.shape[0]
+
+        if grid.shape[1] > 1:
+            search = self._smooth(values, n, *(np.broadcast_to(p, (rows, grid.shape[1])) for p in grid), seasonal)
+            sse = np.nan_to_num(search[3], nan=np.inf)
+            best = grid[:, np.argmin(sse, axis=1)].T
+        else:
+            best = np.broadcast_to(grid.T, (rows, 3))
+
+        alpha, beta, gamma = (np.ascontiguousarray(best[:, j:j + 1]) for j in range(3))
+        level, trend, season, _, residuals, before = self._smooth(
+            values, n, alpha, beta, gamma, seasonal, keep_residuals=True
+        )
+        model = "holt_winters" if seasonal else "holt"
+
+        # One-step-ahead errors: from t=1 for Holt, from the second season for Holt-Winters
+        start = self.season_length if seasonal else 1
+        fitted = (np.arange(values.shape[1]) >= start) & (np.arange(values.shape[1]) < n[:, None])
+        fits = self._build_fits(model, alpha, beta, gamma, n, n, level[:, 0], trend[:, 0],
+                                season[:, 0] if seasonal else None, steps, values, residuals, fitted)
+
+        # The state one month earlier, for when the latest month is revised
+        earlier = n - 1
+        valid = earlier >= (2 * self.season_length if seasonal else 2)
+        previous = self._build_fits(model, alpha, beta, gamma, earlier, n, *before, steps, values, residuals,
+                                    fitted & (np.arange(values.shape[1]) < earlier[:, None]))
+        return [replace(fit, previous=prev) if ok else fit for fit, prev, ok in zip(fits, previous, valid)]
+
+    def _build_fits(
+        self,
+        model: str,
+        alpha: np.ndarray,
+        beta: np.ndarray,
+        gamma: np.ndarray,
+        n: np.ndarray,
+        refit_length: np.ndarray,
+        level: np.ndarray,
+        trend: np.ndarray,
+        season: Optional[np.ndarray],
+        steps: np.ndarray,
+        values: np.ndarray,
+        residuals: np.ndarray,
+        fitted: np.ndarray,
+    ) -> List[FittedForecast]:
+        rows = values.shape[0]
+        if season is not None:
+            factors = np.take_along_axis(season, (n[:, None] + steps - 1) % self.season_length, axis=1)
+        else:
+            factors = np.ones((rows, steps.size))
+        paths = (level[:, None] + steps * trend[:, None]) * factors
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sse = np.where(fitted, residuals ** 2, 0.0).sum(axis=1)
+            counts = fitted.sum(axis=1)
+            sigma = np.sqrt(sse / np.maximum(counts, 1))
+            relative = fitted & (values != 0)
+            ape = np.where(relative, np.abs(residuals / values), 0.0).sum(axis=1)
+            outlier = (fitted & (np.abs(residuals) > 3 * sigma[:, None]) & (sigma[:, None] > 0)).any(axis=1)
+
+        return [
+            FittedForecast(
+                model=model,
+                alpha=float(alpha[r, 0]),
+                beta=float(beta[r, 0]),
+                gamma=float(gamma[r, 0]),
+                length=int(n[r]),
+                level=float(level[r]),
+                trend=float(trend[r]),
+                season=_readonly(season[r] if season is not None else np.empty(0)),
+                path=_readonly(paths[r]),
+                factors=_readonly(factors[r]),
+                residuals=_readonly(residuals[r][fitted[r]]),
+                sse=float(sse[r]),
+                error_count=int(counts[r]),
+                ape_sum=float(ape[r]),
+                ape_count=int(relative[r].sum()),
+                outlier=bool(outlier[r]),
+                refit_length=int(refit_length[r]),
+            )
+            for r in range(rows)
+        ]
+
+    def _smooth(
+        self,
+        values: np.ndarray,
+        n: np.ndarray,
+        alpha: np.ndarray,
+        beta: np.ndarray,
+        gamma: np.ndarray,
+        seasonal: bool,
+        keep_residuals: bool = False,
+    ) -> Tuple[np.ndarray, ...]:
+        """
+        Runs the recurrence for every (series, parameter combination).
+
+        Parameters are (series, combinations) arrays. Returns the final level, trend
+        and seasonal state, the one-step-ahead SSE per combination and, if
+        requested (single combination only), the residual matrix and the
+        (level, trend, season) state before each series' last value.
+        """
+        rows, combos = alpha.shape
+        m = self.season_length
+        residuals = np.zeros(values.shape) if keep_residuals else None
+        sse = np.zeros((rows, combos))
+        before = (np.full(rows, np.nan), np.full(rows, np.nan), np.full((rows, m), np.nan) if seasonal else None)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if seasonal:
+                first_avg = np.mean(values[:, :m], axis=1)
+                season0 = np.where(first_avg[:, None] > 0, values[:, :m] / first_avg[:, None], 1.0)
+                season = np.repeat(season0[:, None, :], combos, axis=1)
+
+                # The second season may be partial; average each row over its own points
+                # (rows grouped by count so the reduction matches a per-series mean)
+                second_avg = np.empty(rows)
+                span = np.minimum(n, 2 * m) - m
+                for count in np.unique(span):
+                    group = span == count
+                    second_avg[group] = np.mean(values[group, m:m + count], axis=1)
+
+                level = np.repeat(first_avg[:, None], combos, axis=1)
+                trend = np.repeat(((second_avg - first_avg) / m)[:, None], combos, axis=1)
+                start = m
+            else:
+                season = None
+                level = np.repeat(values[:, :1], combos, axis=1)
+                trend = np.repeat(values[:, 1:2] - values[:, :1], combos, axis=1)
+                start = 1
+
+            for t in range(start, values.shape[1]):
+                active = int(np.count_nonzero(n > t))
+                if keep_residuals:
+                    # Rows whose last value is at t: keep the state that value is applied to
+                    ending = np.flatnonzero(n[:active] == t + 1)
+                    before[0][ending], before[1][ending] = level[ending, 0], trend[ending, 0]
+                    if seasonal:
+                        before[2][ending] = season[ending, 0]
+
+                idx = t % m
+                error, level[:active], trend[:active], factor = _step(
+                    level[:active], trend[:active], season[:active, :, idx] if seasonal else None,
+                    values[:active, t:t + 1], alpha[:active], beta[:active], gamma[:active],
+                )
+                if seasonal:
+                    season[:active, :, idx] = factor
+
+                sse[:active] += error * error
+                if keep_residuals:
+                    residuals[:active, t] = error[:, 0]
+
+        if keep_residuals:
+            return level, trend, season, sse, residuals, before
+        return level, trend, season, sse, residuals
+
+
+def bootstrap_bounds(
+    fits: Sequence[Optional[FittedForecast]],
+    periods: int,
+    paths: int = BOOTSTRAP_PATHS,
+    seed: int = BOOTSTRAP_SEED,
+    coverage: float = 0.95,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Residual-bootstrap prediction intervals for many fitted series at once.
+
+    Every series is simulated `paths` times: each month adds a resampled one-step
+    error to the model's forecast, floors the value at 0 and feeds it back through
+    the smoothing recurrence, so the spread compounds the way the model's own
+    errors do. The simulation is one (series x paths) array per step, in batches
+    of bounded size. Bounds are the simulated quantiles, widened where needed to
+    contain the point forecast.
+
+    Args:
+        fits (Sequence[Optional[FittedForecast]]): Fitted series (None: zero bounds).
+        periods (int): Horizon; must not exceed the fits' forecast paths.
+        paths (int): Simulated paths per series.
+        seed (int): Base seed; each series' stream is derived from it and the series.
+        coverage (float): Central probability covered by the interval.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (series x periods) lower and upper bounds.
+    """
+    lower, upper = np.zeros((len(fits), periods)), np.zeros((len(fits), periods))
+    rows = [i for i, fit in enumerate(fits) if fit is not None]
+    batch = max(1, _BOOTSTRAP_BATCH_VALUES // max(paths * periods, 1))
+    for start in range(0, len(rows), batch):
+        index = rows[start:start + batch]
+        lower[index], upper[index] = _simulate([fits[i] for i in index], periods, paths, seed, coverage)
+    return lower, upper
+
+
+def _simulate(
+    fits: List[FittedForecast], periods: int, paths: int, seed: int, coverage: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    shocks = np.stack([_shocks(fit, periods, paths, seed) for fit in fits])
+    column = lambda name: np.array([getattr(fit, name) for fit in fits])[:, None]  # noqa: E731
+    level = np.repeat(column("level"), paths, axis=1)
+    trend = np.repeat(column("trend"), paths, axis=1)
+    alpha, beta, gamma = column("alpha"), column("beta"), column("gamma")
+    seasonal = np.array([fit.model == "holt_winters" for fit in fits])[:, None]
+    factors = np.stack([fit.factors[:periods] for fit in fits])
+    m = max(fit.season.size for fit in fits)
+
+    simulated = np.empty((len(fits), periods, paths))
+    updated = []  # seasonal factor per path after each step; reused one season later
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for k in range(periods):
+            factor = updated[k - m] if m and k >= m else factors[:, k:k + 1]
+            y = np.maximum((level + trend) * factor + shocks[:, :, k], 0.0)
+            _, level, trend, new_factor = _step(level, trend, factor, y, alpha, beta, gamma)
+            updated.append(np.where(seasonal, new_factor, 1.0))
+            simulated[:, k] = y
+
+        tail = (1 - coverage) / 2
+        lower, upper = np.quantile(simulated, [tail, 1 - tail], axis=2)
+    points = np.stack([fit.forecast(periods) for fit in fits])
+    return np.minimum(np.nan_to_num(lower), points), np.maximum(np.nan_to_num(upper), points)
+
+
+def _shocks(fit: FittedForecast, periods: int, paths: int, seed: int) -> np.ndarray:
+    entropy = hashlib.blake2b(fit.residuals.tobytes() + fit.path[:1].tobytes(), digest_size=8).digest()
+    rng = np.random.default_rng([seed, int.from_bytes(entropy, "little")])
+    if fit.residuals.size >= MIN_BOOTSTRAP_RESIDUALS:
+        return fit.residuals[rng.integers(0, fit.residuals.size, (paths, periods))]
+    return rng.normal(0.0, fit.sigma, (paths, periods))
+
+
+def _step(
+    level: np.ndarray,
+    trend: np.ndarray,
+    factor: Optional[np.ndarray],
+    y: np.ndarray,
+    alpha: np.ndarray,
+    beta: np.ndarray,
+    gamma: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    """
+    One smoothing step. `factor` is the seasonal factor of y's slot (None for Holt).
+
+    Returns the one-step-ahead error and the new level, trend and factor. Shared by
+    the batched fit and `ForecastEngine.advance` so both do identical arithmetic.
+    """
+    if factor is None:
+        error = y - (level + trend)
+        new_level = alpha * y + (1 - alpha) * (level + trend)
+        new_factor = None
+    else:
+        error = y - (level + trend) * factor
+        new_level = alpha * (y / np.where(factor > 0, factor, 1.0)) + (1 - alpha) * (level + trend)
+        new_factor = gamma * (y / new_level) + (1 - gamma) * factor
+    new_trend = beta * (new_level - level) + (1 - beta) * trend
+    return error, new_level, new_trend, new_factor
+
+
+def _floor(points: np.ndarray) -> np.ndarray:
+    # Same as max(0, x) per point: NaN forecasts also become 0
+    return np.where(points > 0, points, 0.0)
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array = np.array(array, dtype=np.float64)
+    array.flags.writeable = False
+    return array
@@ -0,0 +1,90 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+from src.application.analysis_services import NON_EXPENSE_CATEGORIES
+from src.application.ledger_columns import LedgerColumns
+from src.application.time_buckets import TimeBuckets
+
+
+@dataclass
+class ForecastHierarchy:
+    """
+    The expense ledger as a forecasting hierarchy on one period grid.
+
+    Nodes are the total, then the given categories, then the given projects, then
+    the bottom-level category x project series. `parents` links each bottom series
+    to the total, category and project nodes it adds up to, which is what the
+    weighted least-squares reconciliation needs (see `reconcile_forecasts`).
+
+    Attributes:
+        series (List[np.ndarray]): Spend per period and node, starting at the
+            node's first period with spend (empty if it has none) and ending at
+            the ledger's last expense period.
+        parents (np.ndarray): (bottom series x 3) total, category and project node
+            index of each bottom series (-1 where that category or project is not
+            a node).
+    """
+    series: List[np.ndarray]
+    parents: np.ndarray
+
+    @classmethod
+    def from_columns(
+        cls,
+        columns: LedgerColumns,
+        categories: Sequence[Optional[str]],
+        projects: Sequence[Optional[str]],
+        buckets: TimeBuckets = TimeBuckets(),
+    ) -> "ForecastHierarchy":
+        """
+        Builds the hierarchy from the ledger's columns in one pass.
+
+        Args:
+            columns (LedgerColumns): All entries (non-expense categories are ignored).
+            categories (Sequence[Optional[str]]): Category nodes, in output order.
+            projects (Sequence[Optional[str]]): Project nodes, in output order.
+            buckets (TimeBuckets): Period bucketing (calendar months by default).
+
+        Returns:
+            ForecastHierarchy: Node series and bottom series' parents.
+        """
+        category_codes, category_labels = columns.codes("category")
+        project_codes, project_labels = columns.codes("project")
+        # Missing categories (code -1) get their own code after the labels
+        category_codes = np.where(category_codes < 0, len(category_labels), category_codes)
+        category_labels = np.append(category_labels, None)
+
+        excluded = np.flatnonzero(np.isin(category_labels, list(NON_EXPENSE_CATEGORIES)))
+        expense = ~np.isin(category_codes, excluded)
+        if not expense.any():
+            return cls([np.empty(0)] * (1 + len(categories) + len(projects)), np.empty((0, 3), dtype=np.int64))
+
+        periods = buckets.codes(columns.dates[expense])
+        first, span = int(periods.min()), int(periods.max() - periods.min()) + 1
+        pairs, bottom = np.unique(category_codes[expense] * len(project_labels) + project_codes[expense],
+                                  return_inverse=True)
+        values = np.bincount(bottom * span + (periods - first), weights=np.abs(columns.amounts[expense]),
+                             minlength=pairs.size * span).reshape(pairs.size, span)
+
+        pair_category, pair_project = np.divmod(pairs, len(project_labels))
+        category_index: Dict[Optional[str], int] = {label: i for i, label in enumerate(category_labels)}
+        project_index: Dict[Optional[str], int] = {label: i for i, label in enumerate(project_labels)}
+        # Node index per category / project code (-1 for those that are not nodes)
+        category_node = np.full(len(category_labels), -1, dtype=np.int64)
+        for i, c in enumerate(categories):
+            if c in category_index:
+                category_node[category_index[c]] = 1 + i
+        project_node = np.full(len(project_labels), -1, dtype=np.int64)
+        for i, p in enumerate(projects):
+            if (p or "General") in project_index:
+                project_node[project_index[p or "General"]] = 1 + len(categories) + i
+        parents = np.column_stack([np.zeros(pairs.size, dtype=np.int64),
+                                   category_node[pair_category], project_node[pair_project]])
+
+        aggregates = np.zeros((1 + len(categories) + len(projects), span))
+        for level in parents.T:
+            has_node = level >= 0
+            np.add.at(aggregates, level[has_node], values[has_node])
+        totals = np.vstack([aggregates, values])
+        starts = np.where((totals > 0).any(axis=1), np.argmax(totals > 0, axis=1), span)
+        return cls([row[start:] for row, start in zip(totals, starts)], parents)
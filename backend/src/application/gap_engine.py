@@ -0,0 +1,109 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from src.application.ledger_columns import LedgerColumns
+
+# Days without activity before a gap is reported. 'tenant' covers the whole ledger;
+# the others apply to each project / category / source file separately.
+DEFAULT_GAP_THRESHOLDS: Dict[str, int] = {
+    "tenant": 7,
+    "project": 14,
+    "category": 35,  # Most categories post at least monthly
+    "source_file": 14,
+}
+GAP_DIMENSIONS = ("project", "category", "source_file")
+
+
+def resolve_gap_thresholds(settings: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Merges tenant overrides (`settings['gap_thresholds']`) into the defaults.
+
+    A threshold of 0 or null disables gap detection for that dimension.
+
+    Args:
+        settings (Optional[Dict[str, Any]]): Tenant settings.
+
+    Returns:
+        Dict[str, int]: Threshold in days per dimension (disabled ones omitted).
+    """
+    thresholds = dict(DEFAULT_GAP_THRESHOLDS)
+    thresholds.update((settings or {}).get("gap_thresholds") or {})
+    return {dim: int(days) for dim, days in thresholds.items() if days and dim in DEFAULT_GAP_THRESHOLDS}
+
+
+class GapEngine:
+    """
+    Detects periods without transactions, for the tenant as a whole and per dimension.
+
+    Works on the columnar date array: gaps are the positions where consecutive dates
+    differ by more than the threshold (`np.diff`). For dimensions, rows are stably
+    grouped by factorized code, which keeps each group in date order, so all groups
+    are checked with one diff and a same-group mask. Rows loaded through the
+    (tenant_id, date) index are already ordered and are not re-sorted.
+    """
+
+    @staticmethod
+    def _gap_positions(days: np.ndarray, threshold: int, groups: Optional[np.ndarray] = None) -> np.ndarray:
+        if days.size < 2:
+            return np.empty(0, dtype=np.int64)
+        mask = np.diff(days) > threshold
+        if groups is not None:
+            mask &= (groups[1:] == groups[:-1]) & (groups[1:] >= 0)
+        return np.flatnonzero(mask)
+
+    @classmethod
+    def detect(
+        cls,
+        columns: LedgerColumns,
+        thresholds: Optional[Dict[str, int]] = None,
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Computes tenant-level and per-dimension gaps.
+
+        Args:
+            columns (LedgerColumns): Columnar view of the entries.
+            thresholds (Optional[Dict[str, int]]): Days per dimension (see resolve_gap_thresholds).
+
+        Returns:
+            Tuple[List[Dict], List[Dict]]: Tenant gaps ({start_date, end_date, days}) and
+            dimension gaps ({dimension, key, start_date, end_date, days}).
+        """
+        thresholds = DEFAULT_GAP_THRESHOLDS if thresholds is None else thresholds
+        if columns.size < 2:
+            return [], []
+
+        order = columns.date_order()
+        days = columns.days[order]
+
+        tenant_gaps: List[Dict] = []
+        if "tenant" in thresholds:
+            pos = cls._gap_positions(days, thresholds["tenant"])
+            starts, ends = LedgerColumns.to_dates(days[pos]), LedgerColumns.to_dates(days[pos + 1])
+            tenant_gaps = [
+                {"start_date": s, "end_date": e, "days": (e - s).days}
+                for s, e in zip(starts, ends)
+            ]
+
+        dimension_gaps: List[Dict] = []
+        for dimension in GAP_DIMENSIONS:
+            if dimension not in thresholds:
+                continue
+            codes, labels = columns.codes(dimension)
+            codes = codes[order]
+            # Stable sort by group keeps every group in date order
+            by_group = np.argsort(codes, kind="stable")
+            group_codes, group_days = codes[by_group], days[by_group]
+            pos = cls._gap_positions(group_days, thresholds[dimension], group_codes)
+            if not pos.size:
+                continue
+            starts, ends = LedgerColumns.to_dates(group_days[pos]), LedgerColumns.to_dates(group_days[pos + 1])
+            for code, s, e in zip(group_codes[pos].tolist(), starts, ends):
+                dimension_gaps.append({
+                    "dimension": dimension,
+                    "key": str(labels[code]),
+                    "start_date": s,
+                    "end_date": e,
+                    "days": (e - s).days,
+                })
+
+        return tenant_gaps, dimension_gaps
@@ -0,0 +1,236 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from operator import attrgetter
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+from src.application.analysis_services import (
+    CAPEX_SEED, MONTH_NAMES, NON_EXPENSE_CATEGORIES, ForecastService, classify_expense_batch, s_curve_monthly
+)
+from src.application.forecast_cache import ForecastCache
+from src.application.forecast_engine import bootstrap_bounds
+from src.application.ledger_columns import LedgerColumns
+from src.application.keyword_classifier import KeywordClassifier
+from src.application.timeline_engine import TimelineEngine
+from src.domain.analysis_models import HybridForecast, HybridForecastPoint
+
+# Per-stream confidence (OpEx is the most predictable, CapEx timing the least)
+OPEX_CONFIDENCE = 0.85
+CAPEX_CONFIDENCE = 0.70
+PROJECT_CONFIDENCE = 0.80
+
+# Performance budget: the Monte Carlo matrix is simulations x planned items
+HYBRID_CAPEX_SIMULATIONS = 1000
+MAX_PLANNED_CAPEX = 200
+
+_Z_95 = 1.96
+_Z_90 = 1.2816  # p10..p90 spans +-1.2816 sd of a normal
+
+
+@dataclass(frozen=True)
+class ProjectBudget:
+    """A project with a configured budget, forecast with the S-curve instead of smoothing."""
+    name: str
+    total_budget: float
+    start: int  # month code (months since 1970-01)
+    duration_months: int
+
+
+def month_code(sort_key: str) -> Optional[int]:
+    """Converts 'YYYY-MM' to months since 1970-01; None if unparsable."""
+    try:
+        year, month = map(int, str(sort_key).split("-"))
+    except ValueError:
+        return None
+    return (year - 1970) * 12 + month - 1 if 1 <= month <= 12 else None
+
+
+def project_budgets(settings: Optional[Dict[str, Any]]) -> List[ProjectBudget]:
+    """
+    Reads `settings['project_budgets']` ({project: {total_budget, start_month, duration_months}}).
+
+    Invalid entries are skipped.
+    """
+    budgets = []
+    for name, spec in ((settings or {}).get("project_budgets") or {}).items():
+        start = month_code((spec or {}).get("start_month", ""))
+        try:
+            total, duration = float(spec["total_budget"]), int(spec["duration_months"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if start is not None and total > 0 and duration > 0:
+            budgets.append(ProjectBudget(name, total, start, duration))
+    return budgets
+
+
+class HybridForecaster:
+    """
+    Forecast V2: models the three kinds of spend separately and adds them up.
+
+    - OpEx: the monthly series of recurring spend (CapEx rows and budgeted projects
+      removed, so one-off purchases do not distort the trend) gets the fitted
+      smoothing model, through the shared forecast cache.
+    - CapEx: planned purchases (`settings['capex_plan']`) plus the renewals implied
+      by past CapEx (yearly contracts, hardware refresh cycles) that fall due in the
+      horizon, with timing uncertainty from the seeded Monte Carlo simulation.
+    - Projects with a configured budget: S-curve spend for their remaining months,
+      all projects evaluated in one array operation.
+
+    The aggregator treats the streams as independent: the combined 95% interval
+    adds their variances (OpEx from its interval, CapEx from p10..p90).
+    """
+
+    def __init__(
+        self,
+        settings: Optional[Dict[str, Any]] = None,
+        forecast_cache: Optional[ForecastCache] = None,
+        classifier: Optional[KeywordClassifier] = None,
+        simulations: int = HYBRID_CAPEX_SIMULATIONS,
+    ):
+        self.settings = settings or {}
+        self.forecast_cache = forecast_cache
+        self.classifier = classifier
+        self.simulations = simulations
+
+    def forecast(self, columns: LedgerColumns, periods: int) -> Optional[HybridForecast]:
+        """
+        Builds the hybrid forecast from the ledger.
+
+        Args:
+            columns (LedgerColumns): All entries of the analysis (non-expense
+                categories are ignored).
+            periods (int): Months to forecast.
+
+        Returns:
+            Optional[HybridForecast]: None if there are no expenses.
+        """
+        category_codes, category_labels = columns.codes("category")
+        excluded = np.flatnonzero(np.isin(category_labels, list(NON_EXPENSE_CATEGORIES)))
+        expense = ~np.isin(category_codes, excluded)
+        if not expense.any():
+            return None
+
+        months = columns.dates.astype("datetime64[M]").view(np.int64)
+        first, last = int(months[expense].min()), int(months[expense].max())
+        amounts = np.abs(columns.amounts)
+
+        budgets = project_budgets(self.settings)
+        project_codes, project_labels = columns.codes("project")
+        budgeted = np.isin(project_codes, np.flatnonzero(np.isin(project_labels, [b.name for b in budgets])))
+        capex = self._capex_mask(columns)
+
+        opex_rows = expense & ~capex & ~budgeted
+        opex_series = np.bincount(months[opex_rows] - first, weights=amounts[opex_rows], minlength=last - first + 1)
+        opex, opex_sd = self._opex(opex_series, periods)
+
+        planned = self._planned_capex(columns, expense & capex & ~budgeted, last, periods)
+        capex_expected, capex_sd = self._capex(planned, periods)
+
+        project_spend = np.zeros(periods)
+        if budgets:
+            spend, _ = s_curve_monthly(
+                np.array([b.total_budget for b in budgets]),
+                np.array([b.duration_months for b in budgets]),
+                np.array([last - b.start + 1 for b in budgets]),
+                periods,
+            )
+            project_spend = spend.sum(axis=0)
+
+        return HybridForecast(
+            points=self._aggregate(last, opex, opex_sd, capex_expected, capex_sd, project_spend),
+            planned_capex_items=len(planned),
+            budgeted_projects=[b.name for b in budgets],
+        )
+
+    def _capex_mask(self, columns: LedgerColumns) -> np.ndarray:
+        types = np.array(list(map(attrgetter("expense_type"), columns.entries)), dtype=object)
+        unknown = np.flatnonzero(np.equal(types, None))
+        if unknown.size:
+            # Rows not classified at ingest yet (the backfill job catches up later)
+            entries = columns.entries
+            types[unknown] = classify_expense_batch(
+                [entries[i].description for i in unknown],
+                columns.amounts[unknown],
+                [entries[i].category for i in unknown],
+                self.classifier,
+            )
+        return types == "capex"
+
+    def _opex(self, series: np.ndarray, periods: int) -> Tuple[np.ndarray, np.ndarray]:
+        fit = ForecastService.fit_series([series.tolist()], periods, cache=self.forecast_cache)[0]
+        if fit is None:
+            return np.zeros(periods), np.zeros(periods)
+        lower, upper = bootstrap_bounds([fit], periods)
+        return fit.forecast(periods), (upper[0] - lower[0]) / (2 * _Z_95)
+
+    def _planned_capex(self, columns: LedgerColumns, rows: np.ndarray, last: int, periods: int) -> List[Dict]:
+        planned = []
+        for item in self.settings.get("capex_plan") or []:
+            code = month_code((item or {}).get("planned_month", ""))
+            if code is not None and 0 < code - last <= periods:
+                planned.append({"amount": abs(float(item.get("amount", 0))), "expected_month": code - last})
+
+        # Renewals of past CapEx, projected from the most recent purchase per
+        # description. Only purchases whose contract (1 year) or hardware lifecycle
+        # (3 years) can end inside the horizon are tagged, not the whole history.
+        months = columns.dates.astype("datetime64[M]").view(np.int64)
+        codes, labels = columns.codes("description")
+        latest = np.full(len(labels) + 1, np.iinfo(np.int64).min)
+        np.maximum.at(latest, codes[rows], columns.days[rows])
+        candidates = rows & (columns.days == latest[codes])
+        candidates &= np.isin(months, [last - 12 + k for k in range(periods + 1)] +
+                              [last - 36 + k for k in range(periods + 1)])
+        for item in TimelineEngine.build([columns.entries[i] for i in np.flatnonzero(candidates)], []):
+            due = (item.end_date.year - 1970) * 12 + item.end_date.month - 1 - last
+            if 0 < due <= periods:
+                planned.append({"amount": abs(item.amount or 0.0), "expected_month": due})
+
+        planned.sort(key=lambda p: -p["amount"])
+        return planned[:MAX_PLANNED_CAPEX]
+
+    def _capex(self, planned: List[Dict], periods: int) -> Tuple[np.ndarray, np.ndarray]:
+        expected, sd = np.zeros(periods), np.zeros(periods)
+        for month in ForecastService.capex_forecast(planned, simulations=self.simulations, seed=CAPEX_SEED):
+            if month["month"] <= periods:
+                expected[month["month"] - 1] = month["expected"]
+                sd[month["month"] - 1] = (month["p90"] - month["p10"]) / (2 * _Z_90)
+        return expected, sd
+
+    @staticmethod
+    def _aggregate(
+        last: int,
+        opex: np.ndarray,
+        opex_sd: np.ndarray,
+        capex: np.ndarray,
+        capex_sd: np.ndarray,
+        projects: np.ndarray,
+    ) -> List[HybridForecastPoint]:
+        total = opex + capex + projects
+        sd = np.sqrt(opex_sd ** 2 + capex_sd ** 2)
+        lower, upper = np.maximum(0, total - _Z_95 * sd), total + _Z_95 * sd
+        with np.errstate(divide="ignore", invalid="ignore"):
+            confidence = np.where(
+                total > 0,
+                (opex * OPEX_CONFIDENCE + capex * CAPEX_CONFIDENCE + projects * PROJECT_CONFIDENCE) / total,
+                OPEX_CONFIDENCE,
+            )
+
+        points = []
+        for k in range(total.size):
+            year, month = divmod(last + k + 1, 12)
+            points.append(HybridForecastPoint(
+                month=f"{MONTH_NAMES[month]} {year + 1970}",
+                sort_key=f"{year + 1970}-{month + 1:02d}",
+                total=_money(total[k]),
+                opex=_money(opex[k]),
+                capex=_money(capex[k]),
+                projects=_money(projects[k]),
+                lower_bound=_money(lower[k]),
+                upper_bound=_money(upper[k]),
+                confidence=round(float(confidence[k]), 3),
+            ))
+        return points
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(f"{value:.2f}")
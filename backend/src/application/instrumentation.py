@@ -0,0 +1,207 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import os
+import random
+import threading
+import time
+import tracemalloc
+import structlog
+
+logger = structlog.get_logger()
+
+# Fraction of operations that are profiled (0 disables, 1 profiles everything)
+DEFAULT_SAMPLE_RATE = float(os.getenv("INSTRUMENTATION_SAMPLE_RATE", "0.1"))
+# Allocation tracking uses tracemalloc, which slows the traced code down noticeably
+TRACE_ALLOCATIONS = os.getenv("INSTRUMENTATION_TRACE_ALLOCATIONS", "false").lower() in ("1", "true", "yes")
+
+
+class Histogram:
+    """
+    Fixed-bucket latency histogram (milliseconds).
+
+    Buckets are upper bounds; observations above the last bound fall into an
+    overflow bucket. Percentiles are estimated from the bucket bounds.
+    """
+
+    BOUNDS_MS: Tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+    def __init__(self):
+        self.counts: List[int] = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Records one observation."""
+        self.counts[bisect_left(self.BOUNDS_MS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        """Upper bucket bound containing the q-th quantile (0 < q <= 1)."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for bound, n in zip(self.BOUNDS_MS + (self.max,), self.counts):
+            running += n
+            if running >= target:
+                return float(min(bound, self.max))
+        return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns counters and estimated percentiles."""
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "max": round(self.max, 3),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "buckets": dict(zip([str(b) for b in self.BOUNDS_MS] + ["+Inf"], self.counts)),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe collection of named histograms (analysis runs in executor threads).
+    """
+
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float) -> None:
+        """Records a value into the named histogram, creating it on first use."""
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = Histogram()
+            hist.observe(value)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Returns a snapshot of every histogram."""
+        with self._lock:
+            return {name: h.snapshot() for name, h in sorted(self._histograms.items())}
+
+
+metrics = MetricsRegistry()
+
+
+class _NullStage:
+    """Stand-in yielded for unsampled operations; ignores everything."""
+    __slots__ = ()
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("items",)
+
+    def __init__(self, items: Optional[int]):
+        self.items = items
+
+
+class StageProfile:
+    """
+    Per-operation stage profiler (e.g. one `/analysis` computation).
+
+    When the operation is sampled, each `stage()` block records wall time, CPU time
+    of the current thread, its input size and (optionally) allocated memory. `finish()`
+    emits a single structured log event with every stage and feeds the histograms.
+    Unsampled operations pay only for a context-manager call per stage. Entering
+    a stage name twice adds to the existing record.
+    """
+
+    def __init__(self, operation: str, sampled: bool, trace_allocations: bool = TRACE_ALLOCATIONS):
+        self.operation = operation
+        self.sampled = sampled
+        self.trace_allocations = trace_allocations and sampled
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._started = time.perf_counter()
+        self._started_cpu = time.thread_time()
+
+    @contextmanager
+    def stage(self, name: str, items: Optional[int] = None) -> Iterator[Any]:
+        """
+        Times a block of work.
+
+        Args:
+            name (str): Stage name (e.g. 'gaps').
+            items (Optional[int]): Input size; may also be set on the yielded object.
+
+        Yields:
+            An object whose `items` attribute can be updated inside the block.
+        """
+        if not self.sampled:
+            yield _NULL_STAGE
+            return
+
+        record = _Stage(items)
+        started_tracing = False
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            mem_before = tracemalloc.get_traced_memory()[0]
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield record
+        finally:
+            entry: Dict[str, Any] = {
+                "wall_ms": round((time.perf_counter() - wall) * 1000, 3),
+                "cpu_ms": round((time.thread_time() - cpu) * 1000, 3),
+            }
+            if record.items is not None:
+                entry["items"] = record.items
+            if self.trace_allocations:
+                entry["alloc_kb"] = round((tracemalloc.get_traced_memory()[1] - mem_before) / 1024, 1)
+                if started_tracing:
+                    tracemalloc.stop()
+            previous = self.stages.get(name)
+            if previous:
+                # Repeated stages (e.g. one per sheet) accumulate into one record
+                for key, value in entry.items():
+                    previous[key] = round(previous.get(key, 0) + value, 3)
+            else:
+                self.stages[name] = entry
+
+    def finish(self, **fields: Any) -> None:
+        """
+        Emits the collected stages as one log event and records them in the histograms.
+
+        Args:
+            **fields: Extra structured fields (e.g. row counts).
+        """
+        if not self.sampled:
+            return
+        total_ms = round((time.perf_counter() - self._started) * 1000, 3)
+        cpu_ms = round((time.thread_time() - self._started_cpu) * 1000, 3)
+        metrics.observe(f"{self.operation}.total_ms", total_ms)
+        for name, entry in self.stages.items():
+            metrics.observe(f"{self.operation}.{name}_ms", entry["wall_ms"])
+        logger.info("stage_timings", operation=self.operation, total_ms=total_ms, cpu_ms=cpu_ms,
+                    stages=self.stages, **fields)
+
+
+def profile(operation: str, sample_rate: Optional[float] = None) -> StageProfile:
+    """
+    Starts profiling an operation, sampled at `sample_rate`.
+
+    Args:
+        operation (str): Operation name used as log field and histogram prefix.
+        sample_rate (Optional[float]): Override for INSTRUMENTATION_SAMPLE_RATE.
+
+    Returns:
+        StageProfile: The (possibly no-op) profiler.
+    """
+    rate = DEFAULT_SAMPLE_RATE if sample_rate is None else sample_rate
+    return StageProfile(operation, sampled=rate >= 1.0 or (rate > 0 and random.random() < rate))
@@ -0,0 +1,86 @@
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick style multi-pattern matcher for case-insensitive keyword search.
+
+    All keywords are compiled once into a deterministic automaton, so a single
+    pass over a description finds every keyword it contains. Matching cost depends
+    on the description length, not on how many keywords are registered.
+
+    Attributes:
+        keywords (List[str]): The de-duplicated, lower-cased keywords in registration order.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        seen = set()
+        for keyword in keywords:
+            kw = keyword.lower()
+            if kw and kw not in seen:
+                seen.add(kw)
+                self.keywords.append(kw)
+
+        self._delta: List[Dict[str, int]] = [{}]
+        self._outputs: List[Tuple[int, ...]] = [()]
+        self._build()
+
+    def _build(self) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[int]] = [[]]
+
+        # 1. Trie of all keywords
+        for idx, kw in enumerate(self.keywords):
+            state = 0
+            for ch in kw:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    goto.append({})
+                    outputs.append([])
+                    nxt = len(goto) - 1
+                    goto[state][ch] = nxt
+                state = nxt
+            outputs[state].append(idx)
+
+        # 2. Failure links (BFS), folded into a complete transition table so that
+        # matching never has to follow failure chains at runtime.
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            outputs[state].extend(outputs[fail[state]])
+            # Inherit fallback transitions, then override with real edges
+            trans = dict(delta[fail[state]])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0) if state else 0
+                trans[ch] = nxt
+                queue.append(nxt)
+            delta[state] = trans
+
+        self._delta = delta
+        self._outputs = [tuple(sorted(set(o))) for o in outputs]
+
+    def search(self, text: str) -> FrozenSet[int]:
+        """
+        Finds every registered keyword occurring in the text.
+
+        Args:
+            text (str): The text to scan (matched case-insensitively).
+
+        Returns:
+            FrozenSet[int]: Indices into `keywords` of all keywords found.
+        """
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        found: set = set()
+        for ch in text.lower():
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                found.update(outputs[state])
+        return frozenset(found)
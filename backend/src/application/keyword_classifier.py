@@ -0,0 +1,106 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from src.application.keyword_automaton import KeywordAutomaton
+
+# (first matching category index or -1, distinct keyword hits per tag)
+ScanResult = Tuple[int, Tuple[int, ...]]
+
+
+class KeywordClassifier:
+    """
+    Shared keyword matcher for categories and tags (CapEx/OpEx, contract, hardware).
+
+    Every keyword of every group is compiled into one KeywordAutomaton, so a
+    description is scanned once no matter how many categories or keywords exist.
+    Categories are ordered by priority: a description gets the first category with
+    any keyword in it. Tags report how many distinct tag keywords matched. Results are
+    memoized per description, and whole columns are classified by scanning only the
+    distinct descriptions.
+
+    Attributes:
+        categories (List[str]): Category names in priority order.
+        tags (List[str]): Tag names.
+    """
+
+    def __init__(
+        self,
+        categories: Dict[str, Iterable[str]],
+        tags: Optional[Dict[str, Iterable[str]]] = None,
+        cache_size: int = 65536,
+    ):
+        self.categories: List[str] = list(categories)
+        self.tags: List[str] = list(tags or {})
+        self._tag_index = {name: i for i, name in enumerate(self.tags)}
+
+        # keyword -> owning category indices / tag indices (a keyword may belong to several)
+        owners: Dict[str, Tuple[List[int], List[int]]] = {}
+        for ci, keywords in enumerate(categories.values()):
+            for kw in keywords:
+                owners.setdefault(kw.lower(), ([], []))[0].append(ci)
+        for ti, keywords in enumerate((tags or {}).values()):
+            for kw in keywords:
+                owners.setdefault(kw.lower(), ([], []))[1].append(ti)
+
+        self._automaton = KeywordAutomaton(owners)
+        self._category_owners = [tuple(owners[kw][0]) for kw in self._automaton.keywords]
+        self._tag_owners = [tuple(owners[kw][1]) for kw in self._automaton.keywords]
+        self._cache: Dict[str, ScanResult] = {}
+        self._cache_size = cache_size
+
+    def scan(self, text: str) -> ScanResult:
+        """
+        Classifies one description.
+
+        Args:
+            text (str): The description (matched case-insensitively).
+
+        Returns:
+            ScanResult: (index of the first matching category or -1, hit count per tag).
+        """
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        category = len(self.categories)
+        tag_counts = [0] * len(self.tags)
+        for kw in self._automaton.search(text):
+            for ci in self._category_owners[kw]:
+                if ci < category:
+                    category = ci
+            for ti in self._tag_owners[kw]:
+                tag_counts[ti] += 1
+        result = (category if category < len(self.categories) else -1, tuple(tag_counts))
+
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[text] = result
+        return result
+
+    def category(self, text: str) -> Optional[str]:
+        """Returns the highest-priority category matching the text, or None."""
+        index = self.scan(text)[0]
+        return self.categories[index] if index >= 0 else None
+
+    def tag_count(self, text: str, tag: str) -> int:
+        """Returns how many distinct keywords of `tag` occur in the text."""
+        return self.scan(text)[1][self._tag_index[tag]]
+
+    def scan_column(self, texts: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Classifies a column of descriptions, scanning each distinct value once.
+
+        Args:
+            texts (Sequence[str]): Descriptions.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Category index per row (-1 for none) and an
+            (n_rows, n_tags) array of tag hit counts.
+        """
+        codes, uniques = pd.factorize(pd.Series(texts, dtype=object))
+        scans = [self.scan(str(u)) for u in uniques]
+        category_table = np.array([c for c, _ in scans] + [-1], dtype=np.int64)
+        tag_table = np.array([t for _, t in scans] + [(0,) * len(self.tags)], dtype=np.int32).reshape(-1, len(self.tags))
+        # Missing values (code -1) hit the trailing "no match" row
+        return category_table[codes], tag_table[codes]
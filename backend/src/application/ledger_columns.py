@@ -0,0 +1,132 @@
+from datetime import date
+from typing import Dict, List, Sequence, Tuple
+import numpy as np
+import pandas as pd
+
+from src.application.merchant_normalizer import normalize_merchant
+
+# Day numbers are stored relative to the Unix epoch, so they cast directly to datetime64[D]
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class LedgerColumns:
+    """
+    Columnar (NumPy) view over a list of budget entries.
+
+    Built once per analysis, so vectorized services can share the same arrays instead
+    of each walking the Python objects again. Dates are `datetime64[D]`, amounts
+    `float64`, and string dimensions are factorized into integer codes on first use
+    (missing values get code -1).
+    """
+
+    DIMENSIONS = ("category", "project", "description", "source_file")
+
+    def __init__(self, entries: Sequence):
+        self.entries = entries
+        self.size = len(entries)
+        ordinals = np.fromiter((e.date.toordinal() for e in entries), dtype=np.int64, count=self.size)
+        self.dates: np.ndarray = (ordinals - _EPOCH_ORDINAL).astype("datetime64[D]")
+        self.amounts: np.ndarray = np.fromiter((float(e.amount) for e in entries), dtype=np.float64, count=self.size)
+        self._codes: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._sorted = None
+
+    @property
+    def days(self) -> np.ndarray:
+        """Dates as int64 day numbers (for arithmetic)."""
+        return self.dates.view(np.int64)
+
+    @property
+    def is_date_sorted(self) -> bool:
+        """True if rows are already in date order (e.g. loaded via the (tenant_id, date) index)."""
+        if self._sorted is None:
+            d = self.days
+            self._sorted = bool(self.size < 2 or np.all(d[1:] >= d[:-1]))
+        return self._sorted
+
+    def date_order(self) -> np.ndarray:
+        """
+        Row order by date; the identity when the rows are already sorted.
+
+        Returns:
+            np.ndarray: Row indices in ascending date order (stable).
+        """
+        if self.is_date_sorted:
+            return np.arange(self.size)
+        return np.argsort(self.days, kind="stable")
+
+    def codes(self, dimension: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Factorizes a string dimension.
+
+        Args:
+            dimension (str): One of DIMENSIONS.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (int64 codes per row, unique labels indexed by code).
+        """
+        if dimension not in self._codes:
+            default = "General" if dimension == "project" else None
+            values = [getattr(e, dimension, None) or default for e in self.entries]
+            codes, labels = pd.factorize(pd.Series(values, dtype=object))
+            self._codes[dimension] = (codes.astype(np.int64), np.asarray(labels, dtype=object))
+        return self._codes[dimension]
+
+    def merchant_codes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Groups rows by merchant.
+
+        When every row is linked to a stored merchant the integer `merchant_id` is
+        factorized directly. Otherwise descriptions are grouped by normalized merchant
+        (see normalize_merchant), which yields the same groups because stored merchants
+        are keyed by that normalization; only the distinct descriptions are normalized.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (int64 merchant code per row, merchant keys indexed by code).
+        """
+        if "merchant" not in self._codes and self.size and all(getattr(e, "merchant_id", None) is not None for e in self.entries):
+            codes, _ = pd.factorize(np.fromiter((e.merchant_id for e in self.entries), dtype=np.int64, count=self.size))
+            first = np.unique(codes, return_index=True)[1]
+            keys = [getattr(self.entries[i], "merchant", None) or normalize_merchant(self.entries[i].description) for i in first]
+            self._codes["merchant"] = (codes.astype(np.int64), np.asarray(keys, dtype=object))
+        if "merchant" not in self._codes:
+            desc_codes, desc_labels = self.codes("description")
+            normalized = [normalize_merchant(str(label)) for label in desc_labels]
+            label_to_merchant, merchants = pd.factorize(pd.Series(normalized, dtype=object))
+            if len(label_to_merchant):
+                merchant = np.where(desc_codes >= 0, label_to_merchant[np.maximum(desc_codes, 0)], -1)
+            else:
+                merchant = np.full(self.size, -1, dtype=np.int64)
+            self._codes["merchant"] = (merchant.astype(np.int64), np.asarray(merchants, dtype=object))
+        return self._codes["merchant"]
+
+    @staticmethod
+    def to_date(day: int) -> date:
+        """Converts an int64 day number back to a `date`."""
+        return date.fromordinal(int(day) + _EPOCH_ORDINAL)
+
+    @staticmethod
+    def to_dates(days: np.ndarray) -> List[date]:
+        """Converts an array of day numbers to `date` objects."""
+        return [date.fromordinal(d + _EPOCH_ORDINAL) for d in days.tolist()]
+
+
+def group_median(values: np.ndarray, groups: np.ndarray, n_groups: int) -> np.ndarray:
+    """
+    Median of `values` per group, without a Python loop over groups.
+
+    Args:
+        values (np.ndarray): Values (float).
+        groups (np.ndarray): Group index (0..n_groups-1) per value.
+        n_groups (int): Number of groups.
+
+    Returns:
+        np.ndarray: Median per group (NaN for empty groups).
+    """
+    counts = np.bincount(groups, minlength=n_groups)
+    if not values.size:
+        return np.full(n_groups, np.nan)
+    ordered = values[np.lexsort((values, groups))]
+    starts = np.r_[0, np.cumsum(counts)[:-1]]
+    lo = np.minimum(starts + np.maximum(counts - 1, 0) // 2, values.size - 1)
+    hi = np.minimum(starts + counts // 2, values.size - 1)
+    return np.where(counts > 0, (ordered[lo] + ordered[hi]) / 2, np.nan)
@@ -2,15 +2,34 @@ from typing import List, Optional
 from src.domain.repository import RuleRepository
 from src.domain.rule import Rule
 from src.application.audit_service import AuditService
+from src.application.context import get_tenant_id
+from src.application.recategorization import RecategorizationQueue
+from src.application.rule_engine import CompiledRuleCache, rule_cache, validate_rule_pattern
 
 class ManageRulesUseCase:
     """
     Use case for managing categorization rules.
     Allows creating, listing, and deleting rules.
     """
-    def __init__(self, repo: RuleRepository, audit_service: Optional[AuditService] = None):
+    def __init__(
+        self,
+        repo: RuleRepository,
+        audit_service: Optional[AuditService] = None,
+        compiled_cache: CompiledRuleCache = rule_cache,
+        recategorization: Optional[RecategorizationQueue] = None
+    ):
         self.repo = repo
         self.audit_service = audit_service
+        self.compiled_cache = compiled_cache
+        self.recategorization = recategorization
+
+    async def _rules_changed(self) -> None:
+        # Recompile on next use and re-apply the rules to stored transactions
+        tenant_id = get_tenant_id()
+        if tenant_id:
+            self.compiled_cache.invalidate(tenant_id)
+            if self.recategorization:
+                await self.recategorization.request(tenant_id)
 
     async def get_rules(self) -> List[Rule]:
         """
@@ -31,9 +50,14 @@ class ManageRulesUseCase:
 
         Returns:
             Rule: The created rule entity.
+
+        Raises:
+            RulePatternError: If the pattern is invalid or prone to catastrophic backtracking.
         """
+        validate_rule_pattern(pattern)
         rule = Rule(pattern=pattern, category=category)
         created_rule = await self.repo.add(rule)
+        await self._rules_changed()
         
         if self.audit_service:
             await self.audit_service.log_action(
@@ -53,6 +77,7 @@ class ManageRulesUseCase:
             rule_id (int): The unique identifier of the rule to delete.
         """
         await self.repo.delete(rule_id)
+        await self._rules_changed()
         
         if self.audit_service:
             await self.audit_service.log_action(
@@ -0,0 +1,102 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
+
+from src.application.analysis_cache import AnalysisCache, analysis_cache
+from src.application.merchant_normalizer import normalize_merchant
+from src.infrastructure.models import BudgetModel
+from src.infrastructure.repository import SQLMerchantRepository
+
+logger = structlog.get_logger()
+
+
+class MerchantBackfillService:
+    """
+    Links stored rows whose `merchant_id` is still NULL (rows from before ingest-time
+    merchant resolution) to their tenant's merchants, creating missing merchants.
+
+    Same shape as ExpenseTypeBackfillService: keyset batches by primary key, one short
+    transaction each, resumable by construction because only NULL rows are selected,
+    and cached analysis invalidated for the tenants of each batch.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        cache: AnalysisCache = analysis_cache,
+        batch_size: int = 5000,
+        max_batches_per_run: int = 50,
+    ):
+        self.session_factory = session_factory
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_batches_per_run = max_batches_per_run
+
+    async def run_batch(self, after_id: int = 0) -> Tuple[int, Optional[int]]:
+        """
+        Links the next batch of unlinked rows with id > after_id.
+
+        Args:
+            after_id (int): Keyset cursor (last id of the previous batch).
+
+        Returns:
+            Tuple[int, Optional[int]]: Rows linked and the new cursor (None when done).
+        """
+        async with self.session_factory() as session:
+            stmt = (
+                select(BudgetModel.id, BudgetModel.tenant_id, BudgetModel.description, BudgetModel.category)
+                .where(BudgetModel.merchant_id.is_(None), BudgetModel.id > after_id)
+                .order_by(BudgetModel.id)
+                .limit(self.batch_size)
+            )
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                return 0, None
+
+            by_tenant: Dict[UUID, List[Any]] = defaultdict(list)
+            for row in rows:
+                by_tenant[row.tenant_id].append(row)
+
+            merchant_repo = SQLMerchantRepository(session)
+            ids_by_merchant: Dict[int, List[int]] = defaultdict(list)
+            for tenant_id, tenant_rows in by_tenant.items():
+                keys = [normalize_merchant(r.description) for r in tenant_rows]
+                samples: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+                for key, r in zip(keys, tenant_rows):
+                    samples[key].append((r.description, r.category))
+                merchants = await merchant_repo.resolve_keys(tenant_id, samples)
+                for key, r in zip(keys, tenant_rows):
+                    ids_by_merchant[merchants[key].id].append(r.id)
+
+            for merchant_id, ids in ids_by_merchant.items():
+                await session.execute(
+                    update(BudgetModel).where(BudgetModel.id.in_(ids)).values(merchant_id=merchant_id)
+                )
+            await session.commit()
+            for tenant_id in by_tenant:
+                self.cache.invalidate(tenant_id)
+            return len(rows), rows[-1].id
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Runs up to `max_batches_per_run` batches.
+
+        Returns:
+            Dict[str, Any]: Rows linked, batches run and whether the backlog is empty.
+        """
+        cursor: Optional[int] = 0
+        summary = {"linked": 0, "batches": 0, "complete": False}
+        while summary["batches"] < self.max_batches_per_run:
+            count, cursor = await self.run_batch(cursor)
+            if cursor is None:
+                summary["complete"] = True
+                break
+            summary["linked"] += count
+            summary["batches"] += 1
+
+        if summary["linked"]:
+            logger.info("merchant_backfill_progress", **summary)
+        return summary
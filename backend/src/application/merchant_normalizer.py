@@ -0,0 +1,53 @@
+from functools import lru_cache
+from typing import List
+import re
+
+_NON_ALPHA = re.compile(r"[^a-z ]+")
+_NON_ALPHA_ANY_CASE = re.compile(r"[^a-zA-Z ]+")
+# Payment-processor prefixes and legal / billing suffixes that vary between statements
+_PREFIX_TOKENS = frozenset({"sq", "tst", "pp", "paypal", "pos", "ach", "debit", "card", "purchase", "recurring"})
+_SUFFIX_TOKENS = frozenset({"inc", "llc", "ltd", "co", "com", "corp", "gmbh", "subscription", "payment", "monthly", "bill"})
+
+
+@lru_cache(maxsize=65536)
+def normalize_merchant(description: str) -> str:
+    """
+    Reduces a transaction description to a merchant key.
+
+    Lowercases, strips digits and punctuation, and drops processor prefixes and
+    legal/billing suffixes, so 'NETFLIX.COM 8842' and 'Netflix Inc' share a key.
+
+    Args:
+        description (str): Raw description.
+
+    Returns:
+        str: The normalized merchant key (the lowercased input if nothing is left).
+    """
+    tokens = _strip_affixes(_NON_ALPHA.sub(" ", description.lower()).split())
+    return " ".join(tokens) or description.strip().lower()
+
+
+@lru_cache(maxsize=65536)
+def merchant_display_name(description: str) -> str:
+    """
+    Display name for a merchant, from one of its raw descriptions.
+
+    Keeps the words of the merchant key in their original case, so
+    'IBM Cloud Inc 0042' shows as 'IBM Cloud' rather than a re-cased key.
+
+    Args:
+        description (str): Raw description (typically the merchant's first alias).
+
+    Returns:
+        str: The display name (the stripped input if nothing is left).
+    """
+    tokens = _strip_affixes(_NON_ALPHA_ANY_CASE.sub(" ", description).split())
+    return " ".join(tokens) or description.strip()
+
+
+def _strip_affixes(tokens: List[str]) -> List[str]:
+    while tokens and tokens[0].lower() in _PREFIX_TOKENS:
+        tokens.pop(0)
+    while tokens and tokens[-1].lower() in _SUFFIX_TOKENS:
+        tokens.pop()
+    return tokens
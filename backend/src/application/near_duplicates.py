@@ -0,0 +1,233 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import zlib
+import numpy as np
+
+from src.application.merchant_normalizer import normalize_merchant
+from src.domain.budget import BudgetEntry
+from src.domain.repository import BudgetRepository, DuplicateReviewRepository
+
+DEFAULT_NUM_PERM = 64
+DEFAULT_BANDS = 32
+DEFAULT_DATE_WINDOW_DAYS = 3
+DEFAULT_MIN_SIMILARITY = 0.5
+SHINGLE_SIZE = 3
+
+# Universal hashing modulo a Mersenne prime; a < 2^31 and crc32 < 2^32 keep a*x + b within uint64
+_PRIME = np.uint64((1 << 31) - 1)
+
+# (new entry, entry it duplicates, estimated Jaccard similarity)
+SuspectedDuplicate = Tuple[BudgetEntry, BudgetEntry, float]
+
+
+class MinHasher:
+    """
+    MinHash signatures over character shingles of normalized descriptions.
+
+    The fraction of equal signature slots estimates the Jaccard similarity of two
+    shingle sets. Signatures are memoized per normalized description.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, seed: int = 1, cache_size: int = 65536):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self._a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+        self._cache: Dict[str, np.ndarray] = {}
+        self._cache_size = cache_size
+
+    def signature(self, description: str) -> np.ndarray:
+        """
+        Returns the MinHash signature of a description.
+
+        Args:
+            description (str): Raw description (normalized with normalize_merchant).
+
+        Returns:
+            np.ndarray: uint64 signature of length `num_perm`.
+        """
+        text = normalize_merchant(description)
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        padded = f" {text} "
+        shingles = {padded[i:i + SHINGLE_SIZE] for i in range(max(1, len(padded) - SHINGLE_SIZE + 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        signature = ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0)
+
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[text] = signature
+        return signature
+
+
+class NearDuplicateDetector:
+    """
+    Finds transactions in an ingest batch that likely duplicate one already stored
+    (or earlier in the batch) under a slightly different description or post date,
+    e.g. the same charge on the card statement and on an expense report.
+
+    Candidates come from locality-sensitive hashing: each signature is cut into
+    `bands` bands and hashed into buckets keyed by (amount in cents, band, band
+    hash), so only rows with exactly the same amount and at least one identical band
+    are compared. A candidate is kept if it is within `date_window_days`, its
+    estimated similarity reaches `min_similarity`, it is not an exact duplicate
+    (those are dropped by save_bulk) and it did not come from the same source file.
+    """
+
+    def __init__(
+        self,
+        date_window_days: int = DEFAULT_DATE_WINDOW_DAYS,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+        num_perm: int = DEFAULT_NUM_PERM,
+        bands: int = DEFAULT_BANDS,
+        hasher: Optional[MinHasher] = None,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.date_window_days = date_window_days
+        self.min_similarity = min_similarity
+        self.bands = bands
+        self.rows_per_band = num_perm // bands
+        self.hasher = hasher or MinHasher(num_perm)
+        self._sketches: Dict[str, Tuple[str, np.ndarray, List[int]]] = {}
+
+    def _sketch(self, description: str) -> Tuple[str, np.ndarray, List[int]]:
+        text = normalize_merchant(description)
+        cached = self._sketches.get(text)
+        if cached is None:
+            signature = self.hasher.signature(description)
+            # Fold each band's rows into one integer (wrapping uint64 arithmetic is fine for hashing)
+            bands = signature.reshape(self.bands, self.rows_per_band)
+            folded = bands[:, 0].copy()
+            for j in range(1, self.rows_per_band):
+                folded = folded * np.uint64(1 << 31) + bands[:, j]
+            cached = (text, signature, folded.tolist())
+            self._sketches[text] = cached
+        return cached
+
+    def detect(self, batch: Sequence[BudgetEntry], window: Sequence[BudgetEntry]) -> List[SuspectedDuplicate]:
+        """
+        Screens a batch against stored entries from the surrounding date window.
+
+        Rows sharing an amount and a normalized description form one group, so the
+        LSH index and the similarity estimates are per distinct (amount, merchant text).
+
+        Args:
+            batch (Sequence[BudgetEntry]): Entries about to be saved.
+            window (Sequence[BudgetEntry]): Stored entries dated within the batch range
+                widened by `date_window_days`.
+
+        Returns:
+            List[SuspectedDuplicate]: At most one (best) match per batch entry.
+        """
+        groups: List[Tuple[np.ndarray, List[BudgetEntry]]] = []
+        group_ids: Dict[Tuple[int, str], int] = {}
+        buckets: Dict[Tuple[int, int, int], List[int]] = defaultdict(list)
+
+        def index(entry: BudgetEntry, cents: int, text: str, signature: np.ndarray, band_hashes: List[int]) -> None:
+            gid = group_ids.get((cents, text))
+            if gid is None:
+                gid = group_ids[(cents, text)] = len(groups)
+                groups.append((signature, []))
+                for band, band_hash in enumerate(band_hashes):
+                    buckets[(cents, band, band_hash)].append(gid)
+            groups[gid][1].append(entry)
+
+        # Matches need the exact amount, so stored rows with amounts absent from the batch are never indexed
+        batch_cents = {int(round(e.amount * 100)) for e in batch}
+        for entry in window:
+            cents = int(round(entry.amount * 100))
+            if cents in batch_cents:
+                index(entry, cents, *self._sketch(entry.description))
+
+        suspects: List[SuspectedDuplicate] = []
+        for entry in batch:
+            cents = int(round(entry.amount * 100))
+            text, signature, band_hashes = self._sketch(entry.description)
+            candidates = {gid for band, band_hash in enumerate(band_hashes)
+                          for gid in buckets.get((cents, band, band_hash), ())}
+            best: Optional[Tuple[float, BudgetEntry]] = None
+            for gid in sorted(candidates):
+                other_signature, members = groups[gid]
+                similarity = float(np.mean(signature == other_signature))
+                if similarity < self.min_similarity or (best is not None and similarity <= best[0]):
+                    continue
+                for other in members:
+                    if abs((other.date - entry.date).days) > self.date_window_days:
+                        continue
+                    if other.date == entry.date and other.description == entry.description:
+                        continue
+                    if entry.source_file and entry.source_file == other.source_file:
+                        continue
+                    best = (similarity, other)
+                    break
+            if best is not None:
+                suspects.append((entry, best[1], round(best[0], 3)))
+            # Later rows in the batch are also compared with this one
+            index(entry, cents, text, signature, band_hashes)
+        return suspects
+
+
+class NearDuplicateReview:
+    """
+    Ingest hook: screens a batch before it is saved and queues the suspected
+    duplicates for review once the rows have ids. The batch's dates are split into
+    clusters more than two windows apart, and per cluster only the stored rows
+    within the widened date range and with one of the cluster's amounts are
+    loaded, so a multi-year export does not load the tenant's whole history.
+    Detection runs in the executor, off the event loop.
+    """
+
+    def __init__(
+        self,
+        budget_repo: BudgetRepository,
+        review_repo: DuplicateReviewRepository,
+        detector: Optional[NearDuplicateDetector] = None,
+    ):
+        self.budget_repo = budget_repo
+        self.review_repo = review_repo
+        self.detector = detector or NearDuplicateDetector()
+
+    async def screen(self, entries: List[BudgetEntry]) -> List[SuspectedDuplicate]:
+        """Returns the batch's suspected duplicates (call before saving)."""
+        if not entries:
+            return []
+        margin = timedelta(days=self.detector.date_window_days)
+        window: List[BudgetEntry] = []
+        for cluster in _date_clusters(entries, 2 * margin):
+            # Matches need the exact amount in cents, so other amounts are not loaded
+            amounts = {Decimal(int(round(e.amount * 100))).scaleb(-2) for e in cluster}
+            window.extend(await self.budget_repo.get_window(
+                cluster[0].date - margin, cluster[-1].date + margin, amounts
+            ))
+        # CPU-bound; keep it off the event loop like parsing and rule matching
+        return await asyncio.get_running_loop().run_in_executor(None, self.detector.detect, entries, window)
+
+    async def enqueue(self, suspects: List[SuspectedDuplicate]) -> int:
+        """
+        Queues suspects whose rows were stored (call after saving).
+
+        Returns:
+            int: Number of review items queued.
+        """
+        pairs = [(new.id, original.id, similarity) for new, original, similarity in suspects
+                 if new.id is not None and original.id is not None]
+        if pairs:
+            await self.review_repo.add_candidates(pairs)
+        return len(pairs)
+
+
+def _date_clusters(entries: Sequence[BudgetEntry], gap: timedelta) -> List[List[BudgetEntry]]:
+    """Entries in date order, split wherever consecutive dates are more than `gap` apart."""
+    ordered = sorted(entries, key=lambda e: e.date)
+    clusters = [[ordered[0]]]
+    for entry in ordered[1:]:
+        if entry.date - clusters[-1][-1].date > gap:
+            clusters.append([])
+        clusters[-1].append(entry)
+    return clusters
@@ -0,0 +1,45 @@
+# Rule-pattern scans for the preview, run in a child process so a slow match can be
+# killed. Kept free of application imports so the fork server preloads it cheaply.
+from multiprocessing.connection import Connection
+from typing import List, Pattern, Tuple
+import re
+import time
+
+MAX_EXAMPLES = 10
+
+# Sent by the worker once it is running, before it starts scanning
+READY = "ready"
+
+ScanResult = Tuple[int, int, int, int, List[str], bool]
+
+
+def scan_sample(compiled: Pattern, sample: List[Tuple[str, int]], deadline: float) -> ScanResult:
+    """
+    Matches the pattern against (description, row count) pairs until the deadline.
+
+    Returns:
+        ScanResult: Descriptions and rows scanned, descriptions and rows matched,
+            up to MAX_EXAMPLES matching descriptions, and whether the deadline hit.
+    """
+    scanned = scanned_rows = matched = matched_rows = 0
+    examples: List[str] = []
+    for description, count in sample:
+        # Checked between descriptions; a single slow match is stopped by killing the process
+        if time.perf_counter() > deadline:
+            return scanned, scanned_rows, matched, matched_rows, examples, True
+        scanned += 1
+        scanned_rows += count
+        if compiled.search(description):
+            matched += 1
+            matched_rows += count
+            if len(examples) < MAX_EXAMPLES:
+                examples.append(description)
+    return scanned, scanned_rows, matched, matched_rows, examples, False
+
+
+def scan_worker(connection: Connection, pattern: str, flags: int, sample: List[Tuple[str, int]], budget_s: float) -> None:
+    """Process entry point: signals READY, scans for `budget_s` and sends the ScanResult."""
+    compiled = re.compile(pattern, flags)
+    connection.send(READY)
+    connection.send(scan_sample(compiled, sample, time.perf_counter() + budget_s))
+    connection.close()
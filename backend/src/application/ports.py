@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, AsyncIterator
+from typing import Dict, List, AsyncIterator
 from src.domain.budget import BudgetEntry
 
 class ExcelParser(ABC):
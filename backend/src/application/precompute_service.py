@@ -0,0 +1,106 @@
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+from uuid import UUID
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
+
+from src.application.analysis_cache import AnalysisCache
+from src.application.analyze_budget import AnalyzeBudgetUseCase
+from src.application.context import set_tenant_id
+from src.application.forecast_cache import forecast_cache
+from src.infrastructure.models import TenantModel, UserModel
+from src.infrastructure.repository import SQLBudgetRepository
+
+logger = structlog.get_logger()
+
+
+class AnalysisPrecomputeService:
+    """
+    Warms the analysis cache for recently active tenants.
+
+    Runs from the background scheduler (off-peak) so that interactive `/analysis`
+    requests are served from warm results. Each tenant is analysed in its own DB
+    session and task context, with a semaphore limiting how many run at once.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        cache: AnalysisCache,
+        active_window: timedelta = timedelta(days=7),
+        concurrency: int = 2,
+    ):
+        self.session_factory = session_factory
+        self.cache = cache
+        self.active_window = active_window
+        self.concurrency = concurrency
+
+    async def find_active_tenants(self) -> List[UUID]:
+        """
+        Finds tenants with at least one user login inside the active window.
+
+        Returns:
+            List[UUID]: Tenant ids, most recently active first.
+        """
+        cutoff = datetime.utcnow() - self.active_window
+        async with self.session_factory() as session:
+            stmt = (
+                select(UserModel.tenant_id)
+                .where(UserModel.last_login >= cutoff)
+                .group_by(UserModel.tenant_id)
+                .order_by(func.max(UserModel.last_login).desc(), UserModel.tenant_id)
+            )
+            result = await session.execute(stmt)
+            return list(result.scalars().all())
+
+    async def warm_tenant(self, tenant_id: UUID) -> bool:
+        """
+        Computes and caches the analysis (including forecasts) for one tenant.
+
+        Args:
+            tenant_id (UUID): The tenant to warm.
+
+        Returns:
+            bool: True if a fresh result was computed and stored, False if the cache was already warm.
+        """
+        # Runs inside its own task, so the context var doesn't leak across tenants
+        set_tenant_id(tenant_id)
+        async with self.session_factory() as session:
+            tenant = (await session.execute(select(TenantModel).where(TenantModel.id == tenant_id))).scalar_one_or_none()
+            settings = tenant.settings if tenant else {}
+            if self.cache.contains(tenant_id, settings):
+                return False
+            use_case = AnalyzeBudgetUseCase(SQLBudgetRepository(session), self.cache, forecast_cache)
+            await use_case.execute(settings=settings)
+            return True
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Warms every recently active tenant.
+
+        Returns:
+            Dict[str, Any]: Counts of warmed, already-warm and failed tenants.
+        """
+        tenant_ids = await self.find_active_tenants()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def _guarded(tid: UUID) -> bool:
+            async with semaphore:
+                return await self.warm_tenant(tid)
+
+        outcomes = await asyncio.gather(*(_guarded(tid) for tid in tenant_ids), return_exceptions=True)
+
+        summary = {"tenants": len(tenant_ids), "warmed": 0, "already_warm": 0, "failed": 0}
+        for tid, outcome in zip(tenant_ids, outcomes):
+            if isinstance(outcome, Exception):
+                summary["failed"] += 1
+                logger.error("analysis_precompute_failed", tenant_id=str(tid), error=str(outcome))
+            elif outcome:
+                summary["warmed"] += 1
+            else:
+                summary["already_warm"] += 1
+
+        logger.info("analysis_precompute_completed", **summary, cache=self.cache.stats())
+        return summary
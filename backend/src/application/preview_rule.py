@@ -0,0 +1,141 @@
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Any, List, Optional, Pattern, Tuple
+import asyncio
+import multiprocessing
+import os
+import time
+import structlog
+
+from src.application.pattern_scan import READY, scan_worker
+from src.application.rule_engine import validate_rule_pattern
+from src.domain.repository import BudgetRepository
+from src.domain.rule import RulePreview
+
+logger = structlog.get_logger()
+
+DEFAULT_SAMPLE_SIZE = 5000
+DEFAULT_TIME_BUDGET_MS = 250
+# Starting the scan process; only the first preview also starts the fork server
+SCAN_START_TIMEOUT_S = 10.0
+# Scan processes running at once (per API process); further previews are refused
+MAX_CONCURRENT_SCANS = int(os.getenv("RULE_PREVIEW_MAX_SCANS", "2"))
+
+# Scans fork from a server that preloaded the scan module: cheap to start, and
+# unlike a thread a process stuck in one backtracking match can be killed
+_scan_context = multiprocessing.get_context("forkserver")
+_scan_context.set_forkserver_preload(["src.application.pattern_scan"])
+# Never waited on (see PreviewRuleUseCase.execute), so it is not tied to one event loop
+_scan_slots = asyncio.Semaphore(MAX_CONCURRENT_SCANS)
+
+
+class PreviewBusyError(RuntimeError):
+    """Raised when MAX_CONCURRENT_SCANS previews are already running."""
+
+
+async def _receive(connection: Connection, process: BaseProcess, timeout: float) -> Optional[Any]:
+    """Next message from the scan process, or None on timeout or if it died (killing it on timeout)."""
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    readable = loop.create_future()
+    loop.add_reader(connection.fileno(), lambda: readable.done() or readable.set_result(None))
+    try:
+        await asyncio.wait_for(readable, timeout)
+    except asyncio.TimeoutError:
+        return None
+    finally:
+        loop.remove_reader(connection.fileno())
+    # Only the start of the message may be there: read the rest in the executor, never on the loop
+    reading = loop.run_in_executor(None, connection.recv)
+    try:
+        return await asyncio.wait_for(asyncio.shield(reading), max(deadline - loop.time(), 0))
+    except asyncio.TimeoutError:
+        # The read then ends with EOFError, freeing its thread before the connection is closed
+        process.kill()
+        await asyncio.wait([reading])
+        return None
+    except EOFError:
+        return None
+
+
+class PreviewRuleUseCase:
+    """
+    Dry-runs a candidate rule pattern against the tenant's transactions.
+
+    The pattern must pass `validate_rule_pattern`. It is then evaluated in a
+    separate process on the most recent distinct descriptions, so matching never
+    blocks the event loop or ties up executor threads. The scan stops at the time
+    budget and returns partial counts; if a single match overruns the budget the
+    process is killed and the preview reports a timeout. At most
+    MAX_CONCURRENT_SCANS scans run at once; further previews are refused.
+    """
+
+    def __init__(
+        self,
+        repo: BudgetRepository,
+        sample_size: int = DEFAULT_SAMPLE_SIZE,
+        time_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+    ):
+        self.repo = repo
+        self.sample_size = sample_size
+        self.time_budget_ms = time_budget_ms
+
+    async def execute(self, pattern: str) -> RulePreview:
+        """
+        Evaluates the pattern on a sample of the tenant's descriptions.
+
+        Args:
+            pattern (str): The candidate regex pattern.
+
+        Returns:
+            RulePreview: Match counts and example descriptions.
+
+        Raises:
+            RulePatternError: If the pattern is invalid or too complex.
+            PreviewBusyError: If MAX_CONCURRENT_SCANS previews are already running.
+        """
+        compiled = validate_rule_pattern(pattern)
+        sample = await self.repo.sample_descriptions(self.sample_size)
+        # Checked and taken without awaiting, so this cannot race with another preview
+        if _scan_slots.locked():
+            raise PreviewBusyError("Too many rule previews are running; try again shortly")
+        async with _scan_slots:
+            return await self._scan(pattern, compiled, sample)
+
+    async def _scan(self, pattern: str, compiled: Pattern, sample: List[Tuple[str, int]]) -> RulePreview:
+        start = time.perf_counter()
+        budget_s = self.time_budget_ms / 1000
+        receiver, sender = _scan_context.Pipe(duplex=False)
+        process = _scan_context.Process(
+            target=scan_worker, args=(sender, compiled.pattern, compiled.flags, sample, budget_s), daemon=True
+        )
+        result = None
+        try:
+            # Blocks while the fork server starts (first preview only), so not on the event loop
+            await asyncio.get_running_loop().run_in_executor(None, process.start)
+            sender.close()
+            if await _receive(receiver, process, SCAN_START_TIMEOUT_S) == READY:
+                # Small grace so a scan that stops at the deadline still reports its counts
+                result = await _receive(receiver, process, budget_s + 0.05)
+        finally:
+            if process.is_alive():
+                process.kill()
+            if process.pid is not None:
+                process.join(timeout=1)
+            receiver.close()
+
+        if result is None:
+            logger.warn("rule_preview_timeout", pattern=pattern, budget_ms=self.time_budget_ms)
+            result = (0, 0, 0, 0, [], True)
+        scanned, scanned_rows, matched, matched_rows, examples, timed_out = result
+
+        return RulePreview(
+            pattern=pattern,
+            scanned_descriptions=scanned,
+            scanned_rows=scanned_rows,
+            matched_descriptions=matched,
+            matched_rows=matched_rows,
+            examples=examples,
+            timed_out=timed_out,
+            elapsed_ms=round((time.perf_counter() - start) * 1000, 2),
+        )
@@ -0,0 +1,40 @@
+from datetime import date
+from typing import Any, Dict, List, Optional
+from src.domain.repository import BudgetRepository
+from src.domain.analysis_models import TimelineItem
+from src.application.analysis_services import NON_EXPENSE_CATEGORIES, keyword_classifier_for
+from src.application.ledger_columns import LedgerColumns
+from src.application.subscription_detector import SubscriptionDetector
+from src.application.timeline_engine import TimelineEngine, TimelineIndex
+
+class QueryTimelineUseCase:
+    """
+    Use case for fetching timeline (Gantt) items overlapping a date window.
+    Lets the timeline view load only what is visible in its viewport.
+    """
+    def __init__(self, repo: BudgetRepository):
+        self.repo = repo
+
+    async def execute(
+        self, start: Optional[date] = None, end: Optional[date] = None, settings: Optional[Dict[str, Any]] = None
+    ) -> List[TimelineItem]:
+        """
+        Builds the tenant's timeline and returns the items overlapping [start, end].
+
+        Subscriptions are detected with the tenant's keyword classifier, like the
+        analysis does, so both views agree.
+
+        Args:
+            start (Optional[date]): Window start (inclusive). Unbounded if None.
+            end (Optional[date]): Window end (inclusive). Unbounded if None.
+            settings (Optional[Dict[str, Any]]): Tenant settings ('category_keywords').
+
+        Returns:
+            List[TimelineItem]: Overlapping items ordered by start date.
+        """
+        entries = await self.repo.get_all()
+        expense_entries = [e for e in entries if e.category not in NON_EXPENSE_CATEGORIES]
+        classifier = keyword_classifier_for(settings)
+        subscriptions = SubscriptionDetector(classifier=classifier).detect(LedgerColumns(entries))
+        items = TimelineEngine.build(expense_entries, subscriptions)
+        return TimelineIndex(items).window(start, end)
@@ -0,0 +1,265 @@
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+from sqlalchemy import bindparam, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+import structlog
+
+from src.application.analysis_cache import AnalysisCache, analysis_cache
+from src.application.analysis_services import classify_expense_batch, keyword_classifier_for
+from src.application.rule_engine import CompiledRuleCache, CompiledRuleSet, rule_cache
+from src.domain.rule import Rule
+from src.infrastructure.models import BudgetModel, RecategorizationJobModel, RuleModel, TenantModel
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class RecategorizationProgress:
+    """
+    Progress of one tenant's re-categorization pass.
+
+    Attributes:
+        generation (int): Bumped on every request; a newer request restarts the pass.
+        last_id (int): Keyset cursor (last committed row id).
+        scanned (int): Rows evaluated in the current pass.
+        updated (int): Rows whose category changed in the current pass.
+        done (bool): Whether the current pass finished.
+        requested_at (datetime): When the current pass was requested.
+        finished_at (Optional[datetime]): When it finished.
+    """
+    generation: int
+    last_id: int = 0
+    scanned: int = 0
+    updated: int = 0
+    done: bool = False
+    requested_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class RecategorizationQueue:
+    """
+    Tenants whose rules changed, with per-tenant progress, persisted in the
+    `recategorization_jobs` table.
+
+    Requests coalesce: a rule change during a running pass restarts it from the
+    first row with the new rules. Progress is only recorded with a compare-and-set
+    on (generation, cursor), so a pass survives restarts and deploys, and any
+    worker process can continue it; a batch that lost the race to another worker
+    (or to a newer request) is simply not recorded. Bound to one session, like the
+    repositories; every write commits.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def request(self, tenant_id: UUID) -> None:
+        """Queues a (re)start of the tenant's pass."""
+        reset = {"last_id": 0, "scanned": 0, "updated": 0, "done": False,
+                 "requested_at": datetime.utcnow(), "finished_at": None}
+        result = await self.session.execute(
+            update(RecategorizationJobModel)
+            .where(RecategorizationJobModel.tenant_id == tenant_id)
+            .values(generation=RecategorizationJobModel.generation + 1, **reset)
+        )
+        if result.rowcount == 0:
+            self.session.add(RecategorizationJobModel(tenant_id=tenant_id, generation=1, **reset))
+        await self.session.commit()
+
+    async def pending(self) -> List[Tuple[UUID, RecategorizationProgress]]:
+        """Returns the unfinished passes, oldest request first."""
+        models = (await self.session.execute(
+            select(RecategorizationJobModel)
+            .where(RecategorizationJobModel.done.is_(False))
+            .order_by(RecategorizationJobModel.requested_at)
+        )).scalars().all()
+        return [(m.tenant_id, _progress(m)) for m in models]
+
+    async def advance(
+        self, tenant_id: UUID, generation: int, after_id: int, last_id: Optional[int], scanned: int, updated: int
+    ) -> bool:
+        """
+        Records a committed batch that started at `after_id`. A `last_id` of None
+        marks the pass finished.
+
+        Returns:
+            bool: False if the pass was superseded by a newer request or another
+                worker already recorded this batch.
+        """
+        values: Dict[str, Any] = {
+            "scanned": RecategorizationJobModel.scanned + scanned,
+            "updated": RecategorizationJobModel.updated + updated,
+        }
+        if last_id is None:
+            values.update(done=True, finished_at=datetime.utcnow())
+        else:
+            values["last_id"] = last_id
+        result = await self.session.execute(
+            update(RecategorizationJobModel)
+            .where(
+                RecategorizationJobModel.tenant_id == tenant_id,
+                RecategorizationJobModel.generation == generation,
+                RecategorizationJobModel.last_id == after_id,
+                RecategorizationJobModel.done.is_(False),
+            )
+            .values(**values)
+        )
+        await self.session.commit()
+        return result.rowcount == 1
+
+    async def status(self, tenant_id: UUID) -> Optional[Dict[str, Any]]:
+        model = (await self.session.execute(
+            select(RecategorizationJobModel).where(RecategorizationJobModel.tenant_id == tenant_id)
+        )).scalar_one_or_none()
+        return asdict(_progress(model)) if model else None
+
+
+def _progress(model: RecategorizationJobModel) -> RecategorizationProgress:
+    return RecategorizationProgress(
+        generation=model.generation,
+        last_id=model.last_id,
+        scanned=model.scanned,
+        updated=model.updated,
+        done=model.done,
+        requested_at=model.requested_at,
+        finished_at=model.finished_at,
+    )
+
+
+class RecategorizationService:
+    """
+    Re-applies a tenant's rules to its stored transactions after the rules change.
+
+    Rows are streamed in keyset batches by primary key. Each row's category is
+    recomputed from its description, with `original_category` (the category it was
+    imported with) as the fallback when no rule matches, so a deleted rule is undone
+    and a repeated pass changes nothing. Only changed rows are written, one
+    `UPDATE ... FROM (VALUES ...)` per batch, together with their re-derived
+    CapEx/OpEx type. Each batch commits on its own and advances the persisted queue
+    cursor, so an interrupted pass (including a restart) resumes where it stopped.
+    Rules are matched in the default executor, off the event loop. Cached analysis
+    is invalidated after every batch that changed rows.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession],
+        cache: AnalysisCache = analysis_cache,
+        compiled_rules: CompiledRuleCache = rule_cache,
+        batch_size: int = 2000,
+        max_batches_per_run: int = 50,
+    ):
+        self.session_factory = session_factory
+        self.cache = cache
+        self.compiled_rules = compiled_rules
+        self.batch_size = batch_size
+        self.max_batches_per_run = max_batches_per_run
+
+    async def _rule_set(self, session: AsyncSession, tenant_id: UUID) -> CompiledRuleSet:
+        rule_set = self.compiled_rules.get(tenant_id)
+        if rule_set is None:
+            version = self.compiled_rules.version(tenant_id)
+            models = (await session.execute(select(RuleModel).where(RuleModel.tenant_id == tenant_id))).scalars().all()
+            rule_set = CompiledRuleSet([Rule(id=m.id, pattern=m.pattern, category=m.category) for m in models])
+            self.compiled_rules.put(tenant_id, rule_set, version)
+        return rule_set
+
+    async def run_batch(self, tenant_id: UUID, after_id: int = 0) -> Tuple[int, int, Optional[int]]:
+        """
+        Re-categorizes the tenant's next batch of rows with id > after_id.
+
+        Args:
+            tenant_id (UUID): The tenant.
+            after_id (int): Keyset cursor.
+
+        Returns:
+            Tuple[int, int, Optional[int]]: Rows scanned, rows updated and the new cursor (None when done).
+        """
+        async with self.session_factory() as session:
+            stmt = (
+                select(BudgetModel.id, BudgetModel.description, BudgetModel.amount,
+                       BudgetModel.category, BudgetModel.original_category)
+                .where(BudgetModel.tenant_id == tenant_id, BudgetModel.id > after_id)
+                .order_by(BudgetModel.id)
+                .limit(self.batch_size)
+            )
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                return 0, 0, None
+
+            rule_set = await self._rule_set(session, tenant_id)
+            matched = await asyncio.get_running_loop().run_in_executor(
+                None, rule_set.categorize, [r.description for r in rows]
+            )
+            changed = []
+            for row, category in zip(rows, matched):
+                target = category or row.original_category or row.category
+                if target != row.category:
+                    changed.append((row, target))
+
+            if changed:
+                settings = (await session.execute(
+                    select(TenantModel.settings).where(TenantModel.id == tenant_id)
+                )).scalar()
+                expense_types = classify_expense_batch(
+                    [r.description for r, _ in changed],
+                    [float(r.amount) for r, _ in changed],
+                    [category for _, category in changed],
+                    keyword_classifier_for(settings),
+                )
+                values = ", ".join(
+                    f"(CAST(:id_{i} AS INTEGER), CAST(:category_{i} AS VARCHAR), CAST(:expense_type_{i} AS VARCHAR))"
+                    for i in range(len(changed))
+                )
+                params: Dict[str, Any] = {"tenant_id": tenant_id}
+                for i, ((row, category), expense_type) in enumerate(zip(changed, expense_types)):
+                    params[f"id_{i}"] = row.id
+                    params[f"category_{i}"] = category
+                    params[f"expense_type_{i}"] = expense_type
+                # Tenant predicate as in every repository write, whatever ids the batch holds
+                await session.execute(text(
+                    f"WITH v(id, category, expense_type) AS (VALUES {values}) "
+                    "UPDATE budget_entries SET category = v.category, expense_type = v.expense_type "
+                    "FROM v WHERE budget_entries.id = v.id AND budget_entries.tenant_id = :tenant_id"
+                ).bindparams(bindparam("tenant_id", type_=BudgetModel.__table__.c.tenant_id.type)), params)
+                await session.commit()
+            return len(rows), len(changed), rows[-1].id
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Works through pending tenants, up to `max_batches_per_run` batches in total.
+
+        Returns:
+            Dict[str, Any]: Tenants finished, rows scanned/updated and batches run.
+        """
+        summary = {"tenants": 0, "scanned": 0, "updated": 0, "batches": 0}
+        async with self.session_factory() as session:
+            pending = await RecategorizationQueue(session).pending()
+        for tenant_id, progress in pending:
+            cursor: Optional[int] = progress.last_id
+            while cursor is not None and summary["batches"] < self.max_batches_per_run:
+                after_id = cursor
+                scanned, updated, cursor = await self.run_batch(tenant_id, after_id)
+                summary["batches"] += 1
+                summary["scanned"] += scanned
+                summary["updated"] += updated
+                if updated:
+                    self.cache.invalidate(tenant_id)
+                async with self.session_factory() as session:
+                    recorded = await RecategorizationQueue(session).advance(
+                        tenant_id, progress.generation, after_id, cursor, scanned, updated
+                    )
+                if not recorded:
+                    # Rules changed again mid-pass (the next run restarts with the new rules),
+                    # or another worker got here first
+                    break
+            if cursor is None:
+                summary["tenants"] += 1
+            if summary["batches"] >= self.max_batches_per_run:
+                break
+
+        if summary["batches"]:
+            logger.info("recategorization_progress", **summary)
+        return summary
@@ -0,0 +1,400 @@
+from typing import Dict, FrozenSet, List, Optional, Pattern, Sequence, Tuple
+from uuid import UUID
+import asyncio
+import re
+import threading
+import structlog
+
+from src.application.context import get_tenant_id
+from src.application.keyword_automaton import KeywordAutomaton
+from src.domain.repository import RuleRepository
+from src.domain.rule import Rule
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse
+
+logger = structlog.get_logger()
+
+MAX_PATTERN_LENGTH = 500
+MAX_BOUNDED_REPEAT = 1000
+
+_REGEX_META = frozenset(".^$*+?{}[]\\|()")
+# Backreferences, conditional groups and inline flags change meaning once patterns
+# are merged into one regex (group numbers shift, flags apply to the whole pattern)
+_NOT_COMBINABLE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(|\(\?[aiLmsux]+\)")
+
+
+class RulePatternError(ValueError):
+    """Raised when a rule pattern is invalid or too expensive to evaluate."""
+
+
+# Characters the alternation check probes: Latin-1 plus a few from other scripts and
+# Unicode classes (Cyrillic, Arabic-Indic digit, line separator, CJK, emoji)
+_PROBES = frozenset(map(chr, range(256))) | frozenset("\u0430\u0660\u2028\u4e2d\U0001f600")
+_CATEGORIES = {
+    "CATEGORY_DIGIT": re.compile(r"\d").match,
+    "CATEGORY_NOT_DIGIT": re.compile(r"\D").match,
+    "CATEGORY_SPACE": re.compile(r"\s").match,
+    "CATEGORY_NOT_SPACE": re.compile(r"\S").match,
+    "CATEGORY_WORD": re.compile(r"\w").match,
+    "CATEGORY_NOT_WORD": re.compile(r"\W").match,
+}
+_REPEATS = ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+
+
+def _variants(char: str) -> FrozenSet[str]:
+    # Rules match case-insensitively
+    return frozenset((char, char.lower(), char.upper()))
+
+
+def _in_class(items, char: str) -> bool:
+    negate = bool(items) and str(items[0][0]) == "NEGATE"
+    for variant in _variants(char):
+        for op, av in items:
+            name = str(op)
+            if (
+                (name == "LITERAL" and variant == chr(av))
+                or (name == "RANGE" and av[0] <= ord(variant) <= av[1])
+                or (name == "CATEGORY" and _CATEGORIES[str(av)](variant))
+            ):
+                return not negate
+    return negate
+
+
+def _first(items) -> Tuple[FrozenSet[str], bool]:
+    """
+    The probe characters a parsed sequence can start with, and whether it can
+    match the empty string.
+    """
+    first: FrozenSet[str] = frozenset()
+    for op, av in items:
+        name = str(op)
+        nullable = False
+        if name == "LITERAL":
+            chars = _variants(chr(av))
+        elif name == "NOT_LITERAL":
+            chars = _PROBES - _variants(chr(av))
+        elif name == "ANY":
+            # Newline included: with (?s) the dot matches it too
+            chars = _PROBES
+        elif name == "IN":
+            chars = frozenset(c for c in _PROBES if _in_class(av, c))
+        elif name in _REPEATS:
+            chars, nullable = _first(av[2])
+            nullable = nullable or av[0] == 0
+        elif name in ("SUBPATTERN", "ATOMIC_GROUP"):
+            chars, nullable = _first(av[-1] if name == "SUBPATTERN" else av)
+        elif name in ("BRANCH", "GROUPREF_EXISTS"):
+            branches = av[1] if name == "BRANCH" else [av[1], av[2] or []]
+            firsts = [_first(branch) for branch in branches]
+            chars = frozenset().union(*(c for c, _ in firsts))
+            nullable = any(n for _, n in firsts)
+        elif name == "GROUPREF":
+            chars, nullable = _PROBES, True
+        else:
+            # Anchors and lookarounds consume nothing
+            chars, nullable = frozenset(), True
+        first |= chars
+        if not nullable:
+            return first, False
+    return first, True
+
+
+def _check_alternatives(branches) -> None:
+    # Under a repeat, two alternatives that can match the same text give every
+    # iteration several ways to match, and a failing search tries them all
+    seen: FrozenSet[str] = frozenset()
+    seen_empty = False
+    for branch in branches:
+        chars, nullable = _first(branch)
+        if seen & chars or (nullable and seen_empty):
+            raise RulePatternError(
+                "Alternatives that can match the same text inside a repeat (e.g. '(a|a)+' or '(.|\\s)*') "
+                "can backtrack catastrophically"
+            )
+        seen |= chars
+        seen_empty = seen_empty or nullable
+
+
+def _check_complexity(items, in_unbounded: bool, in_repeat: bool = False) -> None:
+    for op, av in items:
+        name = str(op)
+        if name in _REPEATS:
+            low, high, sub = av
+            unbounded = high == sre_parse.MAXREPEAT
+            if not unbounded and high > MAX_BOUNDED_REPEAT:
+                raise RulePatternError(f"Repetition count {high} exceeds {MAX_BOUNDED_REPEAT}")
+            if name == "POSSESSIVE_REPEAT":
+                # Possessive repeats never backtrack into their body
+                _check_complexity(sub, False)
+                continue
+            if unbounded and in_unbounded:
+                raise RulePatternError("Nested unbounded quantifiers (e.g. '(a+)+') can backtrack catastrophically")
+            _check_complexity(sub, in_unbounded or unbounded, in_repeat or high > 1)
+        elif name == "SUBPATTERN":
+            _check_complexity(av[-1], in_unbounded, in_repeat)
+        elif name == "BRANCH":
+            if in_repeat:
+                _check_alternatives(av[1])
+            for branch in av[1]:
+                _check_complexity(branch, in_unbounded, in_repeat)
+        elif name in ("ASSERT", "ASSERT_NOT"):
+            _check_complexity(av[1], in_unbounded, in_repeat)
+        elif name == "ATOMIC_GROUP":
+            _check_complexity(av, False)
+        elif name == "GROUPREF_EXISTS":
+            if in_repeat:
+                _check_alternatives([av[1], av[2] or []])
+            _check_complexity(av[1], in_unbounded, in_repeat)
+            if av[2] is not None:
+                _check_complexity(av[2], in_unbounded, in_repeat)
+        elif name == "GROUPREF" and in_unbounded:
+            raise RulePatternError("Backreferences inside unbounded quantifiers are not allowed")
+
+
+def validate_rule_pattern(pattern: str) -> Pattern:
+    """
+    Compiles a rule pattern after rejecting constructs prone to catastrophic backtracking.
+
+    Rejected: patterns longer than MAX_PATTERN_LENGTH, repetition counts above
+    MAX_BOUNDED_REPEAT, an unbounded quantifier nested inside another (star height
+    above one, e.g. `(a+)+` or `(\\w*\\s*)*`), backreferences inside unbounded
+    quantifiers, and alternatives inside a repeat that can start with the same
+    character or both match the empty string (e.g. `(a|a)+` or `(.|\\s)*`), which is
+    how overlapping alternation is detected. Possessive quantifiers and atomic
+    groups reset the nesting.
+
+    Args:
+        pattern (str): The regex pattern.
+
+    Returns:
+        Pattern: The compiled, case-insensitive pattern.
+
+    Raises:
+        RulePatternError: If the pattern is empty, invalid or too complex.
+    """
+    if not pattern:
+        raise RulePatternError("Pattern must not be empty")
+    if len(pattern) > MAX_PATTERN_LENGTH:
+        raise RulePatternError(f"Pattern is longer than {MAX_PATTERN_LENGTH} characters")
+    try:
+        parsed = sre_parse.parse(pattern)
+        compiled = re.compile(pattern, re.IGNORECASE)
+    except re.error as exc:
+        raise RulePatternError(f"Invalid pattern: {exc}") from exc
+    _check_complexity(parsed, False)
+    return compiled
+
+
+class CompiledRuleSet:
+    """
+    A tenant's categorization rules compiled into one matcher.
+
+    Precedence is by rule id: when several rules match, the oldest rule wins.
+    Matching is case-insensitive and uses `search` semantics (a pattern may match
+    anywhere in the description). Patterns failing `validate_rule_pattern` (stored
+    before validation existed) are skipped. Rules are split three ways:
+
+    * plain literals go into a KeywordAutomaton (one pass, independent of rule count);
+    * other patterns are merged into a single alternation regex, one alternative per
+      rule in precedence order. Most descriptions match no rule and are rejected by
+      that one search; on a hit, only the rules that outrank the leftmost match are
+      re-checked individually;
+    * patterns with backreferences, conditional groups or inline flags are matched
+      individually.
+
+    Results are memoized per distinct description, so repeated descriptions in an
+    upload cost a dict lookup.
+    """
+
+    def __init__(self, rules: Sequence[Rule], cache_size: int = 65536):
+        self.rules: List[Rule] = sorted(rules, key=lambda r: (r.id is None, r.id or 0))
+        literal_ranks: Dict[str, int] = {}
+        alternatives: List[Tuple[int, Pattern]] = []
+        self._combined_ranks: Dict[int, int] = {}
+        self._combined_rules: List[Tuple[int, Pattern]] = []
+        self._individual: List[Tuple[int, Pattern]] = []
+        self.invalid: List[Rule] = []
+
+        for rank, rule in enumerate(self.rules):
+            pattern = rule.pattern
+            try:
+                compiled = validate_rule_pattern(pattern)
+            except RulePatternError as exc:
+                logger.warn("rule_pattern_invalid", rule_id=rule.id, error=str(exc))
+                self.invalid.append(rule)
+                continue
+            if pattern and not _REGEX_META.intersection(pattern):
+                literal_ranks.setdefault(pattern.lower(), rank)
+            elif _NOT_COMBINABLE.search(pattern) or compiled.groupindex:
+                self._individual.append((rank, compiled))
+            else:
+                alternatives.append((rank, compiled))
+
+        self._literals = KeywordAutomaton(literal_ranks) if literal_ranks else None
+        self._literal_ranks = [literal_ranks[kw] for kw in self._literals.keywords] if self._literals else []
+
+        self._combined: Optional[Pattern] = None
+        if alternatives:
+            # Each alternative ends with an empty marker group; m.lastindex identifies the rule
+            parts = []
+            group = 0
+            for rank, compiled in alternatives:
+                parts.append(f"(?:{compiled.pattern})()")
+                group += compiled.groups + 1
+                self._combined_ranks[group] = rank
+            self._combined = re.compile("|".join(parts), re.IGNORECASE)
+            self._combined_rules = alternatives
+
+        self._cache: Dict[str, int] = {}
+        self._cache_size = cache_size
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match_rank(self, text: str) -> int:
+        """
+        Returns the precedence rank of the winning rule for the text, or -1.
+        """
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+
+        best = len(self.rules)
+        if self._literals is not None:
+            for kw in self._literals.search(text):
+                best = min(best, self._literal_ranks[kw])
+        if self._combined is not None:
+            m = self._combined.search(text)
+            if m is not None:
+                # The leftmost match wins the alternation; an older rule may still match further right
+                best = min(best, self._combined_ranks[m.lastindex])
+                for rank, compiled in self._combined_rules:
+                    if rank >= best:
+                        break
+                    if compiled.search(text):
+                        best = rank
+                        break
+        for rank, compiled in self._individual:
+            if rank >= best:
+                break
+            if compiled.search(text):
+                best = rank
+                break
+        result = best if best < len(self.rules) else -1
+
+        if len(self._cache) >= self._cache_size:
+            self._cache.clear()
+        self._cache[text] = result
+        return result
+
+    def match(self, text: str) -> Optional[Rule]:
+        """Returns the winning rule for the text, or None."""
+        rank = self.match_rank(text)
+        return self.rules[rank] if rank >= 0 else None
+
+    def categorize(self, descriptions: Sequence[str]) -> List[Optional[str]]:
+        """
+        Maps each description to the category of its winning rule (None if no rule matches).
+        """
+        return [self.rules[r].category if r >= 0 else None for r in map(self.match_rank, descriptions)]
+
+
+class CompiledRuleCache:
+    """
+    Process-local cache of compiled rule sets, one per tenant.
+
+    Invalidated by ManageRulesUseCase whenever a tenant's rules change. As in
+    AnalysisCache, every invalidation bumps the tenant's version and a rule set
+    loaded against an older version is refused on `put`, so a load that races
+    with a rule change can never cache the old rules.
+    """
+
+    def __init__(self):
+        self._entries: Dict[UUID, CompiledRuleSet] = {}
+        self._versions: Dict[UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: UUID) -> Optional[CompiledRuleSet]:
+        with self._lock:
+            return self._entries.get(tenant_id)
+
+    def version(self, tenant_id: UUID) -> int:
+        """Returns the tenant's current rules version (read it before loading the rules)."""
+        with self._lock:
+            return self._versions.get(tenant_id, 0)
+
+    def put(self, tenant_id: UUID, rule_set: CompiledRuleSet, version: int) -> bool:
+        """
+        Stores a rule set loaded at `version`.
+
+        Returns:
+            bool: False if the rules changed in the meantime and the set was discarded.
+        """
+        with self._lock:
+            if version != self._versions.get(tenant_id, 0):
+                return False
+            self._entries[tenant_id] = rule_set
+            return True
+
+    def invalidate(self, tenant_id: UUID) -> None:
+        with self._lock:
+            self._versions[tenant_id] = self._versions.get(tenant_id, 0) + 1
+            self._entries.pop(tenant_id, None)
+
+
+# Shared instance used by the API and background jobs
+rule_cache = CompiledRuleCache()
+
+
+class RuleEngine:
+    """
+    Applies the current tenant's categorization rules to entries.
+    """
+
+    def __init__(self, repo: RuleRepository, cache: CompiledRuleCache = rule_cache):
+        self.repo = repo
+        self.cache = cache
+
+    async def load(self) -> CompiledRuleSet:
+        """
+        Returns the tenant's compiled rules, compiling them on a cache miss.
+
+        Returns:
+            CompiledRuleSet: The compiled rules (possibly empty).
+        """
+        tenant_id = get_tenant_id()
+        rule_set = self.cache.get(tenant_id) if tenant_id else None
+        if rule_set is None:
+            version = self.cache.version(tenant_id) if tenant_id else 0
+            rule_set = CompiledRuleSet(await self.repo.get_all())
+            if tenant_id:
+                self.cache.put(tenant_id, rule_set, version)
+        return rule_set
+
+    async def apply(self, entries: List) -> int:
+        """
+        Re-categorizes entries in place according to the tenant's rules.
+
+        Matching runs in the default executor, so a slow pattern never blocks the
+        event loop.
+
+        Args:
+            entries (List): Entries with `description` and `category` attributes.
+
+        Returns:
+            int: Number of entries whose category changed.
+        """
+        rule_set = await self.load()
+        if not len(rule_set) or not entries:
+            return 0
+        descriptions = [e.description for e in entries]
+        categories = await asyncio.get_running_loop().run_in_executor(None, rule_set.categorize, descriptions)
+        changed = 0
+        for entry, category in zip(entries, categories):
+            if category is not None and category != entry.category:
+                entry.category = category
+                changed += 1
+        return changed
@@ -0,0 +1,163 @@
+from decimal import Decimal
+from typing import Dict, Hashable, List, Optional, Tuple
+from operator import itemgetter
+import heapq
+import math
+
+# Tenants with at most this many expense rows get exact merchant totals
+DEFAULT_EXACT_LIMIT = 50_000
+# Relative error bound (fraction of the group's total spend) for sketch mode
+DEFAULT_SKETCH_EPSILON = 0.001
+
+
+class SpaceSavingSketch:
+    """
+    Weighted Space-Saving heavy-hitter sketch (Metwally et al.).
+
+    Tracks at most `capacity` keys. When a new key arrives and the sketch is full,
+    the key with the smallest counter is evicted and the newcomer inherits its count.
+    Every reported weight overestimates the true weight by at most `error_bound`,
+    which is itself at most total_weight / capacity, and any key whose true weight
+    exceeds that bound is guaranteed to be tracked.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.total = Decimal("0")
+        self._counts: Dict[Hashable, Decimal] = {}
+        self._errors: Dict[Hashable, Decimal] = {}
+        # Min-heap with exactly one (possibly stale, i.e. too low) entry per tracked key
+        self._heap: List[Tuple[Decimal, Hashable]] = []
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, key: Hashable, weight: Decimal) -> None:
+        """
+        Adds weight to a key.
+
+        Args:
+            key (Hashable): The item (e.g. merchant description).
+            weight (Decimal): Non-negative weight to add.
+        """
+        self.total += weight
+        counts = self._counts
+        if key in counts:
+            counts[key] += weight
+            return
+        if len(counts) < self.capacity:
+            counts[key] = weight
+            self._errors[key] = Decimal("0")
+            heapq.heappush(self._heap, (weight, key))
+            return
+
+        # Evict the current minimum, refreshing stale heap entries on the way
+        heap = self._heap
+        while True:
+            count, victim = heapq.heappop(heap)
+            actual = counts[victim]
+            if actual == count:
+                break
+            heapq.heappush(heap, (actual, victim))
+        del counts[victim]
+        del self._errors[victim]
+
+        counts[key] = count + weight
+        self._errors[key] = count
+        heapq.heappush(heap, (count + weight, key))
+
+    @property
+    def error_bound(self) -> Decimal:
+        """Maximum overestimation of any reported weight."""
+        if len(self._counts) < self.capacity:
+            return Decimal("0")
+        return max(self._errors.values(), default=Decimal("0"))
+
+    def top(self, k: int) -> List[Tuple[Hashable, Decimal]]:
+        """
+        Returns the k heaviest tracked keys.
+
+        Args:
+            k (int): Number of keys to return.
+
+        Returns:
+            List[Tuple[Hashable, Decimal]]: (key, estimated weight) pairs, heaviest first.
+        """
+        return heapq.nlargest(k, self._counts.items(), key=itemgetter(1))
+
+
+class TopKAccumulator:
+    """
+    Accumulates weights per key and selects the top-K with a heap.
+
+    In exact mode all keys are kept (small tenants). Otherwise a SpaceSavingSketch
+    bounds memory to ceil(1 / epsilon) counters, with every reported total within
+    epsilon * total_weight of the truth.
+    """
+
+    def __init__(self, exact: bool = True, epsilon: float = DEFAULT_SKETCH_EPSILON):
+        self.exact = exact
+        self._exact: Dict[Hashable, Decimal] = {}
+        self._sketch: Optional[SpaceSavingSketch] = None
+        if not exact:
+            self._sketch = SpaceSavingSketch(max(1, math.ceil(1 / epsilon)))
+
+    def add(self, key: Hashable, weight: Decimal) -> None:
+        """Adds weight to a key."""
+        if self._sketch is not None:
+            self._sketch.add(key, weight)
+        else:
+            self._exact[key] = self._exact.get(key, Decimal("0")) + weight
+
+    @property
+    def error_bound(self) -> Decimal:
+        """Maximum overestimation of any reported total (0 in exact mode)."""
+        return self._sketch.error_bound if self._sketch is not None else Decimal("0")
+
+    def top(self, k: int) -> Dict[Hashable, Decimal]:
+        """
+        Returns the k heaviest keys, heaviest first.
+
+        Ties keep first-seen order, matching a stable sort in exact mode.
+        """
+        if self._sketch is not None:
+            return dict(self._sketch.top(k))
+        return dict(heapq.nlargest(k, self._exact.items(), key=itemgetter(1)))
+
+
+class GroupedTopK:
+    """
+    One TopKAccumulator per group (e.g. merchants per category or per project).
+    """
+
+    def __init__(self, exact: bool = True, epsilon: float = DEFAULT_SKETCH_EPSILON):
+        self.exact = exact
+        self.epsilon = epsilon
+        self._groups: Dict[Hashable, TopKAccumulator] = {}
+
+    def add(self, group: Hashable, key: Hashable, weight: Decimal) -> None:
+        """Adds weight to a key within a group."""
+        acc = self._groups.get(group)
+        if acc is None:
+            acc = self._groups[group] = TopKAccumulator(self.exact, self.epsilon)
+        acc.add(key, weight)
+
+    def top(self, k: int) -> Dict[Hashable, Dict[Hashable, Decimal]]:
+        """Returns the top-k keys of every group, in first-seen group order."""
+        return {group: acc.top(k) for group, acc in self._groups.items()}
+
+
+def use_exact_mode(row_count: int, settings: Dict) -> bool:
+    """
+    Decides whether merchant aggregation can afford exact maps.
+
+    Args:
+        row_count (int): Number of expense rows to aggregate.
+        settings (Dict): Tenant settings; honours 'merchant_exact_limit'.
+
+    Returns:
+        bool: True for exact aggregation, False for bounded-memory sketches.
+    """
+    return row_count <= int(settings.get("merchant_exact_limit", DEFAULT_EXACT_LIMIT))
@@ -0,0 +1,123 @@
+from typing import List, Optional
+import numpy as np
+
+from src.application.analysis_services import CategoryClassifier
+from src.application.keyword_classifier import KeywordClassifier
+from src.application.ledger_columns import LedgerColumns, group_median
+from src.domain.analysis_models import SubscriptionEntry
+
+# Cadence name -> (nominal period in days, tolerance in days)
+CADENCES = {
+    "Weekly": (7.0, 2.0),
+    "Monthly": (30.44, 5.0),
+    "Quarterly": (91.31, 10.0),
+    "Annual": (365.25, 20.0),
+}
+
+DEFAULT_AMOUNT_TOLERANCE = 0.10  # Relative change allowed between consecutive charges
+DEFAULT_MIN_CONFIDENCE = 0.5
+
+
+class SubscriptionDetector:
+    """
+    Detects recurring charges from the distribution of inter-arrival intervals.
+
+    Rows are grouped by normalized merchant and ordered by date with one lexsort. For
+    each merchant the median interval picks the cadence (weekly, monthly, quarterly,
+    annual), and confidence combines how many intervals match that cadence, how many
+    consecutive charges stay within the amount tolerance (so a price change costs one
+    step, not the whole group) and the number of observations. All per-group
+    statistics are computed with array operations; Python only touches the merchants
+    that end up reported.
+    """
+
+    def __init__(
+        self,
+        amount_tolerance: float = DEFAULT_AMOUNT_TOLERANCE,
+        min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+        classifier: Optional[KeywordClassifier] = None,
+    ):
+        self.amount_tolerance = amount_tolerance
+        self.min_confidence = min_confidence
+        self.classifier = classifier
+        self._periods = np.array([p for p, _ in CADENCES.values()])
+        self._tolerances = np.array([t for _, t in CADENCES.values()])
+        self._names = list(CADENCES)
+
+    def detect(self, columns: LedgerColumns) -> List[SubscriptionEntry]:
+        """
+        Finds subscriptions in the ledger.
+
+        Args:
+            columns (LedgerColumns): Columnar view of the entries.
+
+        Returns:
+            List[SubscriptionEntry]: Detected subscriptions, most confident first.
+        """
+        if columns.size < 2:
+            return []
+
+        merchant, _ = columns.merchant_codes()
+        days, amounts = columns.days, columns.amounts
+        rows = np.flatnonzero((merchant >= 0) & (amounts != 0))
+        order = rows[np.lexsort((days[rows], merchant[rows]))]
+        g, d, a = merchant[order], days[order], amounts[order]
+        if g.size < 2:
+            return []
+
+        # Group layout over the sorted rows
+        starts = np.flatnonzero(np.r_[True, g[1:] != g[:-1]])
+        counts = np.diff(np.r_[starts, g.size])
+        group_of_row = np.repeat(np.arange(starts.size), counts)
+
+        # Intervals and amount steps between consecutive charges of the same merchant
+        same = g[1:] == g[:-1]
+        igroup = group_of_row[1:][same]
+        intervals = np.diff(d)[same].astype(np.float64)
+        prev_amt, cur_amt = a[:-1][same], a[1:][same]
+        n_int = np.bincount(igroup, minlength=starts.size)
+        has_int = n_int > 0
+        if not has_int.any():
+            return []
+
+        median = group_median(intervals, igroup, starts.size)
+
+        # Cadence: closest nominal period (relative distance) within its tolerance
+        dist = np.abs(median[:, None] - self._periods[None, :])
+        fits = dist <= self._tolerances[None, :]
+        cadence = np.argmin(np.where(fits, dist / self._periods[None, :], np.inf), axis=1)
+        has_cadence = fits.any(axis=1) & has_int
+
+        on_cadence = np.abs(intervals - self._periods[cadence[igroup]]) <= self._tolerances[cadence[igroup]]
+        regularity = np.bincount(igroup, weights=on_cadence, minlength=starts.size) / np.maximum(n_int, 1)
+        step_ok = np.abs(cur_amt - prev_amt) <= self.amount_tolerance * np.maximum(np.abs(prev_amt), 0.01)
+        consistency = np.bincount(igroup, weights=step_ok, minlength=starts.size) / np.maximum(n_int, 1)
+        support = n_int / (n_int + 1.0)
+        confidence = regularity * (0.5 + 0.5 * consistency) * support
+
+        selected = np.flatnonzero(has_cadence & (confidence >= self.min_confidence))
+        if not selected.size:
+            return []
+
+        reference_day = int(days.max())
+        ends = starts + counts - 1
+        subscriptions = []
+        for gi in selected.tolist():
+            first_row, last_row = order[starts[gi]], order[ends[gi]]
+            c = int(cadence[gi])
+            period, tolerance = self._periods[c], self._tolerances[c]
+            last_day = int(d[ends[gi]])
+            latest = columns.entries[last_row]
+            status = "Active" if reference_day - last_day <= period + tolerance else "Cancelled"
+            subscriptions.append(SubscriptionEntry(
+                description=latest.description,
+                amount=float(a[ends[gi]]),
+                frequency=self._names[c],
+                category=CategoryClassifier.infer(latest.description, columns.entries[first_row].category, self.classifier),
+                start_date=LedgerColumns.to_date(d[starts[gi]]),
+                next_payment_date=LedgerColumns.to_date(last_day + round(period)),
+                status=status,
+                confidence=round(float(confidence[gi]), 3),
+            ))
+        subscriptions.sort(key=lambda s: (-s.confidence, s.description))
+        return subscriptions
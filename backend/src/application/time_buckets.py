@@ -0,0 +1,187 @@
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from src.application.ledger_columns import LedgerColumns
+
+MONTH_NAMES = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+GRANULARITIES = ("day", "week", "month", "quarter")
+
+# Seasonal cycle used when forecasting each granularity
+SEASON_LENGTHS = {"day": 7, "week": 52, "month": 12, "quarter": 4}
+
+_EPOCH = date(1970, 1, 1)
+# Day 0 (1970-01-01) is a Thursday; shifting by 3 days makes week codes start on Mondays
+_WEEK_SHIFT = 3
+
+
+@dataclass(frozen=True)
+class TimeBuckets:
+    """
+    Integer period codes for trend buckets.
+
+    Codes count periods since the Unix epoch: days, Monday-to-Sunday weeks, calendar
+    months, or fiscal quarters (quarters of a fiscal year starting in
+    `fiscal_year_start`; quarter 0 starts in that month of 1970). Consecutive
+    periods have consecutive codes, so trends are grouped, sorted and extended
+    with integer arithmetic; labels are only formatted for the response.
+
+    Attributes:
+        granularity (str): One of GRANULARITIES.
+        fiscal_year_start (int): First month (1-12) of the fiscal year; shifts
+            quarters and names fiscal years after the calendar year they end in.
+    """
+    granularity: str = "month"
+    fiscal_year_start: int = 1
+
+    @property
+    def season_length(self) -> int:
+        """Periods per seasonal cycle (forecast seasonality)."""
+        return SEASON_LENGTHS[self.granularity]
+
+    def codes(self, dates: np.ndarray) -> np.ndarray:
+        """
+        Period code of every date.
+
+        Args:
+            dates (np.ndarray): datetime64 dates (any unit of a day or coarser).
+
+        Returns:
+            np.ndarray: int64 period codes.
+        """
+        if self.granularity in ("day", "week"):
+            days = dates.astype("datetime64[D]").view(np.int64)
+            return days if self.granularity == "day" else (days + _WEEK_SHIFT) // 7
+        months = dates.astype("datetime64[M]").view(np.int64)
+        if self.granularity == "month":
+            return months
+        return (months - (self.fiscal_year_start - 1)) // 3
+
+    def start(self, code: int) -> date:
+        """First day of a period."""
+        if self.granularity == "day":
+            return _EPOCH + timedelta(days=code)
+        if self.granularity == "week":
+            return _EPOCH + timedelta(days=7 * code - _WEEK_SHIFT)
+        month = code if self.granularity == "month" else 3 * code + self.fiscal_year_start - 1
+        return date(1970 + month // 12, month % 12 + 1, 1)
+
+    def labels(self, codes: Iterable[int]) -> Dict[int, Tuple[str, str]]:
+        """
+        Display label and sort key per distinct code.
+
+        Sort keys order like the codes: '2024-03-05' (day), ISO '2024-W10'
+        (week), '2024-03' (month), '2024-Q1' or 'FY2025-Q1' (quarter, with a
+        fiscal year not starting in January).
+
+        Args:
+            codes (Iterable[int]): Period codes (duplicates are formatted once).
+
+        Returns:
+            Dict[int, Tuple[str, str]]: code -> (display label, sort key).
+        """
+        return {code: self._label(int(code)) for code in set(codes)}
+
+    def _label(self, code: int) -> Tuple[str, str]:
+        start = self.start(code)
+        name = MONTH_NAMES[start.month - 1]
+        if self.granularity == "day":
+            return f"{start.day:02d} {name} {start.year}", start.isoformat()
+        if self.granularity == "week":
+            iso = start.isocalendar()
+            return f"Week of {start.day:02d} {name} {start.year}", f"{iso.year}-W{iso.week:02d}"
+        if self.granularity == "month":
+            return f"{name} {start.year}", f"{start.year}-{start.month:02d}"
+
+        quarter = code % 4 + 1
+        if self.fiscal_year_start == 1:
+            return f"Q{quarter} {start.year}", f"{start.year}-Q{quarter}"
+        # Fiscal years are named after the calendar year they end in
+        fiscal_year = 1970 + ((code // 4) * 12 + self.fiscal_year_start - 1 + 11) // 12
+        return f"Q{quarter} FY{fiscal_year}", f"FY{fiscal_year}-Q{quarter}"
+
+
+def resolve_time_buckets(settings: Optional[Dict[str, Any]]) -> TimeBuckets:
+    """
+    Reads `settings['trend_granularity']` and `settings['fiscal_year_start_month']`.
+
+    Unknown or out-of-range values fall back to calendar months.
+
+    Args:
+        settings (Optional[Dict[str, Any]]): Tenant settings.
+
+    Returns:
+        TimeBuckets: Bucketing for the tenant's trends.
+    """
+    settings = settings or {}
+    granularity = settings.get("trend_granularity") or "month"
+    fiscal_year_start = settings.get("fiscal_year_start_month") or 1
+    if granularity not in GRANULARITIES:
+        granularity = "month"
+    if not isinstance(fiscal_year_start, int) or not 1 <= fiscal_year_start <= 12:
+        fiscal_year_start = 1
+    return TimeBuckets(granularity, fiscal_year_start)
+
+
+def period_histories(
+    columns: LedgerColumns,
+    rows: np.ndarray,
+    buckets: TimeBuckets,
+    dimensions: Sequence[str] = (),
+) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[Optional[str], List[Dict[str, Any]]]]]:
+    """
+    Sums absolute amounts per period for the selected rows, overall and per value
+    of each dimension.
+
+    Everything is grouped on integer codes with one `bincount` per dimension;
+    amounts are summed in whole cents, so totals are exact. Histories are on a
+    dense grid, with zero for periods without rows, so the forecasts' seasonal
+    positions line up with the calendar (a weekday-only ledger has zero weekends
+    at day granularity) and with the hierarchical mode's series.
+
+    Args:
+        columns (LedgerColumns): The ledger.
+        rows (np.ndarray): Boolean mask of the rows to include.
+        buckets (TimeBuckets): Period bucketing.
+        dimensions (Sequence[str]): LedgerColumns dimensions to break down by.
+
+    Returns:
+        Tuple: The overall history and, per dimension, the history of every value
+            (in order of first appearance). Histories are lists of
+            {"period", "amount"} dicts for every period from the first with rows
+            (overall, or for that value) to the last with rows overall.
+    """
+    index = np.flatnonzero(rows)
+    if index.size == 0:
+        return [], {dimension: {} for dimension in dimensions}
+    period_codes = buckets.codes(columns.dates[index])
+    first_period = int(period_codes.min())
+    period_index = period_codes - first_period
+    periods = np.arange(first_period, int(period_codes.max()) + 1)
+    cents = np.rint(np.abs(columns.amounts[index]) * 100)
+
+    total = _history(periods, np.bincount(period_index, weights=cents, minlength=periods.size), 0)
+
+    breakdowns: Dict[str, Dict[Optional[str], List[Dict[str, Any]]]] = {}
+    for dimension in dimensions:
+        codes, labels = columns.codes(dimension)
+        groups, first, group_index = np.unique(codes[index], return_index=True, return_inverse=True)
+        sums = np.bincount(group_index * periods.size + period_index, weights=cents,
+                           minlength=groups.size * periods.size).reshape(groups.size, periods.size)
+        starts = np.full(groups.size, periods.size)
+        np.minimum.at(starts, group_index, period_index)
+        breakdowns[dimension] = {
+            (labels[groups[g]] if groups[g] >= 0 else None): _history(periods, sums[g], starts[g])
+            for g in np.argsort(first, kind="stable")
+        }
+    return total, breakdowns
+
+
+def _history(periods: np.ndarray, cents: np.ndarray, start: int) -> List[Dict[str, Any]]:
+    return [
+        {"period": int(period), "amount": Decimal(int(amount)).scaleb(-2)}
+        for period, amount in zip(periods[start:].tolist(), cents[start:].tolist())
+    ]
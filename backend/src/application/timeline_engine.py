@@ -0,0 +1,144 @@
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Set, Tuple
+import uuid
+
+from src.application.analysis_services import default_keyword_classifier
+from src.domain.analysis_models import SubscriptionEntry, TimelineItem
+
+# Fixed namespace so that item ids are stable across calls and processes
+TIMELINE_NAMESPACE = uuid.UUID("5d7f3c1e-2a4b-4f6e-9c8d-0b1a2e3f4c5d")
+
+
+class TimelineEngine:
+    """
+    Builds Gantt timeline items for subscriptions, implicit contracts and hardware lifecycles.
+
+    Contract and hardware keywords are tags of the shared keyword classifier, so each
+    description is scanned once (and repeated descriptions not at all). Duplicates are tracked with hashed keys instead of
+    rescanning the items generated so far, and item ids are derived from the item
+    content, so repeated calls over the same data return the same ids.
+    """
+
+    CONTRACT_DURATION = timedelta(days=365)
+    HARDWARE_DURATION = timedelta(days=365 * 3)
+
+    @staticmethod
+    def item_id(item_type: str, label: str, start_date: date) -> str:
+        """
+        Derives a deterministic id for a timeline item.
+
+        Args:
+            item_type (str): The item type (e.g. 'contract').
+            label (str): The item label.
+            start_date (date): The item start date.
+
+        Returns:
+            str: A UUID5 string unique to the (type, label, start) triple.
+        """
+        return str(uuid.uuid5(TIMELINE_NAMESPACE, f"{item_type}|{label}|{start_date.isoformat()}"))
+
+    @staticmethod
+    def _classify(description: str) -> Tuple[bool, bool]:
+        classifier = default_keyword_classifier()
+        return classifier.tag_count(description, "contract") > 0, classifier.tag_count(description, "hardware") > 0
+
+    @classmethod
+    def build(cls, expense_entries: Iterable, subscriptions: List[SubscriptionEntry]) -> List[TimelineItem]:
+        """
+        Generates timeline items in a single pass over the expense entries.
+
+        Args:
+            expense_entries (Iterable): Expense entries (date, description, amount).
+            subscriptions (List[SubscriptionEntry]): Detected subscriptions.
+
+        Returns:
+            List[TimelineItem]: Subscriptions first, then contracts and hardware in entry order.
+        """
+        items: List[TimelineItem] = []
+        # Descriptions already represented by any item; a contract is only added once
+        seen_descriptions: Set[str] = set()
+        seen_hardware: Set[str] = set()
+
+        # A. Subscriptions (renewal marker at next_payment_date)
+        for sub in subscriptions:
+            label = f"{sub.description} ({sub.frequency})"
+            end = sub.next_payment_date if sub.next_payment_date > sub.start_date else sub.start_date + timedelta(days=30)
+            items.append(TimelineItem(
+                id=cls.item_id("subscription", label, sub.start_date),
+                label=label,
+                start_date=sub.start_date,
+                end_date=end,
+                type="subscription",
+                amount=sub.amount,
+                color="#3b82f6"  # Blue
+            ))
+            seen_descriptions.add(sub.description)
+
+        # B/C. Implicit contracts (1 year) and hardware lifecycles (3 years)
+        for e in expense_entries:
+            is_contract, is_hardware = cls._classify(e.description)
+
+            if is_contract and e.description not in seen_descriptions:
+                items.append(TimelineItem(
+                    id=cls.item_id("contract", e.description, e.date),
+                    label=e.description,
+                    start_date=e.date,
+                    end_date=e.date + cls.CONTRACT_DURATION,
+                    type="contract",
+                    amount=float(e.amount),
+                    color="#10b981"  # Green
+                ))
+                seen_descriptions.add(e.description)
+
+            if is_hardware and e.description not in seen_hardware:
+                label = f"{e.description} (Lifecycle)"
+                items.append(TimelineItem(
+                    id=cls.item_id("hardware", label, e.date),
+                    label=label,
+                    start_date=e.date,
+                    end_date=e.date + cls.HARDWARE_DURATION,
+                    type="hardware",
+                    amount=float(e.amount),
+                    color="#f59e0b"  # Amber
+                ))
+                seen_hardware.add(e.description)
+                seen_descriptions.add(e.description)
+
+        return items
+
+
+class TimelineIndex:
+    """
+    Interval index over timeline items for viewport (window) queries.
+
+    Items are sorted by start date once. A window query binary-searches the start
+    dates, bounded on the left by the longest item span, so only items that can
+    overlap the window are inspected.
+    """
+
+    def __init__(self, items: List[TimelineItem]):
+        self._items = sorted(items, key=lambda t: (t.start_date, t.id))
+        self._starts = [t.start_date for t in self._items]
+        self._max_span = max((t.end_date - t.start_date for t in self._items), default=timedelta(0))
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def window(self, start: Optional[date] = None, end: Optional[date] = None) -> List[TimelineItem]:
+        """
+        Returns the items overlapping the closed interval [start, end].
+
+        Args:
+            start (Optional[date]): Window start. Unbounded if None.
+            end (Optional[date]): Window end. Unbounded if None.
+
+        Returns:
+            List[TimelineItem]: Overlapping items ordered by start date.
+        """
+        lo = 0 if start is None else bisect_left(self._starts, start - self._max_span)
+        hi = len(self._items) if end is None else bisect_right(self._starts, end)
+        candidates = self._items[lo:hi]
+        if start is None:
+            return candidates
+        return [t for t in candidates if t.end_date >= start]
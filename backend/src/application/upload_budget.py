@@ -1,9 +1,13 @@
-from typing import Optional
-from src.domain.repository import BudgetRepository
+import asyncio
+from typing import Any, Dict, Optional
+from src.domain.repository import BudgetRepository, MerchantRepository
 from src.infrastructure.excel_parser import ExcelParser
 from src.application.analyze_budget import AnalyzeBudgetUseCase
+from src.application.analysis_services import classify_expense_batch, keyword_classifier_for
 from src.domain.analysis_models import BudgetAnalysisResult
 from src.application.audit_service import AuditService
+from src.application.rule_engine import RuleEngine
+from src.application.near_duplicates import NearDuplicateReview
 
 class UploadBudgetUseCase:
     def __init__(
@@ -11,16 +15,61 @@ class UploadBudgetUseCase:
         repo: BudgetRepository, 
         parser: ExcelParser, 
         analyzer: AnalyzeBudgetUseCase,
-        audit_service: Optional[AuditService] = None
+        audit_service: Optional[AuditService] = None,
+        rule_engine: Optional[RuleEngine] = None,
+        merchant_repo: Optional[MerchantRepository] = None,
+        duplicate_review: Optional[NearDuplicateReview] = None
     ):
         self.repo = repo
         self.parser = parser
         self.analyzer = analyzer
         self.audit_service = audit_service
+        self.rule_engine = rule_engine
+        self.merchant_repo = merchant_repo
+        self.duplicate_review = duplicate_review
 
-    async def execute(self, file_content: bytes) -> BudgetAnalysisResult:
-        entries, warnings = self.parser.parse(file_content)
+    async def execute(
+        self,
+        file_content: bytes,
+        settings: Optional[Dict[str, Any]] = None,
+        filename: Optional[str] = None
+    ) -> BudgetAnalysisResult:
+        # Parsing is CPU-bound; keep it off the event loop like the rule matching and analysis
+        loop = asyncio.get_running_loop()
+        entries, warnings = await loop.run_in_executor(None, self.parser.parse, file_content)
+        if filename:
+            # Source file is tracked so gaps can be reported per imported feed
+            for entry in entries:
+                entry.source_file = filename
+        if entries and self.merchant_repo:
+            # Link rows to the tenant's merchants; known merchants fill in uncategorized rows
+            merchants = await self.merchant_repo.resolve(entries)
+            for entry in entries:
+                default = merchants[entry.merchant].default_category
+                if default and entry.category == "Uncategorized":
+                    entry.category = default
+        for entry in entries:
+            # Kept so rule changes can be re-applied (or undone) on stored rows
+            entry.original_category = entry.category
+        if entries and self.rule_engine:
+            # Tenant rules override the parsed category; applied first so CapEx/OpEx sees the final one
+            await self.rule_engine.apply(entries)
+        if entries:
+            # Classify once at ingest so reports can filter on the stored column
+            expense_types = classify_expense_batch(
+                [e.description for e in entries],
+                [float(e.amount) for e in entries],
+                [e.category for e in entries],
+                keyword_classifier_for(settings),
+            )
+            for entry, expense_type in zip(entries, expense_types):
+                entry.expense_type = expense_type
+        # Near-duplicates (same charge from another source) are stored but queued for review
+        suspects = await self.duplicate_review.screen(entries) if self.duplicate_review else []
         await self.repo.save_bulk(entries)
+        queued = await self.duplicate_review.enqueue(suspects) if suspects else 0
+        # Data changed: drop the cached analysis (the fresh one below re-warms it)
+        self.analyzer.invalidate()
         
         # Log Audit
         if self.audit_service and entries:
@@ -30,13 +79,14 @@ class UploadBudgetUseCase:
                 details={
                     "entries_count": len(entries),
                     "warnings_count": len(warnings),
+                    "suspected_duplicates": queued,
                     "first_date": str(entries[0].date) if entries else None,
                     "last_date": str(entries[-1].date) if entries else None
                 }
             )
         
         # Return analysis of the newly updated state
-        result = await self.analyzer.execute()
+        result = await self.analyzer.execute(settings=settings)
         
         # Attach upload warnings
         result.warnings = warnings
@@ -37,6 +37,24 @@ class GapEntry(BaseModel):
     end_date: date
     days: int
 
+class DimensionGapEntry(BaseModel):
+    """
+    Represents a gap in activity within one project, category or source file.
+
+    Attributes:
+        dimension (str): 'project', 'category' or 'source_file'.
+        key (str): The project / category / file name.
+        start_date (date): Last transaction before the gap.
+        end_date (date): First transaction after the gap.
+        days (int): The duration of the gap in days.
+    """
+    model_config = ConfigDict(strict=True)
+    dimension: str
+    key: str
+    start_date: date
+    end_date: date
+    days: int
+
 class FlashFillSuggestion(BaseModel):
     """
     Represents an AI-suggested category rule based on historical data.
@@ -63,6 +81,7 @@ class SubscriptionEntry(BaseModel):
         start_date (date): The date of the first detected payment.
         next_payment_date (date): The predicted next payment date.
         status (str): The status of the subscription (e.g., "Active").
+        confidence (float): Detection confidence in [0, 1].
     """
     model_config = ConfigDict(strict=True)
     description: str
@@ -72,6 +91,7 @@ class SubscriptionEntry(BaseModel):
     start_date: date
     next_payment_date: date
     status: str = "Active" # Active, Cancelled, Expiring
+    confidence: float = 1.0
 
 class TimelineItem(BaseModel):
     """
@@ -93,14 +113,18 @@ class AnomalyEntry(BaseModel):
     Attributes:
         description (str): The transaction description.
         date (date): The date of the anomalous transaction.
-        amount: float
-        average: float
+        amount (float): The transaction amount.
+        average (float): The typical (median) amount of its merchant / category.
+        score (float): Robust z-score of the amount against that baseline.
+        dimension (str): The baseline the charge was compared with ('merchant' or 'category').
     """
     model_config = ConfigDict(strict=True)
     description: str
     date: date
     amount: float
     average: float
+    score: float = 0.0
+    dimension: str = "merchant"
 
 class ForecastSummary(BaseModel):
     """
@@ -117,6 +141,42 @@ class ForecastSummary(BaseModel):
     outlier_detected: bool
     model_accuracy: Decimal
 
+class HybridForecastPoint(BaseModel):
+    """
+    One month of the hybrid (OpEx + CapEx + project lifecycle) forecast.
+
+    Attributes:
+        month (str): The month label (e.g., "Jan 2025").
+        sort_key (str): Sortable month key (e.g., "2025-01").
+        total (Decimal): Sum of the three streams.
+        opex (Decimal): Smoothing forecast of recurring spend.
+        capex (Decimal): Expected planned CapEx (Monte Carlo over timing slips).
+        projects (Decimal): S-curve spend of projects with a configured budget.
+        lower_bound (Decimal): Lower bound of the combined 95% interval.
+        upper_bound (Decimal): Upper bound of the combined 95% interval.
+        confidence (float): Spend-weighted confidence of the streams (0-1).
+    """
+    model_config = ConfigDict(strict=True)
+    month: str
+    sort_key: str
+    total: Decimal
+    opex: Decimal
+    capex: Decimal
+    projects: Decimal
+    lower_bound: Decimal
+    upper_bound: Decimal
+    confidence: float
+
+class HybridForecast(BaseModel):
+    """
+    Forecast that models OpEx, CapEx and budgeted projects separately and combines them.
+    """
+    model_config = ConfigDict(strict=True)
+    methodology: str = "hybrid_v2"
+    points: List[HybridForecastPoint]
+    planned_capex_items: int = 0
+    budgeted_projects: List[str] = []
+
 class BudgetAnalysisResult(BaseModel):
     """
     Comprehensive result of a budget analysis operation.
@@ -136,6 +196,7 @@ class BudgetAnalysisResult(BaseModel):
     project_merchants: Dict[str, Dict[str, Decimal]]
     
     gaps: List[GapEntry]
+    dimension_gaps: List[DimensionGapEntry] = []
     flash_fill: List[FlashFillSuggestion]
     subscriptions: List[SubscriptionEntry]
     anomalies: List[AnomalyEntry]
@@ -143,6 +204,7 @@ class BudgetAnalysisResult(BaseModel):
     
     # Forecasting
     forecast_summary: Optional[ForecastSummary] = None
+    hybrid_forecast: Optional[HybridForecast] = None
     
     # Upload feedback
     warnings: List[str] = []
@@ -1,4 +1,5 @@
 from datetime import date
+from typing import Optional
 from decimal import Decimal
 from pydantic import BaseModel, ConfigDict, Field
 
@@ -8,8 +9,15 @@ class BudgetEntry(BaseModel):
     """
     model_config = ConfigDict(strict=True)
     
+    id: Optional[int] = None # Set once stored
     date: date
     category: str
     amount: Decimal
     description: str
     project: str = "General"
+    source_file: Optional[str] = None
+    expense_type: Optional[str] = None # 'capex' | 'opex'; assigned at ingest
+    original_category: Optional[str] = None # Category as imported, before tenant rules
+    merchant_id: Optional[int] = None
+    merchant: Optional[str] = None # Normalized merchant key (see normalize_merchant)
+    merchant_name: Optional[str] = None # Display name of the linked merchant (see merchant_display_name)
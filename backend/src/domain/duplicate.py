@@ -0,0 +1,34 @@
+import datetime as dt
+from decimal import Decimal
+from typing import Optional
+from pydantic import BaseModel, ConfigDict
+
+class DuplicateCandidate(BaseModel):
+    """
+    A stored transaction suspected to duplicate another, awaiting review.
+
+    Attributes:
+        id (Optional[int]): Unique identifier of the review item.
+        entry_id (int): The later (suspected duplicate) transaction.
+        duplicate_of_id (int): The transaction it appears to duplicate.
+        similarity (float): Estimated description similarity (0-1).
+        status (str): 'pending', 'confirmed' (duplicate removed) or 'dismissed'.
+        date (Optional[date]): Date of the suspected duplicate.
+        amount (Optional[Decimal]): Amount shared by both transactions.
+        description (Optional[str]): Description of the suspected duplicate.
+        duplicate_of_date (Optional[date]): Date of the original.
+        duplicate_of_description (Optional[str]): Description of the original.
+        created_at (Optional[datetime]): When it was queued.
+    """
+    model_config = ConfigDict(strict=True)
+    id: Optional[int] = None
+    entry_id: int
+    duplicate_of_id: int
+    similarity: float
+    status: str = "pending"
+    date: Optional[dt.date] = None
+    amount: Optional[Decimal] = None
+    description: Optional[str] = None
+    duplicate_of_date: Optional[dt.date] = None
+    duplicate_of_description: Optional[str] = None
+    created_at: Optional[dt.datetime] = None
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional
+
+class Merchant(BaseModel):
+    """
+    A tenant's merchant: the normalized counterparty behind transaction descriptions.
+
+    Attributes:
+        id (Optional[int]): Unique identifier.
+        name (str): Normalized merchant key (see normalize_merchant).
+        aliases (List[str]): Raw descriptions seen for this merchant.
+        default_category (Optional[str]): Category given to its uncategorized transactions.
+    """
+    model_config = ConfigDict(strict=True)
+    id: Optional[int] = None
+    name: str
+    aliases: List[str] = []
+    default_category: Optional[str] = None
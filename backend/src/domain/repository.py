@@ -1,6 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import List, Protocol
+from collections import Counter
+from datetime import date
+from decimal import Decimal
+from typing import Collection, Dict, List, Optional, Protocol, Tuple
 from src.domain.budget import BudgetEntry
+from src.domain.duplicate import DuplicateCandidate
+from src.domain.merchant import Merchant
 from src.domain.rule import Rule
 
 class BudgetRepository(ABC):
@@ -22,6 +27,27 @@ class BudgetRepository(ABC):
         """
         pass
 
+    async def sample_descriptions(self, limit: int) -> List[Tuple[str, int]]:
+        """
+        Returns up to `limit` distinct descriptions with their row counts, most recent first.
+
+        The default derives them from get_all; stores should override it with a grouped query.
+        """
+        counts = Counter(e.description for e in reversed(await self.get_all()))
+        return list(counts.items())[:limit]
+
+    async def get_window(
+        self, start: date, end: date, amounts: Optional[Collection[Decimal]] = None
+    ) -> List[BudgetEntry]:
+        """
+        Retrieves the entries dated between start and end (inclusive), optionally
+        only those with one of the given amounts.
+
+        The default filters get_all; stores should override it with an indexed range query.
+        """
+        return [e for e in await self.get_all()
+                if start <= e.date <= end and (amounts is None or e.amount in amounts)]
+
 class RuleRepository(Protocol):
     async def add(self, rule: Rule) -> Rule:
         """Adds a new rule."""
@@ -34,3 +60,21 @@ class RuleRepository(Protocol):
     async def delete(self, rule_id: int) -> None:
         """Deletes a rule by ID."""
         pass
+
+class MerchantRepository(Protocol):
+    async def resolve(self, entries: List[BudgetEntry]) -> Dict[str, Merchant]:
+        """Links entries to their merchants (creating missing ones); returns merchants by key."""
+        pass
+
+class DuplicateReviewRepository(Protocol):
+    async def add_candidates(self, pairs: List[Tuple[int, int, float]]) -> None:
+        """Queues (entry_id, duplicate_of_id, similarity) pairs for review."""
+        pass
+
+    async def get_pending(self) -> List[DuplicateCandidate]:
+        """Retrieves the pending review items."""
+        pass
+
+    async def resolve(self, candidate_id: int, confirm: bool) -> Optional[DuplicateCandidate]:
+        """Confirms (deleting the duplicate) or dismisses a review item."""
+        pass
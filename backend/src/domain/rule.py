@@ -1,5 +1,5 @@
 from pydantic import BaseModel, ConfigDict
-from typing import Optional
+from typing import List, Optional
 
 class Rule(BaseModel):
     """
@@ -18,3 +18,26 @@ class Rule(BaseModel):
     category: str
     tenant_id: Optional[str] = None # UUID string
 
+
+class RulePreview(BaseModel):
+    """
+    Dry-run result of a candidate rule against a sample of the tenant's transactions.
+
+    Attributes:
+        pattern (str): The evaluated pattern.
+        scanned_descriptions (int): Distinct descriptions evaluated.
+        scanned_rows (int): Transactions those descriptions cover.
+        matched_descriptions (int): Distinct descriptions the pattern matches.
+        matched_rows (int): Transactions the pattern matches.
+        examples (List[str]): Up to a handful of matching descriptions.
+        timed_out (bool): True if the time budget ran out before the whole sample was scanned.
+        elapsed_ms (float): Evaluation time.
+    """
+    pattern: str
+    scanned_descriptions: int
+    scanned_rows: int
+    matched_descriptions: int
+    matched_rows: int
+    examples: List[str] = []
+    timed_out: bool = False
+    elapsed_ms: float
@@ -5,6 +5,7 @@ from typing import List
 from decimal import Decimal
 from src.domain.budget import BudgetEntry
 from src.application.ports import ExcelParser
+from src.application.instrumentation import profile
 
 class PandasExcelParser(ExcelParser):
     """
@@ -21,10 +22,12 @@ class PandasExcelParser(ExcelParser):
         Assumes columns: Date, Category, Amount, Description.
         """
         self.logger.info("parsing_file_start")
+        prof = profile("parse")
         
         # Read all sheets at once (sheet_name=None returns a dict of sheet_name -> DataFrame)
         # We read without header initially to detect it manually per sheet
-        all_sheets = pd.read_excel(io.BytesIO(file_content), sheet_name=None, header=None)
+        with prof.stage("read_excel", items=len(file_content)):
+            all_sheets = pd.read_excel(io.BytesIO(file_content), sheet_name=None, header=None)
         
         all_entries = []
         skipped_rows: List[str] = []
@@ -76,72 +79,81 @@ class PandasExcelParser(ExcelParser):
             df.rename(columns=column_map, inplace=True)
             
             # Ensure Date is datetime
-            if 'Date' in df.columns:
-                df['Date'] = pd.to_datetime(df['Date'], errors='coerce').dt.date
+            with prof.stage("coerce_dates", items=len(df)):
+                if 'Date' in df.columns:
+                    df['Date'] = pd.to_datetime(df['Date'], errors='coerce').dt.date
 
-            for _, row in df.iterrows():
-                # Skip rows with invalid dates (or empty rows handling)
-                if pd.isna(row.get("Date")):
-                    skipped_rows.append(f"Sheet '{sheet_name}' Row {row.name}: Missing or Invalid Date")
-                    continue
-                    
-                date_val = row["Date"]
+            with prof.stage("rows", items=len(df)):
+                self._parse_rows(df, sheet_name, all_entries, skipped_rows)
 
-                try:
-                    # 1. Robust Amount Parsing (Handle accounting negative format like '(100.00)')
-                    raw_amount = str(row["Amount"]) if "Amount" in df.columns and not pd.isna(row["Amount"]) else "0"
-                    # Remove currency symbols and spaces
-                    clean_amount = raw_amount.replace(",", "").replace("$", "").replace(" ", "")
-                    
-                    # Handle parentheses for negative numbers (e.g. "(500)" -> "-500")
-                    if clean_amount.startswith("(") and clean_amount.endswith(")"):
-                        clean_amount = "-" + clean_amount[1:-1]
-                    
-                    try:
-                        amount_decimal = Decimal(clean_amount)
-                    except Exception:
-                        self.logger.warn("invalid_amount_format", value=raw_amount, row_index=row.name)
-                        amount_decimal = Decimal("0")
-                        skipped_rows.append(f"Sheet '{sheet_name}' Row {row.name}: Invalid Amount '{raw_amount}' (Defaulted to 0)")
+        prof.finish(sheets=len(all_sheets), entries=len(all_entries), skipped=len(skipped_rows))
+        return all_entries, skipped_rows
+
+    def _parse_rows(self, df: pd.DataFrame, sheet_name: str, all_entries: List[BudgetEntry], skipped_rows: List[str]) -> None:
+        """
+        Converts the data rows of one sheet into entries, recording rejected rows.
+        """
+        for _, row in df.iterrows():
+            # Skip rows with invalid dates (or empty rows handling)
+            if pd.isna(row.get("Date")):
+                skipped_rows.append(f"Sheet '{sheet_name}' Row {row.name}: Missing or Invalid Date")
+                continue
+                
+            date_val = row["Date"]
 
-                    # 2. Robust String Parsing (Description/Project)
-                    # Force conversion to string, handle NaNs
-                    desc_val = row["Description"] if "Description" in df.columns else "Unknown"
-                    if pd.isna(desc_val):
-                        final_desc = "Unknown"
-                    else:
-                        final_desc = str(desc_val).strip()
-                        # Clean common merchant garbage
-                        import re
-                        final_desc = re.sub(r'AMZN Mktp.*', 'Amazon', final_desc, flags=re.IGNORECASE)
-                        final_desc = re.sub(r'Uber.*', 'Uber', final_desc, flags=re.IGNORECASE)
-                        final_desc = re.sub(r'Lyft.*', 'Lyft', final_desc, flags=re.IGNORECASE)
-                        final_desc = re.sub(r'\d{4,}', '', final_desc).strip()
+            try:
+                # 1. Robust Amount Parsing (Handle accounting negative format like '(100.00)')
+                raw_amount = str(row["Amount"]) if "Amount" in df.columns and not pd.isna(row["Amount"]) else "0"
+                # Remove currency symbols and spaces
+                clean_amount = raw_amount.replace(",", "").replace("$", "").replace(" ", "")
+                
+                # Handle parentheses for negative numbers (e.g. "(500)" -> "-500")
+                if clean_amount.startswith("(") and clean_amount.endswith(")"):
+                    clean_amount = "-" + clean_amount[1:-1]
+                
+                try:
+                    amount_decimal = Decimal(clean_amount)
+                except Exception:
+                    self.logger.warn("invalid_amount_format", value=raw_amount, row_index=row.name)
+                    amount_decimal = Decimal("0")
+                    skipped_rows.append(f"Sheet '{sheet_name}' Row {row.name}: Invalid Amount '{raw_amount}' (Defaulted to 0)")
 
-                    proj_val = row.get("Project")
-                    if pd.isna(proj_val):
-                        final_proj = "General"
-                    else:
-                        final_proj = str(proj_val).strip()
+                # 2. Robust String Parsing (Description/Project)
+                # Force conversion to string, handle NaNs
+                desc_val = row["Description"] if "Description" in df.columns else "Unknown"
+                if pd.isna(desc_val):
+                    final_desc = "Unknown"
+                else:
+                    final_desc = str(desc_val).strip()
+                    # Clean common merchant garbage
+                    import re
+                    final_desc = re.sub(r'AMZN Mktp.*', 'Amazon', final_desc, flags=re.IGNORECASE)
+                    final_desc = re.sub(r'Uber.*', 'Uber', final_desc, flags=re.IGNORECASE)
+                    final_desc = re.sub(r'Lyft.*', 'Lyft', final_desc, flags=re.IGNORECASE)
+                    final_desc = re.sub(r'\d{4,}', '', final_desc).strip()
 
-                    # 3. Robust Category Parsing (AI Inference Prep)
-                    raw_cat = row.get("Category")
-                    if pd.isna(raw_cat) or str(raw_cat).strip() == "":
-                        final_cat = "Uncategorized"
-                    else:
-                        final_cat = str(raw_cat).strip()
+                proj_val = row.get("Project")
+                if pd.isna(proj_val):
+                    final_proj = "General"
+                else:
+                    final_proj = str(proj_val).strip()
 
-                    entry = BudgetEntry(
-                        date=date_val,
-                        category=final_cat,
-                        amount=amount_decimal,
-                        description=final_desc,
-                        project=final_proj
-                    )
-                    all_entries.append(entry)
-                except Exception as e:
-                    # Catch-all to prevent one bad row from crashing the whole file
-                    self.logger.error("skipping_row_crash", error=str(e), row=row.to_dict())
-                    skipped_rows.append(f"Sheet '{sheet_name}' Row {row.name}: Crash - {str(e)}")
+                # 3. Robust Category Parsing (AI Inference Prep)
+                raw_cat = row.get("Category")
+                if pd.isna(raw_cat) or str(raw_cat).strip() == "":
+                    final_cat = "Uncategorized"
+                else:
+                    final_cat = str(raw_cat).strip()
 
-        return all_entries, skipped_rows
+                entry = BudgetEntry(
+                    date=date_val,
+                    category=final_cat,
+                    amount=amount_decimal,
+                    description=final_desc,
+                    project=final_proj
+                )
+                all_entries.append(entry)
+            except Exception as e:
+                # Catch-all to prevent one bad row from crashing the whole file
+                self.logger.error("skipping_row_crash", error=str(e), row=row.to_dict())
+                skipped_rows.append(f"Sheet '{sheet_name}' Row {row.name}: Crash - {str(e)}")
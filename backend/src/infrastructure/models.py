@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Numeric, ForeignKey, DateTime, JSON, Enum, Uuid
+from sqlalchemy import Column, Integer, Float, String, Date, Numeric, ForeignKey, DateTime, JSON, Enum, Uuid, Index, UniqueConstraint, Boolean
 from sqlalchemy.orm import DeclarativeBase, relationship
 from datetime import datetime
 import uuid
@@ -77,7 +77,52 @@ class BudgetModel(Base):
     amount = Column(Numeric(10, 2), nullable=False)
     description = Column(String, nullable=False)
     project = Column(String, nullable=True, default="General")
-    expense_type = Column(String, nullable=True, default="opex")
+    expense_type = Column(String, nullable=True) # 'capex' | 'opex'; NULL until classified
+    source_file = Column(String, nullable=True)
+    original_category = Column(String, nullable=True) # As imported; rules are re-applied on top of it
+    merchant_id = Column(Integer, ForeignKey("merchants.id"), nullable=True) # NULL until resolved
+
+    __table_args__ = (
+        # Analysis reads a tenant's rows in date order (gap detection relies on it)
+        Index("ix_budget_entries_tenant_date", "tenant_id", "date"),
+        # CapEx/OpEx reporting filters on the stored classification
+        Index("ix_budget_entries_tenant_expense_type", "tenant_id", "expense_type"),
+        # Merchant-level queries and breakdowns
+        Index("ix_budget_entries_tenant_merchant", "tenant_id", "merchant_id"),
+    )
+
+class DuplicateCandidateModel(Base):
+    """
+    SQLAlchemy model for the near-duplicate review queue.
+    """
+    __tablename__ = "duplicate_candidates"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(Uuid(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    entry_id = Column(Integer, ForeignKey("budget_entries.id", ondelete="CASCADE"), nullable=False)
+    duplicate_of_id = Column(Integer, ForeignKey("budget_entries.id", ondelete="CASCADE"), nullable=False)
+    similarity = Column(Float, nullable=False)
+    status = Column(String, nullable=False, default="pending") # 'pending' | 'dismissed'; confirmed items go with the row
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_duplicate_candidates_tenant_status", "tenant_id", "status"),
+    )
+
+class MerchantModel(Base):
+    """
+    SQLAlchemy model for a tenant's merchants (normalized transaction counterparties).
+    """
+    __tablename__ = "merchants"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    tenant_id = Column(Uuid(as_uuid=True), ForeignKey("tenants.id"), nullable=False)
+    name = Column(String, nullable=False) # normalize_merchant key
+    aliases = Column(JSON, default=list) # Raw descriptions seen for this merchant (capped)
+    default_category = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("tenant_id", "name", name="uq_merchants_tenant_name"),
+    )
 
 class RuleModel(Base):
     """
@@ -89,6 +134,21 @@ class RuleModel(Base):
     pattern = Column(String, nullable=False)
     category = Column(String, nullable=False)
 
+class RecategorizationJobModel(Base):
+    """
+    SQLAlchemy model for a tenant's pending re-application of its rules to stored
+    transactions (one row per tenant, reused by every request).
+    """
+    __tablename__ = "recategorization_jobs"
+    tenant_id = Column(Uuid(as_uuid=True), ForeignKey("tenants.id"), primary_key=True)
+    generation = Column(Integer, nullable=False, default=1) # Bumped on every rule change; restarts the pass
+    last_id = Column(Integer, nullable=False, default=0) # Keyset cursor (last committed budget_entries.id)
+    scanned = Column(Integer, nullable=False, default=0)
+    updated = Column(Integer, nullable=False, default=0)
+    done = Column(Boolean, nullable=False, default=False, index=True)
+    requested_at = Column(DateTime, default=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
 class GuestUsageStats(Base):
     """
     SQLAlchemy model for tracking guest usage statistics (for cleanup/analytics).
@@ -1,77 +1,187 @@
-from typing import List
-from sqlalchemy import select
+from datetime import date
+from decimal import Decimal
+from typing import Collection, Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.domain.budget import BudgetEntry
+from src.domain.merchant import Merchant
 from src.domain.rule import Rule
-from src.domain.repository import BudgetRepository, RuleRepository
-from src.infrastructure.models import BudgetModel, RuleModel
+from src.domain.duplicate import DuplicateCandidate
+from src.domain.repository import BudgetRepository, DuplicateReviewRepository, MerchantRepository, RuleRepository
+from src.infrastructure.models import BudgetModel, DuplicateCandidateModel, MerchantModel, RuleModel
 from src.infrastructure.base_repository import BaseRepository
+from src.application.instrumentation import profile
+from src.application.merchant_normalizer import merchant_display_name, normalize_merchant
 
 class SQLBudgetRepository(BaseRepository[BudgetModel], BudgetRepository):
     """
     SQLAlchemy implementation of the BudgetRepository.
     Handles persistence of budget entries using BaseRepository for common operations.
     """
+    LOOKUP_CHUNK = 500
+
     def __init__(self, session: AsyncSession):
         super().__init__(session, BudgetModel)
 
     async def save_bulk(self, entries: List[BudgetEntry]) -> None:
         """
         Bulk inserts budget entries with tenant-scoped de-duplication.
+        Inserted entries get their `id` set; skipped duplicates keep None.
         
         Args:
             entries (List[BudgetEntry]): The list of entries to save.
         """
         tenant_id = self._get_tenant_id()
+        prof = profile("save_bulk")
         
         # Optimized Bulk Insert using Hash-based deduplication per Tenant
         # 1. Fetch existing hashes for this Tenant
-        stmt = select(BudgetModel).where(BudgetModel.tenant_id == tenant_id)
-        existing_result = await self.session.execute(stmt)
-        existing_models = existing_result.scalars().all()
+        with prof.stage("load_existing") as stage:
+            stmt = select(BudgetModel).where(BudgetModel.tenant_id == tenant_id)
+            existing_result = await self.session.execute(stmt)
+            existing_models = existing_result.scalars().all()
+            stage.items = len(existing_models)
         
-        existing_hashes = {
-            f"{m.date}_{float(m.amount)}_{m.description}" for m in existing_models
-        }
+        with prof.stage("dedup", items=len(entries)):
+            existing_hashes = {
+                f"{m.date}_{float(m.amount)}_{m.description}" for m in existing_models
+            }
         
-        new_models = []
-        for e in entries:
-            entry_hash = f"{e.date}_{float(e.amount)}_{e.description}"
-            if entry_hash not in existing_hashes:
-                new_models.append(BudgetModel(
-                    tenant_id=tenant_id,
-                    date=e.date,
-                    category=e.category,
-                    amount=e.amount,
-                    description=e.description,
-                    project=e.project
-                ))
-                existing_hashes.add(entry_hash)
+            new_models = []
+            inserted = []
+            for e in entries:
+                entry_hash = f"{e.date}_{float(e.amount)}_{e.description}"
+                if entry_hash not in existing_hashes:
+                    new_models.append(BudgetModel(
+                        tenant_id=tenant_id,
+                        date=e.date,
+                        category=e.category,
+                        amount=e.amount,
+                        description=e.description,
+                        project=e.project,
+                        source_file=e.source_file,
+                        expense_type=e.expense_type,
+                        original_category=e.original_category or e.category,
+                        merchant_id=e.merchant_id
+                    ))
+                    inserted.append(e)
+                    existing_hashes.add(entry_hash)
         
         if new_models:
-            self.session.add_all(new_models)
-            await self.session.commit()
+            with prof.stage("insert", items=len(new_models)):
+                self.session.add_all(new_models)
+                await self.session.flush()
+                for e, m in zip(inserted, new_models):
+                    e.id = m.id
+                await self.session.commit()
+        prof.finish(entries=len(entries), inserted=len(new_models))
 
     async def get_all(self) -> List[BudgetEntry]:
         """
-        Retrieves all budget entries for the current tenant.
+        Retrieves all budget entries for the current tenant, ordered by date.
 
         Returns:
             List[BudgetEntry]: List of budget domain entities.
         """
-        # Using BaseRepository's get_all which already filters by tenant
-        models = await super().get_all()
+        tenant_id = self._get_tenant_id()
+        # Served by the (tenant_id, date) index; downstream analysis relies on date order.
+        # The merchant's first alias is its display name
+        stmt = (
+            select(BudgetModel, MerchantModel.name, MerchantModel.aliases[0].as_string())
+            .outerjoin(MerchantModel, BudgetModel.merchant_id == MerchantModel.id)
+            .where(BudgetModel.tenant_id == tenant_id)
+            .order_by(BudgetModel.date, BudgetModel.id)
+        )
+        rows = (await self.session.execute(stmt)).all()
         return [
             BudgetEntry(
+                id=m.id,
                 date=m.date,
                 category=m.category,
                 amount=m.amount,
                 description=m.description,
-                project=m.project or "General"
+                project=m.project or "General",
+                source_file=m.source_file,
+                expense_type=m.expense_type,
+                original_category=m.original_category,
+                merchant_id=m.merchant_id,
+                merchant=merchant,
+                merchant_name=merchant_display_name(alias) if alias else None
+            )
+            for m, merchant, alias in rows
+        ]
+
+    async def get_window(
+        self, start: date, end: date, amounts: Optional[Collection[Decimal]] = None
+    ) -> List[BudgetEntry]:
+        """
+        Retrieves the current tenant's entries dated between start and end (inclusive).
+
+        Served by the (tenant_id, date) index, so the cost depends on the window, not the history.
+        With `amounts`, rows with other amounts are filtered out in the query (in
+        chunks of LOOKUP_CHUNK amounts).
+
+        Args:
+            start (date): First date.
+            end (date): Last date.
+            amounts (Optional[Collection[Decimal]]): Only return rows with these amounts.
+
+        Returns:
+            List[BudgetEntry]: Entries with ids, in date order.
+        """
+        tenant_id = self._get_tenant_id()
+        stmt = (
+            select(BudgetModel)
+            .where(BudgetModel.tenant_id == tenant_id, BudgetModel.date >= start, BudgetModel.date <= end)
+            .order_by(BudgetModel.date, BudgetModel.id)
+        )
+        if amounts is None:
+            models = list((await self.session.execute(stmt)).scalars())
+        else:
+            amounts = list(amounts)
+            models = []
+            for i in range(0, len(amounts), self.LOOKUP_CHUNK):
+                chunk = stmt.where(BudgetModel.amount.in_(amounts[i:i + self.LOOKUP_CHUNK]))
+                models.extend((await self.session.execute(chunk)).scalars())
+            models.sort(key=lambda m: (m.date, m.id))
+        return [
+            BudgetEntry(
+                id=m.id,
+                date=m.date,
+                category=m.category,
+                amount=m.amount,
+                description=m.description,
+                project=m.project or "General",
+                source_file=m.source_file,
+                merchant_id=m.merchant_id
             )
             for m in models
         ]
 
+    async def sample_descriptions(self, limit: int) -> List[Tuple[str, int]]:
+        """
+        Returns up to `limit` distinct descriptions with their row counts, most recent first.
+
+        Args:
+            limit (int): Maximum number of distinct descriptions.
+
+        Returns:
+            List[Tuple[str, int]]: (description, row count) pairs.
+        """
+        tenant_id = self._get_tenant_id()
+        stmt = (
+            select(BudgetModel.description, func.count())
+            .where(BudgetModel.tenant_id == tenant_id)
+            .group_by(BudgetModel.description)
+            .order_by(func.max(BudgetModel.id).desc())
+            .limit(limit)
+        )
+        return [(d, n) for d, n in (await self.session.execute(stmt)).all()]
+
 class SQLRuleRepository(BaseRepository[RuleModel], RuleRepository):
     """
     SQLAlchemy implementation of the RuleRepository.
@@ -115,3 +225,209 @@ class SQLRuleRepository(BaseRepository[RuleModel], RuleRepository):
         """
         await super().delete_by_id(rule_id)
         await self.session.commit()
+
+class SQLMerchantRepository(BaseRepository[MerchantModel], MerchantRepository):
+    """
+    SQLAlchemy implementation of the MerchantRepository.
+    Merchants are keyed per tenant by their normalized name.
+    """
+    MAX_ALIASES = 20
+    LOOKUP_CHUNK = 500
+
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, MerchantModel)
+
+    async def resolve(self, entries: List[BudgetEntry]) -> Dict[str, Merchant]:
+        """
+        Links entries to their merchants, creating the missing ones.
+
+        Sets `merchant` (the normalized key), `merchant_id` and `merchant_name` on every entry.
+
+        Args:
+            entries (List[BudgetEntry]): Entries to resolve.
+
+        Returns:
+            Dict[str, Merchant]: The entries' merchants by normalized key.
+        """
+        samples: Dict[str, List[Tuple[str, str]]] = {}
+        for e in entries:
+            e.merchant = normalize_merchant(e.description)
+            samples.setdefault(e.merchant, []).append((e.description, e.category))
+        merchants = await self.resolve_keys(self._get_tenant_id(), samples)
+        for e in entries:
+            merchant = merchants[e.merchant]
+            e.merchant_id = merchant.id
+            e.merchant_name = merchant_display_name(merchant.aliases[0])
+        await self.session.commit()
+        return merchants
+
+    async def resolve_keys(
+        self, tenant_id: UUID, samples: Dict[str, Iterable[Tuple[str, str]]]
+    ) -> Dict[str, Merchant]:
+        """
+        Fetches or creates the tenant's merchants for the given keys (flushes, does not commit).
+
+        New merchants take the first categorized sample as their default category.
+        New raw descriptions are added to the aliases, up to MAX_ALIASES.
+
+        Args:
+            tenant_id (UUID): The tenant (explicit, so background jobs can use it).
+            samples (Dict[str, Iterable[Tuple[str, str]]]): (description, category) pairs by merchant key.
+
+        Returns:
+            Dict[str, Merchant]: Merchants by key.
+        """
+        keys = list(samples)
+        models = await self._load(tenant_id, keys)
+
+        missing = [key for key in keys if key not in models]
+        if missing:
+            # A concurrent upload may create the same merchant between the lookup and the
+            # insert: skip conflicting rows and re-select, instead of failing on the unique key.
+            rows = []
+            for key in missing:
+                categories = (c for _, c in samples[key] if c and c != "Uncategorized")
+                rows.append({"tenant_id": tenant_id, "name": key, "aliases": [],
+                             "default_category": next(categories, None)})
+            insert = pg_insert if self.session.bind.dialect.name == "postgresql" else sqlite_insert
+            for i in range(0, len(rows), self.LOOKUP_CHUNK):
+                stmt = insert(MerchantModel).values(rows[i:i + self.LOOKUP_CHUNK])
+                await self.session.execute(stmt.on_conflict_do_nothing(index_elements=["tenant_id", "name"]))
+            models.update(await self._load(tenant_id, missing))
+
+        for key, pairs in samples.items():
+            model = models[key]
+            aliases = list(model.aliases or [])
+            for description, _ in pairs:
+                if len(aliases) >= self.MAX_ALIASES:
+                    break
+                if description not in aliases:
+                    aliases.append(description)
+            if aliases != (model.aliases or []):
+                # Reassign so the JSON column is marked dirty
+                model.aliases = aliases
+        await self.session.flush()
+
+        return {
+            key: Merchant(id=m.id, name=m.name, aliases=list(m.aliases or []), default_category=m.default_category)
+            for key, m in models.items()
+        }
+
+    async def _load(self, tenant_id: UUID, keys: List[str]) -> Dict[str, MerchantModel]:
+        """
+        Selects the tenant's merchants with the given keys, in chunks of LOOKUP_CHUNK.
+
+        Args:
+            tenant_id (UUID): The tenant.
+            keys (List[str]): Normalized merchant names.
+
+        Returns:
+            Dict[str, MerchantModel]: Existing merchants by key.
+        """
+        models: Dict[str, MerchantModel] = {}
+        for i in range(0, len(keys), self.LOOKUP_CHUNK):
+            stmt = select(MerchantModel).where(
+                MerchantModel.tenant_id == tenant_id,
+                MerchantModel.name.in_(keys[i:i + self.LOOKUP_CHUNK])
+            )
+            models.update((m.name, m) for m in (await self.session.execute(stmt)).scalars())
+        return models
+
+class SQLDuplicateReviewRepository(BaseRepository[DuplicateCandidateModel], DuplicateReviewRepository):
+    """
+    SQLAlchemy implementation of the near-duplicate review queue.
+    """
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, DuplicateCandidateModel)
+
+    async def add_candidates(self, pairs: List[Tuple[int, int, float]]) -> None:
+        """
+        Queues suspected duplicates for review.
+
+        Args:
+            pairs (List[Tuple[int, int, float]]): (entry_id, duplicate_of_id, similarity).
+        """
+        tenant_id = self._get_tenant_id()
+        self.session.add_all([
+            DuplicateCandidateModel(tenant_id=tenant_id, entry_id=entry_id, duplicate_of_id=original_id,
+                                    similarity=similarity, status="pending")
+            for entry_id, original_id, similarity in pairs
+        ])
+        await self.session.commit()
+
+    async def _get(self, candidate_id: Optional[int] = None, status: Optional[str] = None) -> List[DuplicateCandidate]:
+        tenant_id = self._get_tenant_id()
+        entry = aliased(BudgetModel)
+        original = aliased(BudgetModel)
+        stmt = (
+            select(DuplicateCandidateModel, entry, original)
+            .join(entry, DuplicateCandidateModel.entry_id == entry.id)
+            .join(original, DuplicateCandidateModel.duplicate_of_id == original.id)
+            .where(DuplicateCandidateModel.tenant_id == tenant_id)
+            .order_by(DuplicateCandidateModel.id)
+        )
+        if candidate_id is not None:
+            stmt = stmt.where(DuplicateCandidateModel.id == candidate_id)
+        if status is not None:
+            stmt = stmt.where(DuplicateCandidateModel.status == status)
+        return [
+            DuplicateCandidate(
+                id=c.id,
+                entry_id=c.entry_id,
+                duplicate_of_id=c.duplicate_of_id,
+                similarity=c.similarity,
+                status=c.status,
+                date=e.date,
+                amount=e.amount,
+                description=e.description,
+                duplicate_of_date=o.date,
+                duplicate_of_description=o.description,
+                created_at=c.created_at
+            )
+            for c, e, o in (await self.session.execute(stmt)).all()
+        ]
+
+    async def get_pending(self) -> List[DuplicateCandidate]:
+        """
+        Retrieves the current tenant's pending review items with both transactions.
+
+        Returns:
+            List[DuplicateCandidate]: Pending items, oldest first.
+        """
+        return await self._get(status="pending")
+
+    async def resolve(self, candidate_id: int, confirm: bool) -> Optional[DuplicateCandidate]:
+        """
+        Confirms or dismisses a review item.
+
+        Confirming deletes the duplicate transaction (and any other review items
+        referencing it); dismissing keeps both.
+
+        Args:
+            candidate_id (int): The review item.
+            confirm (bool): True to delete the duplicate, False to keep it.
+
+        Returns:
+            Optional[DuplicateCandidate]: The resolved item, or None if not found.
+        """
+        found = await self._get(candidate_id=candidate_id)
+        if not found:
+            return None
+        candidate = found[0]
+        tenant_id = self._get_tenant_id()
+        if confirm:
+            await self.session.execute(delete(DuplicateCandidateModel).where(
+                DuplicateCandidateModel.tenant_id == tenant_id,
+                (DuplicateCandidateModel.entry_id == candidate.entry_id)
+                | (DuplicateCandidateModel.duplicate_of_id == candidate.entry_id)
+            ))
+            await self.session.execute(delete(BudgetModel).where(
+                BudgetModel.tenant_id == tenant_id, BudgetModel.id == candidate.entry_id
+            ))
+            candidate.status = "confirmed"
+        else:
+            model = await self.session.get(DuplicateCandidateModel, candidate_id)
+            model.status = "dismissed"
+            candidate.status = "dismissed"
+        await self.session.commit()
+        return candidate
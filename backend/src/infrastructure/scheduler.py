@@ -0,0 +1,187 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import structlog
+
+logger = structlog.get_logger()
+
+
+@dataclass
+class ScheduledJob:
+    """
+    Definition of a periodic background job.
+
+    Attributes:
+        name (str): Unique job name (used in logs and metrics).
+        func (Callable[[], Awaitable[Any]]): Coroutine function executed on each run.
+        interval_seconds (float): Base delay between runs.
+        jitter_seconds (float): Random extra delay (0..jitter) added to every wait, so
+            workers started together don't hit the database in lockstep.
+        initial_delay_seconds (float): Delay before the first run.
+        window_hours (Optional[Tuple[int, int]]): UTC hour range [start, end) in which
+            scheduled runs are allowed (e.g. (1, 5) for off-peak). Wraps past midnight
+            when start > end. Manual triggers ignore the window.
+    """
+    name: str
+    func: Callable[[], Awaitable[Any]]
+    interval_seconds: float
+    jitter_seconds: float = 0.0
+    initial_delay_seconds: float = 0.0
+    window_hours: Optional[Tuple[int, int]] = None
+
+
+@dataclass
+class JobMetrics:
+    """
+    Per-job execution counters.
+    """
+    runs: int = 0
+    failures: int = 0
+    skipped: int = 0
+    last_duration_ms: float = 0.0
+    total_duration_ms: float = 0.0
+    last_started_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    last_result: Any = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns the metrics as a JSON-friendly dict."""
+        return {
+            "runs": self.runs,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "last_duration_ms": round(self.last_duration_ms, 2),
+            "avg_duration_ms": round(self.total_duration_ms / self.runs, 2) if self.runs else 0.0,
+            "last_started_at": self.last_started_at.isoformat() if self.last_started_at else None,
+            "last_error": self.last_error,
+        }
+
+
+def in_window(hour: int, window: Optional[Tuple[int, int]]) -> bool:
+    """
+    Checks whether an hour of day falls inside a [start, end) window.
+
+    Args:
+        hour (int): Hour of day (0-23).
+        window (Optional[Tuple[int, int]]): The window, or None for "always".
+
+    Returns:
+        bool: True if the hour is inside the window.
+    """
+    if window is None:
+        return True
+    start, end = window
+    if start <= end:
+        return start <= hour < end
+    return hour >= start or hour < end
+
+
+class JobScheduler:
+    """
+    Minimal asyncio scheduler for periodic background jobs.
+
+    Each job runs in its own loop task; a shared semaphore caps how many jobs execute
+    at the same time. Runs are timed and counted per job, and failures are logged
+    without stopping the loop.
+    """
+
+    def __init__(self, max_concurrency: int = 2):
+        self._jobs: Dict[str, ScheduledJob] = {}
+        self._metrics: Dict[str, JobMetrics] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._triggered: Set[asyncio.Task] = set()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def register(self, job: ScheduledJob) -> None:
+        """
+        Registers a job. Must be called before `start()`.
+
+        Args:
+            job (ScheduledJob): The job definition.
+        """
+        if job.name in self._jobs:
+            raise ValueError(f"Job '{job.name}' is already registered")
+        self._jobs[job.name] = job
+        self._metrics[job.name] = JobMetrics()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Returns a snapshot of every job's metrics."""
+        return {name: m.snapshot() for name, m in self._metrics.items()}
+
+    async def run_once(self, name: str) -> Any:
+        """
+        Executes a job immediately (respecting the concurrency limit).
+
+        Args:
+            name (str): The job name.
+
+        Returns:
+            Any: The job's return value, or None if it failed.
+        """
+        job = self._jobs[name]
+        metrics = self._metrics[name]
+        async with self._semaphore:
+            metrics.last_started_at = datetime.utcnow()
+            started = time.perf_counter()
+            try:
+                result = await job.func()
+                metrics.last_error = None
+                metrics.last_result = result
+                return result
+            except Exception as e:
+                metrics.failures += 1
+                metrics.last_error = str(e)
+                logger.error("scheduled_job_failed", job=name, error=str(e))
+                return None
+            finally:
+                elapsed = (time.perf_counter() - started) * 1000
+                metrics.runs += 1
+                metrics.last_duration_ms = elapsed
+                metrics.total_duration_ms += elapsed
+                logger.info("scheduled_job_finished", job=name, duration_ms=round(elapsed, 2),
+                            runs=metrics.runs, failures=metrics.failures)
+
+    def trigger(self, name: str) -> asyncio.Task:
+        """
+        Schedules an out-of-band run without waiting for it (e.g. after an upload).
+
+        Args:
+            name (str): The job name.
+
+        Returns:
+            asyncio.Task: The task running the job.
+        """
+        task = asyncio.create_task(self.run_once(name))
+        self._triggered.add(task)
+        task.add_done_callback(self._triggered.discard)
+        return task
+
+    async def _loop(self, job: ScheduledJob) -> None:
+        await asyncio.sleep(job.initial_delay_seconds + random.uniform(0, job.jitter_seconds))
+        while True:
+            if in_window(datetime.utcnow().hour, job.window_hours):
+                await self.run_once(job.name)
+            else:
+                self._metrics[job.name].skipped += 1
+            await asyncio.sleep(job.interval_seconds + random.uniform(0, job.jitter_seconds))
+
+    def start(self) -> None:
+        """Starts one loop task per registered job."""
+        for job in self._jobs.values():
+            self._tasks.append(asyncio.create_task(self._loop(job), name=f"job:{job.name}"))
+
+    async def stop(self) -> None:
+        """Cancels all loops and in-flight triggered runs."""
+        tasks = self._tasks + list(self._triggered)
+        self._tasks = []
+        self._triggered.clear()
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.application.analysis_cache import analysis_cache
+from src.application.context import get_tenant_id
+from src.domain.duplicate import DuplicateCandidate
+from src.infrastructure.db import get_session
+from src.infrastructure.repository import SQLDuplicateReviewRepository
+from src.interface.dependencies import get_current_user
+from src.interface.envelope import ResponseEnvelope
+
+router = APIRouter(tags=["Duplicates"])
+
+class DuplicateResolution(BaseModel):
+    confirm: bool # True deletes the duplicate transaction, False keeps both
+
+async def get_duplicate_review_repo(session: AsyncSession = Depends(get_session)):
+    return SQLDuplicateReviewRepository(session)
+
+@router.get("/duplicates", response_model=ResponseEnvelope[List[DuplicateCandidate]])
+async def get_duplicates(
+    repo: SQLDuplicateReviewRepository = Depends(get_duplicate_review_repo),
+    user: dict = Depends(get_current_user)
+):
+    return ResponseEnvelope.success(data=await repo.get_pending())
+
+@router.post("/duplicates/{candidate_id}/resolve", response_model=ResponseEnvelope[DuplicateCandidate])
+async def resolve_duplicate(
+    candidate_id: int,
+    resolution: DuplicateResolution,
+    repo: SQLDuplicateReviewRepository = Depends(get_duplicate_review_repo),
+    user: dict = Depends(get_current_user)
+):
+    candidate = await repo.resolve(candidate_id, resolution.confirm)
+    if candidate is None:
+        raise HTTPException(status_code=404, detail="Duplicate candidate not found")
+    if resolution.confirm:
+        # A transaction was deleted
+        analysis_cache.invalidate(get_tenant_id())
+    return ResponseEnvelope.success(data=candidate)
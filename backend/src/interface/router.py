@@ -1,16 +1,24 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query
 from src.application.upload_budget import UploadBudgetUseCase
 from src.application.analyze_budget import AnalyzeBudgetUseCase
-from src.infrastructure.repository import SQLBudgetRepository
+from src.application.query_timeline import QueryTimelineUseCase
+from src.application.analysis_cache import analysis_cache
+from src.application.forecast_cache import forecast_cache
+from src.application.rule_engine import RuleEngine
+from src.application.near_duplicates import NearDuplicateReview
+from src.infrastructure.repository import (
+    SQLBudgetRepository, SQLDuplicateReviewRepository, SQLMerchantRepository, SQLRuleRepository
+)
 from src.infrastructure.excel_parser import PandasExcelParser
 from src.infrastructure.db import get_session
 from src.infrastructure.models import TenantModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from datetime import date
 from src.interface.dependencies import get_current_user, get_db
 from src.interface.envelope import ResponseEnvelope
-from src.domain.analysis_models import BudgetAnalysisResult
+from src.domain.analysis_models import BudgetAnalysisResult, TimelineItem
 from src.application.audit_service import AuditService
 from src.domain.user import User
 import structlog
@@ -21,13 +29,20 @@ logger = structlog.get_logger()
 async def get_upload_use_case(session: AsyncSession = Depends(get_session)):
     repo = SQLBudgetRepository(session)
     parser = PandasExcelParser()
-    analyzer = AnalyzeBudgetUseCase(repo)
+    analyzer = AnalyzeBudgetUseCase(repo, analysis_cache, forecast_cache)
     audit_service = AuditService(session)
-    return UploadBudgetUseCase(repo, parser, analyzer, audit_service)
+    rule_engine = RuleEngine(SQLRuleRepository(session))
+    merchant_repo = SQLMerchantRepository(session)
+    duplicate_review = NearDuplicateReview(repo, SQLDuplicateReviewRepository(session))
+    return UploadBudgetUseCase(repo, parser, analyzer, audit_service, rule_engine, merchant_repo, duplicate_review)
 
 async def get_analyze_use_case(session: AsyncSession = Depends(get_session)):
     repo = SQLBudgetRepository(session)
-    return AnalyzeBudgetUseCase(repo)
+    return AnalyzeBudgetUseCase(repo, analysis_cache, forecast_cache)
+
+async def get_timeline_use_case(session: AsyncSession = Depends(get_session)):
+    repo = SQLBudgetRepository(session)
+    return QueryTimelineUseCase(repo)
 
 async def get_tenant_settings(db: AsyncSession, tenant_id: str) -> Dict[str, Any]:
     stmt = select(TenantModel).where(TenantModel.id == tenant_id)
@@ -43,13 +58,14 @@ async def upload_budget(
     db: AsyncSession = Depends(get_db)
 ):
     results = []
+    settings = await get_tenant_settings(db, user.tenant_id)
     try:
         for file in files:
             content = await file.read()
             # We process each file sequentially. 
             # Ideally, we should update the use case to accept a list of contents to do it in one transaction,
             # but calling execute multiple times works because our repository handles de-duplication.
-            result = await use_case.execute(content)
+            result = await use_case.execute(content, settings=settings, filename=file.filename)
             results.append(result)
             
         # Return the last result (which contains the full analysis) or merge them.
@@ -69,3 +85,17 @@ async def analyze_budget(
     settings = await get_tenant_settings(db, user.tenant_id)
     result = await use_case.execute(settings=settings)
     return ResponseEnvelope.success(data=result)
+
+@router.get("/timeline", response_model=ResponseEnvelope[List[TimelineItem]])
+async def get_timeline(
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    use_case: QueryTimelineUseCase = Depends(get_timeline_use_case),
+    user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if start and end and start > end:
+        raise HTTPException(status_code=400, detail="'from' must be on or before 'to'")
+    settings = await get_tenant_settings(db, user.tenant_id)
+    items = await use_case.execute(start, end, settings=settings)
+    return ResponseEnvelope.success(data=items, meta={"count": len(items)})
@@ -1,15 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
-from src.domain.rule import Rule
+from src.domain.rule import Rule, RulePreview
 from src.application.manage_rules import ManageRulesUseCase
-from src.infrastructure.repository import SQLRuleRepository
+from src.application.preview_rule import PreviewBusyError, PreviewRuleUseCase
+from src.application.rule_engine import RulePatternError
+from src.infrastructure.repository import SQLBudgetRepository, SQLRuleRepository
 from src.infrastructure.db import get_session
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.interface.dependencies import get_current_user
 from src.interface.envelope import ResponseEnvelope
 from src.application.audit_service import AuditService
+from src.application.context import get_tenant_id
+from src.application.recategorization import RecategorizationQueue
 
 router = APIRouter()
 
@@ -17,10 +21,17 @@ class RuleCreate(BaseModel):
     pattern: str
     category: str
 
+class RulePreviewRequest(BaseModel):
+    pattern: str
+
 async def get_manage_rules_use_case(session: AsyncSession = Depends(get_session)):
     repo = SQLRuleRepository(session)
     audit_service = AuditService(session)
-    return ManageRulesUseCase(repo, audit_service)
+    # Rule changes queue a re-categorization pass, drained by the scheduled job
+    return ManageRulesUseCase(repo, audit_service, recategorization=RecategorizationQueue(session))
+
+async def get_preview_rule_use_case(session: AsyncSession = Depends(get_session)):
+    return PreviewRuleUseCase(SQLBudgetRepository(session))
 
 @router.get("/rules", response_model=ResponseEnvelope[List[Rule]])
 async def get_rules(
@@ -36,9 +47,35 @@ async def add_rule(
     use_case: ManageRulesUseCase = Depends(get_manage_rules_use_case),
     user: dict = Depends(get_current_user)
 ):
-    await use_case.add_rule(rule.pattern, rule.category)
+    try:
+        await use_case.add_rule(rule.pattern, rule.category)
+    except RulePatternError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return ResponseEnvelope.success(data={"status": "ok"})
 
+@router.post("/rules/preview", response_model=ResponseEnvelope[RulePreview])
+async def preview_rule(
+    request: RulePreviewRequest,
+    use_case: PreviewRuleUseCase = Depends(get_preview_rule_use_case),
+    user: dict = Depends(get_current_user)
+):
+    # Dry run: nothing is stored
+    try:
+        preview = await use_case.execute(request.pattern)
+    except RulePatternError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PreviewBusyError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return ResponseEnvelope.success(data=preview)
+
+@router.get("/rules/recategorization", response_model=ResponseEnvelope[Optional[dict]])
+async def get_recategorization_status(
+    user: dict = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    # Progress of re-applying the latest rule change to stored transactions (None if never requested)
+    return ResponseEnvelope.success(data=await RecategorizationQueue(session).status(get_tenant_id()))
+
 @router.delete("/rules/{rule_id}", response_model=ResponseEnvelope[dict])
 async def delete_rule(
     rule_id: int,
@@ -4,18 +4,66 @@ from sqlalchemy import select
 from src.interface.dependencies import get_db, get_current_user
 from src.infrastructure.models import TenantModel
 from src.domain.user import User, UserRole
-from pydantic import BaseModel, ConfigDict
-from typing import Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+from typing import Optional, Dict, Any, List
 from src.interface.envelope import ResponseEnvelope
+from src.application.gap_engine import DEFAULT_GAP_THRESHOLDS
 
 router = APIRouter(tags=["Settings"])
 
+class ProjectBudgetSetting(BaseModel):
+    total_budget: float = Field(gt=0)
+    start_month: str = Field(pattern=r"^\d{4}-(0[1-9]|1[0-2])$") # YYYY-MM
+    duration_months: int = Field(gt=0, le=240)
+
+class PlannedCapexSetting(BaseModel):
+    amount: float = Field(gt=0)
+    planned_month: str = Field(pattern=r"^\d{4}-(0[1-9]|1[0-2])$") # YYYY-MM
+    description: Optional[str] = None
+
 class SettingsUpdate(BaseModel):
     currency: Optional[str] = None
     forecast_horizon: Optional[int] = None
+    forecast_mode: Optional[str] = Field(None, pattern=r"^(independent|hierarchical)$") # Hierarchical reconciles category/project forecasts to the total
+    trend_granularity: Optional[str] = Field(None, pattern=r"^(day|week|month|quarter)$") # Bucket size of trends and their forecasts
+    fiscal_year_start_month: Optional[int] = Field(None, ge=1, le=12) # Quarters follow the fiscal year
     theme: Optional[str] = None
     budget_threshold: Optional[int] = None
     merge_strategy: Optional[str] = None # 'latest' | 'blended' | 'combined'
+    merchant_exact_limit: Optional[int] = Field(None, ge=0) # Rows above which merchant totals use sketches
+    merchant_sketch_epsilon: Optional[float] = Field(None, gt=0, le=0.1) # Sketch error bound (fraction of spend)
+    gap_thresholds: Optional[Dict[str, Optional[int]]] = None # Days per dimension; 0/null disables
+    anomaly_sensitivity: Optional[float] = Field(None, ge=1, le=10) # Robust z-score threshold; lower flags more
+    category_keywords: Optional[Dict[str, List[str]]] = None # Extra description keywords per category
+    project_budgets: Optional[Dict[str, ProjectBudgetSetting]] = None # Projects forecast with the S-curve
+    capex_plan: Optional[List[PlannedCapexSetting]] = Field(None, max_length=500) # Planned purchases for the CapEx forecast
+
+    @field_validator("category_keywords")
+    @classmethod
+    def validate_category_keywords(cls, value: Optional[Dict[str, List[str]]]):
+        if value is None:
+            return value
+        cleaned = {}
+        for category, keywords in value.items():
+            words = [kw.strip().lower() for kw in keywords if kw.strip()]
+            if not category.strip() or not words:
+                raise ValueError("Each category needs a name and at least one keyword")
+            cleaned[category.strip()] = words
+        if sum(len(words) for words in cleaned.values()) > 500:
+            raise ValueError("At most 500 custom keywords are allowed")
+        return cleaned
+
+    @field_validator("gap_thresholds")
+    @classmethod
+    def validate_gap_thresholds(cls, value: Optional[Dict[str, Optional[int]]]):
+        if value is None:
+            return value
+        unknown = set(value) - set(DEFAULT_GAP_THRESHOLDS)
+        if unknown:
+            raise ValueError(f"Unknown gap dimensions: {sorted(unknown)}")
+        if any(days is not None and days < 0 for days in value.values()):
+            raise ValueError("Gap thresholds must be >= 0")
+        return value
 
 class AuthConfigUpdate(BaseModel):
     enabled: bool
@@ -8,6 +8,7 @@ from src.interface.router import router as api_router
 from src.interface.export_router import router as export_router
 from src.interface.query_router import router as query_router
 from src.interface.rule_router import router as rule_router
+from src.interface.duplicate_router import router as duplicate_router
 from src.interface.middleware import LoggingMiddleware
 
 
@@ -25,41 +26,107 @@ structlog.configure(
     logger_factory=structlog.PrintLoggerFactory(),
 )
 
-import asyncio
+import os
+from datetime import timedelta
 from src.infrastructure.db import AsyncSessionLocal
+from src.infrastructure.scheduler import JobScheduler, ScheduledJob
 from src.application.cleanup_service import CleanupService
+from src.application.analysis_cache import analysis_cache
+from src.application.forecast_cache import forecast_cache
+from src.application.forecast_engine import shutdown_fit_pool
+from src.application.instrumentation import metrics as stage_histograms
+from src.application.precompute_service import AnalysisPrecomputeService
+from src.application.expense_type_backfill import ExpenseTypeBackfillService
+from src.application.recategorization import RecategorizationService
+from src.application.merchant_backfill import MerchantBackfillService
+
+def _parse_hour_window(value: str):
+    # "1-5" -> (1, 5); empty -> no restriction
+    if not value:
+        return None
+    start, end = value.split("-")
+    return int(start), int(end)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Background Task for Cleanup
+    # Background Jobs (cleanup, cache warming)
     logger = structlog.get_logger()
     
-    async def run_cleanup_loop():
-        while True:
-            try:
-                # logger.info("running_background_cleanup")
-                async with AsyncSessionLocal() as session:
-                    service = CleanupService(session)
-                    count = await service.cleanup_expired_guests()
-                    if count > 0:
-                        logger.info("background_cleanup_completed", deleted_tenants=count)
-            except Exception as e:
-                logger.error("background_cleanup_error", error=str(e))
-                
-            # Run every hour
-            await asyncio.sleep(3600)
-
-    # Start loop
-    cleanup_task = asyncio.create_task(run_cleanup_loop())
+    async def run_guest_cleanup():
+        async with AsyncSessionLocal() as session:
+            service = CleanupService(session)
+            count = await service.cleanup_expired_guests()
+            if count > 0:
+                logger.info("background_cleanup_completed", deleted_tenants=count)
+            return count
+
+    precompute = AnalysisPrecomputeService(
+        AsyncSessionLocal,
+        analysis_cache,
+        active_window=timedelta(days=int(os.getenv("PRECOMPUTE_ACTIVE_DAYS", "7"))),
+        concurrency=int(os.getenv("PRECOMPUTE_CONCURRENCY", "2")),
+    )
+
+    scheduler = JobScheduler(max_concurrency=int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "2")))
+    # Run every hour
+    scheduler.register(ScheduledJob(
+        name="guest_cleanup",
+        func=run_guest_cleanup,
+        interval_seconds=3600,
+        jitter_seconds=60,
+    ))
+    # Off-peak warm-up so the first dashboard load of the day hits the cache
+    scheduler.register(ScheduledJob(
+        name="analysis_precompute",
+        func=precompute.run,
+        interval_seconds=float(os.getenv("PRECOMPUTE_INTERVAL_SECONDS", "3600")),
+        jitter_seconds=300,
+        initial_delay_seconds=60,
+        window_hours=_parse_hour_window(os.getenv("PRECOMPUTE_WINDOW_HOURS", "1-6")),
+    ))
+    # Classify rows stored before ingest-time CapEx/OpEx classification (no-op once done)
+    backfill = ExpenseTypeBackfillService(
+        AsyncSessionLocal,
+        batch_size=int(os.getenv("EXPENSE_BACKFILL_BATCH_SIZE", "5000")),
+    )
+    scheduler.register(ScheduledJob(
+        name="expense_type_backfill",
+        func=backfill.run,
+        interval_seconds=float(os.getenv("EXPENSE_BACKFILL_INTERVAL_SECONDS", "900")),
+        jitter_seconds=60,
+        initial_delay_seconds=30,
+    ))
+    # Link rows stored before ingest-time merchant resolution (no-op once done)
+    merchant_backfill = MerchantBackfillService(
+        AsyncSessionLocal,
+        batch_size=int(os.getenv("MERCHANT_BACKFILL_BATCH_SIZE", "5000")),
+    )
+    scheduler.register(ScheduledJob(
+        name="merchant_backfill",
+        func=merchant_backfill.run,
+        interval_seconds=float(os.getenv("MERCHANT_BACKFILL_INTERVAL_SECONDS", "900")),
+        jitter_seconds=60,
+        initial_delay_seconds=45,
+    ))
+    # Re-apply rules to stored transactions after they change (no-op when nothing is queued)
+    recategorize = RecategorizationService(
+        AsyncSessionLocal,
+        batch_size=int(os.getenv("RECATEGORIZE_BATCH_SIZE", "2000")),
+    )
+    scheduler.register(ScheduledJob(
+        name="recategorization",
+        func=recategorize.run,
+        interval_seconds=float(os.getenv("RECATEGORIZE_INTERVAL_SECONDS", "30")),
+        jitter_seconds=5,
+    ))
+    app.state.scheduler = scheduler
+    scheduler.start()
     
     yield
     
-    # Cancel loop on shutdown
-    cleanup_task.cancel()
-    try:
-        await cleanup_task
-    except asyncio.CancelledError:
-        pass
+    # Cancel jobs on shutdown, then stop the forecast fit workers
+    await scheduler.stop()
+    shutdown_fit_pool()
 
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
@@ -107,9 +174,23 @@ app.include_router(api_router, prefix="/api/v1", dependencies=[RequireAuth])
 app.include_router(export_router, prefix="/api/v1", dependencies=[RequireAuth])
 app.include_router(query_router, prefix="/api/v1", dependencies=[RequireAuth])
 app.include_router(rule_router, prefix="/api/v1", dependencies=[RequireAuth])
+app.include_router(duplicate_router, prefix="/api/v1", dependencies=[RequireAuth])
 app.include_router(settings_router, prefix="/api/v1", dependencies=[RequireAuth])
 app.include_router(ai_chat_router, prefix="/api/v1", dependencies=[RequireAuth])
 
 @app.get("/health")
 async def health_check():
     return {"status": "ok"}
+
+@app.get("/api/v1/jobs/metrics", dependencies=[RequireAuth])
+async def job_metrics(request: Request):
+    scheduler = getattr(request.app.state, "scheduler", None)
+    return ResponseEnvelope.success(data={
+        "jobs": scheduler.metrics() if scheduler else {},
+        "analysis_cache": analysis_cache.stats(),
+        "forecast_cache": forecast_cache.stats()
+    })
+
+@app.get("/api/v1/metrics/stages", dependencies=[RequireAuth])
+async def stage_metrics():
+    return ResponseEnvelope.success(data=stage_histograms.snapshot())
@@ -0,0 +1,45 @@
+import uuid
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock
+from src.domain.budget import BudgetEntry
+from src.application.analysis_cache import AnalysisCache
+from src.application.analyze_budget import AnalyzeBudgetUseCase
+from src.application.context import set_tenant_id
+
+
+@pytest.mark.asyncio
+async def test_analysis_served_from_cache_until_invalidated():
+    tenant_id = uuid.uuid4()
+    set_tenant_id(tenant_id)
+    repo = AsyncMock()
+    repo.get_all.return_value = [
+        BudgetEntry(date=date(2025, 1, 1), category="Food", amount=Decimal("10.0"), description="Lunch")
+    ]
+    cache = AnalysisCache()
+    use_case = AnalyzeBudgetUseCase(repo, cache)
+
+    first = await use_case.execute(settings={"forecast_horizon": 3})
+    second = await use_case.execute(settings={"forecast_horizon": 3})
+    assert repo.get_all.await_count == 1
+    assert second.total_expenses == first.total_expenses
+    assert second is not first
+
+    # Different settings -> miss
+    await use_case.execute(settings={"forecast_horizon": 6})
+    assert repo.get_all.await_count == 2
+
+    use_case.invalidate()
+    await use_case.execute(settings={"forecast_horizon": 6})
+    assert repo.get_all.await_count == 3
+    assert cache.stats()["hits"] == 1
+
+
+def test_stale_put_is_rejected():
+    tenant_id = uuid.uuid4()
+    cache = AnalysisCache()
+    version = cache.version(tenant_id)
+    cache.invalidate(tenant_id)  # upload lands while a warm-up is computing
+    assert cache.put(tenant_id, {}, AsyncMock(), version) is False
+    assert cache.get(tenant_id, {}) is None
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from src.domain.budget import BudgetEntry
+from src.application.anomaly_engine import AnomalyEngine, resolve_anomaly_sensitivity
+from src.application.ledger_columns import LedgerColumns, group_median
+import numpy as np
+
+
+def _entry(day: int, description: str, amount: str, category="Cloud") -> BudgetEntry:
+    return BudgetEntry(date=date(2025, 1, 1) + timedelta(days=day), category=category,
+                       amount=Decimal(amount), description=description)
+
+
+def test_group_median_matches_numpy():
+    rng = np.random.default_rng(3)
+    values = rng.normal(size=200)
+    groups = rng.integers(0, 7, size=200)
+    medians = group_median(values, groups, 8)
+    for g in range(7):
+        assert np.isclose(medians[g], np.median(values[groups == g]))
+    assert np.isnan(medians[7])
+
+
+def test_spike_is_flagged_against_robust_merchant_baseline():
+    # The spike would inflate a mean-based baseline; median/MAD is unaffected
+    amounts = ["100.00", "104.00", "98.00", "101.00", "97.00", "103.00", "2500.00"]
+    entries = [_entry(i * 30, "AWS", a) for i, a in enumerate(amounts)]
+    anomalies = AnomalyEngine().detect(LedgerColumns(entries))
+
+    assert len(anomalies) == 1
+    spike = anomalies[0]
+    assert spike.amount == 2500.0
+    assert spike.average == 101.0
+    assert spike.dimension == "merchant"
+    assert spike.score > 10
+
+
+def test_identical_charges_fall_back_to_mean_deviation():
+    entries = [_entry(i, "Zoom", "15.00") for i in range(6)] + [_entry(7, "Zoom", "90.00")]
+    anomalies = AnomalyEngine().detect(LedgerColumns(entries))
+    assert [a.amount for a in anomalies] == [90.0]
+
+
+def test_category_baseline_and_sensitivity():
+    # Each merchant appears once; only the category baseline can catch the outlier
+    entries = [_entry(i, f"Vendor {chr(65 + i)}", "200.00", category="Hardware") for i in range(5)]
+    entries += [_entry(i, f"Vendor {chr(65 + i)}", "210.00", category="Hardware") for i in range(5, 8)]
+    entries.append(_entry(9, "Vendor Z", "900.00", category="Hardware"))
+    entries.append(_entry(9, "Card payment", "5000.00", category="Payment"))
+
+    anomalies = AnomalyEngine().detect(LedgerColumns(entries))
+    assert [(a.description, a.dimension) for a in anomalies] == [("Vendor Z", "category")]
+
+    assert resolve_anomaly_sensitivity({"anomaly_sensitivity": 6}) == 6.0
+    assert resolve_anomaly_sensitivity({}) == 3.5
+
+
+def test_small_groups_are_not_scored():
+    entries = [_entry(0, "Dell", "100.00", "Misc"), _entry(1, "Dell", "5000.00", "Misc2")]
+    assert AnomalyEngine().detect(LedgerColumns(entries)) == []
@@ -1,8 +1,12 @@
 import pytest
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
 from src.application.cleanup_service import CleanupService
-from src.infrastructure.models import TenantModel, UserModel, SessionModel
+from src.infrastructure.models import Base, BudgetModel, DuplicateCandidateModel, MerchantModel, TenantModel, UserModel, SessionModel
 from src.domain.user import UserRole
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 from uuid import uuid4
 
 @pytest.mark.asyncio
@@ -72,3 +76,40 @@ async def test_cleanup_expired_guests(db_session):
     
     permanent = await db_session.get(TenantModel, permanent_tenant.id)
     assert permanent is not None
+
+
+@pytest.mark.asyncio
+async def test_cleanup_deletes_dependent_rows_with_foreign_keys_enforced(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/cleanup.db")
+    # SQLite only checks foreign keys when asked to, as Postgres always does
+    event.listen(engine.sync_engine, "connect", lambda conn, _: conn.execute("PRAGMA foreign_keys=ON"))
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    tenant_id = uuid4()
+    async with session_factory() as session:
+        session.add(TenantModel(id=tenant_id, name="Guest Organization Expired", domain="guest-fk.local",
+                                created_at=datetime.utcnow() - timedelta(hours=25)))
+        await session.flush()
+        session.add(UserModel(id=uuid4(), tenant_id=tenant_id, email="fk@guest.local", role=UserRole.VIEWER))
+        merchant = MerchantModel(tenant_id=tenant_id, name="netflix", aliases=["NETFLIX.COM"])
+        session.add(merchant)
+        await session.flush()
+        entries = [BudgetModel(tenant_id=tenant_id, date=date(2025, 1, 1), category="Software",
+                               amount=Decimal("10.00"), description=description, merchant_id=merchant.id)
+                   for description in ("NETFLIX.COM", "Netflix.com")]
+        session.add_all(entries)
+        await session.flush()
+        session.add(DuplicateCandidateModel(tenant_id=tenant_id, entry_id=entries[1].id,
+                                            duplicate_of_id=entries[0].id, similarity=0.95))
+        await session.commit()
+
+    async with session_factory() as session:
+        assert await CleanupService(session).cleanup_expired_guests() == 1
+
+    async with session_factory() as session:
+        assert await session.get(TenantModel, tenant_id) is None
+        for model in (DuplicateCandidateModel, MerchantModel, BudgetModel, UserModel):
+            assert (await session.execute(select(func.count()).select_from(model))).scalar() == 0
+    await engine.dispose()
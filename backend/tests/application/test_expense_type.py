@@ -0,0 +1,83 @@
+import uuid
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from src.domain.budget import BudgetEntry
+from src.application.analysis_cache import AnalysisCache
+from src.application.analysis_services import classify_expense, classify_expense_batch
+from src.application.expense_type_backfill import ExpenseTypeBackfillService
+from src.application.upload_budget import UploadBudgetUseCase
+from src.infrastructure.models import Base, BudgetModel, TenantModel
+
+ROWS = [
+    ("Server installation", 500.0, "Misc"),
+    ("Monthly hosting", 500.0, "Hardware"),
+    ("Dell", 900.0, "Hardware"),
+    ("Figma", 45.0, "Software"),
+    ("Mystery vendor", 25000.0, "Misc"),
+    ("Mystery vendor", -25000.0, "Misc"),
+    ("Mystery vendor", 250.0, "Misc"),
+    ("Hardware support contract", 100.0, "Misc"),
+]
+
+
+def test_batch_matches_row_classifier():
+    descriptions, amounts, categories = zip(*ROWS)
+    expected = [classify_expense(d, a, c) for d, a, c in ROWS]
+    assert classify_expense_batch(descriptions, amounts, categories) == expected
+    assert expected == ["capex", "opex", "capex", "opex", "capex", "capex", "opex", "opex"]
+    assert classify_expense_batch([], [], []) == []
+
+
+@pytest.mark.asyncio
+async def test_upload_stamps_expense_type_before_saving():
+    entries = [
+        BudgetEntry(date=date(2025, 1, 1), category="Hardware", amount=Decimal("1200.00"), description="Dell monitor"),
+        BudgetEntry(date=date(2025, 1, 2), category="Software", amount=Decimal("20.00"), description="Slack"),
+    ]
+    parser = Mock()
+    parser.parse.return_value = (entries, [])
+    analyzer = Mock()
+    analyzer.execute = AsyncMock(return_value=Mock())
+    repo = AsyncMock()
+
+    await UploadBudgetUseCase(repo, parser, analyzer).execute(b"x", filename="jan.xlsx")
+
+    saved = repo.save_bulk.await_args.args[0]
+    assert [(e.expense_type, e.source_file) for e in saved] == [("capex", "jan.xlsx"), ("opex", "jan.xlsx")]
+
+
+@pytest.mark.asyncio
+async def test_backfill_classifies_null_rows_in_batches(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/backfill.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    tenant_id = uuid.uuid4()
+    async with session_factory() as session:
+        session.add(TenantModel(id=tenant_id, name="T", domain="t.local",
+                                settings={"category_keywords": {"Hardware": ["widget"]}}))
+        for i in range(7):
+            session.add(BudgetModel(tenant_id=tenant_id, date=date(2025, 1, 1 + i), category="Misc",
+                                    amount=Decimal("10.00"), description="Server setup" if i % 2 else "Coffee"))
+        session.add(BudgetModel(tenant_id=tenant_id, date=date(2025, 2, 1), category="Misc",
+                                amount=Decimal("10.00"), description="Coffee", expense_type="capex"))
+        await session.commit()
+
+    cache = AnalysisCache()
+    service = ExpenseTypeBackfillService(session_factory, cache, batch_size=3, max_batches_per_run=2)
+    first = await service.run()
+    assert first == {"classified": 6, "batches": 2, "complete": False}
+    second = await service.run()
+    assert second == {"classified": 1, "batches": 1, "complete": True}
+    assert cache.version(tenant_id) == 3  # invalidated after every batch that wrote rows
+
+    async with session_factory() as session:
+        types = (await session.execute(select(BudgetModel.description, BudgetModel.expense_type).order_by(BudgetModel.id))).all()
+    assert [t for _, t in types] == ["opex", "capex", "opex", "capex", "opex", "capex", "opex", "capex"]
+    await engine.dispose()
@@ -0,0 +1,65 @@
+import copy
+from decimal import Decimal
+import numpy as np
+from src.application.analysis_services import ForecastService
+from src.application.forecast_cache import MAX_INCREMENTAL_MONTHS, ForecastCache, series_fingerprint
+from src.application.forecast_engine import ForecastEngine
+
+
+def _history(values):
+    return [{"month": "m", "amount": Decimal(str(v)), "sort_key": f"{2020 + i // 12}-{i % 12 + 1:02d}"}
+            for i, v in enumerate(values)]
+
+
+HISTORIES = [_history([100 + 7 * i + (i % 12) * 5 for i in range(30)]), _history([40, 55, 61]), _history([9])]
+
+
+def test_cached_forecasts_match_uncached_at_any_horizon():
+    cache = ForecastCache()
+    for periods in (6, 12, 3, 60):
+        cached, fresh = copy.deepcopy(HISTORIES), copy.deepcopy(HISTORIES)
+        assert ForecastService.append_forecasts(cached, periods, cache=cache) == ForecastService.append_forecasts(fresh, periods)
+        assert cached == fresh
+    # Fitted once at the full horizon; every later horizon is a slice (short series are never
+    # cached). Each fit is stored with its state one month earlier.
+    assert cache.stats() == {"entries": 4, "hits": 6, "misses": 2, "updates": 0, "hit_rate": 0.75}
+
+
+def test_changed_series_is_refitted_alone():
+    cache = ForecastCache()
+    ForecastService.append_forecasts(copy.deepcopy(HISTORIES), 6, cache=cache)
+    changed = copy.deepcopy(HISTORIES)
+    changed[0][3]["amount"] = Decimal("1")
+    ForecastService.append_forecasts(changed, 6, cache=cache)
+    assert (cache.hits, cache.misses, cache.updates) == (1, 3, 0)
+
+
+def test_new_and_revised_months_advance_the_cached_state():
+    values = [float(100 + 7 * i + (i % 12) * 5) for i in range(30)]
+    cache = ForecastCache()
+    fit = ForecastService.fit_series([values], 6, cache=cache)[0]
+
+    # The partial latest month is revised, then the month closes and a new one starts
+    for calls, (series, updates) in enumerate(((values[:-1] + [200.0], 1), (values[:-1] + [210.0, 90.0], 3)), 2):
+        advanced = ForecastService.fit_series([series], 6, cache=cache)[0]
+        refit = ForecastEngine.fixed(fit.alpha, fit.beta, fit.gamma).fit([series], 60)[0]
+        assert cache.updates == updates and cache.misses == calls
+        assert (advanced.level, advanced.trend, advanced.length) == (refit.level, refit.trend, refit.length)
+        np.testing.assert_array_equal(advanced.path, refit.path)
+        assert np.isclose(advanced.sigma, refit.sigma) and np.isclose(advanced.mape, refit.mape)
+        assert advanced.refit_length == 30
+
+    # Parameters are searched again once the state has been advanced too far
+    long_history = values + [values[-1]] * (MAX_INCREMENTAL_MONTHS + 1)
+    for length in range(31, len(long_history) + 1):
+        fit = ForecastService.fit_series([long_history[:length]], 6, cache=cache)[0]
+    assert fit.refit_length == len(long_history)
+
+
+def test_lru_eviction_and_parameter_keys():
+    cache = ForecastCache(max_entries=2)
+    keys = [series_fingerprint([1.0, float(i)], ("holt_winters", 0.6)) for i in range(3)]
+    for key in keys:
+        cache.put(key, np.zeros(60))
+    assert cache.get(keys[0]) is None and cache.get(keys[2]) is not None
+    assert series_fingerprint([1.0, 2.0], ("holt_winters", 0.6)) != series_fingerprint([1.0, 2.0], ("holt_winters", 0.7))
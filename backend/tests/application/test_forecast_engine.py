@@ -0,0 +1,156 @@
+import numpy as np
+from concurrent.futures.process import BrokenProcessPool
+from decimal import Decimal
+from src.application import forecast_engine
+from src.application.analysis_services import ForecastService
+from src.application.forecast_engine import ForecastEngine, bootstrap_bounds, shutdown_fit_pool
+
+
+def _scalar_smoothing(values, periods, alpha=0.6, beta=0.3, gamma=0.3, season_length=12):
+    """Per-series recurrences (reference for the batched engine with fixed parameters)."""
+    n = len(values)
+    if n < season_length + 1:
+        level, trend = values[0], values[1] - values[0]
+        for val in values[1:]:
+            last_level, last_trend = level, trend
+            level = alpha * val + (1 - alpha) * (last_level + last_trend)
+            trend = beta * (level - last_level) + (1 - beta) * last_trend
+        return [max(0, level + k * trend) for k in range(1, periods + 1)]
+
+    first_season_avg = np.mean(values[:season_length])
+    season = [values[i] / first_season_avg if first_season_avg > 0 else 1.0 for i in range(season_length)]
+    level = first_season_avg
+    trend = (np.mean(values[season_length:2 * season_length]) - np.mean(values[:season_length])) / season_length
+    for t in range(season_length, n):
+        val = values[t]
+        last_level, last_trend = level, trend
+        season_idx = t % season_length
+        s_factor = season[season_idx] if season[season_idx] > 0 else 1.0
+        level = alpha * (val / s_factor) + (1 - alpha) * (last_level + last_trend)
+        trend = beta * (level - last_level) + (1 - beta) * last_trend
+        season[season_idx] = gamma * (val / level) + (1 - gamma) * season[season_idx]
+    return [max(0, (level + k * trend) * season[(n + k - 1) % season_length]) for k in range(1, periods + 1)]
+
+
+def _history(values):
+    return [{"month": "m", "amount": Decimal(f"{v:.2f}"), "sort_key": f"{2020 + i // 12}-{i % 12 + 1:02d}"}
+            for i, v in enumerate(values)]
+
+
+def _random_series(seed=7, lengths=range(0, 40), repeats=3):
+    rng = np.random.default_rng(seed)
+    series = []
+    for length in list(lengths) * repeats:
+        base = rng.uniform(0, 5000)
+        season = 1 + 0.4 * np.sin(np.arange(length) * np.pi / 6)
+        noise = rng.normal(0, base * 0.2, length)
+        values = np.maximum(0, base * season + noise + rng.uniform(-50, 50) * np.arange(length))
+        if length and rng.random() < 0.2:
+            values[: min(length, 12)] = 0  # empty first season
+        series.append([float(Decimal(f"{v:.2f}")) for v in values])
+    return series
+
+
+def test_fixed_parameters_match_scalar_recurrences_bit_for_bit():
+    series = _random_series()
+    fits = ForecastEngine.fixed(0.6, 0.3, 0.3).fit(series, 18)
+    for values, fit in zip(series, fits):
+        if len(values) < 2:
+            assert fit is None
+        else:
+            assert fit.forecast(18).tolist() == [float(v) for v in _scalar_smoothing(values, 18)]
+
+
+def test_grid_fit_beats_default_parameters_and_reports_errors():
+    series = _random_series(seed=3, lengths=range(8, 40, 4))
+    fitted = ForecastEngine().fit(series, 6)
+    default = ForecastEngine.fixed(0.6, 0.3, 0.3).fit(series, 6)
+    for values, fit, fixed in zip(series, fitted, default):
+        assert fit.model == ("holt_winters" if len(values) > 12 else "holt")
+        assert fit.sigma <= fixed.sigma + 1e-9
+        assert 0 <= fit.mape and fit.sigma >= 0
+    assert any(fit.alpha != 0.6 for fit in fitted)
+
+
+def test_process_pool_matches_in_process_fit():
+    series = _random_series(seed=5, lengths=range(2, 30), repeats=1)
+    serial = ForecastEngine(workers=1).fit(series, 12)
+    parallel = ForecastEngine(workers=2, chunk_size=8).fit(series, 12)
+    for a, b in zip(serial, parallel):
+        assert (a.alpha, a.beta, a.gamma, a.sigma) == (b.alpha, b.beta, b.gamma, b.sigma)
+        np.testing.assert_array_equal(a.path, b.path)
+
+
+def test_fit_pools_are_sized_per_engine_and_shut_down(monkeypatch):
+    series = _random_series(seed=5, lengths=range(2, 30), repeats=1)
+    ForecastEngine(workers=2, chunk_size=8).fit(series, 12)
+    ForecastEngine(workers=3, chunk_size=8).fit(series, 12)
+    pools = dict(forecast_engine._pools)
+    assert {workers: pool._max_workers for workers, pool in pools.items()} == {2: 2, 3: 3}
+
+    # A broken pool is shut down, not just dropped, and the fit falls back in-process
+    def broken(*args):
+        raise BrokenProcessPool("worker died")
+    monkeypatch.setattr(pools[3], "map", broken)
+    assert len(ForecastEngine(workers=3, chunk_size=8).fit(series, 12)) == len(series)
+    assert 3 not in forecast_engine._pools and pools[3]._shutdown_thread
+
+    processes = list(pools[2]._processes.values())
+    shutdown_fit_pool()
+    assert forecast_engine._pools == {}
+    for process in processes:
+        process.join(timeout=10)
+        assert not process.is_alive()
+
+
+def test_bootstrap_bounds_are_seeded_per_series_and_track_the_noise():
+    rng = np.random.default_rng(0)
+    noisy = list(1000 + rng.normal(0, 50, 120))
+    series = [noisy, [100.0, 110.0, 120.0, 130.0], list(rng.uniform(0, 100, 30))]
+    fits = ForecastEngine(workers=1).fit(series, 12)
+
+    lower, upper = bootstrap_bounds(fits, 12, paths=2000)
+    again = bootstrap_bounds([None, fits[0]], 12, paths=2000)
+    np.testing.assert_array_equal(again[0][1], lower[0])  # independent of the batch it is in
+    assert not again[0][0].any() and not again[1][0].any()
+    assert not np.array_equal(bootstrap_bounds(fits, 12, paths=2000, seed=1)[0], lower)
+
+    # One step ahead the interval spans about +-1.96 sigma of the residuals; it widens with the horizon
+    assert abs((upper[0, 0] - lower[0, 0]) / (2 * 1.96 * fits[0].sigma) - 1) < 0.15
+    assert upper[0, -1] - lower[0, -1] > upper[0, 0] - lower[0, 0]
+    # A perfect fit has no residuals to resample
+    np.testing.assert_allclose(lower[1], fits[1].forecast(12))
+    np.testing.assert_allclose(upper[1], fits[1].forecast(12))
+    assert np.all(lower <= np.stack([f.forecast(12) for f in fits])) and np.all(lower >= 0)
+
+
+def test_append_forecasts_formats_points_and_summaries():
+    histories = [_history([100, 110, 120]), _history([]), _history([5]), _history([100, 130, 110, 150, 120, 160])]
+    summaries = ForecastService.append_forecasts(histories, periods=3)
+
+    points = histories[0][3:]
+    assert [p["sort_key"] for p in points] == ["2020-04", "2020-05", "2020-06"]
+    assert [p["month"] for p in points] == ["Apr 2020", "May 2020", "Jun 2020"]
+    assert [p["amount"] for p in points] == [Decimal("130.00"), Decimal("140.00"), Decimal("150.00")]
+    # A perfect fit has no error, so no interval
+    assert points[0]["lower_bound"] == points[0]["upper_bound"] == Decimal("130.00")
+    assert summaries[0] == {
+        "trend_direction": "Increasing ↗",
+        "forecasted_total": Decimal("420.00"),
+        "growth_rate": Decimal("25.00"),
+        "model_accuracy": Decimal("100.00"),
+        "confidence_interval_width": Decimal("0.00"),
+        "seasonality_index": Decimal("0.00"),
+        "trend_component": Decimal("10.00"),
+        "level_component": Decimal("120.00"),
+        "outlier_detected": False,
+    }
+
+    # Too short to forecast: untouched
+    assert histories[1] == [] and len(histories[2]) == 1
+    assert summaries[1]["trend_direction"] == summaries[2]["trend_direction"] == "Insufficient Data"
+
+    noisy = summaries[3]
+    assert 0 < noisy["model_accuracy"] < 100
+    assert noisy["confidence_interval_width"] > 0
+    assert all(p["lower_bound"] < p["amount"] < p["upper_bound"] for p in histories[3][6:])
@@ -0,0 +1,109 @@
+import time
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock
+import numpy as np
+from src.application.analysis_services import reconcile_forecasts
+from src.application.analyze_budget import AnalyzeBudgetUseCase
+from src.application.forecast_hierarchy import ForecastHierarchy
+from src.application.ledger_columns import LedgerColumns
+from src.domain.budget import BudgetEntry
+
+
+def _entry(year, month, category, amount, project="General"):
+    return BudgetEntry(date=date(year, month, 10), category=category, amount=Decimal(amount),
+                       description=f"{category} spend", project=project)
+
+
+def _ledger(months=20):
+    entries = []
+    for i in range(months):
+        year, month = 2023 + i // 12, i % 12 + 1
+        entries.append(_entry(year, month, "Software", -(1000 + 40 * i + 150 * (month == 12)), "Platform"))
+        entries.append(_entry(year, month, "Travel", -(300 + 25 * ((i * 7) % 5)), "Sales"))
+        entries.append(_entry(year, month, "Payment", 5000))
+        if i >= 6:
+            entries.append(_entry(year, month, "Software", -(200 + 10 * i), "Sales"))
+    return entries
+
+
+def test_hierarchy_series_and_summing_matrix():
+    hierarchy = ForecastHierarchy.from_columns(LedgerColumns(_ledger(8)), ["Software", "Travel"], ["Platform", "Sales"])
+
+    # total, 2 categories, 2 projects, 3 category x project series
+    assert len(hierarchy.series) == 8
+    assert sorted(map(tuple, hierarchy.parents.tolist())) == [(0, 1, 3), (0, 1, 4), (0, 2, 4)]
+    assert hierarchy.series[0][0] == 1300 and hierarchy.series[1][-1] == 1280 + 270  # payments excluded
+    # Software x Sales only starts in month 7
+    assert sorted(len(s) for s in hierarchy.series[5:]) == [2, 8, 8]
+
+    empty = ForecastHierarchy.from_columns(LedgerColumns([_entry(2024, 1, "Payment", 10)]), [], [])
+    assert empty.parents.shape == (0, 3) and len(empty.series) == 1 and empty.series[0].size == 0
+
+
+def test_reconciliation_is_coherent_and_keeps_consistent_forecasts():
+    parents = np.array([[0], [0]])
+    coherent = np.array([[30.0, 33.0], [10.0, 11.0], [20.0, 22.0]])
+    np.testing.assert_allclose(reconcile_forecasts(parents, coherent, np.ones(3)), coherent)
+
+    base = np.array([[40.0], [10.0], [20.0]])
+    reconciled = reconcile_forecasts(parents, base, np.array([1.0, 10.0, 10.0]))
+    assert reconciled[0, 0] == pytest.approx(reconciled[1, 0] + reconciled[2, 0])
+    # The precise total moves least
+    assert abs(reconciled[0, 0] - 40) < abs(reconciled[1, 0] - 10)
+
+
+def _random_hierarchy(rng, categories, projects, bottom):
+    parents = np.column_stack([np.zeros(bottom, dtype=np.int64), 1 + rng.integers(-1, categories, bottom),
+                               1 + categories + rng.integers(-1, projects, bottom)])
+    parents[parents[:, 1] == 0, 1] = -1
+    parents[parents[:, 2] == categories, 2] = -1
+    aggregates = 1 + categories + projects
+    base = rng.gamma(2.0, 100.0, (aggregates + bottom, 6))
+    sigma = rng.gamma(2.0, 20.0, aggregates + bottom)
+    unmodeled = rng.random(aggregates + bottom) < 0.15
+    sigma[unmodeled], base[unmodeled] = np.inf, 0.0
+    return parents, base, sigma
+
+
+def test_reconciliation_matches_dense_weighted_least_squares():
+    rng = np.random.default_rng(7)
+    for _ in range(5):
+        parents, base, sigma = _random_hierarchy(rng, categories=6, projects=4, bottom=30)
+        summing = np.zeros((base.shape[0], len(parents)))
+        for level in parents.T:
+            summing[level[level >= 0], np.flatnonzero(level >= 0)] = 1
+        summing[11:] = np.eye(len(parents))
+        weights = 1 / np.maximum(sigma, 0.01)[:, None]
+        bottom, *_ = np.linalg.lstsq(summing * weights, base * weights, rcond=None)
+
+        np.testing.assert_allclose(reconcile_forecasts(parents, base, sigma), summing @ bottom, atol=0.005)
+
+
+def test_reconciliation_scales_with_the_aggregates_not_the_bottom_series():
+    # Benchmark guard: the dense least-squares solve took ~30s at this size
+    parents, base, sigma = _random_hierarchy(np.random.default_rng(3), categories=200, projects=114, bottom=3862)
+    start = time.perf_counter()
+    reconciled = reconcile_forecasts(parents, base, sigma)
+    assert time.perf_counter() - start < 1.0
+    np.testing.assert_allclose(reconciled[0], reconciled[315:].sum(axis=0))
+
+
+@pytest.mark.asyncio
+async def test_hierarchical_mode_forecasts_add_up():
+    result = await AnalyzeBudgetUseCase(repo=AsyncMock()).execute(
+        entries=_ledger(), settings={"forecast_horizon": 4, "forecast_mode": "hierarchical"}
+    )
+
+    def forecast(history):
+        return [p.amount for p in history if p.is_forecast]
+
+    total = forecast(result.monthly_trend)
+    assert len(total) == 4
+    for breakdown in (result.category_history, result.project_history):
+        parts = [forecast(h) for h in breakdown.values()]
+        assert all(len(p) == 4 for p in parts)
+        for k in range(4):
+            assert abs(sum(p[k] for p in parts) - total[k]) <= Decimal("0.05")
+    assert all(p.lower_bound <= p.amount <= p.upper_bound for p in result.monthly_trend if p.is_forecast)
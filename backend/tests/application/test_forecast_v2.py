@@ -76,3 +76,19 @@ class TestForecastV2:
         res = ForecastService.capex_forecast(planned)
         assert len(res) > 0
         assert 'p50' in res[0]
+
+    def test_capex_simulation_is_seeded_and_conserves_spend(self):
+        planned = [
+            {"amount": 10000, "expected_month": 1},
+            {"amount": 5000, "expected_month": 3},
+            {"amount": 2500, "expected_month": 3},
+        ]
+        res = ForecastService.capex_forecast(planned, simulations=20000, seed=42)
+        assert res == ForecastService.capex_forecast(planned, simulations=20000, seed=42)
+        assert res != ForecastService.capex_forecast(planned, simulations=20000, seed=7)
+
+        # Every simulation spends the full plan somewhere
+        assert math.isclose(sum(m["expected"] for m in res), 17500, rel_tol=1e-9)
+        assert [m["month"] for m in res] == sorted(m["month"] for m in res) and res[0]["month"] == 1
+        assert all(m["p10"] <= m["p50"] <= m["p90"] for m in res)
+        assert ForecastService.capex_forecast([]) == []
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from src.domain.budget import BudgetEntry
+from src.application.analysis_services import GapDetector
+from src.application.gap_engine import GapEngine, resolve_gap_thresholds
+from src.application.ledger_columns import LedgerColumns
+
+
+def _entry(d: date, category="Software", project="General", source=None) -> BudgetEntry:
+    return BudgetEntry(date=d, category=category, amount=Decimal("-10.00"), description="x",
+                       project=project, source_file=source)
+
+
+def _legacy_gaps(entries):
+    ordered = sorted(entries, key=lambda e: e.date)
+    return [
+        {"start_date": a.date, "end_date": b.date, "days": (b.date - a.date).days}
+        for a, b in zip(ordered, ordered[1:]) if (b.date - a.date).days > 7
+    ]
+
+
+def test_tenant_gaps_match_legacy_walk_on_unsorted_input():
+    start = date(2025, 1, 1)
+    offsets = [0, 3, 20, 21, 40, 8, 60, 61, 90]
+    entries = [_entry(start + timedelta(days=o)) for o in offsets]
+    assert GapDetector.detect_gaps(entries) == _legacy_gaps(entries)
+
+
+def test_dimension_gaps_per_project_category_and_source():
+    start = date(2025, 1, 1)
+    entries = sorted([
+        # Project "Alpha" goes quiet for 30 days while the tenant stays active
+        _entry(start, project="Alpha", source="jan.xlsx"),
+        _entry(start + timedelta(days=30), project="Alpha", source="feb.xlsx"),
+        *[_entry(start + timedelta(days=d), category="Cloud", source="jan.xlsx") for d in range(0, 31, 5)],
+    ], key=lambda e: e.date)
+    columns = LedgerColumns(entries)
+    assert columns.is_date_sorted
+
+    tenant_gaps, dimension_gaps = GapEngine.detect(columns, {"tenant": 7, "project": 14, "category": 20, "source_file": 14})
+    assert tenant_gaps == []
+    found = {(g["dimension"], g["key"], g["days"]) for g in dimension_gaps}
+    assert ("project", "Alpha", 30) in found
+    assert ("category", "Software", 30) in found
+    # "jan.xlsx" has rows every 5 days, so no source gap; "feb.xlsx" has a single row
+    assert not any(g["dimension"] == "source_file" for g in dimension_gaps)
+    assert not any(g["key"] == "General" for g in dimension_gaps)
+
+
+def test_entries_without_source_file_are_ignored_for_source_gaps():
+    entries = [_entry(date(2025, 1, 1)), _entry(date(2025, 6, 1))]
+    _, dimension_gaps = GapEngine.detect(LedgerColumns(entries), {"source_file": 1})
+    assert dimension_gaps == []
+
+
+def test_resolve_gap_thresholds_overrides_and_disables():
+    thresholds = resolve_gap_thresholds({"gap_thresholds": {"category": 60, "source_file": 0}})
+    assert thresholds["category"] == 60
+    assert thresholds["tenant"] == 7
+    assert "source_file" not in thresholds
@@ -0,0 +1,79 @@
+import math
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock
+import numpy as np
+from src.application.analysis_services import s_curve_monthly, s_curve_spend
+from src.application.analyze_budget import AnalyzeBudgetUseCase
+from src.application.hybrid_forecast import HybridForecaster, month_code, project_budgets
+from src.application.ledger_columns import LedgerColumns
+from src.domain.budget import BudgetEntry
+
+SETTINGS = {
+    "project_budgets": {"Website": {"total_budget": 60000, "start_month": "2024-10", "duration_months": 12},
+                        "Broken": {"total_budget": "n/a"}},
+    "capex_plan": [{"amount": 8000, "planned_month": "2025-04", "description": "Office fit-out"},
+                   {"amount": 999, "planned_month": "2023-01"}],
+}
+
+
+def _entries():
+    entries = []
+    for month in range(1, 13):
+        entries.append(BudgetEntry(date=date(2024, month, 5), category="Hosting/Cloud", amount=Decimal("-1000"),
+                                   description="AWS cloud subscription", expense_type="opex"))
+        entries.append(BudgetEntry(date=date(2024, month, 6), category="Payment", amount=Decimal("5000"),
+                                   description="Card payment"))
+    entries.append(BudgetEntry(date=date(2024, 2, 10), category="Licenses", amount=Decimal("-12000"),
+                               description="Annual license renewal"))
+    entries.append(BudgetEntry(date=date(2024, 3, 10), category="Hardware", amount=Decimal("-15000"),
+                               description="Dell server"))
+    for month in (10, 11, 12):
+        entries.append(BudgetEntry(date=date(2024, month, 15), category="Contractors", amount=Decimal("-4000"),
+                                   description="Agency", project="Website"))
+    return sorted(entries, key=lambda e: e.date)
+
+
+def test_s_curve_monthly_matches_scalar_curve():
+    spend, cumulative = s_curve_monthly(np.array([1000.0, 500.0]), np.array([10, 4]), np.array([2, 3]), 4)
+    for p, (budget, duration, current) in enumerate([(1000.0, 10, 2), (500.0, 4, 3)]):
+        for k in range(4):
+            t = current + k + 1
+            expected = 0 if t > duration else s_curve_spend(t, budget, duration / 2) - s_curve_spend(t - 1, budget, duration / 2)
+            assert math.isclose(spend[p, k], expected, abs_tol=1e-9)
+        assert math.isclose(cumulative[p, 0], s_curve_spend(current + 1, budget, duration / 2))
+
+
+def test_settings_parsing():
+    assert month_code("2024-10") == 54 * 12 + 9
+    assert month_code("2024-13") is None and month_code("soon") is None
+    assert [b.name for b in project_budgets(SETTINGS)] == ["Website"]
+
+
+def test_streams_are_forecast_separately_and_combined():
+    forecast = HybridForecaster(SETTINGS).forecast(LedgerColumns(_entries()), 6)
+
+    assert [p.sort_key for p in forecast.points] == ["2025-01", "2025-02", "2025-03", "2025-04", "2025-05", "2025-06"]
+    assert forecast.budgeted_projects == ["Website"]
+    # Office fit-out (plan) + license renewal due Feb 2025; the server refresh is years out
+    assert forecast.planned_capex_items == 2
+
+    # CapEx spikes and project spend don't leak into the recurring trend
+    assert all(p.opex == Decimal("1000.00") for p in forecast.points)
+    assert math.isclose(sum(float(p.capex) for p in forecast.points), 20000, rel_tol=0.01)
+    website = s_curve_monthly(np.array([60000.0]), np.array([12]), np.array([3]), 6)[0][0]
+    assert [float(p.projects) for p in forecast.points] == [round(v, 2) for v in website]
+
+    for p in forecast.points:
+        assert p.total == p.opex + p.capex + p.projects
+        assert p.lower_bound <= p.total <= p.upper_bound
+        assert 0.7 <= p.confidence <= 0.85
+
+
+@pytest.mark.asyncio
+async def test_analysis_includes_hybrid_forecast():
+    result = await AnalyzeBudgetUseCase(repo=AsyncMock()).execute(entries=_entries(), settings={"forecast_horizon": 3})
+    assert result.hybrid_forecast.methodology == "hybrid_v2"
+    assert len(result.hybrid_forecast.points) == 3
+    assert result.hybrid_forecast.budgeted_projects == []
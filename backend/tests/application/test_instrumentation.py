@@ -0,0 +1,64 @@
+from datetime import date
+from decimal import Decimal
+from src.domain.budget import BudgetEntry
+from src.application import instrumentation
+from src.application.instrumentation import Histogram, MetricsRegistry, StageProfile, profile
+from src.application.analyze_budget import AnalyzeBudgetUseCase
+
+
+def test_histogram_buckets_and_percentiles():
+    hist = Histogram()
+    for value in (0.5, 3, 3, 40, 700):
+        hist.observe(value)
+    snap = hist.snapshot()
+    assert snap["count"] == 5
+    assert snap["buckets"]["1"] == 1
+    assert snap["buckets"]["5"] == 2
+    assert snap["p50"] == 5
+    assert snap["p95"] == 700  # Capped at the observed max
+    assert snap["max"] == 700
+
+
+def test_unsampled_profile_records_nothing(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(instrumentation, "metrics", registry)
+    prof = profile("op", sample_rate=0)
+    with prof.stage("work", items=3) as stage:
+        stage.items = 10
+    prof.finish()
+    assert prof.stages == {}
+    assert registry.snapshot() == {}
+
+
+def test_sampled_profile_records_stages(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(instrumentation, "metrics", registry)
+    prof = StageProfile("op", sampled=True, trace_allocations=True)
+    with prof.stage("work", items=2):
+        _ = [0] * 10_000
+    with prof.stage("work", items=3):
+        pass
+    prof.finish(rows=5)
+
+    work = prof.stages["work"]
+    assert work["items"] == 5
+    assert work["wall_ms"] >= 0 and work["cpu_ms"] >= 0
+    assert work["alloc_kb"] > 0
+    snap = registry.snapshot()
+    assert snap["op.work_ms"]["count"] == 1
+    assert snap["op.total_ms"]["count"] == 1
+
+
+def test_analysis_emits_stage_histograms(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(instrumentation, "metrics", registry)
+    monkeypatch.setattr(instrumentation, "DEFAULT_SAMPLE_RATE", 1.0)
+    entries = [
+        BudgetEntry(date=date(2025, m, 1), category="Food", amount=Decimal("10.0"), description="Lunch")
+        for m in range(1, 4)
+    ]
+    AnalyzeBudgetUseCase(repo=None)._compute_analysis(entries, {"forecast_horizon": 3})
+
+    snap = registry.snapshot()
+    for stage in ("filter", "breakdowns", "gaps", "subscriptions", "anomalies", "forecast", "timeline"):
+        assert snap[f"analysis.{stage}_ms"]["count"] == 1
@@ -0,0 +1,57 @@
+from src.application.analysis_services import (
+    CAPEX_KEYWORDS, OPEX_KEYWORDS, CategoryClassifier, classify_expense,
+    default_keyword_classifier, keyword_classifier_for
+)
+from src.application.keyword_classifier import KeywordClassifier
+
+DESCRIPTIONS = [
+    "GitHub Enterprise seats", "AWS invoice", "Office cleaning", "Security guard (office)",
+    "Dell laptop purchase", "Upwork contractor", "Datadog monthly", "Snowflake credits",
+    "Coffee", "php hosting", "Server installation services", "", "LinkedIn Ads",
+]
+
+
+def _legacy_infer(description: str) -> str:
+    desc_lower = description.lower()
+    for category, keywords in CategoryClassifier.KNOWLEDGE_BASE.items():
+        for keyword in keywords:
+            if keyword in desc_lower:
+                return category
+    return "Uncategorized"
+
+
+def _legacy_scores(description: str):
+    desc_lower = description.lower()
+    return (sum(1 for kw in CAPEX_KEYWORDS if kw in desc_lower), sum(1 for kw in OPEX_KEYWORDS if kw in desc_lower))
+
+
+def test_matches_legacy_substring_loops():
+    clf = default_keyword_classifier()
+    for desc in DESCRIPTIONS:
+        assert CategoryClassifier.infer(desc) == _legacy_infer(desc)
+        assert (clf.tag_count(desc, "capex"), clf.tag_count(desc, "opex")) == _legacy_scores(desc)
+
+
+def test_existing_category_is_kept_and_expense_type_uses_tags():
+    assert CategoryClassifier.infer("AWS invoice", "Travel") == "Travel"
+    assert classify_expense("Server installation", 100) == "capex"
+    assert classify_expense("Monthly hosting", 100) == "opex"
+
+
+def test_scan_column_and_memoization():
+    clf = KeywordClassifier({"A": ["foo"], "B": ["bar", "foo"]}, tags={"t": ["ba", "ar"]})
+    categories, tags = clf.scan_column(["xfoo", "bar", "none", "bar", None])
+    assert categories.tolist() == [0, 1, -1, 1, -1]
+    assert tags[:, 0].tolist() == [0, 2, 0, 2, 0]
+    assert clf.scan("bar") is clf.scan("bar")
+
+
+def test_tenant_extensions_take_priority_and_are_cached():
+    settings = {"category_keywords": {"Internal Tools": ["retool", "github"], "Software": ["linear.app"]}}
+    clf = keyword_classifier_for(settings)
+    assert clf is keyword_classifier_for({"category_keywords": {"Software": ["linear.app"], "Internal Tools": ["retool", "github"]}})
+    assert clf.category("GitHub Actions") == "Internal Tools"
+    assert clf.category("Retool seats") == "Internal Tools"
+    assert clf.category("linear.app") == "Software"
+    assert keyword_classifier_for({}) is default_keyword_classifier()
+    assert default_keyword_classifier().category("Retool seats") is None
@@ -0,0 +1,145 @@
+import uuid
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from src.application.analysis_cache import AnalysisCache
+from src.application.analyze_budget import AnalyzeBudgetUseCase
+from src.application.context import set_tenant_id
+from src.application.ledger_columns import LedgerColumns
+from src.application.merchant_backfill import MerchantBackfillService
+from src.application.upload_budget import UploadBudgetUseCase
+from src.domain.budget import BudgetEntry
+from src.infrastructure.models import Base, BudgetModel, MerchantModel, TenantModel
+from src.infrastructure.repository import SQLBudgetRepository, SQLMerchantRepository
+
+
+def _entry(day, description, category="Software", amount="15.00"):
+    return BudgetEntry(date=date(2025, 1, day), category=category, amount=Decimal(amount), description=description)
+
+
+@pytest.mark.asyncio
+async def test_upload_links_entries_to_merchants(db_session):
+    tenant_id = uuid.uuid4()
+    set_tenant_id(tenant_id)
+    db_session.add(TenantModel(id=tenant_id, name="T", domain=f"{tenant_id}.local"))
+    await db_session.commit()
+
+    parser = Mock()
+    analyzer = Mock()
+    analyzer.execute = AsyncMock(return_value=Mock())
+    repo = SQLBudgetRepository(db_session)
+    use_case = UploadBudgetUseCase(repo, parser, analyzer, merchant_repo=SQLMerchantRepository(db_session))
+
+    parser.parse.return_value = ([_entry(1, "NETFLIX.COM 8842"), _entry(2, "Netflix Inc"),
+                                  _entry(3, "Blue Bottle Coffee", "Food", "4.50"), _entry(3, "IBM Cloud Inc")], [])
+    await use_case.execute(b"x")
+    parser.parse.return_value = ([_entry(4, "Blue Bottle Coffee", "Uncategorized", "5.00")], [])
+    await use_case.execute(b"x")
+
+    stored = await repo.get_all()
+    assert [e.merchant for e in stored] == ["netflix", "netflix", "blue bottle coffee", "ibm cloud", "blue bottle coffee"]
+    assert stored[0].merchant_id == stored[1].merchant_id != stored[2].merchant_id
+    # Known merchant fills in the uncategorized row
+    assert stored[4].category == "Food"
+    # Displayed as first seen on a statement, not as a re-cased key
+    assert [e.merchant_name for e in stored] == ["NETFLIX", "NETFLIX", "Blue Bottle Coffee", "IBM Cloud",
+                                                 "Blue Bottle Coffee"]
+    analysis = await AnalyzeBudgetUseCase(repo).execute()
+    assert set(analysis.top_merchants) == {"NETFLIX", "Blue Bottle Coffee", "IBM Cloud"}
+
+    merchants = (await db_session.execute(select(MerchantModel).order_by(MerchantModel.id))).scalars().all()
+    assert [(m.name, m.default_category) for m in merchants] == [("netflix", "Software"), ("blue bottle coffee", "Food"),
+                                                                 ("ibm cloud", "Software")]
+    assert merchants[0].aliases == ["NETFLIX.COM 8842", "Netflix Inc"]
+
+
+def test_ledger_groups_by_merchant_id_when_linked():
+    entries = [_entry(1, "NETFLIX.COM 8842"), _entry(2, "Netflix Inc"), _entry(3, "Spotify")]
+    by_description = LedgerColumns(entries).merchant_codes()
+    for e, merchant_id in zip(entries, (7, 7, 3)):
+        e.merchant_id = merchant_id
+        e.merchant = "netflix" if merchant_id == 7 else "spotify"
+    by_id = LedgerColumns(entries).merchant_codes()
+    assert by_id[0].tolist() == by_description[0].tolist() == [0, 0, 1]
+    assert by_id[1].tolist() == by_description[1].tolist() == ["netflix", "spotify"]
+
+
+@pytest.mark.asyncio
+async def test_backfill_links_unresolved_rows(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/merchants.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    tenant_a, tenant_b = uuid.uuid4(), uuid.uuid4()
+    async with session_factory() as session:
+        session.add_all([TenantModel(id=tenant_a, name="A", domain="a.local"),
+                         TenantModel(id=tenant_b, name="B", domain="b.local")])
+        for i, desc in enumerate(["Netflix.com", "AWS", "NETFLIX INC", "Netflix"]):
+            for tenant_id in (tenant_a, tenant_b):
+                session.add(BudgetModel(tenant_id=tenant_id, date=date(2025, 1, 1 + i), category="Software",
+                                        amount=Decimal("10.00"), description=desc))
+        await session.commit()
+
+    cache = AnalysisCache()
+    service = MerchantBackfillService(session_factory, cache, batch_size=3, max_batches_per_run=2)
+    assert await service.run() == {"linked": 6, "batches": 2, "complete": False}
+    assert await service.run() == {"linked": 2, "batches": 1, "complete": True}
+    # Every batch mixes both tenants, so both are invalidated after each one
+    assert cache.version(tenant_a) == cache.version(tenant_b) == 3
+
+    async with session_factory() as session:
+        rows = (await session.execute(
+            select(BudgetModel.tenant_id, BudgetModel.merchant_id, MerchantModel.name, MerchantModel.tenant_id)
+            .join(MerchantModel, BudgetModel.merchant_id == MerchantModel.id)
+        )).all()
+        assert len(rows) == 8
+        assert all(row[0] == row[3] for row in rows)
+        assert len({row[1] for row in rows}) == 4  # netflix + aws per tenant
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_resolve_skips_merchants_created_concurrently(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/merchants.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    tenant_id = uuid.uuid4()
+    set_tenant_id(tenant_id)
+    async with session_factory() as session:
+        session.add(TenantModel(id=tenant_id, name="T", domain="t.local"))
+        await session.commit()
+
+    async with session_factory() as session:
+        repo = SQLMerchantRepository(session)
+        load = repo._load
+
+        async def load_then_race(tenant, keys):
+            models = await load(tenant, keys)
+            if not models:
+                # Another upload creates the merchant right after this one's lookup
+                async with session_factory() as other:
+                    other.add(MerchantModel(tenant_id=tenant, name="netflix", aliases=["Netflix Inc"],
+                                            default_category="Streaming"))
+                    await other.commit()
+            return models
+
+        repo._load = load_then_race
+        entries = [_entry(1, "NETFLIX.COM 8842"), _entry(2, "Spotify")]
+        merchants = await repo.resolve(entries)
+
+    async with session_factory() as session:
+        stored = {m.name: m for m in (await session.execute(select(MerchantModel))).scalars()}
+    assert set(stored) == {"netflix", "spotify"}
+    assert entries[0].merchant_id == merchants["netflix"].id == stored["netflix"].id
+    # The concurrent row wins; this upload only adds its alias
+    assert stored["netflix"].default_category == "Streaming"
+    assert stored["netflix"].aliases == ["Netflix Inc", "NETFLIX.COM 8842"]
+    assert entries[0].merchant_name == "Netflix"
+    await engine.dispose()
@@ -0,0 +1,115 @@
+import threading
+import uuid
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock
+from src.application.context import set_tenant_id
+from src.application.near_duplicates import NearDuplicateDetector, NearDuplicateReview
+from src.application.upload_budget import UploadBudgetUseCase
+from src.domain.budget import BudgetEntry
+from src.infrastructure.models import TenantModel
+from src.infrastructure.repository import SQLBudgetRepository, SQLDuplicateReviewRepository
+
+
+def _entry(day, description, amount="412.80", source="card.xlsx"):
+    return BudgetEntry(date=date(2025, 3, day), category="Travel", amount=Decimal(amount),
+                       description=description, source_file=source)
+
+
+STORED = [
+    _entry(3, "DELTA AIR LINES 0062341"),
+    _entry(4, "Hilton Hotels Chicago", "612.00"),
+    _entry(20, "Amazon Web Services", "89.10"),
+]
+
+
+def test_flags_same_amount_similar_description_within_window():
+    batch = [
+        _entry(3, "DELTA AIR LINES 0062341"),                        # exact duplicate (save_bulk drops it)
+        _entry(4, "Delta Air Lines", source="report.xlsx"),           # near duplicate
+        _entry(5, "HILTON CHICAGO", "612.00", source="report.xlsx"),  # near duplicate
+        _entry(5, "Delta Air Lines", "99.00", source="report.xlsx"),  # amount differs
+        _entry(12, "Amazon Web Services", "89.10", source="report.xlsx"),  # outside window
+        _entry(3, "Uber", source="report.xlsx"),                      # unrelated merchant
+    ]
+    suspects = NearDuplicateDetector().detect(batch, STORED)
+    assert [(new.description, original.description) for new, original, _ in suspects] == [
+        ("Delta Air Lines", "DELTA AIR LINES 0062341"),
+        ("HILTON CHICAGO", "Hilton Hotels Chicago"),
+    ]
+    assert all(0.5 <= similarity <= 1 for _, _, similarity in suspects)
+
+
+def test_ignores_rows_from_the_same_source():
+    assert NearDuplicateDetector().detect([_entry(4, "Delta Air Lines")], STORED) == []
+
+
+def test_matches_within_the_batch():
+    batch = [_entry(1, "SQ *BLUE BOTTLE COFFEE", "6.50", None), _entry(2, "Blue Bottle Coffee Inc", "6.50", None)]
+    suspects = NearDuplicateDetector().detect(batch, [])
+    assert [(n.description, o.description) for n, o, _ in suspects] == [("Blue Bottle Coffee Inc", "SQ *BLUE BOTTLE COFFEE")]
+
+
+@pytest.mark.asyncio
+async def test_screen_loads_only_the_batch_window():
+    budget_repo = AsyncMock()
+    budget_repo.get_window.return_value = []
+    review = NearDuplicateReview(budget_repo, AsyncMock())
+    await review.screen([_entry(10, "A"), _entry(14, "B", "5.5")])
+    budget_repo.get_window.assert_awaited_once_with(date(2025, 3, 7), date(2025, 3, 17),
+                                                    {Decimal("412.80"), Decimal("5.50")})
+
+
+@pytest.mark.asyncio
+async def test_screen_queries_each_date_cluster_and_detects_off_the_event_loop(monkeypatch):
+    budget_repo = AsyncMock()
+    budget_repo.get_window.side_effect = [[], [STORED[0]], [STORED[2]]]
+    review = NearDuplicateReview(budget_repo, AsyncMock())
+    threads = []
+    detect = NearDuplicateDetector.detect
+    monkeypatch.setattr(NearDuplicateDetector, "detect",
+                        lambda self, batch, window: threads.append(threading.get_ident()) or detect(self, batch, window))
+
+    batch = [_entry(20, "AWS", "89.10", "report.xlsx"), _entry(4, "Delta Air Lines", source="report.xlsx"),
+             BudgetEntry(date=date(2023, 3, 2), category="Travel", amount=Decimal("412.80"), description="Delta")]
+    suspects = await review.screen(batch)
+
+    # Three clusters: 2023, and two in March 2025 more than two windows apart
+    assert [call.args for call in budget_repo.get_window.await_args_list] == [
+        (date(2023, 2, 27), date(2023, 3, 5), {Decimal("412.80")}),
+        (date(2025, 3, 1), date(2025, 3, 7), {Decimal("412.80")}),
+        (date(2025, 3, 17), date(2025, 3, 23), {Decimal("89.10")}),
+    ]
+    assert [(n.description, o.description) for n, o, _ in suspects] == [("Delta Air Lines", "DELTA AIR LINES 0062341")]
+    assert threads and threading.get_ident() not in threads
+
+
+@pytest.mark.asyncio
+async def test_upload_queues_suspects_for_review_and_confirm_deletes(db_session):
+    tenant_id = uuid.uuid4()
+    set_tenant_id(tenant_id)
+    db_session.add(TenantModel(id=tenant_id, name="T", domain=f"{tenant_id}.local"))
+    await db_session.commit()
+
+    repo = SQLBudgetRepository(db_session)
+    review_repo = SQLDuplicateReviewRepository(db_session)
+    parser = Mock()
+    analyzer = Mock()
+    analyzer.execute = AsyncMock(return_value=Mock())
+    use_case = UploadBudgetUseCase(repo, parser, analyzer, duplicate_review=NearDuplicateReview(repo, review_repo))
+
+    parser.parse.return_value = (list(STORED), [])
+    await use_case.execute(b"x", filename="card.xlsx")
+    parser.parse.return_value = ([_entry(4, "Delta Air Lines", source=None), _entry(9, "Lunch", "12.00", None)], [])
+    await use_case.execute(b"x", filename="report.xlsx")
+
+    pending = await review_repo.get_pending()
+    assert [(c.description, c.duplicate_of_description) for c in pending] == [("Delta Air Lines", "DELTA AIR LINES 0062341")]
+    assert len(await repo.get_all()) == 5
+
+    resolved = await review_repo.resolve(pending[0].id, confirm=True)
+    assert resolved.status == "confirmed"
+    assert await review_repo.get_pending() == []
+    assert "Delta Air Lines" not in [e.description for e in await repo.get_all()]
+    assert await review_repo.resolve(pending[0].id, confirm=False) is None
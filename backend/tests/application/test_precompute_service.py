@@ -0,0 +1,47 @@
+import pytest
+from datetime import datetime, timedelta
+from uuid import uuid4
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+from src.application.analysis_cache import AnalysisCache
+from src.application.precompute_service import AnalysisPrecomputeService
+from src.domain.user import UserRole
+from src.infrastructure.models import TenantModel, UserModel
+
+
+def _service(engine, cache):
+    return AnalysisPrecomputeService(sessionmaker(engine, class_=AsyncSession, expire_on_commit=False), cache)
+
+
+async def _tenant(session, last_logins):
+    tenant_id = uuid4()
+    session.add(TenantModel(id=tenant_id, name="Org", domain=f"{tenant_id}.local", created_at=datetime.utcnow()))
+    for login in last_logins:
+        session.add(UserModel(id=uuid4(), tenant_id=tenant_id, email=f"{uuid4()}@org.local",
+                              role=UserRole.VIEWER, last_login=login))
+    return tenant_id
+
+
+@pytest.mark.asyncio
+async def test_active_tenants_are_ordered_by_latest_login(db_session, engine):
+    now = datetime.utcnow()
+    older = await _tenant(db_session, [now - timedelta(days=3)])
+    latest = await _tenant(db_session, [now - timedelta(days=6), now - timedelta(hours=1)])
+    middle = await _tenant(db_session, [now - timedelta(days=1)])
+    await _tenant(db_session, [now - timedelta(days=30)])
+    await db_session.commit()
+
+    assert await _service(engine, AnalysisCache()).find_active_tenants() == [latest, middle, older]
+
+
+@pytest.mark.asyncio
+async def test_warm_up_probe_does_not_count_as_cache_traffic(db_session, engine):
+    tenant_id = await _tenant(db_session, [datetime.utcnow()])
+    await db_session.commit()
+    cache = AnalysisCache()
+    service = _service(engine, cache)
+
+    assert await service.warm_tenant(tenant_id) is True
+    assert await service.warm_tenant(tenant_id) is False
+    stats = cache.stats()
+    assert stats["entries"] == 1 and stats["hits"] == 0 and stats["misses"] == 1  # the first run's own lookup
@@ -0,0 +1,112 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, Mock
+import asyncio
+import multiprocessing
+import os
+import struct
+import time
+import pytest
+from src.application.manage_rules import ManageRulesUseCase
+from src.application.preview_rule import MAX_CONCURRENT_SCANS, PreviewBusyError, PreviewRuleUseCase, _receive
+from src.application.rule_engine import CompiledRuleSet, RulePatternError, validate_rule_pattern
+from src.domain.rule import Rule
+
+SAMPLE = [("Uber Eats order", 4), ("UBER trip", 2), ("Coffee", 10), ("AWS bill", 1)]
+
+
+@pytest.mark.parametrize("pattern", [r"(a+)+$", r"(\w*\s*)*x", r"x{1,5000}", r"((ab)\2)+", r"(a|a)+$", r"(.|\s)*invoice",
+                                     "", "[unclosed"])
+def test_rejects_invalid_or_catastrophic_patterns(pattern):
+    with pytest.raises(RulePatternError):
+        validate_rule_pattern(pattern)
+
+
+@pytest.mark.parametrize("pattern", [r"uber\s*eats", r"(\w+) \1", r"(a|b)*c", r"(?>a+)+", r"^amzn\s+mktp",
+                                     r"(foo|bar)+", r"(uber|lyft)\s+(trip|eats)"])
+def test_accepts_ordinary_patterns(pattern):
+    assert validate_rule_pattern(pattern).flags & 2  # re.IGNORECASE
+
+
+def test_stored_catastrophic_rules_are_skipped():
+    rule_set = CompiledRuleSet([Rule(id=1, pattern=r"(a+)+$", category="Bad"), Rule(id=2, pattern="a", category="Ok")])
+    assert [r.id for r in rule_set.invalid] == [1]
+    assert rule_set.categorize(["aaaaaaaaaaaaaaaaaaaaaaaaaaaaaaaa!"]) == ["Ok"]
+
+
+@pytest.mark.asyncio
+async def test_preview_counts_matches_over_the_sample():
+    repo = AsyncMock()
+    repo.sample_descriptions.return_value = SAMPLE
+    preview = await PreviewRuleUseCase(repo, sample_size=100).execute("uber")
+
+    repo.sample_descriptions.assert_awaited_once_with(100)
+    assert (preview.scanned_descriptions, preview.scanned_rows) == (4, 17)
+    assert (preview.matched_descriptions, preview.matched_rows) == (2, 6)
+    assert preview.examples == ["Uber Eats order", "UBER trip"]
+    assert not preview.timed_out
+
+
+@pytest.mark.asyncio
+async def test_preview_stops_at_the_time_budget():
+    repo = AsyncMock()
+    repo.sample_descriptions.return_value = [("x" * 2000 + str(i), 1) for i in range(20000)]
+    preview = await PreviewRuleUseCase(repo, time_budget_ms=5).execute(r"\d{3}$")
+    assert preview.timed_out
+    assert 0 < preview.scanned_descriptions < 20000
+    assert preview.elapsed_ms < 1000
+
+
+@pytest.mark.asyncio
+async def test_add_rule_rejects_catastrophic_pattern():
+    repo = AsyncMock()
+    with pytest.raises(RulePatternError):
+        await ManageRulesUseCase(repo).add_rule(r"(.*a){2,}(b+)+", "Bad")
+    repo.add.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_overrunning_match_is_killed_and_frees_the_executor():
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=1))
+    children = set(multiprocessing.active_children())
+    try:
+        repo = AsyncMock()
+        # Polynomial rather than exponential, so it passes validation, but one match takes seconds
+        repo.sample_descriptions.return_value = [(" " * 3000, 1)]
+        preview = await PreviewRuleUseCase(repo, time_budget_ms=50).execute(r"\s*\s*\s*\s*x")
+
+        assert preview.timed_out and preview.scanned_descriptions == 0
+        assert preview.elapsed_ms < 1000
+        assert set(multiprocessing.active_children()) == children
+        assert await asyncio.wait_for(loop.run_in_executor(None, sum, [1, 2]), 0.5) == 3
+    finally:
+        loop.set_default_executor(ThreadPoolExecutor())
+
+
+@pytest.mark.asyncio
+async def test_previews_beyond_the_concurrency_limit_are_refused():
+    repo = AsyncMock()
+    repo.sample_descriptions.return_value = [(" " * 3000, 1)]
+    use_case = PreviewRuleUseCase(repo, time_budget_ms=100)
+    results = await asyncio.gather(*(use_case.execute(r"\s*\s*\s*\s*x") for _ in range(MAX_CONCURRENT_SCANS + 1)),
+                                   return_exceptions=True)
+
+    assert all(r.timed_out for r in results[:MAX_CONCURRENT_SCANS])
+    assert isinstance(results[-1], PreviewBusyError)
+    # Slots are released again
+    assert not (await use_case.execute("x")).timed_out
+
+
+@pytest.mark.asyncio
+async def test_partially_written_message_does_not_block_the_loop():
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    # Length header of a 1000-byte message, and no body
+    os.write(sender.fileno(), struct.pack("!i", 1000))
+    process = Mock()
+    process.kill.side_effect = sender.close  # as a killed scan closes its end
+
+    start = time.perf_counter()
+    assert await _receive(receiver, process, 0.2) is None
+    assert time.perf_counter() - start < 1
+    process.kill.assert_called_once()
+    receiver.close()
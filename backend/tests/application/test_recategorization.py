@@ -0,0 +1,106 @@
+import uuid
+import pytest
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from src.application.analysis_cache import AnalysisCache
+from src.application.recategorization import RecategorizationQueue, RecategorizationService
+from src.application.rule_engine import CompiledRuleCache
+from src.infrastructure.models import Base, BudgetModel, RuleModel, TenantModel
+
+DESCRIPTIONS = ["AWS invoice", "Coffee", "aws credits", "Dell server", "Coffee", "AWS support", "Lunch"]
+
+
+@pytest.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/recategorize.db")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+async def _request(session_factory, tenant_id):
+    async with session_factory() as session:
+        await RecategorizationQueue(session).request(tenant_id)
+
+
+async def _status(session_factory, tenant_id):
+    async with session_factory() as session:
+        return await RecategorizationQueue(session).status(tenant_id)
+
+
+async def _categories(session_factory, tenant_id):
+    async with session_factory() as session:
+        rows = (await session.execute(
+            select(BudgetModel.category, BudgetModel.expense_type)
+            .where(BudgetModel.tenant_id == tenant_id).order_by(BudgetModel.id)
+        )).all()
+    return [tuple(r) for r in rows]
+
+
+@pytest.mark.asyncio
+async def test_rule_changes_are_applied_and_undone_in_resumable_batches(session_factory):
+    tenant_id, other_id = uuid.uuid4(), uuid.uuid4()
+    async with session_factory() as session:
+        session.add_all([TenantModel(id=tenant_id, name="T", domain="t.local"),
+                         TenantModel(id=other_id, name="O", domain="o.local")])
+        for i, desc in enumerate(DESCRIPTIONS):
+            for tid in (tenant_id, other_id):
+                session.add(BudgetModel(tenant_id=tid, date=date(2025, 1, 1 + i), category="Misc",
+                                        original_category="Misc", amount=Decimal("50.00"), description=desc))
+        session.add(RuleModel(tenant_id=tenant_id, pattern=r"aws|dell", category="Hardware"))
+        await session.commit()
+
+    cache, compiled = AnalysisCache(), CompiledRuleCache()
+    service = RecategorizationService(session_factory, cache, compiled, batch_size=3, max_batches_per_run=2)
+    await _request(session_factory, tenant_id)
+
+    first = await service.run()
+    assert first == {"tenants": 0, "scanned": 6, "updated": 4, "batches": 2}
+    status = await _status(session_factory, tenant_id)
+    assert status["last_id"] > 0 and not status["done"]
+    assert cache.version(tenant_id) == 2
+
+    # A restarted process (fresh service and caches) resumes from the stored cursor
+    service = RecategorizationService(session_factory, AnalysisCache(), CompiledRuleCache(), batch_size=3)
+    assert (await service.run())["scanned"] == 1
+    status = await _status(session_factory, tenant_id)
+    assert status["done"] and status["scanned"] == 7
+    assert status["updated"] == 4
+    assert [c for c, _ in await _categories(session_factory, tenant_id)] == [
+        "Hardware", "Misc", "Hardware", "Hardware", "Misc", "Hardware", "Misc"]
+    assert ("Hardware", "capex") in await _categories(session_factory, tenant_id)
+    assert {c for c, _ in await _categories(session_factory, other_id)} == {"Misc"}
+    assert await service.run() == {"tenants": 0, "scanned": 0, "updated": 0, "batches": 0}
+
+    # Re-running is a no-op; deleting the rule restores the imported categories
+    await _request(session_factory, tenant_id)
+    await service.run()
+    assert (await _status(session_factory, tenant_id))["updated"] == 0
+    async with session_factory() as session:
+        await session.execute(RuleModel.__table__.delete())
+        await session.commit()
+    service.compiled_rules.invalidate(tenant_id)
+    await _request(session_factory, tenant_id)
+    await service.run()
+    assert {c for c, _ in await _categories(session_factory, tenant_id)} == {"Misc"}
+
+
+@pytest.mark.asyncio
+async def test_new_request_or_another_worker_supersedes_a_batch(session_factory):
+    tenant_id = uuid.uuid4()
+    async with session_factory() as session:
+        queue = RecategorizationQueue(session)
+        await queue.request(tenant_id)
+        generation = (await queue.pending())[0][1].generation
+        assert await queue.advance(tenant_id, generation, 0, 10, 10, 1)
+        # Another worker already recorded the batch after id 0
+        assert not await queue.advance(tenant_id, generation, 0, 10, 10, 1)
+
+        await queue.request(tenant_id)
+        assert not await queue.advance(tenant_id, generation, 10, 20, 10, 1)
+        status = await queue.status(tenant_id)
+        assert (status["generation"], status["last_id"], status["scanned"]) == (generation + 1, 0, 0)
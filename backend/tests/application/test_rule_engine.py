@@ -0,0 +1,133 @@
+import re
+import threading
+import uuid
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, Mock
+from src.application.context import set_tenant_id
+from src.application.manage_rules import ManageRulesUseCase
+from src.application.rule_engine import CompiledRuleCache, CompiledRuleSet, RuleEngine
+from src.application.upload_budget import UploadBudgetUseCase
+from src.domain.budget import BudgetEntry
+from src.domain.rule import Rule
+
+RULES = [
+    Rule(id=5, pattern="uber", category="Travel"),
+    Rule(id=2, pattern=r"^amzn\s+mktp", category="Supplies"),
+    Rule(id=3, pattern="aws", category="Cloud"),
+    Rule(id=1, pattern=r"(\w+) \1", category="Duplicated word"),
+    Rule(id=4, pattern=r"uber\s*eats", category="Meals"),
+    Rule(id=6, pattern="[unclosed", category="Broken"),
+    Rule(id=0, pattern=r"refund\s+\d+", category="Refunds"),
+]
+
+
+def _naive(rules, text):
+    for rule in sorted(rules, key=lambda r: r.id):
+        try:
+            if re.search(rule.pattern, text, re.IGNORECASE):
+                return rule.category
+        except re.error:
+            continue
+    return None
+
+
+def test_precedence_matches_rule_by_rule_evaluation():
+    rule_set = CompiledRuleSet(RULES)
+    texts = ["Uber Eats order", "UBER trip", "AMZN Mktp US", "paid aws aws", "AWS bill",
+             "lunch", "", "Amazon amzn mktp", "uber uber",
+             "Uber Eats refund 12"]
+    assert rule_set.categorize(texts) == [_naive(RULES, t) for t in texts]
+    assert [r.id for r in rule_set.invalid] == [6]
+    assert rule_set.match("Uber Eats").id == 4
+    # Leftmost match is rule 4, but the older rule 0 matches further right
+    assert rule_set.match("Uber Eats refund 12").id == 0
+
+
+def test_conditional_groups_are_matched_individually():
+    rules = [Rule(id=1, pattern=r"x(y)?z", category="First"), Rule(id=2, pattern=r"(a)?(?(1)b|c)", category="Second")]
+    # Merged into the alternation, (?(1)...) would test the first rule's group
+    texts = ["ab", "c", "xz", "xyz", "b"]
+    assert CompiledRuleSet(rules).categorize(texts) == [_naive(rules, t) for t in texts]
+
+
+def test_empty_rule_set_matches_nothing():
+    assert CompiledRuleSet([]).categorize(["anything"]) == [None]
+
+
+@pytest.mark.asyncio
+async def test_engine_caches_per_tenant_until_rules_change():
+    tenant_id = uuid.uuid4()
+    set_tenant_id(tenant_id)
+    repo = AsyncMock()
+    repo.get_all.return_value = [Rule(id=1, pattern="aws", category="Cloud")]
+    repo.add.return_value = Rule(id=2, pattern="gcp", category="Cloud")
+    cache = CompiledRuleCache()
+    engine = RuleEngine(repo, cache)
+
+    first = await engine.load()
+    assert await engine.load() is first
+    assert repo.get_all.await_count == 1
+
+    await ManageRulesUseCase(repo, compiled_cache=cache).add_rule("gcp", "Cloud")
+    assert await engine.load() is not first
+    assert repo.get_all.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_load_racing_a_rule_change_does_not_cache_the_old_rules():
+    tenant_id = uuid.uuid4()
+    set_tenant_id(tenant_id)
+    cache = CompiledRuleCache()
+    old_rules = [Rule(id=1, pattern="aws", category="Cloud")]
+
+    async def get_all_then_rules_change():
+        # The rules change after the old ones were read, before the load caches them
+        cache.invalidate(tenant_id)
+        return old_rules
+
+    repo = AsyncMock()
+    repo.get_all.side_effect = get_all_then_rules_change
+    stale = await RuleEngine(repo, cache).load()
+
+    assert stale.categorize(["AWS bill"]) == ["Cloud"]
+    assert cache.get(tenant_id) is None
+
+
+@pytest.mark.asyncio
+async def test_upload_applies_rules_before_classifying_and_saving():
+    set_tenant_id(uuid.uuid4())
+    entries = [
+        BudgetEntry(date=date(2025, 1, 1), category="Misc", amount=Decimal("50.00"), description="AWS invoice"),
+        BudgetEntry(date=date(2025, 1, 2), category="Misc", amount=Decimal("50.00"), description="Coffee"),
+    ]
+    parser = Mock()
+    parser.parse.return_value = (entries, [])
+    analyzer = Mock()
+    analyzer.execute = AsyncMock(return_value=Mock())
+    repo = AsyncMock()
+    rule_repo = AsyncMock()
+    rule_repo.get_all.return_value = [Rule(id=1, pattern=r"aws|gcp", category="Hardware")]
+
+    use_case = UploadBudgetUseCase(repo, parser, analyzer, rule_engine=RuleEngine(rule_repo, CompiledRuleCache()))
+    await use_case.execute(b"x")
+
+    saved = repo.save_bulk.await_args.args[0]
+    assert [(e.category, e.expense_type) for e in saved] == [("Hardware", "capex"), ("Misc", "opex")]
+
+
+@pytest.mark.asyncio
+async def test_apply_matches_off_the_event_loop(monkeypatch):
+    set_tenant_id(uuid.uuid4())
+    rule_repo = AsyncMock()
+    rule_repo.get_all.return_value = [Rule(id=1, pattern=r"aws\s+\w+", category="Cloud")]
+    threads = []
+    categorize = CompiledRuleSet.categorize
+    monkeypatch.setattr(CompiledRuleSet, "categorize",
+                        lambda self, texts: threads.append(threading.get_ident()) or categorize(self, texts))
+    entries = [BudgetEntry(date=date(2025, 1, 1), category="Misc", amount=Decimal("5.00"), description="AWS invoice")]
+
+    assert await RuleEngine(rule_repo, CompiledRuleCache()).apply(entries) == 1
+    assert entries[0].category == "Cloud"
+    assert threads and threading.get_ident() not in threads
@@ -0,0 +1,47 @@
+from decimal import Decimal
+import random
+from src.application.sketches import SpaceSavingSketch, TopKAccumulator, GroupedTopK, use_exact_mode
+
+
+def test_exact_top_k_matches_full_sort():
+    acc = TopKAccumulator(exact=True)
+    data = [("a", "5"), ("b", "7"), ("c", "5"), ("a", "3"), ("d", "1")]
+    for key, amount in data:
+        acc.add(key, Decimal(amount))
+    assert acc.top(3) == {"a": Decimal("8"), "b": Decimal("7"), "c": Decimal("5")}
+    assert list(acc.top(3)) == ["a", "b", "c"]
+    assert acc.error_bound == Decimal("0")
+
+
+def test_space_saving_respects_capacity_and_error_bound():
+    rng = random.Random(42)
+    sketch = SpaceSavingSketch(capacity=50)
+    truth = {}
+    for _ in range(20_000):
+        # Zipf-like stream: a few heavy merchants and a long tail of noise
+        key = f"m{min(int(rng.paretovariate(1.2)), 5000)}"
+        weight = Decimal(rng.randint(1, 100))
+        truth[key] = truth.get(key, Decimal("0")) + weight
+        sketch.add(key, weight)
+
+    assert len(sketch) == 50
+    bound = sketch.error_bound
+    assert bound <= sketch.total / 50
+
+    true_top = sorted(truth.items(), key=lambda kv: kv[1], reverse=True)[:5]
+    estimated = dict(sketch.top(5))
+    assert [k for k, _ in true_top] == list(estimated)
+    for key, value in true_top:
+        assert value <= estimated[key] <= value + bound
+
+
+def test_grouped_top_k_and_mode_selection():
+    grouped = GroupedTopK(exact=False, epsilon=0.5)
+    grouped.add("Food", "Lunch", Decimal("10"))
+    grouped.add("Food", "Dinner", Decimal("20"))
+    grouped.add("Travel", "Bus", Decimal("5"))
+    top = grouped.top(1)
+    assert top == {"Food": {"Dinner": Decimal("20")}, "Travel": {"Bus": Decimal("5")}}
+
+    assert use_exact_mode(10, {}) is True
+    assert use_exact_mode(10, {"merchant_exact_limit": 5}) is False
@@ -0,0 +1,64 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from src.domain.budget import BudgetEntry
+from src.application.ledger_columns import LedgerColumns
+from src.application.merchant_normalizer import merchant_display_name, normalize_merchant
+from src.application.subscription_detector import SubscriptionDetector
+
+
+def _entry(d: date, description: str, amount: str, category="Software") -> BudgetEntry:
+    return BudgetEntry(date=d, category=category, amount=Decimal(amount), description=description)
+
+
+def test_normalize_merchant_merges_statement_variants():
+    assert normalize_merchant("NETFLIX.COM 8842") == "netflix"
+    assert normalize_merchant("Netflix Inc") == "netflix"
+    assert normalize_merchant("SQ *Blue Bottle Coffee") == "blue bottle coffee"
+    assert normalize_merchant("1234") == "1234"
+
+
+def test_merchant_display_name_keeps_the_original_case():
+    assert merchant_display_name("AWS") == "AWS"
+    assert merchant_display_name("IBM Cloud Inc 0042") == "IBM Cloud"
+    assert merchant_display_name("SQ *Blue Bottle Coffee") == "Blue Bottle Coffee"
+    assert merchant_display_name(" 1234 ") == "1234"
+
+
+def test_monthly_subscription_with_price_change_and_name_variants():
+    start = date(2025, 1, 3)
+    entries = []
+    for i in range(8):
+        name = "Slack Technologies Inc" if i % 2 else "SLACK TECHNOLOGIES"
+        amount = "120.00" if i < 5 else "135.00"
+        entries.append(_entry(start + timedelta(days=round(30.4 * i)), name, amount))
+    subs = SubscriptionDetector().detect(LedgerColumns(entries))
+
+    assert len(subs) == 1
+    sub = subs[0]
+    assert sub.frequency == "Monthly"
+    assert sub.amount == 135.0  # Latest price
+    assert sub.start_date == start
+    assert sub.next_payment_date == entries[-1].date + timedelta(days=30)
+    assert sub.status == "Active"
+    assert 0.8 < sub.confidence <= 1.0
+
+
+def test_cadences_and_irregular_spend():
+    start = date(2023, 1, 1)
+    entries = (
+        [_entry(start + timedelta(days=7 * i), "Vercel Pro", "40.00") for i in range(10)]
+        + [_entry(start + timedelta(days=91 * i), "Insurance Premium", "900.00") for i in range(4)]
+        + [_entry(start + timedelta(days=365 * i), "JetBrains Annual", "650.00") for i in range(3)]
+        # Weekly groceries with varying amounts are not a subscription
+        + [_entry(start + timedelta(days=7 * i), "Whole Foods", f"{50 + 17 * (i % 5)}.00") for i in range(20)]
+    )
+    found = {s.description: s.frequency for s in SubscriptionDetector().detect(LedgerColumns(entries))}
+    assert found == {"Vercel Pro": "Weekly", "Insurance Premium": "Quarterly", "JetBrains Annual": "Annual"}
+
+
+def test_lapsed_subscription_is_cancelled():
+    start = date(2025, 1, 1)
+    entries = [_entry(start + timedelta(days=30 * i), "Zoom Pro", "15.00") for i in range(4)]
+    entries.append(_entry(date(2025, 12, 1), "Office Rent", "2000.00", category="Facilities"))
+    subs = SubscriptionDetector().detect(LedgerColumns(entries))
+    assert [(s.description, s.status) for s in subs] == [("Zoom Pro", "Cancelled")]
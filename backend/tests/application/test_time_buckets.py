@@ -0,0 +1,112 @@
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import AsyncMock
+import numpy as np
+from src.application.analyze_budget import AnalyzeBudgetUseCase
+from src.application.ledger_columns import LedgerColumns
+from src.application.time_buckets import TimeBuckets, period_histories, resolve_time_buckets
+from src.domain.budget import BudgetEntry
+
+
+def _entry(day, category, amount, project="General"):
+    return BudgetEntry(date=day, category=category, amount=Decimal(amount), description=f"{category} spend",
+                       project=project)
+
+
+def test_codes_are_consecutive_and_labelled():
+    dates = np.array(["2024-03-03", "2024-03-04", "2024-03-31", "2024-04-01"], dtype="datetime64[D]")
+
+    week = TimeBuckets("week")
+    codes = week.codes(dates)
+    # Sunday 3 March closes ISO week 9; Monday 4 March opens week 10
+    assert codes[1] - codes[0] == 1 and codes[2] - codes[1] == 3
+    assert week.start(int(codes[1])) == date(2024, 3, 4)
+    assert week.labels([codes[1]])[codes[1]] == ("Week of 04 Mar 2024", "2024-W10")
+
+    month = TimeBuckets()
+    assert month.labels(month.codes(dates[:1]).tolist()) == {650: ("Mar 2024", "2024-03")}
+    assert TimeBuckets("day").labels([19788]) == {19788: ("06 Mar 2024", "2024-03-06")}
+
+    quarter = TimeBuckets("quarter")
+    q1, q2 = quarter.codes(dates[[0, 3]])
+    assert q2 == q1 + 1
+    assert quarter.labels([q1, q2]) == {q1: ("Q1 2024", "2024-Q1"), q2: ("Q2 2024", "2024-Q2")}
+
+
+def test_fiscal_quarters_follow_the_fiscal_year():
+    fiscal = TimeBuckets("quarter", fiscal_year_start=4)
+    codes = fiscal.codes(np.array(["2024-03-31", "2024-04-01", "2025-01-15"], dtype="datetime64[D]"))
+
+    labels = fiscal.labels(codes.tolist())
+    assert [labels[c] for c in codes] == [("Q4 FY2024", "FY2024-Q4"), ("Q1 FY2025", "FY2025-Q1"),
+                                          ("Q4 FY2025", "FY2025-Q4")]
+    assert fiscal.start(int(codes[1])) == date(2024, 4, 1)
+
+    assert resolve_time_buckets({"trend_granularity": "quarter", "fiscal_year_start_month": 4}) == fiscal
+    assert resolve_time_buckets({"trend_granularity": "hourly", "fiscal_year_start_month": 13}) == TimeBuckets()
+
+
+def test_period_histories_sum_exactly_per_dimension():
+    entries = [
+        _entry(date(2024, 1, 5), "Software", "-10.10", "Platform"),
+        _entry(date(2024, 1, 20), "Travel", "-0.20"),
+        _entry(date(2024, 2, 1), "Software", "-5.05", "Platform"),
+        _entry(date(2024, 2, 9), "Payment", "900.00"),
+        _entry(date(2024, 4, 2), "Software", "-1.00"),
+    ]
+    columns = LedgerColumns(entries)
+    rows = np.array([e.category != "Payment" for e in entries])
+
+    total, breakdowns = period_histories(columns, rows, TimeBuckets(), ("category", "project"))
+
+    # Dense grid: March has no rows but is still a (zero) period
+    assert total == [{"period": 648, "amount": Decimal("10.30")}, {"period": 649, "amount": Decimal("5.05")},
+                     {"period": 650, "amount": Decimal("0.00")}, {"period": 651, "amount": Decimal("1.00")}]
+    assert list(breakdowns["category"]) == ["Software", "Travel"]
+    assert [p["period"] for p in breakdowns["category"]["Software"]] == [648, 649, 650, 651]
+    # Each value starts at its own first period and runs to the last period overall
+    assert [p["amount"] for p in breakdowns["category"]["Travel"]] == [Decimal("0.20"), 0, 0, 0]
+    assert [p["amount"] for p in breakdowns["project"]["General"]] == [Decimal("0.20"), 0, 0, Decimal("1.00")]
+    assert breakdowns["project"]["Platform"][0]["period"] == 648
+
+    assert period_histories(columns, np.zeros(len(entries), dtype=bool), TimeBuckets(), ("category",)) == (
+        [], {"category": {}})
+
+
+@pytest.mark.asyncio
+async def test_weekday_only_spend_forecasts_quiet_weekends():
+    monday = date(2024, 1, 1)
+    days = [monday + timedelta(days=d) for d in range(12 * 7)]
+    entries = [_entry(day, "Software", f"-{300 + 10 * (i // 7 % 3)}") for i, day in enumerate(days) if day.weekday() < 5]
+    result = await AnalyzeBudgetUseCase(repo=AsyncMock()).execute(
+        entries=entries, settings={"forecast_horizon": 7, "trend_granularity": "day"}
+    )
+
+    history = [p for p in result.monthly_trend if not p.is_forecast]
+    forecast = [p for p in result.monthly_trend if p.is_forecast]
+    # Weekends are zero days in the history, not skipped
+    assert len(history) == 82 and history[-1].month == "22 Mar 2024"
+    assert [p.month for p in forecast[:3]] == ["23 Mar 2024", "24 Mar 2024", "25 Mar 2024"]
+    assert forecast[0].amount == forecast[1].amount == 0
+    assert all(p.amount > 100 for p in forecast[2:])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("granularity, periods", [("quarter", 4), ("week", 9)])
+async def test_analysis_trends_follow_the_granularity(granularity, periods):
+    entries = [_entry(date(2024, 1, 1) + np.timedelta64(3 * i, "D").item(), "Software", f"-{100 + i}")
+               for i in range(120)]
+    result = await AnalyzeBudgetUseCase(repo=AsyncMock()).execute(
+        entries=entries, settings={"forecast_horizon": periods, "trend_granularity": granularity}
+    )
+
+    history = [p for p in result.monthly_trend if not p.is_forecast]
+    forecast = [p for p in result.monthly_trend if p.is_forecast]
+    assert sum(p.amount for p in history) == sum(abs(e.amount) for e in entries)
+    assert len(forecast) == periods
+    keys = [p.sort_key for p in result.monthly_trend]
+    assert keys == sorted(keys) and len(set(keys)) == len(keys)
+    if granularity == "quarter":
+        assert [p.month for p in history] == ["Q1 2024", "Q2 2024", "Q3 2024", "Q4 2024"]
+        assert forecast[0].sort_key == "2025-Q1"
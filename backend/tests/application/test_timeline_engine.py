@@ -0,0 +1,79 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+from src.domain.budget import BudgetEntry
+from src.domain.analysis_models import SubscriptionEntry
+from src.application.analysis_services import keyword_classifier_for
+from src.application.analyze_budget import AnalyzeBudgetUseCase
+from src.application.keyword_automaton import KeywordAutomaton
+from src.application.query_timeline import QueryTimelineUseCase
+from src.application.subscription_detector import SubscriptionDetector
+from src.application.timeline_engine import TimelineEngine, TimelineIndex
+
+
+def _entry(d, desc, amount="100"):
+    return BudgetEntry(date=d, category="Software", amount=Decimal(amount), description=desc)
+
+
+def test_keyword_automaton_finds_overlapping_keywords():
+    automaton = KeywordAutomaton(["he", "she", "his", "hers"])
+    found = {automaton.keywords[i] for i in automaton.search("uSHErs")}
+    assert found == {"he", "she", "hers"}
+    assert automaton.search("nothing here") == frozenset({0})
+
+
+def test_timeline_ids_are_deterministic():
+    entries = [_entry(date(2024, 1, 5), "Dell Lease"), _entry(date(2024, 2, 1), "Annual Jira License")]
+    first = TimelineEngine.build(entries, [])
+    second = TimelineEngine.build(entries, [])
+    assert [t.id for t in first] == [t.id for t in second]
+    assert len({t.id for t in first}) == len(first)
+
+
+def test_timeline_deduplicates_contracts_and_hardware():
+    entries = [
+        _entry(date(2024, 1, 5), "Dell Lease"),
+        _entry(date(2024, 2, 5), "Dell Lease"),
+        _entry(date(2024, 3, 1), "Slack Renewal"),
+    ]
+    sub = SubscriptionEntry(
+        description="Slack Renewal", amount=100.0, frequency="Monthly", category="Software",
+        start_date=date(2024, 1, 1), next_payment_date=date(2024, 4, 1)
+    )
+    items = TimelineEngine.build(entries, [sub])
+    labels = [(t.type, t.label) for t in items]
+    assert labels == [
+        ("subscription", "Slack Renewal (Monthly)"),
+        ("contract", "Dell Lease"),
+        ("hardware", "Dell Lease (Lifecycle)"),
+    ]
+
+
+def test_timeline_index_window():
+    entries = [
+        _entry(date(2020, 1, 1), "Server Rack"),    # 2020-01-01 .. 2022-12-31 (hardware)
+        _entry(date(2023, 6, 1), "Annual Figma"),   # 2023-06-01 .. 2024-05-31
+        _entry(date(2025, 1, 1), "Contract Audit"), # 2025-01-01 .. 2026-01-01
+    ]
+    index = TimelineIndex(TimelineEngine.build(entries, []))
+
+    assert [t.label for t in index.window(date(2022, 6, 1), date(2023, 7, 1))] == ["Server Rack (Lifecycle)", "Annual Figma"]
+    assert [t.label for t in index.window(date(2024, 6, 1), date(2024, 12, 31))] == []
+    assert [t.label for t in index.window(date(2025, 6, 1), None)] == ["Contract Audit"]
+    assert len(index.window()) == 3
+
+
+@pytest.mark.asyncio
+async def test_timeline_query_detects_subscriptions_with_tenant_classifier():
+    settings = {"category_keywords": {"Design": ["figma"]}}
+    entries = [_entry(date(2024, month, 3), "Figma seats", "-45") for month in range(1, 7)]
+    repo = AsyncMock()
+    repo.get_all.return_value = entries
+
+    with patch("src.application.query_timeline.SubscriptionDetector", wraps=SubscriptionDetector) as detector:
+        items = await QueryTimelineUseCase(repo).execute(settings=settings)
+
+    assert detector.call_args.kwargs["classifier"] is keyword_classifier_for(settings)
+    analysis = await AnalyzeBudgetUseCase(repo=repo).execute(entries=entries, settings=settings)
+    assert items and items == analysis.timeline
@@ -0,0 +1,52 @@
+import asyncio
+import pytest
+from src.infrastructure.scheduler import JobScheduler, ScheduledJob, in_window
+
+
+@pytest.mark.asyncio
+async def test_run_once_records_metrics_and_failures():
+    scheduler = JobScheduler()
+
+    async def ok():
+        return 3
+
+    async def boom():
+        raise RuntimeError("db down")
+
+    scheduler.register(ScheduledJob(name="ok", func=ok, interval_seconds=60))
+    scheduler.register(ScheduledJob(name="boom", func=boom, interval_seconds=60))
+
+    assert await scheduler.run_once("ok") == 3
+    assert await scheduler.run_once("boom") is None
+
+    metrics = scheduler.metrics()
+    assert metrics["ok"]["runs"] == 1 and metrics["ok"]["failures"] == 0
+    assert metrics["boom"]["runs"] == 1 and metrics["boom"]["failures"] == 1
+    assert metrics["boom"]["last_error"] == "db down"
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit():
+    scheduler = JobScheduler(max_concurrency=1)
+    running = 0
+    peak = 0
+
+    async def work():
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    for i in range(3):
+        scheduler.register(ScheduledJob(name=f"job{i}", func=work, interval_seconds=60))
+
+    await asyncio.gather(*(scheduler.trigger(f"job{i}") for i in range(3)))
+    assert peak == 1
+    await scheduler.stop()
+
+
+def test_in_window_wraps_midnight():
+    assert in_window(3, None)
+    assert in_window(2, (1, 5)) and not in_window(5, (1, 5))
+    assert in_window(23, (22, 4)) and in_window(1, (22, 4)) and not in_window(12, (22, 4))
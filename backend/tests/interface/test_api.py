@@ -68,3 +68,45 @@ async def test_upload_and_analysis(client):
     assert float(data['category_breakdown']['Transport']) == 5.0
     
     app.dependency_overrides.pop(get_current_user, None)
+
+@pytest.mark.asyncio
+async def test_rule_preview_and_validation(client):
+    tenant_id = uuid.uuid4()
+
+    async def mock_get_current_user():
+        set_tenant_id(tenant_id)
+        return User(
+            id=uuid.uuid4(),
+            tenant_id=tenant_id,
+            email="test@example.com",
+            role=UserRole.ADMIN,
+            created_at=datetime.now()
+        )
+
+    app.dependency_overrides[get_current_user] = mock_get_current_user
+
+    df = pd.DataFrame({
+        'Date': [date(2025, 1, 1), date(2025, 1, 2), date(2025, 1, 3)],
+        'Category': ['Travel', 'Travel', 'Food'],
+        'Amount': [20.0, 15.0, 4.0],
+        'Description': ['Slack seats', 'SLACK annual', 'Coffee'],
+    })
+    file_content = BytesIO()
+    with pd.ExcelWriter(file_content, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False)
+    file_content.seek(0)
+    files = [('files', ('rules.xlsx', file_content, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'))]
+    assert (await client.post("/api/v1/upload", files=files)).status_code == 200
+
+    response = await client.post("/api/v1/rules/preview", json={"pattern": r"slack\s"})
+    assert response.status_code == 200
+    preview = response.json()['data']
+    assert preview['matched_rows'] == 2
+    assert sorted(preview['examples']) == ['SLACK annual', 'Slack seats']
+
+    assert (await client.post("/api/v1/rules/preview", json={"pattern": "(a+)+$"})).status_code == 400
+    response = await client.post("/api/v1/rules", json={"pattern": "(a+)+$", "category": "Bad"})
+    assert response.status_code == 400
+    assert (await client.get("/api/v1/rules")).json()['data'] == []
+
+    app.dependency_overrides.pop(get_current_user, None)
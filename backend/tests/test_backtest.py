@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from benchmarks.backtest import backtest, ledger_series, load_dataset, make_folds, score, synthetic_tenants
+
+
+def test_score_metrics():
+    actual = np.array([[100.0, 0.0], [50.0, 0.0]])
+    point = np.array([[110.0, 0.0], [40.0, 10.0]])
+    scores = score(actual, point, point - 5, point + 5)
+    assert scores["mape"] == 15.0  # (10% + 20%) / 2, zero actuals skipped
+    assert scores["smape"] == round(100 * (20 / 210 + 0 + 20 / 90 + 2) / 4, 2)
+    assert scores["coverage"] == 0.25
+
+
+def test_folds_roll_the_origin_back():
+    folds = make_folds({"total": [np.arange(10.0)], "category": [np.arange(4.0)]}, horizon=2, folds=3, step=2, min_train=3)
+    assert [len(t) for t in folds.train] == [8, 6, 4]
+    assert folds.actual.tolist() == [[8, 9], [6, 7], [4, 5]]
+    assert folds.kind == ["total"] * 3
+
+
+def test_dataset_series_match_the_analysis_and_split_by_tenant(tmp_path):
+    path = tmp_path / "export.csv"
+    pd.DataFrame({
+        "Tenant_ID": ["a", "a", "a", "b"],
+        "Date": ["2024-01-03", "2024-01-20", "2024-03-01", "2024-01-01"],
+        "Amount": [-10.0, 5.0, 7.0, 1.0],
+        "Category": ["Software", "Payment", "Software", "Travel"],
+        "Project": ["X", None, "Y", "X"],
+    }).to_csv(path, index=False)
+
+    frames = load_dataset(path)
+    assert len(frames) == 2
+    series = ledger_series(frames[0])
+    assert [s.tolist() for s in series["total"]] == [[10.0, 7.0]]  # payments excluded, empty months omitted
+    assert [s.tolist() for s in series["project"]] == [[10.0], [7.0]]
+
+
+def test_backtest_reports_every_model():
+    series = {"total": [], "category": [], "project": []}
+    for frame in synthetic_tenants(tenants=2, rows=1_500, months=24, seed=1):
+        for kind, values in ledger_series(frame).items():
+            series[kind].extend(values)
+    folds = make_folds(series, horizon=3, folds=2, step=1, min_train=6)
+    report = backtest(folds, ["naive", "holt", "holt_winters"], horizon=3, workers=1)
+
+    assert set(report) == {"naive", "holt", "holt_winters"}
+    for result in report.values():
+        assert result["fit_seconds"] >= 0 and 0 <= result["coverage"] <= 1
+        assert set(result["by_kind"]) == {"total", "category", "project"}
+        assert len(result["mape_by_step"]) == 3
+    assert report["holt"] != report["holt_winters"]
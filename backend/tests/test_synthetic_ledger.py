@@ -0,0 +1,30 @@
+from benchmarks.synthetic_ledger import LedgerSpec, generate_ledger
+from benchmarks.run_pipeline import compare
+
+
+def test_generator_is_seeded_and_sized():
+    spec = LedgerSpec(rows=2_000, sheets=2, seed=7)
+    first = generate_ledger(spec)
+    second = generate_ledger(spec)
+
+    assert list(first) == ["Sheet1", "Sheet2"]
+    assert sum(len(f) for f in first.values()) == 2_000
+    for name in first:
+        assert first[name].equals(second[name])
+        assert first[name]["Date"].is_monotonic_increasing
+    assert not generate_ledger(LedgerSpec(rows=2_000, sheets=2, seed=8))["Sheet1"].equals(first["Sheet1"])
+
+
+def test_generator_contains_subscriptions_and_payments():
+    ledger = generate_ledger(LedgerSpec(rows=5_000))["Sheet1"]
+    assert (ledger["Description"] == "GitHub Enterprise").sum() >= 12
+    assert (ledger["Amount"] < 0).any()
+    assert ledger["Description"].nunique() > 100
+
+
+def test_compare_flags_regressions_only_beyond_tolerance():
+    baseline = {"sqlite:10": {"stages": {"parse": {"seconds": 1.0}, "tiny": {"seconds": 0.001}}}}
+    results = {"sqlite:10": {"stages": {"parse": {"seconds": 1.2}, "tiny": {"seconds": 1.0}}}}
+    assert compare(results, baseline, tolerance=0.25, min_seconds=0.05) == []
+    results["sqlite:10"]["stages"]["parse"]["seconds"] = 1.5
+    assert compare(results, baseline, tolerance=0.25, min_seconds=0.05) == ["sqlite:10:parse"]
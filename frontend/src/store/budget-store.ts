@@ -20,6 +20,7 @@ export interface Subscription {
     start_date?: string;
     next_payment_date?: string;
     status?: string;
+    confidence?: number;
 }
 
 export interface BudgetMetrics {
@@ -28,6 +29,7 @@ export interface BudgetMetrics {
     project_breakdown: Record<string, number>;
     top_merchants: Record<string, number>;
     gaps: Array<{ start_date: string; end_date: string; days: number }>;
+    dimension_gaps?: Array<{ dimension: string; key: string; start_date: string; end_date: string; days: number }>;
     flash_fill: Array<{ description: string; suggested_category: string; count: number }>;
     subscriptions: Array<Subscription>;
     anomalies: Array<{ description: string; date: string; amount: number; average: number }>;